@@ -0,0 +1,251 @@
+"""
+Cluster benchmark and test harness: sharded ping sweeps run by scan workers on localhost, against the same sweep
+run locally, with a stand-in nmap.
+
+The coordinator runs in process with ToolPingSweep, the workers are separate processes started with the worker entry
+point and registering over TCP. nmap is replaced on PATH by fake_nmap.py, whose run time is a fixed start cost plus
+a cost per address down, waiting for its timeout: a worker runs its shards concurrently, up to its capacity.
+
+The scenarios are:
+- local: the shards scanned by the coordinator itself, no worker registered;
+- workers: the same sweep with 1, 2 and 4 workers;
+- killed: a worker killed while its shards run, the shards are sent again to the other workers;
+- stalled: a worker stopped while its shards run, found lost when its heartbeats stop.
+
+Every sweep is checked to find the same hosts as the local one.
+
+Usage: python benchmarks/bench_cluster.py [--prefix 20] [--shard-prefix 24] [--capacity 2] [--delay 0.2]
+                                          [--dead-probe-us 2000] [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import yaml
+
+BENCHMARKS = Path(__file__).resolve().parent
+ROOT = BENCHMARKS.parent
+SOURCES = ROOT / "src" / "ai_mcp_net_analysis"
+sys.path.insert(0, str(SOURCES))
+
+from utils import ConfigParser, LoggerFactory  # noqa: E402
+from tools import Tool  # noqa: E402
+
+# Worker process command, the configuration path and worker name are its arguments
+WORKER_COMMAND = [
+    sys.executable, "-c",
+    "import asyncio, sys; from worker import work; asyncio.run(work(sys.argv[1], name=sys.argv[2]))",
+]
+
+# Upper bound in s for the workers to register
+REGISTER_TIMEOUT_S = 30
+
+# Heartbeats of the workers, short so that a stalled worker is found lost quickly
+HEARTBEAT_INTERVAL_S = 0.25
+HEARTBEAT_TIMEOUT_S = 1.0
+
+
+def free_port() -> int:
+    """
+    A TCP port free on the loopback interface.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def setup(workdir: Path, options: argparse.Namespace) -> Path:
+    """
+    Install the stand-in nmap on PATH and write the configuration of the coordinator and workers.
+    :return: The configuration file path.
+    """
+    bin_dir = workdir / "bin"
+    bin_dir.mkdir()
+    nmap = bin_dir / "nmap"
+    nmap.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{BENCHMARKS / "fake_nmap.py"}" "$@"\n')
+    nmap.chmod(0o755)
+    os.environ["PATH"] = f"{bin_dir}{os.pathsep}{os.environ['PATH']}"
+    os.environ["FAKE_NMAP_DELAY_S"] = str(options.delay)
+    os.environ["FAKE_NMAP_UP_RATIO"] = str(options.up_ratio)
+    os.environ["FAKE_NMAP_DEAD_PROBE_US"] = str(options.dead_probe_us)
+
+    config = yaml.safe_load((ROOT / "config" / "config.yaml").read_text())
+    config["cache"]["enabled"] = False
+    config["inventory"]["enabled"] = False
+    # The sweeps do not resolve the host names, the synthetic addresses have no name server
+    config["dns"]["enabled"] = False
+    config["scan"]["sharding"].update({"workers": options.capacity, "prefix_length_v4": options.shard_prefix})
+    config["cluster"] = {
+        "enabled": True,
+        "host": "127.0.0.1",
+        "port": free_port(),
+        "token": "bench",
+        "capacity": options.capacity,
+        "heartbeat_interval_s": HEARTBEAT_INTERVAL_S,
+        "heartbeat_timeout_s": HEARTBEAT_TIMEOUT_S,
+        "max_attempts": 3,
+        "wait_s": 30,
+    }
+    cfg_path = workdir / "config.yaml"
+    cfg_path.write_text(yaml.safe_dump(config))
+    return cfg_path
+
+
+class Workers:
+    """
+    Worker processes, each in its own directory.
+    """
+
+    def __init__(self, workdir: Path, cfg_path: Path):
+        self._workdir = workdir
+        self._cfg_path = cfg_path
+        self.processes: list[subprocess.Popen] = []
+
+    def start(self, count: int) -> None:
+        env = {**os.environ, "PYTHONPATH": str(SOURCES)}
+        for _ in range(count):
+            name = f"worker-{len(self.processes)}"
+            worker_dir = self._workdir / name
+            worker_dir.mkdir()
+            self.processes.append(subprocess.Popen(
+                [*WORKER_COMMAND, str(self._cfg_path), name], cwd=worker_dir, env=env, stderr=subprocess.DEVNULL
+            ))
+
+    def stop(self) -> None:
+        for process in self.processes:
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+
+
+async def wait_workers(count: int) -> None:
+    """
+    Wait for a number of workers to be registered.
+    """
+    deadline = time.monotonic() + REGISTER_TIMEOUT_S
+    while Tool.get_cluster().get_stats()["workers"] != count:
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"{count} workers expected, {Tool.get_cluster().get_stats()['workers']} registered")
+        await asyncio.sleep(0.05)
+
+
+async def sweep(network: str) -> tuple[dict, dict]:
+    """
+    Run a sharded ping sweep and measure it.
+    :return: The measures and the hosts found with their state.
+    """
+    stats = Tool.get_cluster().get_stats()
+    start = time.perf_counter()
+    result = await Tool.exec_tool_async("ToolPingSweep", {"ip_cidr": network, "timeout_s": 30, "sharded": True})
+    elapsed = time.perf_counter() - start
+    after = Tool.get_cluster().get_stats()
+    return {
+        "wall_s": round(elapsed, 3),
+        "workers": after["workers"],
+        "capacity": after["capacity"],
+        "shards": after["shards"] - stats["shards"],
+        "retries": after["retries"] - stats["retries"],
+        "lost": after["lost"] - stats["lost"],
+        "up": result.stats.up,
+    }, {host.ip: host.state for host in result.hosts}
+
+
+async def bench(workdir: Path, cfg_path: Path, options: argparse.Namespace) -> dict:
+    """
+    Run the scenarios with the coordinator in process.
+    """
+    network = f"10.30.0.0/{options.prefix}"
+    cfg = ConfigParser.get_config(str(cfg_path)).config
+    LoggerFactory.get_logger(cfg)
+    Tool.configure(cfg)
+    coordinator = asyncio.create_task(Tool.get_cluster().run())
+    workers = Workers(workdir, cfg_path)
+    results = {}
+    try:
+        results["local"], reference = await sweep(network)
+        found = []
+
+        for count in (1, 2, 4):
+            workers.start(count - len(workers.processes))
+            await wait_workers(count)
+            results[f"workers_{count}"], hosts = await sweep(network)
+            found.append(hosts)
+
+        # A worker is killed, then another one stopped, once their first shards are running
+        for scenario, action in (("killed", signal.SIGKILL), ("stalled", signal.SIGSTOP)):
+            victim = next(process for process in workers.processes if process.poll() is None)
+            task = asyncio.create_task(sweep(network))
+            await asyncio.sleep(options.delay / 2)
+            victim.send_signal(action)
+            results[scenario], hosts = await task
+            found.append(hosts)
+
+        assert all(hosts == reference for hosts in found), "a cluster sweep changed the result"
+    finally:
+        workers.stop()
+        coordinator.cancel()
+    return results
+
+
+def git_revision() -> str | None:
+    """
+    Current commit of the repository, None if unavailable.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--prefix", type=int, default=20, help="Prefix length of the swept IPv4 network.")
+    parser.add_argument("--shard-prefix", type=int, default=24, help="Prefix length of the shards.")
+    parser.add_argument("--capacity", type=int, default=2, help="Shards run at once by a worker, and locally.")
+    parser.add_argument("--up-ratio", type=float, default=0.2, help="Fraction of the addresses up.")
+    parser.add_argument("--delay", type=float, default=0.2, help="Start cost of an nmap run in seconds.")
+    parser.add_argument("--dead-probe-us", type=float, default=2000, help="Cost of a probe to an address down in us.")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    options = parser.parse_args()
+
+    cwd = Path.cwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        cfg_path = setup(workdir, options)
+        # The logs are written in the working directory
+        os.chdir(workdir)
+        try:
+            results = asyncio.run(bench(workdir, cfg_path, options))
+        finally:
+            os.chdir(cwd)
+
+    report = {
+        "revision": git_revision(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "options": {name: value for name, value in vars(options).items() if name != "output"},
+        "scenarios": results,
+    }
+
+    for name, result in results.items():
+        print(f"{name:<10} {result['wall_s']:>8.3f}s  {result['workers']:>2} workers  {result['capacity']:>3} slots  "
+              f"{result['shards']:>4} shards  {result['retries']:>3} retries  {result['lost']:>2} lost  "
+              f"{result['up']:>6} up")
+    if options.output:
+        Path(options.output).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Host discovery benchmark and test harness: ping sweeps of on-link, routed and mixed networks with ICMP echo only,
+as before the choice of technique, and with the technique chosen from the route table, with a stand-in nmap.
+
+nmap is replaced on PATH by fake_nmap.py, whose run time is a fixed start cost plus a cost per address down: the
+ICMP and TCP probes of an address down wait for their full timeout, the ARP requests of an address down time out
+sooner. A fraction of the hosts up drop ICMP probes and are only found with ARP requests or TCP probes. The route
+table of the local host is replaced by a synthetic one, with a single on-link network behind an Ethernet interface
+and a default route through a gateway.
+
+The scenarios sweep each network with:
+- icmp: ICMP echo only (scan.discovery.technique 'icmp');
+- auto: ARP requests for the on-link networks and ICMP and TCP probes for the others (technique 'auto').
+
+Every auto sweep is checked to find all the hosts up and to record the technique of each network.
+
+Usage: python benchmarks/bench_discovery.py [--prefix 22] [--up-ratio 0.25] [--drop-ratio 0.2] [--delay 0.2]
+                                            [--dead-probe-us 1000] [--arp-dead-probe-us 100] [--output results.json]
+"""
+import argparse
+import asyncio
+import ipaddress
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import yaml
+
+BENCHMARKS = Path(__file__).resolve().parent
+ROOT = BENCHMARKS.parent
+sys.path.insert(0, str(ROOT / "src" / "ai_mcp_net_analysis"))
+
+from synthetic import is_up  # noqa: E402
+from utils import ConfigParser, LoggerFactory, RouteTable  # noqa: E402
+from tools import Tool  # noqa: E402
+
+
+def setup(workdir: Path, options: argparse.Namespace) -> None:
+    """
+    Install the stand-in nmap on PATH.
+    """
+    bin_dir = workdir / "bin"
+    bin_dir.mkdir()
+    nmap = bin_dir / "nmap"
+    nmap.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{BENCHMARKS / "fake_nmap.py"}" "$@"\n')
+    nmap.chmod(0o755)
+    os.environ["PATH"] = f"{bin_dir}{os.pathsep}{os.environ['PATH']}"
+    os.environ["FAKE_NMAP_DELAY_S"] = str(options.delay)
+    os.environ["FAKE_NMAP_UP_RATIO"] = str(options.up_ratio)
+    os.environ["FAKE_NMAP_ECHO_DROP_RATIO"] = str(options.drop_ratio)
+    os.environ["FAKE_NMAP_DEAD_PROBE_US"] = str(options.dead_probe_us)
+    os.environ["FAKE_NMAP_ARP_DEAD_PROBE_US"] = str(options.arp_dead_probe_us)
+
+
+def route_table(workdir: Path, on_link: ipaddress.IPv4Network) -> None:
+    """
+    Write a synthetic route table, an on-link network on eth0 and a default route through its first address,
+    and read it instead of the one of the local host.
+    """
+    def hex_le(address: ipaddress.IPv4Address) -> str:
+        return int(address).to_bytes(4, "little").hex().upper()
+
+    gateway = on_link.network_address + 1
+    header = "Iface\tDestination\tGateway\tFlags\tRefCnt\tUse\tMetric\tMask\tMTU\tWindow\tIRTT"
+    routes = [
+        f"eth0\t00000000\t{hex_le(gateway)}\t0003\t0\t0\t100\t00000000\t0\t0\t0",
+        f"eth0\t{hex_le(on_link.network_address)}\t00000000\t0001\t0\t0\t100\t{hex_le(on_link.netmask)}\t0\t0\t0",
+    ]
+    (workdir / "route").write_text("\n".join([header, *routes]) + "\n")
+    (workdir / "ipv6_route").write_text("")
+    interface = workdir / "net" / "eth0"
+    interface.mkdir(parents=True)
+    (interface / "type").write_text("1\n")
+    (interface / "flags").write_text("0x1003\n")
+    RouteTable.ROUTE_V4 = str(workdir / "route")
+    RouteTable.ROUTE_V6 = str(workdir / "ipv6_route")
+    RouteTable.SYS_CLASS_NET = str(workdir / "net")
+
+
+def configure(workdir: Path, technique: str) -> None:
+    """
+    Configure the tools with a host discovery technique, without the results cache, inventory, name resolution
+    and timing model.
+    """
+    config = yaml.safe_load((ROOT / "config" / "config.yaml").read_text())
+    config["cache"]["enabled"] = False
+    config["inventory"]["enabled"] = False
+    config["dns"]["enabled"] = False
+    config["scan"]["timing"]["enabled"] = False
+    config["scan"]["discovery"] = {"technique": technique}
+    cfg_path = workdir / "config.yaml"
+    cfg_path.write_text(yaml.safe_dump(config))
+    cfg = ConfigParser.get_config(str(cfg_path)).config
+    LoggerFactory.get_logger(cfg)
+    Tool.configure(cfg)
+
+
+async def sweep(network: str) -> dict:
+    """
+    Run a ping sweep and measure it.
+    """
+    start = time.perf_counter()
+    result = await Tool.exec_tool_async("ToolPingSweep", {"ip_cidr": network, "timeout_s": 30})
+    elapsed = time.perf_counter() - start
+    return {
+        "wall_s": round(elapsed, 3),
+        "up": result.stats.up,
+        "discovery": [f"{technique} {cidr}" for cidr, technique in result.discovery or []],
+    }
+
+
+async def bench(workdir: Path, options: argparse.Namespace) -> dict:
+    """
+    Run the scenarios on the on-link, routed and mixed networks.
+    """
+    on_link = ipaddress.IPv4Network(f"10.50.0.0/{options.prefix}")
+    mixed = on_link.supernet()
+    routed = ipaddress.IPv4Network(f"10.60.0.0/{options.prefix}")
+    route_table(workdir, on_link)
+    results = {}
+    for technique in ("icmp", "auto"):
+        configure(workdir, technique)
+        for name, network in (("on_link", on_link), ("routed", routed), ("mixed", mixed)):
+            result = await sweep(str(network))
+            result["expected_up"] = sum(is_up(int(address), options.up_ratio) for address in network)
+            results[f"{name}_{technique}"] = result
+
+    for name in ("on_link", "routed", "mixed"):
+        result = results[f"{name}_auto"]
+        assert result["up"] == result["expected_up"], f"hosts up lost by the {name} auto sweep"
+    assert results["on_link_auto"]["discovery"] == [f"arp {on_link}"], "on-link network not swept with ARP"
+    assert results["routed_auto"]["discovery"] == [f"icmp-tcp {routed}"], "routed network not swept with TCP"
+    assert len(results["mixed_auto"]["discovery"]) == 2, "mixed network not split by technique"
+    return results
+
+
+def git_revision() -> str | None:
+    """
+    Current commit of the repository, None if unavailable.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--prefix", type=int, default=22, help="Prefix length of the on-link and routed networks.")
+    parser.add_argument("--up-ratio", type=float, default=0.25, help="Fraction of the addresses up.")
+    parser.add_argument("--drop-ratio", type=float, default=0.2, help="Fraction of the hosts up dropping ICMP.")
+    parser.add_argument("--delay", type=float, default=0.2, help="Start cost of an nmap run in seconds.")
+    parser.add_argument("--dead-probe-us", type=float, default=1000,
+                        help="Cost of the ICMP and TCP probes of an address down in us.")
+    parser.add_argument("--arp-dead-probe-us", type=float, default=100,
+                        help="Cost of the ARP requests of an address down in us.")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    options = parser.parse_args()
+
+    cwd = Path.cwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        setup(workdir, options)
+        # The logs are written in the working directory
+        os.chdir(workdir)
+        try:
+            results = asyncio.run(bench(workdir, options))
+        finally:
+            os.chdir(cwd)
+
+    report = {
+        "revision": git_revision(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "options": {name: value for name, value in vars(options).items() if name != "output"},
+        "scenarios": results,
+    }
+
+    for name, result in results.items():
+        print(f"{name:<15} {result['wall_s']:>8.3f}s  {result['up']:>6} up of {result['expected_up']:<6}  "
+              f"{', '.join(result['discovery'])}")
+    if options.output:
+        Path(options.output).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
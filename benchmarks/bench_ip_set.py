@@ -0,0 +1,200 @@
+"""
+IP target set benchmark: interval based set operations against the equivalent ipaddress based code.
+
+Random IPv4 and IPv6 include and exclude lists are generated with a fixed seed, both implementations are timed on
+lists of growing size. The results of the interval set are checked by the property tests of
+tests/test_type_ip_set.py.
+
+Usage: python benchmarks/bench_ip_set.py [--sizes 16,256,1024] [--seed 1] [--output results.json]
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from ipaddress import collapse_addresses, ip_network, IPv4Address, IPv6Address, IPv4Network, IPv6Network
+from itertools import islice
+from pathlib import Path
+from typing import Callable
+
+BENCHMARKS = Path(__file__).resolve().parent
+ROOT = BENCHMARKS.parent
+sys.path.insert(0, str(ROOT / "src" / "ai_mcp_net_analysis"))
+
+from utils.type import IPTargetSet  # noqa: E402
+
+# Address space and prefix lengths of the random networks, for each address family
+SPACES = {
+    4: (ip_network("10.0.0.0/8"), 16, 32),
+    6: (ip_network("2001:db8::/32"), 48, 128),
+}
+
+
+def random_network(rng: random.Random, version: int) -> IPv4Network | IPv6Network:
+    """
+    Random network of an address family within its benchmark address space.
+    """
+    space, shortest, longest = SPACES[version]
+    prefix = rng.randint(shortest, longest)
+    offset = rng.getrandbits(prefix - space.prefixlen) << (space.max_prefixlen - prefix)
+    return ip_network((int(space.network_address) + offset, prefix))
+
+
+def random_networks(rng: random.Random, count: int) -> list[IPv4Network | IPv6Network]:
+    """
+    Random IPv4 and IPv6 networks, about half of each family.
+    """
+    return [random_network(rng, rng.choice((4, 6))) for _ in range(count)]
+
+
+# ipaddress based reference code
+
+
+def ref_union(networks: list) -> list:
+    """
+    Merge networks into the minimal list of networks, per address family.
+    """
+    return [net for version in (4, 6) for net in collapse_addresses(n for n in networks if n.version == version)]
+
+
+def ref_difference(networks: list, excluded: list) -> list:
+    """
+    Cut excluded networks out of merged networks, one excluded network at a time.
+    """
+    result = ref_union(networks)
+    for excluded_network in ref_union(excluded):
+        cut = []
+        for network in result:
+            if network.version != excluded_network.version or not network.overlaps(excluded_network):
+                cut.append(network)
+            elif not excluded_network.supernet_of(network):
+                cut.extend(network.address_exclude(excluded_network))
+        result = ref_union(cut)
+    return result
+
+
+def ref_intersection(a: list, b: list) -> list:
+    """
+    Intersect merged networks pairwise, two networks either nest or are disjoint.
+    """
+    common = []
+    for network in ref_union(a):
+        for other in ref_union(b):
+            if network.version == other.version and network.overlaps(other):
+                common.append(network if network.prefixlen >= other.prefixlen else other)
+    return ref_union(common)
+
+
+def ref_contains(networks: list, address: IPv4Address | IPv6Address) -> bool:
+    """
+    Check whether an address belongs to any of the networks.
+    """
+    return any(address in network for network in networks)
+
+
+def ref_split(networks: list, count: int) -> list[list[IPv4Address | IPv6Address]]:
+    """
+    Split the addresses of merged networks into chunks of the same size by enumerating them.
+    """
+    addresses = (address for network in ref_union(networks) for address in network)
+    total = sum(network.num_addresses for network in ref_union(networks))
+    size, extra = divmod(total, count)
+    chunks = [list(islice(addresses, size + (1 if index < extra else 0))) for index in range(count)]
+    return [chunk for chunk in chunks if chunk]
+
+
+# Timings
+
+
+def timed(function: Callable[[], object], runs: int) -> float:
+    """
+    Median time of a function in ms.
+    """
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return round(statistics.median(times) * 1000, 3)
+
+
+def bench(rng: random.Random, size: int, runs: int) -> dict:
+    """
+    Time the interval set and the reference code on include and exclude lists of a size.
+    """
+    included = random_networks(rng, size)
+    excluded = random_networks(rng, size)
+    probes = [random_network(rng, version).network_address for version in (4, 6) for _ in range(500)]
+    set_included, set_excluded = IPTargetSet(included), IPTargetSet(excluded)
+    merged = ref_union(included)
+
+    # The reference difference is quadratic, time it once on the larger lists
+    ref_runs = runs if size <= 256 else 1
+    split_space = [ip_network("10.0.0.0/14")]
+    results = {
+        "build": (timed(lambda: IPTargetSet(included), runs), timed(lambda: ref_union(included), runs)),
+        "union": (timed(lambda: set_included | set_excluded, runs),
+                  timed(lambda: ref_union(included + excluded), runs)),
+        "intersection": (timed(lambda: set_included & set_excluded, runs),
+                         timed(lambda: ref_intersection(included, excluded), ref_runs)),
+        "difference": (timed(lambda: (set_included - set_excluded).to_networks(), runs),
+                       timed(lambda: ref_difference(included, excluded), ref_runs)),
+        "contains_1000": (timed(lambda: [probe in set_included for probe in probes], runs),
+                          timed(lambda: [ref_contains(merged, probe) for probe in probes], ref_runs)),
+        "count": (timed(lambda: set_included.num_addresses(), runs),
+                  timed(lambda: sum(network.num_addresses for network in merged), runs)),
+        "split_/14_by_7": (timed(lambda: IPTargetSet(split_space).split(7), runs),
+                           timed(lambda: ref_split(split_space, 7), 1)),
+    }
+    return {
+        name: {"interval_ms": interval_ms, "ipaddress_ms": ipaddress_ms,
+               "speedup": round(ipaddress_ms / interval_ms, 1) if interval_ms else None}
+        for name, (interval_ms, ipaddress_ms) in results.items()
+    }
+
+
+def git_revision() -> str | None:
+    """
+    Current commit of the repository, None if unavailable.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="16,256,1024", help="Comma separated numbers of networks per list.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    options = parser.parse_args()
+
+    rng = random.Random(options.seed)
+    sizes = [int(size) for size in options.sizes.split(",")]
+    report = {
+        "revision": git_revision(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "options": {name: value for name, value in vars(options).items() if name != "output"},
+        "sizes": {str(size): bench(rng, size, options.runs) for size in sizes},
+    }
+
+    for size, results in report["sizes"].items():
+        print(f"{size} networks per list")
+        for name, result in results.items():
+            print(f"  {name:<20} interval {result['interval_ms']:>10.3f}ms  ipaddress {result['ipaddress_ms']:>10.3f}ms"
+                  f"  x{result['speedup']}")
+    if options.output:
+        Path(options.output).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Port scan benchmark: wall time and probe count of the port scan tool for each of its choices, with a stand-in nmap.
+
+nmap is replaced on PATH by fake_nmap.py, whose run time is a fixed start cost plus a cost per probe: a probe
+answered by a host up is cheap, a probe sent to an address down waits for its timeout. A single nmap run is
+modeled as working through its probes one after the other, so that the benchmark measures the effect of the work
+partitioning between runs, not the parallelism within a run. The ranked ports are read from a synthetic
+nmap-services file, set with NMAPDIR.
+
+Three sets of scenarios are run, each varying a single choice from the default configuration:
+- discovery: the hosts to scan found by a ping sweep, from the host inventory, or all the addresses;
+- ports: the top 20, 100 and 1000 ports against the full port range;
+- partitioning: the number of workers and the hosts and ports per task, including a single nmap run.
+
+The open ports found are checked to be the same whatever the partitioning.
+
+Usage: python benchmarks/bench_port_scan.py [--prefix 24] [--up-ratio 0.1] [--delay 0.1] [--probe-us 50]
+                                            [--dead-probe-us 500] [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import yaml
+
+BENCHMARKS = Path(__file__).resolve().parent
+ROOT = BENCHMARKS.parent
+sys.path.insert(0, str(ROOT / "src" / "ai_mcp_net_analysis"))
+
+from synthetic import SERVICES  # noqa: E402
+from utils import ConfigParser, LoggerFactory  # noqa: E402
+from tools import Tool  # noqa: E402
+
+# Default port scan configuration, each partitioning scenario overrides it
+PORT_SCAN = {"workers": 8, "hosts_per_task": 32, "ports_per_task": 1024}
+
+# Partitioning scenarios: workers, hosts per task and ports per task, None for everything in a single task
+PARTITIONS = [
+    (1, None, None),
+    (1, 32, 1024),
+    (4, 32, 1024),
+    (8, 32, 1024),
+    (8, 8, 256),
+    (8, 64, 4096),
+]
+
+
+def write_services(directory: Path, seed: int) -> None:
+    """
+    Write a synthetic nmap-services file ranking every TCP port, the well known ones first.
+    """
+    rng = random.Random(seed)
+    others = [port for port in range(1, 65536) if port not in SERVICES]
+    rng.shuffle(others)
+    ranked = [*SERVICES, *others]
+    lines = [
+        f"{SERVICES.get(port, 'unknown')}\t{port}/tcp\t{1 / (rank + 2):.6f}\n" for rank, port in enumerate(ranked)
+    ]
+    (directory / "nmap-services").write_text("".join(lines))
+
+
+def setup(workdir: Path, options: argparse.Namespace) -> None:
+    """
+    Install the stand-in nmap on PATH and the synthetic services file.
+    """
+    bin_dir = workdir / "bin"
+    bin_dir.mkdir()
+    nmap = bin_dir / "nmap"
+    nmap.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{BENCHMARKS / "fake_nmap.py"}" "$@"\n')
+    nmap.chmod(0o755)
+    os.environ["PATH"] = f"{bin_dir}{os.pathsep}{os.environ['PATH']}"
+    os.environ["FAKE_NMAP_DELAY_S"] = str(options.delay)
+    os.environ["FAKE_NMAP_UP_RATIO"] = str(options.up_ratio)
+    os.environ["FAKE_NMAP_OPEN_RATIO"] = str(options.open_ratio)
+    os.environ["FAKE_NMAP_PROBE_US"] = str(options.probe_us)
+    os.environ["FAKE_NMAP_DEAD_PROBE_US"] = str(options.dead_probe_us)
+    os.environ["NMAPDIR"] = str(workdir)
+    write_services(workdir, options.seed)
+
+
+def configure(workdir: Path, port_scan: dict) -> None:
+    """
+    Configure the tools with the repository configuration, the results cache disabled, the host inventory in the
+    working directory and the given port scan section.
+    """
+    config = yaml.safe_load((ROOT / "config" / "config.yaml").read_text())
+    config["cache"]["enabled"] = False
+    config["inventory"]["path"] = str(workdir / "inventory.sqlite")
+    config["scan"]["port_scan"] = {**config["scan"].get("port_scan", {}), **port_scan}
+    cfg_path = workdir / "config.yaml"
+    cfg_path.write_text(yaml.safe_dump(config))
+    cfg = ConfigParser.get_config(str(cfg_path)).config
+    LoggerFactory.get_logger(cfg)
+    Tool.configure(cfg)
+
+
+async def run(arguments: dict) -> dict:
+    """
+    Run a port scan and measure it.
+    """
+    start = time.perf_counter()
+    result = await Tool.exec_tool_async("ToolPortScan", arguments)
+    elapsed = time.perf_counter() - start
+    # The ping sweep sends a probe per address
+    sweep_probes = result.stats.scanned + result.stats.skipped if arguments.get("discovery") == "sweep" else 0
+    return {
+        "wall_s": round(elapsed, 3),
+        "probes": result.stats.probes + sweep_probes,
+        "sweep_probes": sweep_probes,
+        "scanned": result.stats.scanned,
+        "tasks": result.stats.tasks,
+        "open_ports": result.num_open_ports(),
+        "found": {host.ip: [port.port for port in host.ports] for host in result.hosts},
+    }
+
+
+async def bench(workdir: Path, options: argparse.Namespace) -> dict:
+    """
+    Run the discovery, ports and partitioning scenarios.
+    """
+    network = f"10.20.0.0/{options.prefix}"
+    base = {"ip_cidrs": [network], "timeout_s": 60}
+    configure(workdir, PORT_SCAN)
+
+    # Discovery: the inventory is filled by the first sweep
+    discovery = {}
+    for mode in ("sweep", "inventory", "none"):
+        discovery[mode] = await run({**base, "top_ports": 100, "discovery": mode})
+
+    ports = {}
+    for top_ports in (20, 100, 1000):
+        ports[f"top_{top_ports}"] = await run({**base, "top_ports": top_ports, "discovery": "inventory"})
+    ports["all"] = await run({**base, "ports": "1-65535", "discovery": "inventory"})
+
+    partitions = {}
+    for workers, hosts_per_task, ports_per_task in PARTITIONS:
+        configure(workdir, {
+            "workers": workers,
+            "hosts_per_task": hosts_per_task or 1 << 32,
+            "ports_per_task": ports_per_task or 65535,
+        })
+        name = f"w{workers}_h{hosts_per_task or 'all'}_p{ports_per_task or 'all'}"
+        partitions[name] = await run({**base, "ports": options.partition_ports, "discovery": "inventory"})
+
+    found = [result.pop("found") for scenarios in (discovery, ports, partitions) for result in scenarios.values()]
+    reference = found[len(discovery) + len(ports)]
+    assert all(item == reference for item in found[len(discovery) + len(ports):]), "partitioning changed the result"
+    return {"discovery": discovery, "ports": ports, "partitions": partitions}
+
+
+def git_revision() -> str | None:
+    """
+    Current commit of the repository, None if unavailable.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--prefix", type=int, default=24, help="Prefix length of the scanned IPv4 network.")
+    parser.add_argument("--up-ratio", type=float, default=0.1, help="Fraction of the addresses up.")
+    parser.add_argument("--open-ratio", type=float, default=0.01, help="Fraction of the ports open on hosts up.")
+    parser.add_argument("--delay", type=float, default=0.1, help="Start cost of an nmap run in seconds.")
+    parser.add_argument("--probe-us", type=float, default=50, help="Cost of a probe answered by a host up in us.")
+    parser.add_argument("--dead-probe-us", type=float, default=500, help="Cost of a probe to an address down in us.")
+    parser.add_argument("--partition-ports", default="1-4096", help="Ports of the partitioning scenarios.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    options = parser.parse_args()
+
+    cwd = Path.cwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        setup(workdir, options)
+        # The logs are written in the working directory
+        os.chdir(workdir)
+        try:
+            results = asyncio.run(bench(workdir, options))
+        finally:
+            os.chdir(cwd)
+            inventory = Tool.get_inventory()
+            if inventory is not None:
+                inventory.close()
+
+    report = {
+        "revision": git_revision(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "options": {name: value for name, value in vars(options).items() if name != "output"},
+        **results,
+    }
+
+    for section in ("discovery", "ports", "partitions"):
+        print(f"\n{section}")
+        for name, result in report[section].items():
+            print(f"  {name:<16} {result['wall_s']:>8.3f}s  {result['probes']:>9} probes  "
+                  f"{result['scanned']:>6} hosts  {result['tasks']:>4} tasks  {result['open_ports']:>6} open")
+    if options.output:
+        Path(options.output).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
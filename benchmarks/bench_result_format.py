@@ -0,0 +1,86 @@
+"""
+Payload size and serialization time of the ping sweep result formats.
+
+Usage: python benchmarks/bench_result_format.py [--hosts 256 65536 1048576] [--output results.json]
+"""
+import argparse
+import json
+import sys
+import time
+from ipaddress import IPv4Network
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "ai_mcp_net_analysis"))
+
+from synthetic import nmap_xml  # noqa: E402
+from utils.nmap import NmapXmlStream, NmapSweepResult  # noqa: E402
+
+# Rough number of bytes per LLM token, used to estimate the token cost of a payload
+BYTES_PER_TOKEN = 4
+
+
+def network_for(hosts: int) -> str:
+    """
+    Smallest IPv4 network holding the given number of hosts.
+    """
+    prefix_length = 32 - max(hosts - 1, 1).bit_length()
+    return str(IPv4Network((0x0a000000, prefix_length)))
+
+
+def bench(hosts: int) -> dict:
+    """
+    Measure both formats for a sweep returning the given number of hosts, all up.
+    """
+    cidr = network_for(hosts)
+    raw = nmap_xml([cidr]).encode()
+
+    # XML format: the report is decoded and returned as is
+    start = time.perf_counter()
+    xml_text = str(NmapSweepResult(cidr, xml=raw.decode()))
+    xml_s = time.perf_counter() - start
+
+    # Compact format: the report is parsed in chunks and rendered as a host table
+    start = time.perf_counter()
+    parser = NmapXmlStream()
+    records = []
+    for offset in range(0, len(raw), 64 * 1024):
+        records.extend(parser.feed(raw[offset:offset + 64 * 1024]))
+    records.extend(parser.close())
+    compact_text = str(NmapSweepResult(cidr, records, parser.stats))
+    compact_s = time.perf_counter() - start
+
+    xml_bytes = len(xml_text.encode())
+    compact_bytes = len(compact_text.encode())
+    return {
+        "hosts": len(records),
+        "xml": {"bytes": xml_bytes, "tokens_est": xml_bytes // BYTES_PER_TOKEN, "seconds": round(xml_s, 4)},
+        "compact": {
+            "bytes": compact_bytes,
+            "tokens_est": compact_bytes // BYTES_PER_TOKEN,
+            "seconds": round(compact_s, 4),
+        },
+        "size_ratio": round(compact_bytes / xml_bytes, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hosts", type=int, nargs="+", default=[256, 65536, 1048576])
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    options = parser.parse_args()
+
+    results = []
+    for hosts in options.hosts:
+        result = bench(hosts)
+        results.append(result)
+        print(
+            f"{result['hosts']:>8} hosts  xml {result['xml']['bytes']:>11} B {result['xml']['seconds']:>8.3f}s  "
+            f"compact {result['compact']['bytes']:>10} B {result['compact']['seconds']:>8.3f}s  "
+            f"ratio {result['size_ratio']}"
+        )
+    if options.output:
+        Path(options.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
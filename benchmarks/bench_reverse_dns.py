@@ -0,0 +1,185 @@
+"""
+Reverse DNS benchmark and test harness: ping sweeps resolving the names of the hosts up, inside nmap or in the
+separate asynchronous stage of the sweep tools, against a stub DNS server on localhost, with a stand-in nmap.
+
+nmap is replaced on PATH by fake_nmap.py, whose run time is a fixed start cost plus a cost per host up for the
+reverse DNS resolution when run without -n. The stub DNS server answers after a fixed latency, one address in five
+without a PTR record (NXDOMAIN).
+
+The scenarios are:
+- nmap: the names resolved by nmap, the sweep command run without -n, as before the resolution stage;
+- skipped: the sweep with -n and the resolution stage skipped by the call (resolve false);
+- cold: the resolution stage with an empty resolver cache, every host up is queried;
+- warm: the same sweep again, every answer is cached;
+- negative_expired: the same sweep once the negative answers expired, only the addresses without a name are
+  queried again.
+
+Every sweep resolving names is checked to find the same names as nmap.
+
+Usage: python benchmarks/bench_reverse_dns.py [--prefix 20] [--up-ratio 0.5] [--delay 0.2] [--nmap-rdns-us 1000]
+                                              [--dns-latency-ms 5] [--concurrency 64] [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import yaml
+
+BENCHMARKS = Path(__file__).resolve().parent
+ROOT = BENCHMARKS.parent
+sys.path.insert(0, str(ROOT / "src" / "ai_mcp_net_analysis"))
+
+import stub_dns  # noqa: E402
+from utils import ConfigParser, LoggerFactory, NmapScanner  # noqa: E402
+from tools import Tool  # noqa: E402
+
+# Time to live in s of the negative answers of the stub server, short so that they expire during the benchmark
+NEGATIVE_TTL_S = 1
+
+
+def setup(workdir: Path, options: argparse.Namespace) -> None:
+    """
+    Install the stand-in nmap on PATH.
+    """
+    bin_dir = workdir / "bin"
+    bin_dir.mkdir()
+    nmap = bin_dir / "nmap"
+    nmap.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{BENCHMARKS / "fake_nmap.py"}" "$@"\n')
+    nmap.chmod(0o755)
+    os.environ["PATH"] = f"{bin_dir}{os.pathsep}{os.environ['PATH']}"
+    os.environ["FAKE_NMAP_DELAY_S"] = str(options.delay)
+    os.environ["FAKE_NMAP_UP_RATIO"] = str(options.up_ratio)
+    os.environ["FAKE_NMAP_RDNS_US"] = str(options.nmap_rdns_us)
+
+
+def configure(workdir: Path, server: str, options: argparse.Namespace) -> None:
+    """
+    Configure the tools with the resolver of the stub server, without the results cache and inventory.
+    """
+    config = yaml.safe_load((ROOT / "config" / "config.yaml").read_text())
+    config["cache"]["enabled"] = False
+    config["inventory"]["enabled"] = False
+    config["dns"] = {"enabled": True, "servers": [server], "concurrency": options.concurrency, "timeout_s": 2.0}
+    cfg_path = workdir / "config.yaml"
+    cfg_path.write_text(yaml.safe_dump(config))
+    cfg = ConfigParser.get_config(str(cfg_path)).config
+    LoggerFactory.get_logger(cfg)
+    Tool.configure(cfg)
+
+
+async def sweep(network: str, resolve: bool, server: stub_dns.StubDns) -> tuple[dict, dict]:
+    """
+    Run a ping sweep and measure it.
+    :return: The measures and the host names found by address.
+    """
+    queries = server.queries.total()
+    start = time.perf_counter()
+    result = await Tool.exec_tool_async("ToolPingSweep", {"ip_cidr": network, "timeout_s": 30, "resolve": resolve})
+    elapsed = time.perf_counter() - start
+    names = {host.ip: host.hostname for host in result.hosts}
+    return {
+        "wall_s": round(elapsed, 3),
+        "up": result.stats.up,
+        "named": sum(name is not None for name in names.values()),
+        "queries": server.queries.total() - queries,
+    }, names
+
+
+async def bench(workdir: Path, options: argparse.Namespace) -> dict:
+    """
+    Run the scenarios against the stub DNS server.
+    """
+    network = f"10.40.0.0/{options.prefix}"
+    transport, server, address = await stub_dns.start(options.dns_latency_ms / 1000, negative_ttl_s=NEGATIVE_TTL_S)
+    configure(workdir, address, options)
+    results = {}
+    try:
+        # The command line of the sweeps before the resolution stage, nmap resolves the names
+        command = NmapScanner.command
+        NmapScanner.command = lambda self, *args, **kwargs: [
+            arg for arg in command(self, *args, **kwargs) if arg != "-n"
+        ]
+        try:
+            results["nmap"], reference = await sweep(network, False, server)
+        finally:
+            NmapScanner.command = command
+
+        results["skipped"], _ = await sweep(network, False, server)
+        results["cold"], cold = await sweep(network, True, server)
+        results["warm"], warm = await sweep(network, True, server)
+        await asyncio.sleep(NEGATIVE_TTL_S + 0.1)
+        results["negative_expired"], expired = await sweep(network, True, server)
+
+        assert all(names == reference for names in (cold, warm, expired)), "the resolution stage changed the names"
+        assert results["warm"]["queries"] == 0, "cached answers queried again"
+        assert results["negative_expired"]["queries"] == results["cold"]["up"] - results["cold"]["named"], \
+            "expired negative answers not queried again"
+        results["resolver"] = Tool.get_resolver().get_stats()
+    finally:
+        transport.close()
+    return results
+
+
+def git_revision() -> str | None:
+    """
+    Current commit of the repository, None if unavailable.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--prefix", type=int, default=20, help="Prefix length of the swept IPv4 network.")
+    parser.add_argument("--up-ratio", type=float, default=0.5, help="Fraction of the addresses up.")
+    parser.add_argument("--delay", type=float, default=0.2, help="Start cost of an nmap run in seconds.")
+    parser.add_argument("--nmap-rdns-us", type=float, default=1000,
+                        help="Cost of the reverse DNS resolution of a host up inside nmap in us.")
+    parser.add_argument("--dns-latency-ms", type=float, default=5, help="Latency of the stub DNS server in ms.")
+    parser.add_argument("--concurrency", type=int, default=64, help="PTR queries in flight of the resolver.")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    options = parser.parse_args()
+
+    cwd = Path.cwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        setup(workdir, options)
+        # The logs are written in the working directory
+        os.chdir(workdir)
+        try:
+            results = asyncio.run(bench(workdir, options))
+        finally:
+            os.chdir(cwd)
+
+    resolver = results.pop("resolver")
+    report = {
+        "revision": git_revision(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "options": {name: value for name, value in vars(options).items() if name != "output"},
+        "scenarios": results,
+        "resolver": resolver,
+    }
+
+    for name, result in results.items():
+        saved = results["nmap"]["wall_s"] - result["wall_s"]
+        print(f"{name:<17} {result['wall_s']:>8.3f}s  {saved:>+8.3f}s saved  {result['up']:>6} up  "
+              f"{result['named']:>6} named  {result['queries']:>6} queries")
+    if options.output:
+        Path(options.output).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Host discovery backends wall time against loopback addresses and local stand-in listeners.
+
+Usage: python benchmarks/bench_scanner_backends.py [--cidr 127.0.0.0/22] [--listeners 64] [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import shutil
+import sys
+import time
+from contextlib import aclosing
+from ipaddress import ip_network
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src" / "ai_mcp_net_analysis"))
+
+from utils import ConfigParser, LoggerFactory  # noqa: E402
+from utils import AsyncioScanner, NmapScanner, NmapRunStats  # noqa: E402
+
+
+async def run(scanner, cidr: str, timeout_s: int) -> dict:
+    """
+    Run a sweep and measure it.
+    """
+    stats = NmapRunStats()
+    start = time.perf_counter()
+    async with aclosing(scanner.sweep([cidr], timeout_s, stats)) as hosts:
+        up = sum(1 for _ in [host async for host in hosts])
+    elapsed = time.perf_counter() - start
+    return {"up": up, "total": stats.total, "seconds": round(elapsed, 4), "hosts_per_s": round(stats.total / elapsed)}
+
+
+async def bench(options: argparse.Namespace) -> dict:
+    """
+    Start the stand-in listeners and run the backends.
+    """
+    addresses = list(ip_network(options.cidr).hosts())[:options.listeners]
+    servers = [await asyncio.start_server(lambda r, w: w.close(), str(ip), options.port) for ip in addresses]
+
+    results = {}
+    try:
+        for name, scanner in (
+            ("asyncio-tcp", AsyncioScanner(ports=[options.port], icmp=False, concurrency=options.concurrency)),
+            ("asyncio-tcp-icmp", AsyncioScanner(ports=[options.port], icmp=True, concurrency=options.concurrency)),
+        ):
+            results[name] = await run(scanner, options.cidr, options.timeout)
+        if shutil.which("nmap"):
+            results["nmap"] = await run(NmapScanner(), options.cidr, options.timeout)
+    finally:
+        for server in servers:
+            server.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cidr", default="127.0.0.0/22")
+    parser.add_argument("--listeners", type=int, default=64)
+    parser.add_argument("--port", type=int, default=18080)
+    parser.add_argument("--concurrency", type=int, default=AsyncioScanner.DEFAULT_CONCURRENCY)
+    parser.add_argument("--timeout", type=int, default=1)
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    options = parser.parse_args()
+
+    # nmap runs through CmdExec which logs with the application logger
+    LoggerFactory.get_logger(ConfigParser.get_config(str(ROOT / "config" / "config.yaml")).config)
+
+    results = asyncio.run(bench(options))
+    for name, result in results.items():
+        print(f"{name:>18}  {result['up']:>6}/{result['total']:<6} up  {result['seconds']:>8.3f}s  "
+              f"{result['hosts_per_s']:>8} hosts/s")
+    if options.output:
+        Path(options.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+End-to-end server benchmark: call_tool latency, throughput, peak RSS and bytes returned, with a stand-in nmap.
+
+The server runs in process over in-memory MCP streams, nmap is replaced on PATH by fake_nmap.py which writes a
+synthetic report for the scanned network. Each call sweeps a distinct network and the results cache is disabled,
+so that every call runs a scan.
+
+Usage: python benchmarks/bench_server.py [--hosts 256 4096] [--calls 32] [--concurrency 8] [--delay 0.1]
+                                         [--padding 0] [--format compact] [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from ipaddress import IPv4Network
+from pathlib import Path
+
+import anyio
+import yaml
+from mcp.client.session import ClientSession
+from mcp.shared.memory import create_client_server_memory_streams
+
+BENCHMARKS = Path(__file__).resolve().parent
+ROOT = BENCHMARKS.parent
+sys.path.insert(0, str(ROOT / "src" / "ai_mcp_net_analysis"))
+
+from server import serve  # noqa: E402
+
+
+def network_for(hosts: int, index: int) -> str:
+    """
+    The index-th IPv4 network of the smallest size holding the given number of hosts.
+    """
+    prefix_length = 32 - max(hosts - 1, 1).bit_length()
+    size = 1 << (32 - prefix_length)
+    return str(IPv4Network((0x0a000000 + index * size, prefix_length)))
+
+
+def percentile(values: list[float], rank: float) -> float:
+    """
+    Nearest rank percentile of the values.
+    """
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * rank), len(ordered) - 1)]
+
+
+def setup(workdir: Path, options: argparse.Namespace) -> Path:
+    """
+    Install the stand-in nmap on PATH and write the benchmark configuration.
+    :return: The configuration file path.
+    """
+    bin_dir = workdir / "bin"
+    bin_dir.mkdir()
+    nmap = bin_dir / "nmap"
+    nmap.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{BENCHMARKS / "fake_nmap.py"}" "$@"\n')
+    nmap.chmod(0o755)
+    os.environ["PATH"] = f"{bin_dir}{os.pathsep}{os.environ['PATH']}"
+    os.environ["FAKE_NMAP_DELAY_S"] = str(options.delay)
+    os.environ["FAKE_NMAP_UP_RATIO"] = str(options.up_ratio)
+    os.environ["FAKE_NMAP_PADDING"] = str(options.padding)
+
+    config = yaml.safe_load((ROOT / "config" / "config.yaml").read_text())
+    config["cache"]["enabled"] = False
+    # The sweeps do not resolve the host names, the synthetic addresses have no name server
+    config["dns"]["enabled"] = False
+    cfg_path = workdir / "config.yaml"
+    cfg_path.write_text(yaml.safe_dump(config))
+    return cfg_path
+
+
+async def run_scenario(session: ClientSession, hosts: int, options: argparse.Namespace, offset: int) -> dict:
+    """
+    Issue the calls of a scenario, at most options.concurrency at a time, and measure them.
+    """
+    semaphore = asyncio.Semaphore(options.concurrency)
+    latencies = []
+    returned = 0
+    errors = 0
+
+    async def call(index: int) -> None:
+        nonlocal returned, errors
+        arguments = {"ip_cidr": network_for(hosts, offset + index), "timeout_s": 5, "format": options.format}
+        async with semaphore:
+            start = time.perf_counter()
+            result = await session.call_tool("ToolPingSweep", arguments)
+            latencies.append(time.perf_counter() - start)
+        returned += sum(len(content.text.encode()) for content in result.content)
+        errors += 1 if result.isError else 0
+
+    start = time.perf_counter()
+    await asyncio.gather(*(call(index) for index in range(options.calls)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "hosts": hosts,
+        "calls": options.calls,
+        "concurrency": options.concurrency,
+        "errors": errors,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50) * 1000, 2),
+            "p90": round(percentile(latencies, 0.90) * 1000, 2),
+            "p99": round(percentile(latencies, 0.99) * 1000, 2),
+            "max": round(max(latencies) * 1000, 2),
+        },
+        "seconds": round(elapsed, 3),
+        "calls_per_s": round(options.calls / elapsed, 2),
+        "hosts_per_s": round(options.calls * hosts / elapsed),
+        "bytes_returned": returned,
+        "bytes_per_call": returned // options.calls,
+    }
+
+
+async def bench(cfg_path: Path, options: argparse.Namespace) -> list[dict]:
+    """
+    Run the server over in-memory streams and the scenarios against it.
+    """
+    results = []
+    async with create_client_server_memory_streams() as (client_streams, server_streams):
+        async with anyio.create_task_group() as group:
+            group.start_soon(serve, str(cfg_path), server_streams)
+            async with ClientSession(*client_streams) as session:
+                await session.initialize()
+                # Warm up: first process spawn and imports
+                await session.call_tool("ToolPingSweep", {"ip_cidr": network_for(16, 0xffff), "timeout_s": 5})
+                for index, hosts in enumerate(options.hosts):
+                    results.append(await run_scenario(session, hosts, options, index * options.calls))
+            group.cancel_scope.cancel()
+    return results
+
+
+def git_revision() -> str | None:
+    """
+    Current commit of the repository, None if unavailable.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hosts", type=int, nargs="+", default=[256, 4096])
+    parser.add_argument("--calls", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--delay", type=float, default=0.1, help="Run time of each fake nmap process in seconds.")
+    parser.add_argument("--up-ratio", type=float, default=1.0)
+    parser.add_argument("--padding", type=int, default=0, help="Extra bytes per host in the nmap report.")
+    parser.add_argument("--format", choices=("compact", "xml"), default="compact")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    options = parser.parse_args()
+    output = Path(options.output).resolve() if options.output else None
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # Logs and the host inventory are written relative to the working directory
+        os.chdir(workdir)
+        cfg_path = setup(Path(workdir), options)
+        scenarios = asyncio.run(bench(cfg_path, options))
+
+    report = {
+        "revision": git_revision(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "options": {name: value for name, value in vars(options).items() if name != "output"},
+        "scenarios": scenarios,
+        # Server process only, ru_maxrss is in KiB on Linux
+        "peak_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+    for scenario in scenarios:
+        latency = scenario["latency_ms"]
+        print(f"{scenario['hosts']:>8} hosts  p50 {latency['p50']:>9.2f}ms  p90 {latency['p90']:>9.2f}ms  "
+              f"p99 {latency['p99']:>9.2f}ms  {scenario['calls_per_s']:>8.2f} calls/s  "
+              f"{scenario['bytes_per_call']:>10} bytes/call  {scenario['errors']} errors")
+    print(f"peak RSS {report['peak_rss_kib'] // 1024} MiB")
+    if output:
+        output.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
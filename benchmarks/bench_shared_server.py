@@ -0,0 +1,291 @@
+"""
+Shared server load test: per-call latency, session start time and server memory of many concurrent clients, served by
+one resident process over SSE against one stdio server process per client, with a stand-in nmap.
+
+nmap is replaced on PATH by fake_nmap.py which writes a synthetic report for the scanned network. The clients sweep
+networks from a common pool, as agents looking at the same sites do, with the repository configuration: the shared
+process answers the repeated sweeps from its results cache and runs the scans through a single scheduler, each
+stdio process has its own. Session start is the time to connect and initialize, including the process start and
+imports for stdio. Server memory is the resident size of the server processes, summed, once all the calls are done.
+
+Usage: python benchmarks/bench_shared_server.py [--clients 16] [--calls 8] [--networks 16] [--prefix 24]
+                                                [--delay 0.1] [--mode shared stdio] [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from ipaddress import IPv4Network
+from pathlib import Path
+
+import yaml
+from mcp.client.session import ClientSession
+from mcp.client.sse import sse_client
+from mcp.client.stdio import StdioServerParameters, stdio_client
+
+BENCHMARKS = Path(__file__).resolve().parent
+ROOT = BENCHMARKS.parent
+SOURCES = ROOT / "src" / "ai_mcp_net_analysis"
+
+# Server process command, the configuration path is its only argument
+SERVER_COMMAND = [
+    sys.executable, "-c", "import asyncio, sys; from server import serve; asyncio.run(serve(sys.argv[1]))"
+]
+
+# Upper bound in s for the shared server to accept connections
+STARTUP_TIMEOUT_S = 60
+
+
+def percentile(values: list[float], rank: float) -> float:
+    """
+    Nearest rank percentile of the values.
+    """
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * rank), len(ordered) - 1)]
+
+
+def free_port() -> int:
+    """
+    A TCP port free on the loopback interface.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_env() -> dict[str, str]:
+    """
+    Environment of the server processes: the sources on the module path and the stand-in nmap on PATH.
+    """
+    return {**os.environ, "PYTHONPATH": str(SOURCES)}
+
+
+def setup(workdir: Path, options: argparse.Namespace) -> None:
+    """
+    Install the stand-in nmap on PATH.
+    """
+    bin_dir = workdir / "bin"
+    bin_dir.mkdir()
+    nmap = bin_dir / "nmap"
+    nmap.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{BENCHMARKS / "fake_nmap.py"}" "$@"\n')
+    nmap.chmod(0o755)
+    os.environ["PATH"] = f"{bin_dir}{os.pathsep}{os.environ['PATH']}"
+    os.environ["FAKE_NMAP_DELAY_S"] = str(options.delay)
+    os.environ["FAKE_NMAP_UP_RATIO"] = str(options.up_ratio)
+
+
+def write_config(workdir: Path, transport: dict) -> Path:
+    """
+    Write the repository configuration with the given transport section.
+    :return: The configuration file path.
+    """
+    config = yaml.safe_load((ROOT / "config" / "config.yaml").read_text())
+    config["transport"] = transport
+    config["logging"]["level"] = "WARNING"
+    # The sweeps do not resolve the host names, the synthetic addresses have no name server
+    config["dns"]["enabled"] = False
+    cfg_path = workdir / f"config-{transport['type']}.yaml"
+    cfg_path.write_text(yaml.safe_dump(config))
+    return cfg_path
+
+
+def children_memory() -> dict:
+    """
+    Resident size of the child processes of the benchmark, the servers, in KiB.
+    :return: The number of processes, their current and peak resident sizes summed.
+    """
+    own_pid = str(os.getpid())
+    count = rss = hwm = 0
+    for status_path in Path("/proc").glob("[0-9]*/status"):
+        try:
+            fields = dict(line.split(":", 1) for line in status_path.read_text().splitlines() if ":" in line)
+        except OSError:
+            continue
+        if fields.get("PPid", "").strip() != own_pid:
+            continue
+        count += 1
+        rss += int(fields.get("VmRSS", "0 kB").split()[0])
+        hwm += int(fields.get("VmHWM", "0 kB").split()[0])
+    return {"processes": count, "rss_kib": rss, "peak_rss_kib": hwm}
+
+
+async def run_client(
+    index: int,
+    connect,
+    options: argparse.Namespace,
+    arrived: asyncio.Barrier,
+    release: asyncio.Event,
+    measures: dict,
+) -> None:
+    """
+    Open a session, issue the calls one after the other, then wait for the memory to be measured before closing.
+    """
+    try:
+        start = time.perf_counter()
+        async with connect() as (read_stream, write_stream):
+            async with ClientSession(read_stream, write_stream) as session:
+                await session.initialize()
+                measures["session_start"].append(time.perf_counter() - start)
+                for call in range(options.calls):
+                    network = IPv4Network((0x0a400000 + ((index + call) % options.networks << (32 - options.prefix)),
+                                           options.prefix))
+                    start = time.perf_counter()
+                    result = await session.call_tool("ToolPingSweep", {"ip_cidr": str(network), "timeout_s": 30})
+                    measures["first_call" if call == 0 else "calls"].append(time.perf_counter() - start)
+                    measures["errors"] += 1 if result.isError else 0
+                await arrived.wait()
+                await release.wait()
+    except Exception as e:
+        measures["errors"] += 1
+        print(f"client {index}: {e!r}", file=sys.stderr)
+        if not release.is_set():
+            await arrived.wait()
+
+
+async def run_clients(connect, options: argparse.Namespace) -> dict:
+    """
+    Run the clients concurrently and measure them.
+    :param connect: Factory of the client transport context managers.
+    """
+    measures = {"session_start": [], "first_call": [], "calls": [], "errors": 0}
+    arrived = asyncio.Barrier(options.clients + 1)
+    release = asyncio.Event()
+    start = time.perf_counter()
+    clients = [
+        asyncio.create_task(run_client(index, connect, options, arrived, release, measures))
+        for index in range(options.clients)
+    ]
+    await arrived.wait()
+    elapsed = time.perf_counter() - start
+    memory = children_memory()
+    release.set()
+    await asyncio.gather(*clients)
+
+    def summary(values: list[float]) -> dict:
+        if not values:
+            return {}
+        return {
+            "p50": round(percentile(values, 0.50) * 1000, 2),
+            "p90": round(percentile(values, 0.90) * 1000, 2),
+            "p99": round(percentile(values, 0.99) * 1000, 2),
+            "max": round(max(values) * 1000, 2),
+        }
+
+    return {
+        "clients": options.clients,
+        "calls": options.clients * options.calls,
+        "errors": measures["errors"],
+        "seconds": round(elapsed, 3),
+        "session_start_ms": summary(measures["session_start"]),
+        "first_call_ms": summary(measures["first_call"]),
+        "call_ms": summary(measures["calls"]),
+        **memory,
+    }
+
+
+async def bench_shared(workdir: Path, options: argparse.Namespace) -> dict:
+    """
+    One resident server process over SSE, every client connects to it.
+    """
+    port = free_port()
+    cfg_path = write_config(workdir, {"type": "sse", "host": "127.0.0.1", "port": port})
+    server_dir = workdir / "shared"
+    server_dir.mkdir()
+    server = subprocess.Popen([*SERVER_COMMAND, str(cfg_path)], cwd=server_dir, env=server_env())
+    try:
+        deadline = time.monotonic() + STARTUP_TIMEOUT_S
+        while True:
+            try:
+                with socket.create_connection(("127.0.0.1", port), timeout=1):
+                    break
+            except OSError:
+                if server.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("The shared server did not start")
+                await asyncio.sleep(0.05)
+        url = f"http://127.0.0.1:{port}/sse"
+        return await run_clients(lambda: sse_client(url, timeout=30), options)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+async def bench_stdio(workdir: Path, options: argparse.Namespace) -> dict:
+    """
+    One stdio server process per client, as each agent starting its own.
+    """
+    cfg_path = write_config(workdir, {"type": "stdio"})
+    errlog = open(os.devnull, "w")
+    counter = iter(range(options.clients))
+
+    def connect():
+        # Each process has its own working directory, for its logs and host inventory
+        server_dir = workdir / f"stdio-{next(counter)}"
+        server_dir.mkdir()
+        parameters = StdioServerParameters(
+            command=SERVER_COMMAND[0], args=[*SERVER_COMMAND[1:], str(cfg_path)], env=server_env(), cwd=server_dir
+        )
+        return stdio_client(parameters, errlog=errlog)
+
+    try:
+        return await run_clients(connect, options)
+    finally:
+        errlog.close()
+
+
+def git_revision() -> str | None:
+    """
+    Current commit of the repository, None if unavailable.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=16, help="Number of concurrent clients.")
+    parser.add_argument("--calls", type=int, default=8, help="Number of calls of each client.")
+    parser.add_argument("--networks", type=int, default=16, help="Number of networks the clients sweep.")
+    parser.add_argument("--prefix", type=int, default=24, help="Prefix length of the swept networks.")
+    parser.add_argument("--delay", type=float, default=0.1, help="Run time of each fake nmap process in seconds.")
+    parser.add_argument("--up-ratio", type=float, default=0.2)
+    parser.add_argument("--mode", nargs="+", choices=("shared", "stdio"), default=["shared", "stdio"])
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        setup(workdir, options)
+        benches = {"shared": bench_shared, "stdio": bench_stdio}
+        results = {mode: asyncio.run(benches[mode](workdir, options)) for mode in options.mode}
+
+    report = {
+        "revision": git_revision(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "options": {name: value for name, value in vars(options).items() if name != "output"},
+        "modes": results,
+    }
+
+    for mode, result in results.items():
+        print(f"{mode:<7} {result['clients']:>4} clients  start p50 {result['session_start_ms']['p50']:>9.2f}ms  "
+              f"first call p50 {result['first_call_ms']['p50']:>9.2f}ms  "
+              f"call p50 {result.get('call_ms', {}).get('p50', 0):>9.2f}ms "
+              f"p99 {result.get('call_ms', {}).get('p99', 0):>9.2f}ms  {result['seconds']:>7.2f}s  "
+              f"{result['processes']:>3} processes  {result['rss_kib'] // 1024:>5} MiB  {result['errors']} errors")
+    if options.output:
+        Path(options.output).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
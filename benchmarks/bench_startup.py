@@ -0,0 +1,156 @@
+"""
+Server cold start benchmark: time from process spawn to the initialize and first list_tools responses.
+
+Each run starts a new server process over stdio, like a client starting a new container per session. The server
+imports are also timed in the server process. With --cold the bytecode cache is redirected to an empty directory
+for every run, so that all the modules are compiled again, as in an image built without bytecode.
+
+Usage: python benchmarks/bench_startup.py [--runs 10] [--cold] [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import yaml
+from mcp.client.session import ClientSession
+from mcp.client.stdio import StdioServerParameters, stdio_client
+
+BENCHMARKS = Path(__file__).resolve().parent
+ROOT = BENCHMARKS.parent
+SOURCES = ROOT / "src" / "ai_mcp_net_analysis"
+
+# Server process: time the imports, then serve over stdio
+SERVER_CODE = f"""
+import time
+start = time.perf_counter()
+import sys
+sys.path.insert(0, {str(SOURCES)!r})
+import asyncio
+from server import serve
+import_s = time.perf_counter() - start
+with open(sys.argv[1], "w") as file:
+    file.write(str(import_s))
+asyncio.run(serve(sys.argv[2]))
+"""
+
+
+def setup(workdir: Path) -> Path:
+    """
+    Write the benchmark configuration, logs and inventory go to the work directory.
+    :return: The configuration file path.
+    """
+    config = yaml.safe_load((ROOT / "config" / "config.yaml").read_text())
+    config["logging"]["file"]["path"] = str(workdir / "logs" / "server.log")
+    config["inventory"]["path"] = str(workdir / "data" / "inventory.sqlite")
+    cfg_path = workdir / "config.yaml"
+    cfg_path.write_text(yaml.safe_dump(config))
+    return cfg_path
+
+
+async def run_once(workdir: Path, cfg_path: Path, index: int, cold: bool) -> dict:
+    """
+    Start a server process, initialize a session and list the tools.
+    """
+    env = dict(os.environ)
+    if cold:
+        env["PYTHONPYCACHEPREFIX"] = str(workdir / f"pycache-{index}")
+    import_file = workdir / f"import-{index}.txt"
+    params = StdioServerParameters(
+        command=sys.executable, args=["-c", SERVER_CODE, str(import_file), str(cfg_path)], env=env, cwd=workdir
+    )
+
+    start = time.perf_counter()
+    async with stdio_client(params) as (read_stream, write_stream):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            initialized = time.perf_counter() - start
+            tools = await session.list_tools()
+            listed = time.perf_counter() - start
+            await session.list_tools()
+            listed_again = time.perf_counter() - start - listed
+
+    return {
+        "import_s": float(import_file.read_text()),
+        "initialize_s": initialized,
+        "first_list_tools_s": listed,
+        "second_list_tools_s": listed_again,
+        "tools": len(tools.tools),
+    }
+
+
+def interpreter_start_s(runs: int) -> float:
+    """
+    Median time to start and stop a bare interpreter, the floor of the server start time.
+    """
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def summarize(runs: list[dict], name: str) -> dict:
+    """
+    Median, min and max in ms of a measure over the runs.
+    """
+    values = [run[name] * 1000 for run in runs]
+    return {"median": round(statistics.median(values), 2), "min": round(min(values), 2), "max": round(max(values), 2)}
+
+
+def git_revision() -> str | None:
+    """
+    Current commit of the repository, None if unavailable.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--cold", action="store_true", help="Compile all the modules again on every run.")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cfg_path = setup(Path(workdir))
+        # Warm up the bytecode cache and the file system cache
+        asyncio.run(run_once(Path(workdir), cfg_path, -1, False))
+        runs = [asyncio.run(run_once(Path(workdir), cfg_path, index, options.cold)) for index in range(options.runs)]
+
+    measures = ("import_s", "initialize_s", "first_list_tools_s", "second_list_tools_s")
+    report = {
+        "revision": git_revision(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "options": {name: value for name, value in vars(options).items() if name != "output"},
+        "interpreter_start_ms": round(interpreter_start_s(options.runs) * 1000, 2),
+        "tools": runs[0]["tools"],
+        **{name.removesuffix("_s") + "_ms": summarize(runs, name) for name in measures},
+    }
+
+    print(f"interpreter start      {report['interpreter_start_ms']:>9.2f}ms")
+    for name in measures:
+        summary = report[name.removesuffix("_s") + "_ms"]
+        print(f"{name.removesuffix('_s'):<22} {summary['median']:>9.2f}ms  "
+              f"(min {summary['min']:.2f}ms, max {summary['max']:.2f}ms)")
+    if options.output:
+        Path(options.output).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
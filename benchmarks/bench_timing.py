@@ -0,0 +1,182 @@
+"""
+Adaptive scan timing benchmark: simulated ping sweep duration and recall with the static timing and with the timing
+learned by the timing model.
+
+Each subnet profile has a round trip time, a jitter and a probe loss rate. A sweep is simulated like nmap runs it:
+each address gets up to 1 + retries probes, a reply counts when it arrives before the current timeout, which adapts
+to the replies seen during the sweep within the min and max RTT timeouts, and the probes of the addresses are sent
+in parallel. The static timing is the one used without the model: nmap default RTT timeouts and no retries. The
+learned timing is recomputed before each sweep from the host records of the previous ones.
+
+Retries trade sweep duration for recall: with the default target miss rate of 1%, subnets losing more than 1% of
+the probes get retries, and their sweeps take longer than with the static timing.
+
+Usage: python benchmarks/bench_timing.py [--sweeps 6] [--prefix 24] [--seed 1] [--output results.json]
+"""
+import argparse
+import json
+import math
+import platform
+import random
+import statistics
+import subprocess
+import sys
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from ipaddress import ip_network, IPv4Address, IPv4Network
+from pathlib import Path
+
+BENCHMARKS = Path(__file__).resolve().parent
+ROOT = BENCHMARKS.parent
+sys.path.insert(0, str(ROOT / "src" / "ai_mcp_net_analysis"))
+
+from utils.nmap import NmapHost  # noqa: E402
+from utils.scanner import ScanTiming, TimingModel  # noqa: E402
+from utils.type import IPTargetSet  # noqa: E402
+
+# nmap default RTT timeouts in ms and the parallelism used when none is set
+NMAP_INITIAL_RTT_TIMEOUT_MS = 1000
+NMAP_MIN_RTT_TIMEOUT_MS = 100
+NMAP_MAX_RTT_TIMEOUT_MS = 10000
+DEFAULT_PARALLELISM = 64
+
+
+@dataclass
+class Profile:
+    """
+    Subnet profile: round trip time in ms, log-normal jitter, probe loss rate and fraction of the hosts up.
+    """
+    name: str
+    rtt_ms: float
+    jitter: float
+    loss: float
+    up_ratio: float
+
+
+PROFILES = [
+    Profile("lan", 0.4, 0.3, 0.0, 0.3),
+    Profile("wan", 60.0, 0.2, 0.01, 0.3),
+    Profile("lossy", 35.0, 0.3, 0.25, 0.3),
+    Profile("satellite", 600.0, 0.1, 0.02, 0.3),
+]
+
+
+def simulate(
+    rng: random.Random, profile: Profile, network: IPv4Network, up: dict[int, float], timing: ScanTiming | None
+) -> tuple[list[NmapHost], float]:
+    """
+    Simulate a sweep of a subnet.
+    :param up: Base round trip time in ms of each host up.
+    :return: The host records and the sweep duration in s.
+    """
+    timing = timing or ScanTiming()
+    min_timeout = timing.min_rtt_timeout_ms or NMAP_MIN_RTT_TIMEOUT_MS
+    max_timeout = timing.max_rtt_timeout_ms or NMAP_MAX_RTT_TIMEOUT_MS
+    timeout = timing.initial_rtt_timeout_ms or NMAP_INITIAL_RTT_TIMEOUT_MS
+    parallelism = timing.min_parallelism or DEFAULT_PARALLELISM
+
+    srtt = rttvar = None
+    hosts = []
+    cost_ms = 0.0
+    for address in range(int(network.network_address), int(network.broadcast_address) + 1):
+        for _ in range(timing.max_retries + 1):
+            if address in up and rng.random() >= profile.loss:
+                rtt = up[address] * rng.lognormvariate(0, profile.jitter)
+                if rtt <= timeout:
+                    cost_ms += rtt
+                    hosts.append(NmapHost(ip=str(IPv4Address(address)), state="up",
+                                          latency_ms=round(rtt, 3)))
+                    # Adapt the timeout to the replies, as nmap does
+                    if srtt is None:
+                        srtt, rttvar = rtt, rtt / 2
+                    else:
+                        rttvar += (abs(srtt - rtt) - rttvar) / 4
+                        srtt += (rtt - srtt) / 8
+                    timeout = min(max(srtt + 4 * rttvar, min_timeout), max_timeout)
+                    break
+            cost_ms += timeout
+    return hosts, cost_ms / parallelism / 1000
+
+
+def run_profile(rng: random.Random, profile: Profile, prefix: int, sweeps: int) -> dict:
+    """
+    Sweep a subnet of a profile several times with the static and the learned timing.
+    """
+    network = ip_network(f"10.0.0.0/{prefix}")
+    addresses = range(int(network.network_address), int(network.broadcast_address) + 1)
+    up = {
+        address: profile.rtt_ms * rng.lognormvariate(0, profile.jitter)
+        for address in addresses if rng.random() < profile.up_ratio
+    }
+    targets = IPTargetSet([network])
+    model = TimingModel()
+
+    results = {"static": [], "learned": []}
+    timing = None
+    for _ in range(sweeps):
+        hosts, duration_s = simulate(rng, profile, network, up, None)
+        results["static"].append((duration_s, len(hosts) / len(up)))
+
+        timing = model.timing(targets)
+        hosts, duration_s = simulate(rng, profile, network, up, timing)
+        results["learned"].append((duration_s, len(hosts) / len(up)))
+        model.record(targets, hosts, timing)
+
+    # The first learned sweep has no statistics yet and runs with the static timing
+    summary = {}
+    for name, runs in results.items():
+        runs = runs[1:] if len(runs) > 1 else runs
+        summary[name] = {
+            "duration_s": round(statistics.mean(duration for duration, _ in runs), 3),
+            "recall": round(statistics.mean(recall for _, recall in runs), 4),
+        }
+    summary["timing"] = asdict(timing) if timing is not None else None
+    summary["speedup"] = round(summary["static"]["duration_s"] / summary["learned"]["duration_s"], 2) \
+        if summary["learned"]["duration_s"] else math.inf
+    return summary
+
+
+def git_revision() -> str | None:
+    """
+    Current commit of the repository, None if unavailable.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sweeps", type=int, default=6, help="Number of sweeps of each subnet.")
+    parser.add_argument("--prefix", type=int, default=24, help="Prefix length of the simulated subnets.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    options = parser.parse_args()
+
+    rng = random.Random(options.seed)
+    report = {
+        "revision": git_revision(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "options": {name: value for name, value in vars(options).items() if name != "output"},
+        "profiles": {
+            profile.name: {"profile": asdict(profile), **run_profile(rng, profile, options.prefix, options.sweeps)}
+            for profile in PROFILES
+        },
+    }
+
+    for name, result in report["profiles"].items():
+        static, learned = result["static"], result["learned"]
+        print(f"{name:<10} static {static['duration_s']:>9.3f}s recall {static['recall']:.4f}   "
+              f"learned {learned['duration_s']:>9.3f}s recall {learned['recall']:.4f}   x{result['speedup']}")
+        if result["timing"]:
+            print(f"{'':<10} {' '.join(ScanTiming(**result['timing']).nmap_options())}")
+    if options.output:
+        Path(options.output).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
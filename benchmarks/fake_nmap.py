@@ -0,0 +1,126 @@
+"""
+Stand-in for the nmap executable: writes a synthetic ping sweep XML report for the targets of its command line, or
+a port scan report when ports are given with -p.
+
+Behavior is set by environment variables:
+- FAKE_NMAP_DELAY_S: run time in seconds, the report is written in steps over that time (default 0).
+- FAKE_NMAP_UP_RATIO: fraction of the addresses reported up (default 1.0).
+- FAKE_NMAP_PADDING: extra bytes per host element of a ping sweep, to inflate the report (default 0).
+- FAKE_NMAP_OPEN_RATIO: fraction of the ports open on the hosts up, for port scans (default 0.05).
+- FAKE_NMAP_PROBE_US: run time added per probe answered by a host up, in microseconds (default 0).
+- FAKE_NMAP_DEAD_PROBE_US: run time added per probe sent to an address down, which waits for its timeout,
+  in microseconds (default 0).
+- FAKE_NMAP_ARP_DEAD_PROBE_US: run time added per address down of a ping sweep with ARP requests (-PR), which
+  time out sooner than the other probes, in microseconds (default FAKE_NMAP_DEAD_PROBE_US).
+- FAKE_NMAP_ECHO_DROP_RATIO: fraction of the hosts up dropping ICMP probes, reported down by a ping sweep without
+  ARP requests (-PR) or TCP probes (-PS, -PA) (default 0).
+- FAKE_NMAP_RDNS_US: run time added per host up of a ping sweep for the reverse DNS resolution of its name, unless
+  -n is given, in microseconds (default 0).
+
+A ping sweep sends a probe per address, a port scan a probe per address and port.
+Progress elements are written at each step when --stats-every is given, like nmap does.
+"""
+import os
+import sys
+import time
+from ipaddress import ip_network
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from synthetic import host_count, is_up, nmap_port_xml_chunks, nmap_xml_chunks, parse_ports  # noqa: E402
+
+# nmap options followed by a value
+OPTIONS_WITH_VALUE = {
+    "-oX", "-oN", "-oG", "-p", "-iL", "--max-retries", "--host-timeout", "--max-rate", "--min-rate",
+    "--stats-every", "--min-rtt-timeout", "--max-rtt-timeout", "--initial-rtt-timeout", "--min-parallelism",
+    "--max-parallelism", "--min-hostgroup", "--max-hostgroup", "--top-ports", "--exclude", "--excludefile",
+    "--scan-delay", "--max-scan-delay", "--dns-servers",
+}
+
+# Number of steps the report is written in
+STEPS = 10
+
+
+def targets(args: list[str]) -> list[str]:
+    """
+    Extract the targets of an nmap command line.
+    """
+    result = []
+    values = iter(args)
+    for arg in values:
+        if arg in OPTIONS_WITH_VALUE:
+            value = next(values, None)
+            if arg == "-iL" and value is not None:
+                source = sys.stdin if value == "-" else open(value)
+                result.extend(line.strip() for line in source if line.strip())
+        elif not arg.startswith("-"):
+            result.append(arg)
+    return result
+
+
+def option(args: list[str], name: str) -> str | None:
+    """
+    Value of an option of an nmap command line, None if not given.
+    """
+    return args[args.index(name) + 1] if name in args[:-1] else None
+
+
+def probes_delay_s(cidrs: list[str], ports: int, up_ratio: float, arp: bool = False) -> float:
+    """
+    Run time spent on the probes of a scan, from the per probe costs of the addresses up and down.
+    """
+    probe_us = float(os.environ.get("FAKE_NMAP_PROBE_US", "0"))
+    dead_probe_us = float(os.environ.get("FAKE_NMAP_DEAD_PROBE_US", "0"))
+    if arp:
+        dead_probe_us = float(os.environ.get("FAKE_NMAP_ARP_DEAD_PROBE_US", dead_probe_us))
+    if not probe_us and not dead_probe_us:
+        return 0.0
+    up = sum(1 for cidr in cidrs for ip in ip_network(cidr, strict=False) if is_up(int(ip), up_ratio))
+    return ports * (up * probe_us + (host_count(cidrs) - up) * dead_probe_us) / 1e6
+
+
+def main():
+    args = sys.argv[1:]
+    delay_s = float(os.environ.get("FAKE_NMAP_DELAY_S", "0"))
+    up_ratio = float(os.environ.get("FAKE_NMAP_UP_RATIO", "1.0"))
+    padding = int(os.environ.get("FAKE_NMAP_PADDING", "0"))
+    open_ratio = float(os.environ.get("FAKE_NMAP_OPEN_RATIO", "0.05"))
+    progress = "--stats-every" in args
+    cidrs = targets(args)
+    ports = option(args, "-p")
+    command = " ".join(["nmap", *args])
+
+    if ports is None:
+        resolve = "-n" not in args
+        arp = "-PR" in args
+        tcp = any(arg.startswith(("-PS", "-PA")) for arg in args)
+        drop_ratio = 0.0 if arp or tcp else float(os.environ.get("FAKE_NMAP_ECHO_DROP_RATIO", "0"))
+        chunks = list(nmap_xml_chunks(cidrs, up_ratio, padding, args=command, resolve=resolve, drop_ratio=drop_ratio))
+        delay_s += probes_delay_s(cidrs, 1, up_ratio, arp)
+        if resolve:
+            delay_s += (len(chunks) - 5) * float(os.environ.get("FAKE_NMAP_RDNS_US", "0")) / 1e6
+    else:
+        ports = parse_ports(ports)
+        chunks = list(nmap_port_xml_chunks(cidrs, ports, up_ratio, open_ratio, args=command))
+        delay_s += probes_delay_s(cidrs, len(ports), up_ratio)
+    head, hosts, tail = chunks[:4], chunks[4:-1], chunks[-1]
+
+    out = sys.stdout
+    out.write("".join(head))
+    for step in range(STEPS):
+        out.write("".join(hosts[step * len(hosts) // STEPS:(step + 1) * len(hosts) // STEPS]))
+        if progress:
+            out.write(
+                f'<taskprogress task="Ping Scan" time="1700000000" percent="{(step + 1) * 100 / STEPS:.2f}" '
+                'remaining="0" etc="1700000001"/>\n'
+            )
+        out.flush()
+        if delay_s:
+            time.sleep(delay_s / STEPS)
+    out.write(tail)
+    out.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Stub DNS server answering the PTR queries of the benchmarks on the loopback interface.
+
+The host names are the ones of synthetic.ptr_name, the other addresses get a negative answer (NXDOMAIN) with the
+SOA record of the zone. Every answer is sent after a fixed latency, modelling a recursive resolver, and the queries
+are counted by name so that the caching of the answers can be checked.
+"""
+import asyncio
+import ipaddress
+import struct
+import sys
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from synthetic import ptr_name  # noqa: E402
+
+TYPE_PTR = 12
+TYPE_SOA = 6
+CLASS_IN = 1
+RCODE_NXDOMAIN = 3
+
+
+def encode_name(name: str) -> bytes:
+    """
+    Encode a name in the DNS wire format, without compression.
+    """
+    return b"".join(len(label).to_bytes(1, "big") + label.encode() for label in name.split(".") if label) + b"\x00"
+
+
+def address_of(qname: str) -> int | None:
+    """
+    Address of a reverse name, e.g. '1.0.0.10.in-addr.arpa', None if not an IPv4 or IPv6 reverse name.
+    """
+    labels = qname.lower().rstrip(".").split(".")
+    try:
+        if labels[-2:] == ["in-addr", "arpa"] and len(labels) == 6:
+            return int(ipaddress.IPv4Address(".".join(reversed(labels[:4]))))
+        if labels[-2:] == ["ip6", "arpa"] and len(labels) == 34:
+            return int("".join(reversed(labels[:32])), 16)
+    except ValueError:
+        return None
+    return None
+
+
+class StubDns(asyncio.DatagramProtocol):
+    """
+    Stub DNS server.
+    """
+
+    def __init__(self, latency_s: float = 0.0, ttl_s: int = 300, negative_ttl_s: int = 60):
+        """
+        :param latency_s: Delay in seconds before each answer.
+        :param ttl_s: Time to live of the PTR records.
+        :param negative_ttl_s: Time to live of the negative answers, the minimum field of the SOA record.
+        """
+        self.latency_s = latency_s
+        self.ttl_s = ttl_s
+        self.negative_ttl_s = negative_ttl_s
+        self.queries: Counter[str] = Counter()
+        self._transport: asyncio.DatagramTransport | None = None
+
+    def connection_made(self, transport: asyncio.DatagramTransport) -> None:
+        self._transport = transport
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        asyncio.get_running_loop().call_later(self.latency_s, self._answer, data, addr)
+
+    def answer(self, query: bytes) -> bytes:
+        """
+        Build the answer to a query.
+        """
+        query_id, _, _, _, _, _ = struct.unpack_from(">HHHHHH", query)
+        offset = 12
+        labels = []
+        while query[offset]:
+            labels.append(query[offset + 1:offset + 1 + query[offset]].decode())
+            offset += 1 + query[offset]
+        question = query[12:offset + 5]
+        qname = ".".join(labels)
+        self.queries[qname.lower()] += 1
+
+        address = address_of(qname)
+        name = ptr_name(address) if address is not None else None
+        if name is not None:
+            rdata = encode_name(name)
+            # The owner name points to the question name at offset 12
+            record = b"\xc0\x0c" + struct.pack(">HHIH", TYPE_PTR, CLASS_IN, self.ttl_s, len(rdata)) + rdata
+            return struct.pack(">HHHHHH", query_id, 0x8180, 1, 1, 0, 0) + question + record
+        zone = encode_name("in-addr.arpa" if qname.lower().endswith("in-addr.arpa") else "ip6.arpa")
+        rdata = encode_name("ns.stub.lan") + encode_name("hostmaster.stub.lan") + struct.pack(
+            ">IIIII", 1, 3600, 600, 86400, self.negative_ttl_s
+        )
+        record = zone + struct.pack(">HHIH", TYPE_SOA, CLASS_IN, self.negative_ttl_s, len(rdata)) + rdata
+        return struct.pack(">HHHHHH", query_id, 0x8180 | RCODE_NXDOMAIN, 1, 0, 1, 0) + question + record
+
+    def _answer(self, data: bytes, addr) -> None:
+        if self._transport is not None and not self._transport.is_closing():
+            self._transport.sendto(self.answer(data), addr)
+
+
+async def start(
+    latency_s: float = 0.0, ttl_s: int = 300, negative_ttl_s: int = 60
+) -> tuple[asyncio.DatagramTransport, StubDns, str]:
+    """
+    Start a stub DNS server on a free UDP port of the loopback interface.
+    :return: The transport, closed to stop the server, the server and its address as 'host:port'.
+    """
+    transport, server = await asyncio.get_running_loop().create_datagram_endpoint(
+        lambda: StubDns(latency_s, ttl_s, negative_ttl_s), local_addr=("127.0.0.1", 0)
+    )
+    host, port = transport.get_extra_info("sockname")[:2]
+    return transport, server, f"{host}:{port}"
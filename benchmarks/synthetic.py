@@ -0,0 +1,164 @@
+"""
+Synthetic nmap XML reports used by the benchmarks.
+"""
+from ipaddress import ip_network, IPv4Network
+from typing import Iterator
+
+# Vendors cycled through for synthetic MAC addresses
+VENDORS = ("Dell", "Cisco Systems", "Raspberry Pi Trading", "Intel Corporate", "Apple")
+
+
+def host_count(cidrs: list[str]) -> int:
+    """
+    Number of addresses in the given networks.
+    """
+    return sum(ip_network(cidr, strict=False).num_addresses for cidr in cidrs)
+
+
+# Service names of the synthetic open ports
+SERVICES = {21: "ftp", 22: "ssh", 23: "telnet", 25: "smtp", 53: "domain", 80: "http", 110: "pop3", 139: "netbios-ssn",
+            143: "imap", 443: "https", 445: "microsoft-ds", 3306: "mysql", 3389: "ms-wbt-server", 8080: "http-proxy"}
+
+
+def is_up(address: int, up_ratio: float) -> bool:
+    """
+    Deterministic up/down state of an address, the same in every report whatever the scanned networks.
+    """
+    return int(address * up_ratio) != int((address + 1) * up_ratio)
+
+
+def is_open(address: int, port: int, open_ratio: float) -> bool:
+    """
+    Deterministic open/closed state of a port of a host up.
+    """
+    return (address * 2654435761 + port * 40503) % 10007 < open_ratio * 10007
+
+
+def drops_echo(address: int, drop_ratio: float) -> bool:
+    """
+    Deterministic choice of the hosts up dropping ICMP probes, found only by ARP or TCP probes.
+    """
+    return (address * 2654435761 + 7919) % 10007 < drop_ratio * 10007
+
+
+def ptr_name(address: int) -> str | None:
+    """
+    Deterministic host name of an address, None for one address in five, which has no PTR record.
+    """
+    return f"host-{address:x}.lan" if address % 5 else None
+
+
+def parse_ports(spec: str) -> list[int]:
+    """
+    Ports of an nmap port specification such as "22,80,1000-2000".
+    """
+    ports = []
+    for item in spec.split(","):
+        first, _, last = item.partition("-")
+        ports.extend(range(int(first), int(last or first) + 1))
+    return ports
+
+
+def nmap_xml_chunks(
+    cidrs: list[str], up_ratio: float = 1.0, padding: int = 0, args: str = "nmap", resolve: bool = True,
+    drop_ratio: float = 0.0,
+) -> Iterator[str]:
+    """
+    Generate an nmap ping sweep XML report for the given networks.
+    :param cidrs: The scanned networks.
+    :param up_ratio: Fraction of the addresses reported up.
+    :param padding: Number of extra bytes added to each host element to inflate the report.
+    :param args: Command line recorded in the report.
+    :param resolve: Whether the host names are reported, nmap does not resolve them when run with -n.
+    :param drop_ratio: Fraction of the hosts up dropping the probes, reported down.
+    :return: An iterator over the report fragments.
+    """
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<!DOCTYPE nmaprun>\n'
+    yield f'<nmaprun scanner="nmap" args="{args}" start="1700000000" startstr="synthetic" version="7.94" ' \
+          'xmloutputversion="1.05">\n'
+    yield '<verbose level="0"/>\n<debugging level="0"/>\n'
+    pad = f'<!-- {"x" * max(padding - 9, 0)} -->\n' if padding else ""
+    up = total = 0
+    for cidr in cidrs:
+        network = ip_network(cidr, strict=False)
+        addrtype = "ipv4" if isinstance(network, IPv4Network) else "ipv6"
+        for ip in network:
+            total += 1
+            if not is_up(int(ip), up_ratio) or drops_echo(int(ip), drop_ratio):
+                continue
+            up += 1
+            mac = f"{(int(ip) >> 24) & 0xff:02X}:{(int(ip) >> 16) & 0xff:02X}:{(int(ip) >> 8) & 0xff:02X}:" \
+                  f"{int(ip) & 0xff:02X}:00:01"
+            name = ptr_name(int(ip)) if resolve else None
+            hostname = f'<hostname name="{name}" type="PTR"/>\n' if name else ""
+            yield (
+                f'<host><status state="up" reason="arp-response" reason_ttl="0"/>\n'
+                f'<address addr="{ip}" addrtype="{addrtype}"/>\n'
+                f'<address addr="{mac}" addrtype="mac" vendor="{VENDORS[int(ip) % len(VENDORS)]}"/>\n'
+                f'<hostnames>\n{hostname}</hostnames>\n'
+                f'<times srtt="{200 + int(ip) % 900}" rttvar="5000" to="100000"/>\n'
+                f'{pad}</host>\n'
+            )
+    yield (
+        '<runstats><finished time="1700000001" timestr="synthetic" '
+        f'summary="Nmap done; {total} IP addresses ({up} hosts up) scanned in 1.00 seconds" '
+        'elapsed="1.00" exit="success"/>'
+        f'<hosts up="{up}" down="{total - up}" total="{total}"/>\n</runstats>\n</nmaprun>\n'
+    )
+
+
+def nmap_xml(cidrs: list[str], up_ratio: float = 1.0, padding: int = 0, args: str = "nmap") -> str:
+    """
+    Generate an nmap ping sweep XML report for the given networks as a single string.
+    """
+    return "".join(nmap_xml_chunks(cidrs, up_ratio, padding, args))
+
+
+def nmap_port_xml_chunks(
+    cidrs: list[str], ports: list[int], up_ratio: float = 1.0, open_ratio: float = 0.05, args: str = "nmap"
+) -> Iterator[str]:
+    """
+    Generate an nmap port scan XML report for the given networks, as written with --open: only the hosts up with
+    open ports are reported.
+    :param cidrs: The scanned networks.
+    :param ports: The scanned ports.
+    :param up_ratio: Fraction of the addresses up.
+    :param open_ratio: Fraction of the ports open on the hosts up.
+    :param args: Command line recorded in the report.
+    :return: An iterator over the report fragments, one per host.
+    """
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<!DOCTYPE nmaprun>\n'
+    yield f'<nmaprun scanner="nmap" args="{args}" start="1700000000" startstr="synthetic" version="7.94" ' \
+          'xmloutputversion="1.05">\n'
+    yield '<verbose level="0"/>\n<debugging level="0"/>\n'
+    total = 0
+    for cidr in cidrs:
+        network = ip_network(cidr, strict=False)
+        addrtype = "ipv4" if isinstance(network, IPv4Network) else "ipv6"
+        for ip in network:
+            total += 1
+            if not is_up(int(ip), up_ratio):
+                continue
+            open_ports = [port for port in ports if is_open(int(ip), port, open_ratio)]
+            if not open_ports:
+                continue
+            elements = "".join(
+                f'<port protocol="tcp" portid="{port}"><state state="open" reason="syn-ack" reason_ttl="64"/>'
+                + (f'<service name="{SERVICES[port]}" method="table" conf="3"/>' if port in SERVICES else "")
+                + '</port>\n'
+                for port in open_ports
+            )
+            yield (
+                f'<host starttime="1700000000" endtime="1700000001"><status state="up" reason="user-set" '
+                f'reason_ttl="0"/>\n<address addr="{ip}" addrtype="{addrtype}"/>\n<hostnames>\n</hostnames>\n'
+                f'<ports><extraports state="closed" count="{len(ports) - len(open_ports)}"/>\n{elements}</ports>\n'
+                f'<times srtt="{200 + int(ip) % 900}" rttvar="5000" to="100000"/>\n</host>\n'
+            )
+    yield (
+        '<runstats><finished time="1700000001" timestr="synthetic" '
+        f'summary="Nmap done; {total} IP addresses ({total} hosts up) scanned in 1.00 seconds" '
+        'elapsed="1.00" exit="success"/>'
+        f'<hosts up="{total}" down="0" total="{total}"/>\n</runstats>\n</nmaprun>\n'
+    )
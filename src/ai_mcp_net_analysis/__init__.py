@@ -8,5 +8,24 @@ def main():
     asyncio.run(serve())
 
 
+def worker():
+    """MCP network analysis - scan worker of a cluster"""
+    import argparse
+    import asyncio
+    from .worker import work, coordinator_address, CONFIG_PATH
+
+    parser = argparse.ArgumentParser(description=worker.__doc__)
+    parser.add_argument("--config", default=CONFIG_PATH, help="Configuration file path.")
+    parser.add_argument(
+        "--coordinator", type=coordinator_address,
+        help="Coordinator address as host, host:port or [v6]:port, defaults to the configuration.",
+    )
+    parser.add_argument("--name", help="Worker name, defaults to the host name and process id.")
+    parser.add_argument("--capacity", type=int, help="Number of shards run at once, defaults to the configuration.")
+    options = parser.parse_args()
+
+    asyncio.run(work(options.config, options.coordinator, options.name, options.capacity))
+
+
 if __name__ == "__main__":
     main()
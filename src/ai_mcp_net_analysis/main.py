@@ -59,7 +59,7 @@ def _main():
     )
 
     # Execute a tool
-    result: str = ServerTool.exec_tool("ToolPingSweep", args)
+    result = ServerTool.exec_tool("ToolPingSweep", args)
     print("Tool execution result:")
     print(result)
 
@@ -1,24 +1,184 @@
-from typing import Sequence
+import asyncio
+import itertools
+import time
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Iterable, Sequence, TYPE_CHECKING
 
 from mcp.server import Server
+from mcp.server.lowlevel.helper_types import ReadResourceContents
 from mcp.server.stdio import stdio_server
-from mcp.types import Tool, TextContent, ImageContent, EmbeddedResource
+from mcp.types import Tool, TextContent, ImageContent, EmbeddedResource, Resource
+from pydantic import AnyUrl
 
-from utils import ConfigParser
+from utils import ConfigParser, ConfigData, ConfigWatcher
 from utils import Logger, LoggerFactory
+from utils import MetricsRegistry, MetricsFileWriter
 from tools import Tool as ServerTool
+from tools import ToolError, ToolProgress, ToolResultError
 
+# The HTTP server and SSE transport modules are only imported when serving over SSE
+if TYPE_CHECKING:
+    from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
+    from starlette.types import Message, Receive, Scope, Send
 
-async def serve() -> None:
+
+# Default configuration file path
+CONFIG_PATH = "config/config.yaml"
+
+# Transports: a single client on stdio, or many clients sharing the server over HTTP with server-sent events
+TRANSPORT_STDIO = "stdio"
+TRANSPORT_SSE = "sse"
+
+# Defaults of the SSE transport
+SSE_HOST = "127.0.0.1"
+SSE_PORT = 8000
+SSE_PATH = "/sse"
+SSE_MESSAGE_PATH = "/messages/"
+SSE_SHUTDOWN_TIMEOUT_S = 5
+
+# Identifier of the client session served by the current task, inherited by its request handlers
+_session_caller: ContextVar[str | None] = ContextVar("session_caller", default=None)
+_session_ids = itertools.count(1)
+
+
+async def run_session(
+    server: Server, read_stream: "MemoryObjectReceiveStream", write_stream: "MemoryObjectSendStream"
+) -> None:
+    """
+    Run a client session of the MCP server. The session gets an identifier of its own, never reused, so that the
+    scans are scheduled fairly between sessions, and its scheduling state is dropped when it ends.
+    :param server: The MCP server.
+    :param read_stream: The stream of the client messages.
+    :param write_stream: The stream of the server messages.
+    """
+    caller = f"session-{next(_session_ids)}"
+    token = _session_caller.set(caller)
+    try:
+        await server.run(read_stream, write_stream, server.create_initialization_options())
+    finally:
+        _session_caller.reset(token)
+        ServerTool.end_session(caller)
+
+
+class AsgiEndpoint:
+    """
+    Route endpoint running an ASGI handler. Starlette calls the function endpoints of its routes with a request and
+    only passes the ASGI receive and send callables to the other ones.
+    """
+
+    def __init__(self, handler: Callable[["Scope", "Receive", "Send"], Awaitable[None]]):
+        """
+        :param handler: The ASGI handler.
+        """
+        self._handler = handler
+
+    async def __call__(self, scope: "Scope", receive: "Receive", send: "Send") -> None:
+        await self._handler(scope, receive, send)
+
+
+async def serve_sse(server: Server, transport_config: ConfigData, logger: Logger) -> None:
+    """
+    Serve the MCP server over HTTP with server-sent events, each client connection running its own session.
+    The sessions share the tools configuration, results cache, scans scheduler and background jobs of the process.
+    :param server: The MCP server.
+    :param transport_config: The transport configuration section.
+    :param logger: The logger.
+    """
+    import anyio
+    import uvicorn
+    from mcp.server.sse import SseServerTransport
+    from starlette.applications import Starlette
+    from starlette.routing import Mount, Route
+
+    metrics = MetricsRegistry.get_registry()
+    sse = SseServerTransport(transport_config.get_value("message_path", SSE_MESSAGE_PATH))
+
+    async def handle_sse(scope: "Scope", http_receive: "Receive", send: "Send") -> None:
+        client = scope.get("client")
+        logger.log_info("Client session opened from %s", client[0] if client else "unknown")
+        metrics.inc("sessions_total", transport=TRANSPORT_SSE)
+        metrics.add("sessions_active", 1, transport=TRANSPORT_SSE)
+        # The session is not ended by the transport when the client goes away, it is cancelled on disconnection
+        disconnected = anyio.Event()
+
+        async def receive() -> "Message":
+            message = await http_receive()
+            if message["type"] == "http.disconnect":
+                disconnected.set()
+            return message
+
+        async def run_sse_session(read_stream, write_stream, cancel_scope: anyio.CancelScope) -> None:
+            await run_session(server, read_stream, write_stream)
+            cancel_scope.cancel()
+
+        try:
+            async with sse.connect_sse(scope, receive, send) as (read_stream, write_stream):
+                async with anyio.create_task_group() as group:
+                    group.start_soon(run_sse_session, read_stream, write_stream, group.cancel_scope)
+                    await disconnected.wait()
+                    group.cancel_scope.cancel()
+        finally:
+            metrics.add("sessions_active", -1, transport=TRANSPORT_SSE)
+            logger.log_info("Client session closed")
+
+    app = Starlette(routes=[
+        Route(transport_config.get_value("sse_path", SSE_PATH), endpoint=AsgiEndpoint(handle_sse), methods=["GET"]),
+        Mount(transport_config.get_value("message_path", SSE_MESSAGE_PATH), app=sse.handle_post_message),
+    ])
+    host = transport_config.get_value("host", SSE_HOST)
+    port = transport_config.get_value("port", SSE_PORT)
+    logger.log_info("Serving MCP over SSE on %s:%d", host, port)
+    # The server logs go through the logging configuration of the process, access logs are disabled. Open sessions
+    # are cancelled at shutdown after a grace period.
+    http_server = uvicorn.Server(uvicorn.Config(
+        app, host=host, port=port, log_config=None, access_log=False, timeout_graceful_shutdown=SSE_SHUTDOWN_TIMEOUT_S
+    ))
+    await http_server.serve()
+
+
+async def serve(
+    cfg_path: str = CONFIG_PATH,
+    streams: tuple["MemoryObjectReceiveStream", "MemoryObjectSendStream"] | None = None,
+) -> None:
+    """
+    Run the MCP server.
+    :param cfg_path: The configuration file path.
+    :param streams: The (read, write) streams of a single session, None to serve on the configured transport.
+    """
 
     # Load the configuration
-    cfg_path = "config/config.yaml"
     config = ConfigParser.get_config(cfg_path)
 
     # Intnialize the logger
     config_data = config.config
     logger: Logger = LoggerFactory.get_logger(config_data)
 
+    # Share the configuration with the tools
+    ServerTool.configure(config_data)
+
+    # Configuration reloaded on file changes, the logging level and the tools settings are applied
+    def reload(new_config_data: ConfigData) -> None:
+        logger.set_level(new_config_data.logging.level)
+        ServerTool.configure(new_config_data)
+
+    reload_config = config_data.get_value("reload", ConfigData({}))
+    config_watcher = None
+    if reload_config.get_value("enabled", False):
+        config_watcher = ConfigWatcher(
+            cfg_path, reload, reload_config.get_value("interval_s", ConfigWatcher.DEFAULT_INTERVAL_S)
+        )
+
+    # Metrics, optionally written to a Prometheus text file at an interval
+    metrics = MetricsRegistry.get_registry()
+    prometheus_config = config_data.get_value("metrics", ConfigData({})).get_value("prometheus", ConfigData({}))
+    metrics_writer = None
+    if prometheus_config.get_value("enabled", False):
+        metrics_writer = MetricsFileWriter(
+            metrics,
+            prometheus_config.get_value("path", MetricsFileWriter.DEFAULT_PATH),
+            prometheus_config.get_value("interval_s", MetricsFileWriter.DEFAULT_INTERVAL_S),
+        )
+
     # Create server instance
     logger.log_info("Creating server instance...")
     server = Server(config_data.mcp.name)
@@ -34,10 +194,82 @@ async def serve() -> None:
         name: str, arguments: dict
     ) -> Sequence[TextContent | ImageContent | EmbeddedResource]:
         """ Handle tools calls. """
-        logger.log_info(f"Calling tool: {name} with arguments: {arguments}")
-        result: str = ServerTool.exec_tool(name, arguments)
-        return [TextContent(type="text", text=result)]
+        logger.log_info("Calling tool: %s with arguments: %s", name, arguments)
+        # Scans are scheduled fairly between the client sessions
+        context = server.request_context
+        caller = _session_caller.get()
+
+        # Forward the progress of the call if the client asked for it, throttled
+        progress_token = context.meta.progressToken if context.meta is not None else None
+        progress_config = ServerTool.get_config().get_value("progress", ConfigData({}))
+        progress = None
+        if progress_config.get_value("enabled", False) and progress_token is not None:
+            async def send_progress(fraction: float) -> None:
+                try:
+                    await context.session.send_progress_notification(progress_token, round(fraction * 100, 1), 100)
+                except Exception as e:
+                    logger.log_warning("Failed to send progress notification: %s", e)
+
+            progress = ToolProgress(
+                send_progress, progress_config.get_value("interval_s", ToolProgress.DEFAULT_INTERVAL_S)
+            )
+
+        try:
+            result = await ServerTool.exec_tool_async(
+                name, arguments, caller=caller, on_progress=progress.update if progress is not None else None
+            )
+        finally:
+            if progress is not None:
+                await progress.close()
+
+        # Large results are kept by the server and returned by pages
+        start = time.perf_counter()
+        result = await asyncio.to_thread(ServerTool.page_result, name, result)
+        text = str(result)
+        metrics.observe("tool_serialize_seconds", time.perf_counter() - start, tool=name)
+        metrics.observe("tool_output_bytes", len(text.encode()), MetricsRegistry.BYTES_BUCKETS, tool=name)
+        return [TextContent(type="text", text=text)]
+
+    @server.list_resources()
+    async def list_resources() -> list[Resource]:
+        """ List the large results kept by the server, gzip compressed. """
+        try:
+            store = ServerTool.get_results()
+        except ToolError:
+            return []
+        return [
+            Resource(
+                uri=AnyUrl(handle.uri),
+                name=f"{handle.tool_name} result {handle.handle_id}",
+                description=f"Full result of a {handle.tool_name} call of "
+                            f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(handle.created_at))}.",
+                mimeType=store.MIME_TYPE,
+            )
+            for handle in store.get_handles()
+        ]
+
+    @server.read_resource()
+    async def read_resource(uri: AnyUrl) -> Iterable[ReadResourceContents]:
+        """ Read a large result kept by the server, gzip compressed. """
+        store = ServerTool.get_results()
+        if uri.scheme != store.URI_SCHEME or not uri.host:
+            raise ToolResultError(f"Unknown resource: {uri}")
+        content = await asyncio.to_thread(store.compressed, uri.host)
+        return [ReadResourceContents(content=content, mime_type=store.MIME_TYPE)]
 
-    options = server.create_initialization_options()
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(read_stream, write_stream, options)
+    transport_config = config_data.get_value("transport", ConfigData({}))
+    # The cluster coordinator accepts workers for the lifetime of the server
+    workers = (metrics_writer, config_watcher, ServerTool.get_cluster())
+    tasks = [asyncio.create_task(worker.run()) for worker in workers if worker is not None]
+    try:
+        if streams is not None:
+            read_stream, write_stream = streams
+            await run_session(server, read_stream, write_stream)
+        elif transport_config.get_value("type", TRANSPORT_STDIO) == TRANSPORT_SSE:
+            await serve_sse(server, transport_config, logger)
+        else:
+            async with stdio_server() as (read_stream, write_stream):
+                await run_session(server, read_stream, write_stream)
+    finally:
+        for task in tasks:
+            task.cancel()
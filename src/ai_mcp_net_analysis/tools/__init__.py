@@ -1,2 +1,49 @@
-from .tool import Tool, ToolError  # noqa: F401
-from .tools_discovery import ToolPingSweep  # noqa: F401
+import importlib
+from typing import TYPE_CHECKING
+
+# Exported names and the submodules providing them, a submodule is imported on the first access to one of
+# its names: the tool modules are only imported when a tool is used
+_EXPORTS = {
+    ".tool": ("Tool", "ToolError"),
+    ".tools_discovery": ("ToolPingSweep", "ToolPingSweepBatch"),
+    ".tools_ports": ("ToolPortScan",),
+    ".tools_inventory": ("ToolHostInventory",),
+    ".tools_status": ("ToolScanQueue", "ToolMetrics"),
+    ".tool_jobs": ("ToolJobError",),
+    ".tools_jobs": ("ToolJobSubmit", "ToolJobStatus", "ToolJobResult", "ToolJobCancel"),
+    ".tool_progress": ("ToolProgress",),
+    ".tool_results": ("ToolResultStore", "ToolResultError"),
+    ".tools_results": ("ToolResultPage",),
+}
+_MODULES = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = list(_MODULES)
+
+
+def __getattr__(name: str):
+    """
+    Import an exported name from its submodule on first access.
+    """
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
+
+
+if TYPE_CHECKING:
+    from .tool import Tool, ToolError  # noqa: F401
+    from .tools_discovery import ToolPingSweep, ToolPingSweepBatch  # noqa: F401
+    from .tools_ports import ToolPortScan  # noqa: F401
+    from .tools_inventory import ToolHostInventory  # noqa: F401
+    from .tools_status import ToolScanQueue, ToolMetrics  # noqa: F401
+    from .tool_jobs import ToolJobError  # noqa: F401
+    from .tools_jobs import ToolJobSubmit, ToolJobStatus, ToolJobResult, ToolJobCancel  # noqa: F401
+    from .tool_progress import ToolProgress  # noqa: F401
+    from .tool_results import ToolResultStore, ToolResultError  # noqa: F401
+    from .tools_results import ToolResultPage  # noqa: F401
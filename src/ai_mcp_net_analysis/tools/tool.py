@@ -1,8 +1,26 @@
+import asyncio
+import importlib
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Any
+from importlib.metadata import entry_points
+from dataclasses import replace
+from typing import Any, Callable, Hashable, TYPE_CHECKING
 
 from mcp.types import Tool as MCPTool
 
+from utils import ConfigData
+from utils import LoggerFactory
+from utils import MetricsRegistry
+from tools.tool_cache import ToolCache
+from tools.tool_context import ToolContext, tool_context
+from tools.tool_jobs import ToolJobManager
+from tools.tool_results import ToolResultStore
+from tools.tool_scheduler import ToolScheduler
+
+if TYPE_CHECKING:
+    from utils import InventoryStore, TimingModel, ClusterCoordinator, ReverseResolver, NmapHost
+
 
 class ToolError(Exception):
     """
@@ -16,9 +34,316 @@ class Tool(ABC):
     An abstract class representing a tool with a name, description, and function.
     """
 
+    # Built-in tools: name and "module:class" reference, the module is imported on first use of the tool
+    TOOLS_MANIFEST = {
+        "ToolPingSweep": "tools.tools_discovery:ToolPingSweep",
+        "ToolPingSweepBatch": "tools.tools_discovery:ToolPingSweepBatch",
+        "ToolPortScan": "tools.tools_ports:ToolPortScan",
+        "ToolHostInventory": "tools.tools_inventory:ToolHostInventory",
+        "ToolScanQueue": "tools.tools_status:ToolScanQueue",
+        "ToolMetrics": "tools.tools_status:ToolMetrics",
+        "ToolJobSubmit": "tools.tools_jobs:ToolJobSubmit",
+        "ToolJobStatus": "tools.tools_jobs:ToolJobStatus",
+        "ToolJobResult": "tools.tools_jobs:ToolJobResult",
+        "ToolJobCancel": "tools.tools_jobs:ToolJobCancel",
+        "ToolResultPage": "tools.tools_results:ToolResultPage",
+    }
+
+    # Entry points group of the tools provided by other packages, the entry point name is the tool name and
+    # its value the "module:class" reference
+    TOOLS_ENTRY_POINTS_GROUP = "ai_mcp_net_analysis.tools"
+
     # Tools registry
     _tools = {}
 
+    # References of the known tools, built-in and from entry points, None until discovered
+    _tool_refs: dict[str, str] = None
+
+    # Metadata of all the tools, computed once
+    _tools_metadata: tuple[MCPTool, ...] = None
+
+    # Configuration data shared by all tools
+    _config: ConfigData = None
+
+    # Results cache, None if disabled
+    _cache: ToolCache = None
+
+    # Host inventory store, opened on first use, its path, None if disabled, and retention period
+    _inventory: "InventoryStore" = None
+    _inventory_path: str = None
+    _inventory_retention_s: int = None
+    _inventory_lock = threading.Lock()
+
+    # Scan timing learned from the previous scans, None if disabled
+    _timing: "TimingModel" = None
+
+    # Scans scheduler, None if disabled
+    _scheduler: ToolScheduler = None
+
+    # Background jobs manager, None if disabled
+    _jobs: ToolJobManager = None
+
+    # Store of the large results read by pages, None if disabled
+    _results: ToolResultStore = None
+
+    # Coordinator of the remote scan workers, None if disabled
+    _cluster: "ClusterCoordinator" = None
+
+    # Reverse DNS resolver of the sweep results, None if disabled
+    _resolver: "ReverseResolver" = None
+
+    # Whether the tool calls go through the scans scheduler, set by tools running scans
+    SCHEDULED = False
+
+    @staticmethod
+    def _section(config_data: ConfigData | None, name: str) -> ConfigData | None:
+        """
+        Get a configuration section, empty if not set, None if there is no configuration.
+        """
+        return config_data.get_value(name, ConfigData({})) if config_data is not None else None
+
+    @classmethod
+    def configure(cls, config_data: ConfigData) -> None:
+        """
+        Set the configuration data used by the tools.
+        On a configuration reload the components whose section did not change are kept, and the scheduler and
+        jobs manager limits are changed in place, so that the running scans and jobs are not affected.
+        """
+        previous = Tool._config
+        Tool._config = config_data
+
+        # Create the results cache
+        cache = cls._section(config_data, "cache")
+        if cache != cls._section(previous, "cache"):
+            if cache.get_value("enabled", False):
+                Tool._cache = ToolCache(
+                    ttl_s=cache.get_value("ttl_s", ToolCache.DEFAULT_TTL_S),
+                    max_entries=cache.get_value("max_entries", ToolCache.DEFAULT_MAX_ENTRIES),
+                )
+            else:
+                Tool._cache = None
+
+        # Host inventory store, opened on first use
+        inventory = cls._section(config_data, "inventory")
+        if inventory != cls._section(previous, "inventory"):
+            # The store of the previous section is closed, the next use opens the new one
+            with Tool._inventory_lock:
+                if Tool._inventory is not None:
+                    Tool._inventory.close()
+                Tool._inventory = None
+                if inventory.get_value("enabled", False):
+                    from utils import InventoryStore
+                    Tool._inventory_path = inventory.get_value("path", InventoryStore.DEFAULT_PATH)
+                    Tool._inventory_retention_s = inventory.get_value("retention_s", InventoryStore.DEFAULT_RETENTION_S)
+                else:
+                    Tool._inventory_path = None
+
+        # Scan timing model, the learned statistics are kept unless its section changed
+        timing = cls._section(cls._section(config_data, "scan"), "timing")
+        if timing != cls._section(cls._section(previous, "scan"), "timing"):
+            if timing.get_value("enabled", False):
+                from utils import TimingModel
+                Tool._timing = TimingModel(
+                    prefix_length_v4=timing.get_value("prefix_length_v4", TimingModel.DEFAULT_PREFIX_LENGTH_V4),
+                    prefix_length_v6=timing.get_value("prefix_length_v6", TimingModel.DEFAULT_PREFIX_LENGTH_V6),
+                    max_subnets=timing.get_value("max_subnets", TimingModel.DEFAULT_MAX_SUBNETS),
+                    target_miss=timing.get_value("target_miss", TimingModel.DEFAULT_TARGET_MISS),
+                    max_retries=timing.get_value("max_retries", TimingModel.DEFAULT_MAX_RETRIES),
+                )
+            else:
+                Tool._timing = None
+
+        # Create the scans scheduler
+        scheduler = cls._section(config_data, "scheduler")
+        if scheduler.get_value("enabled", False):
+            max_concurrent = scheduler.get_value("max_concurrent", ToolScheduler.DEFAULT_MAX_CONCURRENT)
+            max_rate_pps = scheduler.get_value("max_rate_pps", ToolScheduler.DEFAULT_MAX_RATE_PPS)
+            if Tool._scheduler is None:
+                Tool._scheduler = ToolScheduler(max_concurrent=max_concurrent, max_rate_pps=max_rate_pps)
+            else:
+                Tool._scheduler.set_limits(max_concurrent, max_rate_pps)
+        else:
+            Tool._scheduler = None
+
+        # Create the background jobs manager
+        jobs = cls._section(config_data, "jobs")
+        if jobs.get_value("enabled", False):
+            max_jobs = jobs.get_value("max_jobs", ToolJobManager.DEFAULT_MAX_JOBS)
+            retention_s = jobs.get_value("retention_s", ToolJobManager.DEFAULT_RETENTION_S)
+            if Tool._jobs is None:
+                Tool._jobs = ToolJobManager(max_jobs=max_jobs, retention_s=retention_s)
+            else:
+                Tool._jobs.set_limits(max_jobs, retention_s)
+        else:
+            Tool._jobs = None
+
+        # Create the store of the large results read by pages
+        results = cls._section(config_data, "results")
+        if results.get_value("enabled", False):
+            limits = (
+                results.get_value("page_size", ToolResultStore.DEFAULT_PAGE_SIZE),
+                results.get_value("max_results", ToolResultStore.DEFAULT_MAX_RESULTS),
+                results.get_value("max_bytes", ToolResultStore.DEFAULT_MAX_BYTES),
+                results.get_value("ttl_s", ToolResultStore.DEFAULT_TTL_S),
+            )
+            if Tool._results is None:
+                Tool._results = ToolResultStore(*limits)
+            else:
+                Tool._results.set_limits(*limits)
+        else:
+            Tool._results = None
+
+        # Coordinator of the remote scan workers, its listening address is only applied when it is created
+        cluster = cls._section(config_data, "cluster")
+        if cluster.get_value("enabled", False):
+            from utils import ClusterCoordinator
+            limits = (
+                cluster.get_value("token", ""),
+                cluster.get_value("heartbeat_timeout_s", ClusterCoordinator.DEFAULT_HEARTBEAT_TIMEOUT_S),
+                cluster.get_value("max_attempts", ClusterCoordinator.DEFAULT_MAX_ATTEMPTS),
+                cluster.get_value("wait_s", ClusterCoordinator.DEFAULT_WAIT_S),
+            )
+            if Tool._cluster is None:
+                Tool._cluster = ClusterCoordinator(
+                    cluster.get_value("host", ClusterCoordinator.DEFAULT_HOST),
+                    cluster.get_value("port", ClusterCoordinator.DEFAULT_PORT),
+                    *limits,
+                )
+            else:
+                Tool._cluster.set_limits(*limits)
+        else:
+            Tool._cluster = None
+
+        # Reverse DNS resolver, the cached answers are kept unless its section changed
+        dns = cls._section(config_data, "dns")
+        if dns != cls._section(previous, "dns"):
+            if dns.get_value("enabled", False):
+                from utils import ReverseResolver
+                Tool._resolver = ReverseResolver(
+                    servers=dns.get_value("servers", []),
+                    concurrency=dns.get_value("concurrency", ReverseResolver.DEFAULT_CONCURRENCY),
+                    timeout_s=dns.get_value("timeout_s", ReverseResolver.DEFAULT_TIMEOUT_S),
+                    retries=dns.get_value("retries", ReverseResolver.DEFAULT_RETRIES),
+                    max_ttl_s=dns.get_value("max_ttl_s", ReverseResolver.DEFAULT_MAX_TTL_S),
+                    negative_ttl_s=dns.get_value("negative_ttl_s", ReverseResolver.DEFAULT_NEGATIVE_TTL_S),
+                    max_entries=dns.get_value("max_entries", ReverseResolver.DEFAULT_MAX_ENTRIES),
+                )
+            else:
+                Tool._resolver = None
+
+        # Metrics, the cache, scheduler, jobs, timing, results, cluster and resolver statistics are read along with
+        # the metrics
+        metrics = MetricsRegistry.get_registry()
+        metrics.enabled = config_data.get_value("metrics", ConfigData({})).get_value("enabled", True)
+        metrics.register_collector("cache", cls.get_cache_stats)
+        metrics.register_collector("scheduler", cls.get_scheduler_stats)
+        metrics.register_collector("jobs", lambda: Tool._jobs.get_stats() if Tool._jobs is not None else None)
+        metrics.register_collector("timing", lambda: Tool._timing.get_stats() if Tool._timing is not None else None)
+        metrics.register_collector(
+            "results", lambda: Tool._results.get_stats() if Tool._results is not None else None
+        )
+        metrics.register_collector(
+            "cluster", lambda: Tool._cluster.get_stats() if Tool._cluster is not None else None
+        )
+        metrics.register_collector(
+            "dns", lambda: Tool._resolver.get_stats() if Tool._resolver is not None else None
+        )
+
+    @classmethod
+    def get_scheduler_stats(cls) -> dict | None:
+        """
+        Get the scans scheduler state and statistics, None if the scheduler is disabled.
+        """
+        return Tool._scheduler.get_stats() if Tool._scheduler is not None else None
+
+    @classmethod
+    def end_session(cls, caller: str) -> None:
+        """
+        Drop the scheduling state of a client session that ended.
+        :param caller: Identifier of the client session.
+        """
+        if Tool._scheduler is not None:
+            Tool._scheduler.forget(caller)
+
+    @classmethod
+    def get_inventory(cls) -> "InventoryStore | None":
+        """
+        Get the host inventory store, opened on first use, None if disabled.
+        """
+        if Tool._inventory is None and Tool._inventory_path is not None:
+            from utils import InventoryStore
+            with Tool._inventory_lock:
+                if Tool._inventory is None:
+                    Tool._inventory = InventoryStore(Tool._inventory_path, Tool._inventory_retention_s)
+        return Tool._inventory
+
+    @classmethod
+    def get_timing(cls) -> "TimingModel | None":
+        """
+        Get the scan timing model, None if disabled.
+        """
+        return Tool._timing
+
+    @classmethod
+    def get_cluster(cls) -> "ClusterCoordinator | None":
+        """
+        Get the coordinator of the remote scan workers, None if disabled.
+        """
+        return Tool._cluster
+
+    @classmethod
+    def get_resolver(cls) -> "ReverseResolver | None":
+        """
+        Get the reverse DNS resolver of the sweep results, None if disabled.
+        """
+        return Tool._resolver
+
+    @classmethod
+    def get_jobs(cls) -> ToolJobManager:
+        """
+        Get the background jobs manager.
+        """
+        if Tool._jobs is None:
+            raise ToolError("Background jobs are not enabled in the configuration.")
+        return Tool._jobs
+
+    @classmethod
+    def get_results(cls) -> ToolResultStore:
+        """
+        Get the store of the large results read by pages.
+        """
+        if Tool._results is None:
+            raise ToolError("Paginated results are not enabled in the configuration.")
+        return Tool._results
+
+    @classmethod
+    def page_result(cls, tool_name: str, result: Any) -> Any:
+        """
+        Replace a result whose host table is longer than a page by its first page: the result is kept in the
+        results store and the page carries the cursor of the next page.
+        :param tool_name: Name of the tool which produced the result.
+        :param result: The result.
+        :return: The first page, or the result itself if it fits in a page or the store is disabled or full.
+        """
+        if Tool._results is None or not Tool._results.needs_paging(result):
+            return result
+        handle = Tool._results.put(tool_name, result)
+        return Tool._results.page(handle) if handle is not None else result
+
+    @classmethod
+    def get_cache_stats(cls) -> dict | None:
+        """
+        Get the results cache counters, None if the cache is disabled.
+        """
+        return Tool._cache.get_stats() if Tool._cache is not None else None
+
+    @classmethod
+    def get_config(cls) -> ConfigData:
+        """
+        Get the configuration data used by the tools, empty if not configured.
+        """
+        return Tool._config if Tool._config is not None else ConfigData({})
+
     @classmethod
     def register_tool(cls, tool: "Tool") -> None:
         """
@@ -31,38 +356,184 @@ class Tool(ABC):
         else:
             raise ToolError(f"Tool '{name}' is already registered.")
 
+    @classmethod
+    def _discover_tools(cls) -> dict[str, str]:
+        """
+        Get the references of the known tools, the built-in tools first then the entry points, without
+        importing them.
+        """
+        if Tool._tool_refs is None:
+            refs = dict(cls.TOOLS_MANIFEST)
+            for entry_point in entry_points(group=cls.TOOLS_ENTRY_POINTS_GROUP):
+                refs.setdefault(entry_point.name, entry_point.value)
+            Tool._tool_refs = refs
+        return Tool._tool_refs
+
+    @classmethod
+    def _load_tool(cls, tool_name: str) -> "Tool | None":
+        """
+        Import, instantiate and register a known tool if not already done.
+        :return: The tool, None if unknown.
+        """
+        if tool_name in cls._tools:
+            return cls._tools[tool_name]
+        ref = cls._discover_tools().get(tool_name)
+        if ref is None:
+            return None
+        module_name, _, class_name = ref.partition(":")
+        try:
+            tool_class = getattr(importlib.import_module(module_name), class_name)
+        except (ImportError, AttributeError) as e:
+            raise ToolError(f"Failed to load tool '{tool_name}' from '{ref}': {e}") from e
+        tool = tool_class()
+        cls.register_tool(tool)
+        return tool
+
     @classmethod
     def register_tools(cls) -> None:
         """
-        Instantiate and register all tools if not already done.
+        Instantiate and register all the known tools, and the already imported subclasses of Tool, if not
+        already done.
         """
-        # Check if tools are already registered
-        if cls._tools:
-            return
+        for tool_name in cls._discover_tools():
+            try:
+                cls._load_tool(tool_name)
+            except ToolError as e:
+                # A broken tool provided by another package does not prevent the other tools from being listed
+                LoggerFactory.get_logger().log_error("%s", e)
 
-        # Register all subclasses of Tool
+        # Register the subclasses of Tool defined outside of the manifest and entry points
         for subclass in cls.__subclasses__():
             tool_instance = subclass()
-            cls.register_tool(tool_instance)
+            if tool_instance.get_name() not in cls._tools:
+                cls.register_tool(tool_instance)
 
     @classmethod
     def get_tools(cls) -> list[MCPTool]:
         """
         Get a list of all registered tools.
+        The metadata is computed once, the returned tool objects are shared and must not be modified.
+        """
+        if Tool._tools_metadata is None:
+            cls.register_tools()
+            Tool._tools_metadata = tuple(tool.get_tool() for tool in cls._tools.values())
+        return list(Tool._tools_metadata)
+
+    @classmethod
+    def _get_tool(cls, tool_name: str) -> "Tool":
         """
-        cls.register_tools()
-        return [tool.get_tool() for tool in cls._tools.values()]
+        Get a registered tool by name, the tool module is imported on first use.
+        """
+        tool = cls._load_tool(tool_name)
+        if tool is None:
+            cls.register_tools()
+            tool = cls._tools.get(tool_name)
+        if tool is None:
+            raise ToolError(f"Tool '{tool_name}' not found.")
+        return tool
+
+    @classmethod
+    def _cache_get(cls, tool: "Tool", arguments: dict) -> tuple[Hashable | None, bool, Any]:
+        """
+        Look up the cached result of a tool call.
+        :return: A (key, found, value) tuple, the key is None if the call is not cacheable.
+        """
+        if Tool._cache is None:
+            return None, False, None
+        key = tool.cache_key(arguments)
+        if key is None:
+            return None, False, None
+        found, value = Tool._cache.get(tool.get_name(), key, tool.cache_subsume)
+        return key, found, value
+
+    @staticmethod
+    def _validate(tool: "Tool", arguments: dict) -> None:
+        """
+        Validate the arguments of a call and measure the validation time.
+        """
+        start = time.perf_counter()
+        tool.validate_arguments(arguments)
+        MetricsRegistry.get_registry().observe(
+            "tool_validate_seconds", time.perf_counter() - start, tool=tool.get_name()
+        )
 
     @classmethod
     def exec_tool(cls, tool_name: str, arguments: dict) -> Any:
         """
         Execute a registered tool with the given name and arguments.
         """
-        cls.register_tools()
-        if tool_name not in cls._tools:
-            raise ToolError(f"Tool '{tool_name}' not found.")
-        tool = cls._tools[tool_name]
-        return tool.exec(arguments)
+        tool = cls._get_tool(tool_name)
+        metrics = MetricsRegistry.get_registry()
+        with metrics.track("tool_call", tool=tool_name):
+            cls._validate(tool, arguments)
+            key, found, result = cls._cache_get(tool, arguments)
+            if found:
+                metrics.inc("tool_cache_hits_total", tool=tool_name)
+                return result
+
+            start = time.perf_counter()
+            result = tool.exec(arguments)
+            metrics.observe("tool_exec_seconds", time.perf_counter() - start, tool=tool_name)
+
+            if key is not None:
+                Tool._cache.put(tool_name, key, result)
+            return result
+
+    @classmethod
+    async def exec_tool_async(
+        cls,
+        tool_name: str,
+        arguments: dict,
+        caller: str | None = None,
+        on_progress: Callable[[float], None] | None = None,
+    ) -> Any:
+        """
+        Execute a registered tool with the given name and arguments without blocking the event loop.
+        Calls of scheduled tools wait for a slot of the scans scheduler, if enabled.
+        :param tool_name: The tool name.
+        :param arguments: The tool arguments.
+        :param caller: Identifier of the client issuing the call, used for fair scheduling.
+        :param on_progress: Called with the completed fraction of the call, if the tool reports progress.
+        """
+        tool = cls._get_tool(tool_name)
+        metrics = MetricsRegistry.get_registry()
+        with metrics.track("tool_call", tool=tool_name):
+            cls._validate(tool, arguments)
+            key, found, result = cls._cache_get(tool, arguments)
+            if found:
+                metrics.inc("tool_cache_hits_total", tool=tool_name)
+                return result
+
+            context = tool_context.get()
+            if on_progress is not None:
+                context = replace(context, on_progress=on_progress)
+            if tool.SCHEDULED and Tool._scheduler is not None:
+                async with Tool._scheduler.slot(caller, tool.get_priority(arguments)) as grant:
+                    metrics.observe("scheduler_wait_seconds", grant.wait_s, tool=tool_name)
+                    result = await cls._exec_in_context(tool, arguments, replace(
+                        context, caller=caller, max_rate=grant.max_rate
+                    ))
+            else:
+                result = await cls._exec_in_context(tool, arguments, replace(context, caller=caller))
+
+            if key is not None:
+                Tool._cache.put(tool_name, key, result)
+            return result
+
+    @staticmethod
+    async def _exec_in_context(tool: "Tool", arguments: dict, context: ToolContext) -> Any:
+        """
+        Run a tool asynchronously with the given call context and measure the execution time.
+        """
+        token = tool_context.set(context)
+        start = time.perf_counter()
+        try:
+            return await tool.exec_async(arguments)
+        finally:
+            MetricsRegistry.get_registry().observe(
+                "tool_exec_seconds", time.perf_counter() - start, tool=tool.get_name()
+            )
+            tool_context.reset(token)
 
     @abstractmethod
     def get_tool(self) -> MCPTool:
@@ -87,3 +558,54 @@ class Tool(ABC):
         This method should contain the logic for the tool's functionality.
         """
         pass
+
+    async def exec_async(self, arguments: dict) -> Any:
+        """
+        Asynchronous variant of exec.
+        The default implementation runs exec in a worker thread, subclasses should override it
+        with a native asyncio implementation when they spawn processes or perform I/O.
+        """
+        return await asyncio.to_thread(self.exec, arguments)
+
+    def validate_arguments(self, arguments: dict) -> None:
+        """
+        Validate the arguments of a call before running it, raise an exception if they are invalid.
+        The default implementation accepts any arguments.
+        """
+        pass
+
+    def get_priority(self, arguments: dict) -> int:
+        """
+        Get the scheduling priority of a call, lower values start first.
+        The default implementation returns the scheduler default priority.
+        """
+        return ToolScheduler.DEFAULT_PRIORITY
+
+    def cache_key(self, arguments: dict) -> Hashable | None:
+        """
+        Get the normalized arguments used as results cache key.
+        The default implementation returns None: the tool results are not cached.
+        """
+        return None
+
+    def cache_subsume(self, key: Hashable, cached_key: Hashable, cached_value: Any) -> Any | None:
+        """
+        Derive the result of a call from a cached result of another call covering it.
+        The default implementation returns None: only exact matches are served from the cache.
+        :param key: The normalized arguments of the call.
+        :param cached_key: The normalized arguments of the cached call.
+        :param cached_value: The cached result.
+        :return: The derived result, None if the cached result does not cover the call.
+        """
+        return None
+
+    def partial_result(self, arguments: dict, hosts: list["NmapHost"], elapsed_s: float) -> Any | None:
+        """
+        Build the result of a call still running in the background, or cancelled, from the hosts found so far.
+        The default implementation returns None: the tool has no partial result.
+        :param arguments: The arguments of the call.
+        :param hosts: The host records found so far.
+        :param elapsed_s: Time in seconds the call has been running.
+        :return: The partial result, None if the tool has none.
+        """
+        return None
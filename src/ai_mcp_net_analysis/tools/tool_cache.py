@@ -0,0 +1,102 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class ToolCache:
+    """
+    Tool results cache with time to live and least recently used eviction.
+    Entries are keyed by tool name and normalized arguments. On an exact miss, a tool can derive the
+    result from a cached entry covering the request (e.g. a sub-network of a cached network).
+    """
+
+    # Default time to live in s of the cached results
+    DEFAULT_TTL_S = 30
+
+    # Default maximum number of cached results
+    DEFAULT_MAX_ENTRIES = 128
+
+    def __init__(self, ttl_s: float = DEFAULT_TTL_S, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Initialize the cache.
+        :param ttl_s: Time to live in seconds of the cached results.
+        :param max_entries: Maximum number of cached results.
+        """
+        self._ttl_s = ttl_s
+        self._max_entries = max_entries
+        # (tool name, key) -> (expiry time, value), least recently used first
+        self._entries: OrderedDict[tuple[str, Hashable], tuple[float, Any]] = OrderedDict()
+        self._stats = dict(hits=0, subsumed_hits=0, misses=0, evictions=0, expirations=0)
+
+    def _expire(self, now: float) -> None:
+        """
+        Drop the expired entries.
+        """
+        expired = [entry_key for entry_key, (expiry, _) in self._entries.items() if expiry <= now]
+        for entry_key in expired:
+            del self._entries[entry_key]
+        self._stats["expirations"] += len(expired)
+
+    def get(
+        self,
+        tool_name: str,
+        key: Hashable,
+        subsume: Callable[[Hashable, Hashable, Any], Any | None] | None = None,
+    ) -> tuple[bool, Any]:
+        """
+        Look up a cached result.
+        :param tool_name: The tool name.
+        :param key: The normalized arguments.
+        :param subsume: Optional function deriving the result for key from a cached (key, value), None if
+            the cached entry does not cover the request.
+        :return: A (found, value) tuple.
+        """
+        now = time.monotonic()
+        self._expire(now)
+
+        entry_key = (tool_name, key)
+        if entry_key in self._entries:
+            self._entries.move_to_end(entry_key)
+            self._stats["hits"] += 1
+            return True, self._entries[entry_key][1]
+
+        if subsume is not None:
+            # Most recently used entries first
+            for (name, cached_key), (_, value) in reversed(self._entries.items()):
+                if name != tool_name:
+                    continue
+                derived = subsume(key, cached_key, value)
+                if derived is not None:
+                    self._entries.move_to_end((name, cached_key))
+                    self._stats["subsumed_hits"] += 1
+                    return True, derived
+
+        self._stats["misses"] += 1
+        return False, None
+
+    def put(self, tool_name: str, key: Hashable, value: Any) -> None:
+        """
+        Cache a result, evicting the least recently used entries if the cache is full.
+        :param tool_name: The tool name.
+        :param key: The normalized arguments.
+        :param value: The result.
+        """
+        entry_key = (tool_name, key)
+        self._entries[entry_key] = (time.monotonic() + self._ttl_s, value)
+        self._entries.move_to_end(entry_key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        """
+        Drop all the cached results.
+        """
+        self._entries.clear()
+
+    def get_stats(self) -> dict:
+        """
+        Get the cache counters.
+        :return: The hits, subsumed hits, misses, evictions and expirations counters and the cache size.
+        """
+        return dict(self._stats, size=len(self._entries), max_entries=self._max_entries, ttl_s=self._ttl_s)
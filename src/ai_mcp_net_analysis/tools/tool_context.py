@@ -0,0 +1,25 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from utils import NmapHost
+
+
+@dataclass(slots=True)
+class ToolContext:
+    """
+    Execution context of a tool call, set by the tools registry around Tool.exec_async.
+    """
+    # Identifier of the client which issued the call
+    caller: str | None = None
+    # Packet rate budget in packets per second granted by the scheduler, None if unlimited
+    max_rate: int | None = None
+    # Called with each host record as soon as it is found, used to collect partial results
+    on_host: Callable[["NmapHost"], None] | None = None
+    # Called with the completed fraction of the call, from 0 to 1, as it progresses
+    on_progress: Callable[[float], None] | None = None
+
+
+# Context of the tool call running in the current task
+tool_context: ContextVar[ToolContext] = ContextVar("tool_context", default=ToolContext())
@@ -0,0 +1,213 @@
+import asyncio
+import secrets
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Awaitable, Callable, TYPE_CHECKING
+
+from tools.tool_context import tool_context
+
+if TYPE_CHECKING:
+    from utils import NmapHost
+
+
+class ToolJobError(Exception):
+    """
+    Custom exception for background job errors.
+    """
+    pass
+
+
+@dataclass(slots=True)
+class ToolJob:
+    """
+    Tool call running in the background.
+    """
+
+    # Job states
+    STATE_RUNNING = "running"
+    STATE_DONE = "done"
+    STATE_FAILED = "failed"
+    STATE_CANCELLED = "cancelled"
+
+    job_id: str
+    tool_name: str
+    arguments: dict
+    caller: str | None
+    state: str = STATE_RUNNING
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    # Result of the call once done
+    result: Any = None
+    # Error message if the call failed
+    error: str | None = None
+    # Host records found so far, released once the job is done
+    hosts: list["NmapHost"] = field(default_factory=list)
+    # Completed fraction of the call, from 0 to 1, if the tool reports progress
+    progress: float | None = None
+    task: asyncio.Task | None = None
+
+    @property
+    def finished(self) -> bool:
+        """
+        Whether the job is over.
+        """
+        return self.state != self.STATE_RUNNING
+
+    @property
+    def elapsed_s(self) -> float:
+        """
+        Time elapsed since the job was submitted, up to its end.
+        """
+        return (self.finished_at if self.finished_at is not None else time.time()) - self.created_at
+
+    def set_progress(self, fraction: float) -> None:
+        """
+        Record the progress of the call.
+        """
+        self.progress = fraction
+
+    def get_status(self) -> dict:
+        """
+        Get the job status.
+        :return: State, tool, timing, progress, number of hosts found until the job is done and error message.
+        """
+        status = dict(
+            job_id=self.job_id,
+            state=self.state,
+            tool=self.tool_name,
+            elapsed_s=round(self.elapsed_s, 2),
+        )
+        if self.progress is not None:
+            status["progress_pct"] = round(self.progress * 100, 1)
+        if self.state != self.STATE_DONE:
+            status["hosts_found"] = len(self.hosts)
+        if self.error is not None:
+            status["error"] = self.error
+        return status
+
+
+class ToolJobManager:
+    """
+    Manager of the tool calls running in the background on the server event loop.
+    Finished jobs are retained for a limited time, and the number of retained jobs is bounded: the oldest
+    finished jobs are evicted first, submissions are rejected when all the retained jobs are still running.
+    """
+
+    # Defaults, overridden by the jobs configuration section
+    DEFAULT_MAX_JOBS = 64
+    DEFAULT_RETENTION_S = 3600
+
+    def __init__(self, max_jobs: int = DEFAULT_MAX_JOBS, retention_s: float = DEFAULT_RETENTION_S):
+        """
+        Initialize the job manager.
+        :param max_jobs: Maximum number of retained jobs, running or finished.
+        :param retention_s: Time in seconds a finished job is retained.
+        """
+        self._max_jobs = max_jobs
+        self._retention_s = retention_s
+        # Jobs in submission order
+        self._jobs: dict[str, ToolJob] = {}
+
+    def set_limits(self, max_jobs: int, retention_s: float) -> None:
+        """
+        Change the limits, applied from the next submission.
+        :param max_jobs: Maximum number of retained jobs, running or finished.
+        :param retention_s: Time in seconds a finished job is retained.
+        """
+        self._max_jobs = max_jobs
+        self._retention_s = retention_s
+
+    def _evict(self) -> None:
+        """
+        Drop the finished jobs past their retention time, then the oldest finished jobs over the limit.
+        """
+        now = time.time()
+        expired = [
+            job.job_id for job in self._jobs.values()
+            if job.finished and now - job.finished_at > self._retention_s
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+        excess = len(self._jobs) - self._max_jobs + 1
+        if excess > 0:
+            finished = [job.job_id for job in self._jobs.values() if job.finished]
+            for job_id in finished[:excess]:
+                del self._jobs[job_id]
+
+    def submit(
+        self, tool_name: str, arguments: dict, caller: str | None, run: Callable[[], Awaitable[Any]]
+    ) -> ToolJob:
+        """
+        Start a job on the running event loop.
+        :param tool_name: Name of the tool called.
+        :param arguments: Arguments of the call.
+        :param caller: Identifier of the client submitting the job.
+        :param run: Coroutine function performing the call.
+        :return: The job.
+        """
+        self._evict()
+        if len(self._jobs) >= self._max_jobs:
+            raise ToolJobError(f"Too many jobs running: {len(self._jobs)}, retry when a job is done.")
+
+        job = ToolJob(job_id=secrets.token_hex(8), tool_name=tool_name, arguments=arguments, caller=caller)
+        job.task = asyncio.get_running_loop().create_task(self._run(job, run))
+        job.task.add_done_callback(lambda _: self._finish(job))
+        self._jobs[job.job_id] = job
+        return job
+
+    @staticmethod
+    async def _run(job: ToolJob, run: Callable[[], Awaitable[Any]]) -> None:
+        """
+        Perform the call of a job and record its outcome.
+        """
+        tool_context.set(replace(tool_context.get(), on_host=job.hosts.append, on_progress=job.set_progress))
+        try:
+            job.result = await run()
+            job.state = ToolJob.STATE_DONE
+            job.hosts = []
+        except Exception as e:
+            job.state = ToolJob.STATE_FAILED
+            job.error = f"{type(e).__name__}: {e}"
+
+    @staticmethod
+    def _finish(job: ToolJob) -> None:
+        """
+        Record the end of a job, a job still running when its task ends was cancelled.
+        """
+        if job.state == ToolJob.STATE_RUNNING:
+            job.state = ToolJob.STATE_CANCELLED
+        job.finished_at = time.time()
+        job.task = None
+
+    def get(self, job_id: str) -> ToolJob:
+        """
+        Get a retained job.
+        :param job_id: The job identifier.
+        :return: The job.
+        """
+        self._evict()
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise ToolJobError(f"Unknown or expired job: {job_id}")
+        return job
+
+    def cancel(self, job_id: str) -> ToolJob:
+        """
+        Cancel a running job, the hosts found so far are kept.
+        :param job_id: The job identifier.
+        :return: The job.
+        """
+        job = self.get(job_id)
+        if job.task is not None:
+            job.task.cancel()
+        return job
+
+    def get_stats(self) -> dict:
+        """
+        Get the number of retained jobs by state.
+        """
+        stats = dict(max_jobs=self._max_jobs, retention_s=self._retention_s)
+        for state in (ToolJob.STATE_RUNNING, ToolJob.STATE_DONE, ToolJob.STATE_FAILED, ToolJob.STATE_CANCELLED):
+            stats[state] = sum(1 for job in self._jobs.values() if job.state == state)
+        return stats
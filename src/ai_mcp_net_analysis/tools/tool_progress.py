@@ -0,0 +1,67 @@
+import asyncio
+from typing import Awaitable, Callable
+
+
+class ToolProgress:
+    """
+    Throttled forwarder of the progress of a tool call.
+    Progress updates are sent at most once per interval: an update arriving too early is held back and the
+    latest value is sent at the end of the interval, unchanged values are not sent again.
+    """
+
+    # Default minimum interval in s between two progress reports
+    DEFAULT_INTERVAL_S = 1.0
+
+    def __init__(self, send: Callable[[float], Awaitable[None]], interval_s: float = DEFAULT_INTERVAL_S):
+        """
+        Initialize the forwarder.
+        :param send: Coroutine function sending a progress report, given the completed fraction from 0 to 1.
+        :param interval_s: Minimum interval in seconds between two reports.
+        """
+        self._send = send
+        self._interval_s = interval_s
+        self._loop = asyncio.get_running_loop()
+        self._latest: float | None = None
+        self._sent: float | None = None
+        self._sent_at = float("-inf")
+        self._handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    def update(self, fraction: float) -> None:
+        """
+        Report the progress of the call.
+        :param fraction: The completed fraction of the call, from 0 to 1.
+        """
+        self._latest = fraction
+        if self._handle is not None:
+            # A report is already scheduled and will carry the latest value
+            return
+        delay = self._sent_at + self._interval_s - self._loop.time()
+        if delay <= 0:
+            self._flush()
+        else:
+            self._handle = self._loop.call_later(delay, self._flush)
+
+    def _flush(self) -> None:
+        """
+        Send the latest progress if it changed since the last report.
+        """
+        self._handle = None
+        if self._latest == self._sent:
+            return
+        self._sent = self._latest
+        self._sent_at = self._loop.time()
+        task = self._loop.create_task(self._send(self._sent))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def close(self) -> None:
+        """
+        Stop forwarding: the held back report is sent at once, and the reports in flight are awaited, so that the
+        last progress, 100% for a completed call, reaches the client before the result of the call.
+        """
+        if self._handle is not None:
+            self._handle.cancel()
+            self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
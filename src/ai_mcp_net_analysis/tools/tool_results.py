@@ -0,0 +1,347 @@
+import base64
+import binascii
+import gzip
+import json
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from ipaddress import ip_address, ip_network, IPv4Network, IPv6Network
+from typing import Any, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from utils import NmapHost
+
+
+class ToolResultError(Exception):
+    """
+    Custom exception for result handle errors.
+    """
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class ToolResultFilter:
+    """
+    Filter of the host records of a stored result, None fields match every host.
+    """
+    # Host state, e.g. 'up'
+    state: str | None = None
+    # Network holding the host address, in CIDR notation
+    cidr: str | None = None
+    # Open port of the host, for port scan results
+    port: int | None = None
+
+    def __bool__(self) -> bool:
+        """
+        Whether the filter excludes any host.
+        """
+        return self.state is not None or self.cidr is not None or self.port is not None
+
+    def __str__(self) -> str:
+        """
+        Render the filter as 'name=value' pairs.
+        """
+        return " ".join(f"{name}={getattr(self, name)}" for name in self.__slots__ if getattr(self, name) is not None)
+
+    def apply(self, hosts: list["NmapHost"]) -> list["NmapHost"]:
+        """
+        Get the host records matching the filter, in result order.
+        """
+        network: IPv4Network | IPv6Network | None = ip_network(self.cidr, strict=False) if self.cidr else None
+        return [
+            host for host in hosts
+            if (self.state is None or host.state == self.state)
+            and (network is None or ip_address(host.ip) in network)
+            and (self.port is None or any(port.port == self.port for port in host.ports))
+        ]
+
+
+@dataclass(slots=True)
+class ToolResultHandle:
+    """
+    Tool result kept by the results store, read by pages.
+    """
+    handle_id: str
+    tool_name: str
+    result: Any
+    # Estimated memory held by the result and its compressed rendering
+    size_bytes: int
+    created_at: float = field(default_factory=time.time)
+    accessed_at: float = field(default_factory=time.monotonic)
+    # Host records of the filtered views read so far, least recently used first
+    views: OrderedDict[ToolResultFilter, list["NmapHost"]] = field(default_factory=OrderedDict)
+    # Full result rendering, gzip compressed, built on first read
+    compressed: bytes | None = None
+
+    @property
+    def uri(self) -> str:
+        """
+        URI of the full result as an MCP resource.
+        """
+        return f"{ToolResultStore.URI_SCHEME}://{self.handle_id}"
+
+
+class ToolResultStore:
+    """
+    Store of the large tool results, read by pages.
+    A result whose host table is longer than a page is kept under a handle, and the call returns its first page
+    with a cursor to the next one. Pages are sliced from the stored host records, and the filtered views are
+    kept with the handle, so that the full result is neither rendered nor filtered again for each page. The
+    store is bounded by a number of results and an estimated memory size: results idle for longer than their time
+    to live are dropped first, then the least recently read ones.
+    """
+
+    # Defaults, overridden by the results configuration section
+    DEFAULT_PAGE_SIZE = 256
+    DEFAULT_MAX_RESULTS = 32
+    DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+    DEFAULT_TTL_S = 3600
+
+    # Maximum number of rows of a page
+    MAX_PAGE_SIZE = 4096
+
+    # Maximum number of filtered views kept per result
+    MAX_VIEWS = 8
+
+    # Estimated memory held by a host record, used to bound the store without measuring the objects
+    HOST_BYTES_ESTIMATE = 256
+
+    # URI scheme of the results served as MCP resources, and their MIME type
+    URI_SCHEME = "result"
+    MIME_TYPE = "application/gzip"
+
+    def __init__(
+        self,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        max_results: int = DEFAULT_MAX_RESULTS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl_s: float = DEFAULT_TTL_S,
+    ):
+        """
+        Initialize the store.
+        :param page_size: Number of rows of a page, results with more hosts are kept and read by pages.
+        :param max_results: Maximum number of results kept.
+        :param max_bytes: Maximum estimated memory held by the results kept.
+        :param ttl_s: Time in seconds a result is kept after it was last read.
+        """
+        self._page_size = page_size
+        self._max_results = max_results
+        self._max_bytes = max_bytes
+        self._ttl_s = ttl_s
+        self._handles: OrderedDict[str, ToolResultHandle] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = dict(stored=0, pages=0, evictions=0, expirations=0, rejected=0)
+
+    def set_limits(self, page_size: int, max_results: int, max_bytes: int, ttl_s: float) -> None:
+        """
+        Change the limits, applied from the next stored result.
+        """
+        with self._lock:
+            self._page_size = page_size
+            self._max_results = max_results
+            self._max_bytes = max_bytes
+            self._ttl_s = ttl_s
+
+    @staticmethod
+    def is_pageable(result: Any) -> bool:
+        """
+        Whether a result has a host table which can be read by pages.
+        """
+        return isinstance(getattr(result, "hosts", None), list) and callable(getattr(result, "with_hosts", None))
+
+    def needs_paging(self, result: Any) -> bool:
+        """
+        Whether a result has more hosts than a page.
+        """
+        return self.is_pageable(result) and len(result.hosts) > self._page_size
+
+    def _estimate(self, result: Any) -> int:
+        """
+        Estimate the memory held by a result.
+        """
+        xml = getattr(result, "xml", None)
+        return len(result.hosts) * self.HOST_BYTES_ESTIMATE + (len(xml) if isinstance(xml, str) else 0)
+
+    def _drop(self, handle_id: str) -> None:
+        """
+        Drop a result. Called with the lock held.
+        """
+        handle = self._handles.pop(handle_id)
+        self._bytes -= handle.size_bytes
+
+    def _evict(self, incoming_bytes: int = 0) -> None:
+        """
+        Drop the expired results, then the least recently read ones until a result of the given size fits.
+        Called with the lock held.
+        """
+        now = time.monotonic()
+        expired = [handle.handle_id for handle in self._handles.values() if now - handle.accessed_at > self._ttl_s]
+        for handle_id in expired:
+            self._drop(handle_id)
+        self._stats["expirations"] += len(expired)
+
+        while self._handles and (
+            len(self._handles) + (1 if incoming_bytes else 0) > self._max_results
+            or self._bytes + incoming_bytes > self._max_bytes
+        ):
+            self._drop(next(iter(self._handles)))
+            self._stats["evictions"] += 1
+
+    def put(self, tool_name: str, result: Any) -> ToolResultHandle | None:
+        """
+        Keep a result, evicting the least recently read ones if the store is full.
+        :param tool_name: Name of the tool which produced the result.
+        :param result: The result, with a host table.
+        :return: The handle of the result, None if it is larger than the store.
+        """
+        size_bytes = self._estimate(result)
+        with self._lock:
+            if size_bytes > self._max_bytes:
+                self._stats["rejected"] += 1
+                return None
+            self._evict(size_bytes)
+            handle = ToolResultHandle(secrets.token_hex(8), tool_name, result, size_bytes)
+            handle.views[ToolResultFilter()] = result.hosts
+            self._handles[handle.handle_id] = handle
+            self._bytes += size_bytes
+            self._stats["stored"] += 1
+        return handle
+
+    def get(self, handle_id: str) -> ToolResultHandle:
+        """
+        Get a kept result and mark it as read.
+        :param handle_id: The result handle.
+        :return: The result handle.
+        :raises ToolResultError: If the result is unknown or was dropped.
+        """
+        with self._lock:
+            self._evict()
+            handle = self._handles.get(handle_id)
+            if handle is None:
+                raise ToolResultError(f"Unknown or expired result: {handle_id}, run the scan again.")
+            handle.accessed_at = time.monotonic()
+            self._handles.move_to_end(handle_id)
+            return handle
+
+    def get_handles(self) -> list[ToolResultHandle]:
+        """
+        Get the kept results, least recently read first.
+        """
+        with self._lock:
+            self._evict()
+            return list(self._handles.values())
+
+    def _view(self, handle: ToolResultHandle, result_filter: ToolResultFilter) -> list["NmapHost"]:
+        """
+        Get the host records of a result matching a filter, filtered once and kept with the result.
+        """
+        with self._lock:
+            hosts = handle.views.get(result_filter)
+            if hosts is not None:
+                handle.views.move_to_end(result_filter)
+                return hosts
+
+        hosts = result_filter.apply(handle.result.hosts)
+        with self._lock:
+            handle.views[result_filter] = hosts
+            # The unfiltered view is the host table of the result itself and is never dropped
+            while len(handle.views) > self.MAX_VIEWS:
+                oldest = next(key for key in handle.views if key)
+                del handle.views[oldest]
+        return hosts
+
+    @staticmethod
+    def encode_cursor(handle_id: str, offset: int, limit: int, result_filter: ToolResultFilter) -> str:
+        """
+        Encode the position of a page as an opaque cursor.
+        """
+        position = {"h": handle_id, "o": offset, "l": limit}
+        position.update({name: value for name, value in zip("scp", (
+            result_filter.state, result_filter.cidr, result_filter.port)) if value is not None})
+        return base64.urlsafe_b64encode(json.dumps(position, separators=(",", ":")).encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple[str, int, int, ToolResultFilter]:
+        """
+        Decode a cursor.
+        :return: The result handle, offset, limit and filter of the page.
+        :raises ToolResultError: If the cursor is invalid.
+        """
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            return (
+                str(position["h"]), int(position["o"]), int(position["l"]),
+                ToolResultFilter(position.get("s"), position.get("c"), position.get("p")),
+            )
+        except (binascii.Error, ValueError, TypeError, KeyError) as e:
+            raise ToolResultError(f"Invalid cursor: {cursor}") from e
+
+    def page(
+        self,
+        handle: ToolResultHandle,
+        offset: int = 0,
+        limit: int | None = None,
+        result_filter: ToolResultFilter = ToolResultFilter(),
+    ) -> str:
+        """
+        Render a page of a kept result: a header with the position of the page, the cursor of the next page and
+        the URI of the full result, then the page rendered as the result is.
+        :param handle: The result handle.
+        :param offset: Index of the first row of the page in the filtered host table.
+        :param limit: Number of rows of the page, the configured page size if None.
+        :param result_filter: Filter of the host records.
+        :return: The rendered page.
+        """
+        limit = min(limit or self._page_size, self.MAX_PAGE_SIZE)
+        hosts = self._view(handle, result_filter)
+        rows = hosts[offset:offset + limit]
+        page = handle.result.with_hosts(rows)
+        if offset or result_filter:
+            # The changes of an incremental sweep are rendered with the first unfiltered page only
+            if getattr(page, "changes", None) is not None:
+                page.changes = None
+        with self._lock:
+            self._stats["pages"] += 1
+
+        header = f"# result {handle.handle_id}: rows {offset + 1}-{offset + len(rows)} of {len(hosts)}"
+        if not rows:
+            header = f"# result {handle.handle_id}: no rows from {offset + 1}, {len(hosts)} rows"
+        if result_filter:
+            header += f" ({result_filter})"
+        lines = [header]
+        if offset + limit < len(hosts):
+            lines.append(f"# next cursor: {self.encode_cursor(handle.handle_id, offset + limit, limit, result_filter)}")
+        lines.append(f"# full result: {handle.uri} ({self.MIME_TYPE})")
+        return "\n".join(lines) + "\n" + str(page)
+
+    def compressed(self, handle_id: str) -> bytes:
+        """
+        Get the full rendering of a kept result, gzip compressed, built on the first read and kept with it.
+        :param handle_id: The result handle.
+        :return: The compressed rendering.
+        """
+        handle = self.get(handle_id)
+        if handle.compressed is None:
+            compressed = gzip.compress(str(handle.result).encode())
+            with self._lock:
+                if handle.compressed is None and handle.handle_id in self._handles:
+                    handle.compressed = compressed
+                    handle.size_bytes += len(compressed)
+                    self._bytes += len(compressed)
+            return compressed
+        return handle.compressed
+
+    def get_stats(self) -> dict:
+        """
+        Get the store counters.
+        :return: The stored, pages, evictions, expirations and rejected counters, the number of results and
+            their estimated size.
+        """
+        with self._lock:
+            return dict(
+                self._stats, results=len(self._handles), bytes=self._bytes,
+                max_results=self._max_results, max_bytes=self._max_bytes,
+            )
@@ -0,0 +1,222 @@
+import asyncio
+import itertools
+import time
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+
+@dataclass(slots=True)
+class ScanGrant:
+    """
+    Permission to run a scan, given by the scheduler.
+    """
+    # Packet rate budget of the scan in packets per second, None if unlimited
+    max_rate: int | None
+    # Time spent waiting in the queue in seconds
+    wait_s: float
+
+
+class ToolScheduler:
+    """
+    Central scheduler of the scans.
+    Caps the number of concurrent scans and queues the others. Waiting scans are started by priority (lower
+    first), then by the scan time already used by their caller and the number of scans already granted to
+    it, so that a caller queuing many scans does not starve the others. A global packet rate budget is
+    shared evenly between the scan slots and passed to each scan.
+    The accounting of a caller is dropped when it is forgotten, once its session ended, or after IDLE_TTL_S
+    without a running or waiting scan.
+    """
+
+    # Defaults, overridden by the scheduler configuration section
+    DEFAULT_MAX_CONCURRENT = 4
+    DEFAULT_MAX_RATE_PPS = 0
+    MIN_PRIORITY = 0
+    MAX_PRIORITY = 9
+    DEFAULT_PRIORITY = 5
+
+    # Number of recent wait times kept for the statistics
+    WAIT_HISTORY = 1024
+
+    # Time in s after which the accounting of a caller without running or waiting scans is dropped
+    IDLE_TTL_S = 3600.0
+
+    def __init__(self, max_concurrent: int = DEFAULT_MAX_CONCURRENT, max_rate_pps: int = DEFAULT_MAX_RATE_PPS):
+        """
+        Initialize the scheduler.
+        :param max_concurrent: Maximum number of concurrent scans.
+        :param max_rate_pps: Global packet rate budget in packets per second, 0 for unlimited.
+        """
+        self._max_concurrent = max_concurrent
+        self._max_rate_pps = max_rate_pps
+        self._running = 0
+        # Waiting scans: [priority, sequence, caller, future]
+        self._waiting: list[list] = []
+        self._sequence = itertools.count()
+        self._usage_s: dict[str | None, float] = defaultdict(float)
+        self._granted: dict[str | None, int] = defaultdict(int)
+        # Running and waiting scans of each caller, the callers without any in the order they became idle, and
+        # the forgotten callers with scans left
+        self._active: dict[str | None, int] = defaultdict(int)
+        self._idle_since: dict[str | None, float] = {}
+        self._forgotten: set[str | None] = set()
+        self._waits: deque[float] = deque(maxlen=self.WAIT_HISTORY)
+        self._total_granted = 0
+
+    @property
+    def rate_per_scan(self) -> int | None:
+        """
+        Packet rate budget of each scan, None if unlimited.
+        """
+        if not self._max_rate_pps:
+            return None
+        return max(self._max_rate_pps // self._max_concurrent, 1)
+
+    def _enter(self, caller: str | None) -> None:
+        """
+        Account for a scan of a caller asking for a slot.
+        """
+        self._active[caller] += 1
+        self._idle_since.pop(caller, None)
+
+    def _leave(self, caller: str | None) -> None:
+        """
+        Account for a scan of a caller ending or leaving the queue, and drop the expired idle callers.
+        """
+        self._active[caller] -= 1
+        if not self._active[caller]:
+            del self._active[caller]
+            if caller in self._forgotten:
+                self._drop(caller)
+            else:
+                self._idle_since[caller] = time.monotonic()
+        expired = time.monotonic() - self.IDLE_TTL_S
+        while self._idle_since:
+            caller, since = next(iter(self._idle_since.items()))
+            if since > expired:
+                break
+            self._drop(caller)
+
+    def _drop(self, caller: str | None) -> None:
+        """
+        Drop the accounting of a caller without running or waiting scans.
+        """
+        self._usage_s.pop(caller, None)
+        self._granted.pop(caller, None)
+        self._idle_since.pop(caller, None)
+        self._forgotten.discard(caller)
+
+    def forget(self, caller: str | None) -> None:
+        """
+        Drop the accounting of a caller whose session ended, once its running and waiting scans end.
+        :param caller: Identifier of the client.
+        """
+        if caller in self._active:
+            self._forgotten.add(caller)
+        else:
+            self._drop(caller)
+
+    def _grant(self, caller: str | None) -> None:
+        """
+        Account for a scan starting.
+        """
+        self._running += 1
+        self._granted[caller] += 1
+        self._total_granted += 1
+
+    def _next(self) -> list | None:
+        """
+        Pop the next waiting scan to start.
+        """
+        if not self._waiting:
+            return None
+        entry = min(
+            self._waiting,
+            key=lambda item: (item[0], self._usage_s[item[2]], self._granted[item[2]], item[1]),
+        )
+        self._waiting.remove(entry)
+        return entry
+
+    def _dispatch(self) -> None:
+        """
+        Start waiting scans while slots are available.
+        """
+        while self._running < self._max_concurrent:
+            entry = self._next()
+            if entry is None:
+                return
+            self._grant(entry[2])
+            entry[3].set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, caller: str | None = None, priority: int = DEFAULT_PRIORITY) -> AsyncIterator[ScanGrant]:
+        """
+        Wait for a scan slot and hold it for the duration of the context.
+        :param caller: Identifier of the client running the scan.
+        :param priority: Priority of the scan, lower values start first.
+        :return: The scan grant.
+        """
+        enqueued = time.monotonic()
+        self._enter(caller)
+        if self._running < self._max_concurrent and not self._waiting:
+            self._grant(caller)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            entry = [priority, next(self._sequence), caller, future]
+            self._waiting.append(entry)
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # Granted while being cancelled, give the slot back
+                    self._release(caller, 0.0)
+                else:
+                    self._waiting.remove(entry)
+                    self._leave(caller)
+                raise
+
+        started = time.monotonic()
+        self._waits.append(started - enqueued)
+        try:
+            yield ScanGrant(max_rate=self.rate_per_scan, wait_s=started - enqueued)
+        finally:
+            self._release(caller, time.monotonic() - started)
+
+    def set_limits(self, max_concurrent: int, max_rate_pps: int) -> None:
+        """
+        Change the limits, running scans keep their slot and packet rate, waiting scans start if slots are added.
+        :param max_concurrent: Maximum number of concurrent scans.
+        :param max_rate_pps: Global packet rate budget in packets per second, 0 for unlimited.
+        """
+        self._max_concurrent = max_concurrent
+        self._max_rate_pps = max_rate_pps
+        self._dispatch()
+
+    def _release(self, caller: str | None, elapsed_s: float) -> None:
+        """
+        Account for a scan ending and start the next waiting scans.
+        """
+        self._running -= 1
+        self._usage_s[caller] += elapsed_s
+        self._leave(caller)
+        self._dispatch()
+
+    def get_stats(self) -> dict:
+        """
+        Get the scheduler state and statistics.
+        :return: Queue depth, running scans, limits and recent wait times in seconds.
+        """
+        waits = sorted(self._waits)
+        return dict(
+            queue_depth=len(self._waiting),
+            running=self._running,
+            max_concurrent=self._max_concurrent,
+            max_rate_pps=self._max_rate_pps,
+            rate_per_scan=self.rate_per_scan,
+            granted=self._total_granted,
+            wait_avg_s=round(sum(waits) / len(waits), 4) if waits else 0.0,
+            wait_p95_s=round(waits[int(len(waits) * 0.95)], 4) if waits else 0.0,
+            wait_max_s=round(waits[-1], 4) if waits else 0.0,
+            usage_s={str(caller): round(usage, 3) for caller, usage in self._usage_s.items()},
+        )
@@ -1,27 +1,86 @@
-from typing import Any
-from pydantic import BaseModel, field_validator
+import asyncio
+import time
+from contextlib import aclosing
+from ipaddress import ip_address, ip_network, IPv4Network, IPv6Network
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Hashable
+from pydantic import BaseModel, field_validator, model_validator
 
-from utils import CmdExec
-from utils import CIDRIPContainer
+from utils import ConfigData
+from utils import NmapXml
+from utils import NmapXmlStream, NmapHost, NmapRunStats
+from utils import NmapSweepResult
+from utils import InventoryDelta
+from utils import Scanner, ScannerFactory, NmapScanner, ScanTiming, RouteTable
+from utils import ClusterCoordinator, ClusterError
+from utils import CIDRIPContainer, CIDRIPListContainer, IPTargetSet
 from utils import TimeoutSecContainer
-from tools.tool import Tool
+from tools.tool import Tool, ToolError
+from tools.tool_context import tool_context
+from tools.tool_scheduler import ToolScheduler
 
 from mcp.types import Tool as MCPTool
 
 
+class SweepArguments(BaseModel):
+    """
+    Arguments common to the ping sweep functions.
+    """
+    timeout_s: int
+    format: str = NmapSweepResult.FORMAT_COMPACT
+    resolve: bool | None = None
+    priority: int = ToolScheduler.DEFAULT_PRIORITY
+
+    @field_validator("timeout_s")
+    def validate_timeout_s(cls, value: int) -> int:
+        """ Validate the timeout in seconds """
+        _ = TimeoutSecContainer(value)
+        return value
+
+    @field_validator("format")
+    def validate_format(cls, value: str) -> str:
+        """ Validate the output format """
+        if value not in NmapSweepResult.FORMATS:
+            raise ValueError(f"Invalid format: {value}, expected one of {', '.join(NmapSweepResult.FORMATS)}")
+        return value
+
+    @field_validator("priority")
+    def validate_priority(cls, value: int) -> int:
+        """ Validate the scheduling priority """
+        if not ToolScheduler.MIN_PRIORITY <= value <= ToolScheduler.MAX_PRIORITY:
+            raise ValueError(
+                f"Invalid priority: {value}, expected {ToolScheduler.MIN_PRIORITY} to {ToolScheduler.MAX_PRIORITY}")
+        return value
+
+
 class ToolPingSweep(Tool):
     """
     Network host discovery class.
     This class is responsible for discovering network hosts and their statuses.
     """
 
+    # Sharding defaults, overridden by the scan.sharding configuration section
+    SHARDING_WORKERS = 4
+    SHARDING_PREFIX_LENGTH_V4 = 24
+    SHARDING_PREFIX_LENGTH_V6 = 120
+
+    # Sweeps run concurrently with other scans and wait for a slot of the scans scheduler
+    SCHEDULED = True
+
+    # Incremental sweep defaults, overridden by the scan.incremental configuration section
+    INCREMENTAL_FRESHNESS_S = 300
+    INCREMENTAL_EMPTY_FRESHNESS_S = 3600
+    INCREMENTAL_BLOCK_PREFIX_LENGTH_V4 = 24
+    INCREMENTAL_BLOCK_PREFIX_LENGTH_V6 = 120
+
     # Dataclass for function arguments
-    class Arguments(BaseModel):
+    class Arguments(SweepArguments):
         """
         Arguments for the ping sweep function.
         """
         ip_cidr: str
-        timeout_s: int
+        sharded: bool | None = None
+        incremental: bool = False
 
         @field_validator("ip_cidr")
         def validate_ip_cidr(cls, value: str) -> str:
@@ -29,11 +88,12 @@ class ToolPingSweep(Tool):
             _ = CIDRIPContainer(value)
             return value
 
-        @field_validator("timeout_s")
-        def validate_timeout_s(cls, value: int) -> int:
-            """ Validate the timeout in seconds """
-            _ = TimeoutSecContainer(value)
-            return value
+        @model_validator(mode="after")
+        def validate_incremental(self) -> "ToolPingSweep.Arguments":
+            """ Validate the incremental sweep options """
+            if self.incremental and self.format != NmapSweepResult.FORMAT_COMPACT:
+                raise ValueError("Incremental sweeps only support the compact format")
+            return self
 
     def __init__(self):
         """
@@ -41,6 +101,9 @@ class ToolPingSweep(Tool):
         """
         super().__init__()
 
+        # The raw XML report is always produced by nmap
+        self._nmap = NmapScanner()
+
     def get_tool(self) -> MCPTool:
         """
         Returns the tool's metadata.
@@ -59,6 +122,36 @@ class ToolPingSweep(Tool):
                         "type": "integer",
                         "description": "Timeout for each ping in seconds (e.g., 10). Default is 60 if not specified."
                     },
+                    "sharded": {
+                        "type": "boolean",
+                        "description": "Split the network into sub-networks scanned concurrently. "
+                                       "Defaults to the server configuration."
+                    },
+                    "format": {
+                        "type": "string",
+                        "enum": list(NmapSweepResult.FORMATS),
+                        "description": "Output format: 'compact' host table with a summary (default) "
+                                       "or 'xml' for the raw nmap XML report, without host names."
+                    },
+                    "resolve": {
+                        "type": "boolean",
+                        "description": "Resolve the names of the hosts up with reverse DNS after the sweep, "
+                                       "compact format only. Set to false for faster sweeps. "
+                                       "Defaults to the server configuration."
+                    },
+                    "incremental": {
+                        "type": "boolean",
+                        "description": "Only probe again the addresses whose last scan is older than the freshness "
+                                       "window and report the changes (hosts up, down or with a new MAC address) "
+                                       "with the merged current view. Requires the compact format."
+                    },
+                    "priority": {
+                        "type": "integer",
+                        "minimum": ToolScheduler.MIN_PRIORITY,
+                        "maximum": ToolScheduler.MAX_PRIORITY,
+                        "description": "Scheduling priority when scans are queued, lower values start first. "
+                                       f"Default is {ToolScheduler.DEFAULT_PRIORITY}."
+                    },
                 },
                 "required": ["ip_cidr", "timeout_s"],
             }
@@ -70,18 +163,311 @@ class ToolPingSweep(Tool):
         """
         return self.__class__.__name__
 
+    def _get_arguments(self, arguments: dict) -> Arguments:
+        """
+        Validate the raw tool arguments.
+        """
+        return self.Arguments(
+            ip_cidr=arguments.get("ip_cidr"),
+            timeout_s=arguments.get("timeout_s"),
+            sharded=arguments.get("sharded"),
+            format=arguments.get("format") or NmapSweepResult.FORMAT_COMPACT,
+            incremental=arguments.get("incremental") or False,
+            resolve=arguments.get("resolve"),
+            priority=arguments.get("priority", ToolScheduler.DEFAULT_PRIORITY)
+        )
+
     def exec(self, arguments: dict) -> Any:
         """
         Invokes the tool with the provided arguments.
         """
         # Create an instance of the Arguments dataclass
-        args = self.Arguments(
-            ip_cidr=arguments.get("ip_cidr"),
-            timeout_s=arguments.get("timeout_s")
-        )
+        args = self._get_arguments(arguments)
 
         # Call the ping_sweep method with the arguments
-        return self.ping_sweep(args)
+        if args.incremental:
+            raise ToolError("Incremental sweeps are only supported by the asynchronous execution path.")
+        ts = time.time()
+        result = self._parse_xml(args, self.ping_sweep(args))
+        self._record(args, ts, result)
+        return result
+
+    async def exec_async(self, arguments: dict) -> Any:
+        """
+        Invokes the tool with the provided arguments without blocking the event loop.
+        """
+        # Create an instance of the Arguments dataclass
+        args = self._get_arguments(arguments)
+
+        # Call the ping_sweep_async method with the arguments
+        if args.incremental:
+            return await self.ping_sweep_incremental(args)
+
+        ts = time.time()
+        if args.format == NmapSweepResult.FORMAT_XML:
+            result = self._parse_xml(args, await self.ping_sweep_async(args))
+        else:
+            result = await self.ping_sweep_compact(args)
+            await self._resolve_names(args, result.hosts)
+        await asyncio.to_thread(self._record, args, ts, result)
+        return result
+
+    def _parse_xml(self, args: Arguments, xml: str) -> NmapSweepResult:
+        """
+        Build the sweep result from a complete nmap XML report.
+        :param args: Arguments containing the CIDR IP address and output format.
+        :param xml: The nmap XML report.
+        :return: The sweep result, holding the report if the XML format was requested.
+        """
+        parser = NmapXmlStream(max_buffer_bytes=len(xml) + 1)
+        hosts = parser.feed(xml.encode()) + parser.close()
+        return NmapSweepResult(
+            args.ip_cidr, hosts, parser.stats, xml if args.format == NmapSweepResult.FORMAT_XML else None,
+            discovery=self._discovery_record([args.ip_cidr]),
+        )
+
+    def _record(self, args: Arguments, ts: float, result: NmapSweepResult) -> None:
+        """
+        Record the sweep result in the host inventory, if enabled.
+        :param args: Arguments containing the CIDR IP address.
+        :param ts: The sweep start time as a POSIX timestamp.
+        :param result: The sweep result.
+        """
+        inventory = self.get_inventory()
+        if inventory is not None:
+            inventory.record(CIDRIPContainer(args.ip_cidr).get_network(), ts, result.hosts)
+
+    def validate_arguments(self, arguments: dict) -> None:
+        """
+        Validate the sweep arguments.
+        """
+        _ = self._get_arguments(arguments)
+
+    def get_priority(self, arguments: dict) -> int:
+        """
+        Get the scheduling priority of the sweep.
+        """
+        return self._get_arguments(arguments).priority
+
+    def cache_key(self, arguments: dict) -> Hashable | None:
+        """
+        Get the normalized arguments used as results cache key: canonical CIDR, timeout, format and name
+        resolution. Sharding and priority do not change the result and are not part of the key. Incremental
+        sweeps are not cached: each one reports the changes since the inventory baseline and records a new one.
+        """
+        args = self._get_arguments(arguments)
+        if args.incremental:
+            return None
+        return CIDRIPContainer(args.ip_cidr).get_value(), args.timeout_s, args.format, self._resolves(args)
+
+    def cache_subsume(self, key: Hashable, cached_key: Hashable, cached_value: Any) -> Any | None:
+        """
+        Answer a sweep of a sub-network of a cached sweep by filtering the cached result.
+        """
+        cidr, *options = key
+        cached_cidr, *cached_options = cached_key
+        if options != cached_options:
+            return None
+        network, cached_network = ip_network(cidr), ip_network(cached_cidr)
+        if network.version != cached_network.version or not network.subnet_of(cached_network):
+            return None
+        return cached_value.filter(network)
+
+    def partial_result(self, arguments: dict, hosts: list[NmapHost], elapsed_s: float) -> Any:
+        """
+        Build the result of a sweep still running, or cancelled, from the hosts found so far.
+        :param arguments: The arguments of the sweep.
+        :param hosts: The host records found so far, in the order they were found.
+        :param elapsed_s: Time in seconds the sweep has been running.
+        :return: The partial sweep result.
+        """
+        return NmapSweepResult(
+            CIDRIPContainer(self._get_arguments(arguments).ip_cidr).get_value(), list(hosts),
+            NmapRunStats(elapsed_s=elapsed_s), partial=True,
+        )
+
+    def _sharding_config(self) -> ConfigData:
+        """
+        Get the sharding configuration section.
+        """
+        scan = self.get_config().get_value("scan", ConfigData({}))
+        return scan.get_value("sharding", ConfigData({}))
+
+    def _cluster(self) -> ClusterCoordinator | None:
+        """
+        Get the coordinator the shards are sent to, None if the cluster is disabled or has no worker registered.
+        """
+        cluster = self.get_cluster()
+        return cluster if cluster is not None and cluster.has_workers() else None
+
+    def _workers(self) -> int:
+        """
+        Get the number of scanner runs of a sweep in flight: the capacity of the cluster workers, or the
+        sharding workers when the shards are scanned locally.
+        """
+        cluster = self._cluster()
+        if cluster is not None:
+            return max(cluster.get_capacity(), 1)
+        return self._sharding_config().get_value("workers", self.SHARDING_WORKERS)
+
+    def _shards(self, args: Arguments) -> list[str]:
+        """
+        Split the target network into the sub-networks to scan.
+        :param args: Arguments containing the CIDR IP address and the sharding flag.
+        :return: The list of CIDR to scan, in address order.
+        """
+        sharding = self._sharding_config()
+        # Sweeps are sharded by default when the shards are sent to cluster workers
+        sharded = args.sharded
+        if sharded is None:
+            sharded = sharding.get_value("enabled", False) or self._cluster() is not None
+        if not sharded:
+            return [args.ip_cidr]
+
+        cidr = CIDRIPContainer(args.ip_cidr)
+        if cidr.is_ipv4():
+            prefix_length = sharding.get_value("prefix_length_v4", self.SHARDING_PREFIX_LENGTH_V4)
+        else:
+            prefix_length = sharding.get_value("prefix_length_v6", self.SHARDING_PREFIX_LENGTH_V6)
+        return cidr.subnets(prefix_length)
+
+    def _max_rate(self, workers: int = 1) -> int | None:
+        """
+        Get the packet rate allowed to each scanner run, the rate granted by the scheduler is split evenly
+        between the concurrent workers of the sweep.
+        :param workers: Number of scanner runs in flight.
+        :return: The maximum rate in packets per second, None for no limit.
+        """
+        max_rate = tool_context.get().max_rate
+        if not max_rate:
+            return None
+        return max(max_rate // max(workers, 1), 1)
+
+    def _scanner(self) -> Scanner:
+        """
+        Get the host discovery backend selected by the scan.backend configuration.
+        """
+        return ScannerFactory.get_scanner(self.get_config())
+
+    def _timing(self, targets: list[str]) -> ScanTiming | None:
+        """
+        Get the timing options of a scanner run, learned from the previous scans of its subnets.
+        :param targets: The CIDRs of the run.
+        :return: The timing options, None if the timing model is disabled or has no statistics for the targets.
+        """
+        model = self.get_timing()
+        return model.timing(IPTargetSet(targets)) if model is not None else None
+
+    def _learn(self, targets: list[str], hosts: list[NmapHost], timing: ScanTiming | None) -> None:
+        """
+        Update the timing model with the host records of a complete scanner run, if enabled.
+        :param targets: The CIDRs of the run.
+        :param hosts: The host records of the run.
+        :param timing: The timing options of the run.
+        """
+        model = self.get_timing()
+        if model is not None:
+            model.record(IPTargetSet(targets), hosts, timing)
+
+    def _learn_report(self, targets: list[str], report: str, timing: ScanTiming | None) -> None:
+        """
+        Update the timing model with the nmap XML report of a complete scanner run, if enabled.
+        """
+        if self.get_timing() is not None:
+            parser = NmapXmlStream(max_buffer_bytes=len(report) + 1)
+            self._learn(targets, parser.feed(report.encode()) + parser.close(), timing)
+
+    def _technique(self) -> str:
+        """
+        Get the host discovery technique of the scan.discovery configuration section.
+        """
+        scan = self.get_config().get_value("scan", ConfigData({}))
+        return scan.get_value("discovery", ConfigData({})).get_value("technique", NmapScanner.TECHNIQUE_AUTO)
+
+    def _discovery(self, targets: list[str], nmap: bool = True) -> list[tuple[list[str], str | None]]:
+        """
+        Split the networks of a scanner run by host discovery technique. With the 'auto' technique the on-link
+        networks of the route table are swept with ARP, the others with ICMP and TCP probes, each in a run of its
+        own. Runs sent to cluster workers use ICMP and TCP probes: the route table of the server does not tell
+        which networks are on-link for a worker, and nmap still uses ARP for the on-link hosts of a privileged
+        worker. So do the runs of an unprivileged nmap, which cannot send ARP requests.
+        :param targets: The CIDRs of the run.
+        :param nmap: Whether the run uses nmap, the other backends have no choice of probes.
+        :return: The CIDRs and technique of each run, a None technique for a backend other than nmap.
+        """
+        if not nmap:
+            return [(targets, None)]
+        technique = self._technique()
+        if technique != NmapScanner.TECHNIQUE_AUTO:
+            return [(targets, technique)]
+        if self._cluster() is not None or not NmapScanner.is_privileged():
+            return [(targets, NmapScanner.TECHNIQUE_ICMP_TCP)]
+        on_link, routed = RouteTable.get_table().split(IPTargetSet(targets))
+        if not on_link or not routed:
+            return [(targets, NmapScanner.TECHNIQUE_ARP if on_link else NmapScanner.TECHNIQUE_ICMP_TCP)]
+        return [
+            ([str(network) for network in on_link.to_networks()], NmapScanner.TECHNIQUE_ARP),
+            ([str(network) for network in routed.to_networks()], NmapScanner.TECHNIQUE_ICMP_TCP),
+        ]
+
+    def _discovery_record(self, targets: list[str], nmap: bool = True) -> list[tuple[str, str]] | None:
+        """
+        Get the host discovery technique chosen for each network of a sweep, as recorded in its result.
+        :return: The CIDRs and their technique, None for a backend other than nmap.
+        """
+        if not nmap:
+            return None
+        return [(cidr, technique) for cidrs, technique in self._discovery(targets) for cidr in cidrs]
+
+    def _uses_nmap(self) -> bool:
+        """
+        Whether the compact sweeps run nmap: on the cluster workers, or locally with the nmap backend.
+        """
+        return self._cluster() is not None or self._scanner().get_name() == self._nmap.get_name()
+
+    def _report(self, targets: list[str], timeout_s: int) -> str:
+        """
+        Run an nmap ping sweep with the learned timing and return the raw nmap XML report, with a run per host
+        discovery technique.
+        """
+        reports = []
+        for cidrs, technique in self._discovery(targets):
+            timing = self._timing(cidrs)
+            report = self._nmap.report(cidrs, timeout_s, timing=timing, technique=technique)
+            self._learn_report(cidrs, report, timing)
+            reports.append(report)
+        return reports[0] if len(reports) == 1 else NmapXml.merge(reports)
+
+    async def _remote_report(
+        self, cluster: ClusterCoordinator, targets: list[str], timeout_s: int, max_rate: int | None,
+        timing: ScanTiming | None, technique: str | None,
+    ) -> str:
+        """
+        Run an nmap ping sweep on a cluster worker and return the raw nmap XML report.
+        """
+        try:
+            return await cluster.report(targets, timeout_s, max_rate, timing, technique)
+        except ClusterError as e:
+            raise ToolError(str(e)) from e
+
+    async def _report_async(self, targets: list[str], timeout_s: int, max_rate: int | None = None) -> str:
+        """
+        Run an nmap ping sweep with the learned timing without blocking the event loop and return the raw nmap
+        XML report, with a run per host discovery technique. The sweep runs on a cluster worker when workers are
+        registered.
+        """
+        reports = []
+        for cidrs, technique in self._discovery(targets):
+            timing = self._timing(cidrs)
+            cluster = self._cluster()
+            if cluster is not None:
+                report = await self._remote_report(cluster, cidrs, timeout_s, max_rate, timing, technique)
+            else:
+                report = await self._nmap.report_async(cidrs, timeout_s, max_rate, timing, technique)
+            if self.get_timing() is not None:
+                await asyncio.to_thread(self._learn_report, cidrs, report, timing)
+            reports.append(report)
+        return reports[0] if len(reports) == 1 else NmapXml.merge(reports)
 
     def ping_sweep(self, args: Arguments) -> str:
         """
@@ -91,14 +477,557 @@ class ToolPingSweep(Tool):
         """
 
         # Execute the command and capture the output
-        command = [
-            "nmap",
-            "-oX",
-            "-",
-            "-sn",
-            "-PE",
-            "--max-retries", "0",
-            "--host-timeout", f"{args.timeout_s}s",
-            f"{args.ip_cidr}"]
-        result = CmdExec.execute(command)
+        result = self._report([args.ip_cidr], args.timeout_s)
+        return result
+
+    async def ping_sweep_async(self, args: Arguments) -> str:
+        """
+        Perform a ping sweep of a network using nmap without blocking the event loop.
+        :param args: Arguments containing the CIDR IP address and timeout.
+        :return: The XML output from nmap.
+        """
+
+        shards = self._shards(args)
+        if len(shards) > 1:
+            return await self.ping_sweep_sharded(args, shards)
+
+        # Execute the command and capture the output
+        result = await self._report_async([args.ip_cidr], args.timeout_s, self._max_rate())
         return result
+
+    async def ping_sweep_sharded(self, args: Arguments, shards: list[str]) -> str:
+        """
+        Perform a ping sweep of a network split in shards, using a bounded pool of nmap workers.
+        :param args: Arguments containing the CIDR IP address and timeout.
+        :param shards: The sub-networks to scan.
+        :return: The merged XML output from nmap, hosts in address order.
+        """
+        workers = self._workers()
+        semaphore = asyncio.Semaphore(workers)
+        max_rate = self._max_rate(min(workers, len(shards)))
+
+        async def sweep_shard(shard: str) -> str:
+            async with semaphore:
+                return await self._report_async([shard], args.timeout_s, max_rate)
+
+        # Results are gathered in shard order, a failing shard cancels the remaining ones
+        async with asyncio.TaskGroup() as group:
+            tasks = [group.create_task(sweep_shard(shard)) for shard in shards]
+        results = [task.result() for task in tasks]
+
+        return NmapXml.merge(results, args=" ".join(self._nmap.command([args.ip_cidr], args.timeout_s)))
+
+    async def ping_sweep_compact(self, args: Arguments) -> NmapSweepResult:
+        """
+        Perform a ping sweep with the configured backend and collect the host records.
+        :param args: Arguments containing the CIDR IP address and timeout.
+        :return: The sweep result.
+        """
+        stats = NmapRunStats()
+        async with aclosing(self.ping_sweep_stream(args, stats)) as stream:
+            hosts = await self._collect(stream)
+        return NmapSweepResult(
+            args.ip_cidr, hosts, stats, discovery=self._discovery_record([args.ip_cidr], self._uses_nmap())
+        )
+
+    @staticmethod
+    async def _collect(stream: AsyncIterator[NmapHost]) -> list[NmapHost]:
+        """
+        Collect the host records of a sweep, passing each one to the partial results callback of the call.
+        """
+        on_host = tool_context.get().on_host
+        hosts = []
+        async for host in stream:
+            hosts.append(host)
+            if on_host is not None:
+                on_host(host)
+        return hosts
+
+    def _resolves(self, args: SweepArguments) -> bool:
+        """
+        Whether the names of the hosts up are resolved after the sweep: compact format only, as asked by the call
+        or by default when the resolver is enabled.
+        :raises ToolError: If the call asks for the names and the resolver is disabled.
+        """
+        if args.format != NmapSweepResult.FORMAT_COMPACT or args.resolve is False:
+            return False
+        if self.get_resolver() is None:
+            if args.resolve:
+                raise ToolError("Name resolution requires the dns section to be enabled in the configuration.")
+            return False
+        return True
+
+    async def _resolve_names(self, args: SweepArguments, hosts: list[NmapHost]) -> None:
+        """
+        Resolve the names of the hosts up with reverse DNS, in a single batch, and set them in the host records.
+        nmap does not resolve them itself, so that a sweep does not wait for the name servers when they are not
+        needed.
+        """
+        if not self._resolves(args):
+            return
+        addresses = [host.ip for host in hosts if host.state == "up" and host.hostname is None]
+        if not addresses:
+            return
+        names = await self.get_resolver().resolve(addresses)
+        for host in hosts:
+            if host.hostname is None:
+                host.hostname = names.get(host.ip)
+
+    def _incremental_delta(self, cidr: CIDRIPContainer) -> InventoryDelta:
+        """
+        Create the incremental sweep planner from the scan.incremental configuration section.
+        """
+        inventory = self.get_inventory()
+        if inventory is None:
+            raise ToolError("Incremental sweeps require the host inventory to be enabled in the configuration.")
+
+        scan = self.get_config().get_value("scan", ConfigData({}))
+        incremental = scan.get_value("incremental", ConfigData({}))
+        if cidr.is_ipv4():
+            block_prefix_length = incremental.get_value(
+                "block_prefix_length_v4", self.INCREMENTAL_BLOCK_PREFIX_LENGTH_V4)
+        else:
+            block_prefix_length = incremental.get_value(
+                "block_prefix_length_v6", self.INCREMENTAL_BLOCK_PREFIX_LENGTH_V6)
+        return InventoryDelta(
+            inventory,
+            freshness_s=incremental.get_value("freshness_s", self.INCREMENTAL_FRESHNESS_S),
+            empty_freshness_s=incremental.get_value("empty_freshness_s", self.INCREMENTAL_EMPTY_FRESHNESS_S),
+            block_prefix_length=block_prefix_length,
+        )
+
+    async def ping_sweep_incremental(self, args: Arguments) -> NmapSweepResult:
+        """
+        Perform an incremental ping sweep: only the blocks whose last scan is older than their freshness window
+        are probed, the other hosts keep the state recorded in the host inventory.
+        :param args: Arguments containing the CIDR IP address and timeout.
+        :return: The sweep result with the host changes and the merged current view.
+        """
+        cidr = CIDRIPContainer(args.ip_cidr)
+        network = cidr.get_network()
+        delta = self._incremental_delta(cidr)
+        inventory = self.get_inventory()
+
+        ts = time.time()
+        plan = await asyncio.to_thread(delta.plan, network, ts)
+        previous = await asyncio.to_thread(inventory.alive_at, network, ts)
+
+        stats = NmapRunStats()
+        hosts: list[NmapHost] = []
+        if plan.targets:
+            targets = [str(target) for target in plan.targets]
+            on_progress = tool_context.get().on_progress
+            async with aclosing(self._stream_shard(args, targets, stats, self._max_rate(), on_progress)) as stream:
+                hosts = await self._collect(stream)
+            await self._resolve_names(args, hosts)
+            await asyncio.to_thread(inventory.record_many, plan.targets, ts, hosts)
+
+        changes, current = delta.diff(plan, previous, hosts)
+        total = network.num_addresses
+        up = len(current)
+        return NmapSweepResult(
+            args.ip_cidr,
+            current,
+            NmapRunStats(up=up, down=total - up, total=total, elapsed_s=stats.elapsed_s),
+            changes=changes,
+            probed=plan.probed,
+            discovery=self._discovery_record(targets, self._uses_nmap()) if plan.targets else [],
+        )
+
+    async def _stream_shard(
+        self,
+        args: Arguments,
+        targets: list[str],
+        stats: NmapRunStats,
+        max_rate: int | None = None,
+        on_progress: Callable[[float], None] | None = None,
+    ) -> AsyncIterator[NmapHost]:
+        """
+        Scan networks with the configured backend and yield host records as they are found, with a run per host
+        discovery technique. When the networks need several runs, their host records are yielded once all runs
+        complete, in address order.
+        :param args: Arguments containing the CIDR IP address and timeout.
+        :param targets: The CIDRs to scan.
+        :param stats: Run statistics updated when the scan completes.
+        :param max_rate: Maximum number of packets sent per second, None for no limit.
+        :param on_progress: Called with the completed fraction of the scan, None if progress is not tracked.
+        :return: An asynchronous iterator over the host records.
+        """
+        runs = self._discovery(targets, self._uses_nmap())
+        if len(runs) == 1:
+            async with aclosing(self._stream_run(args, targets, runs[0][1], stats, max_rate, on_progress)) as hosts:
+                async for host in hosts:
+                    yield host
+            return
+
+        found = []
+        runs_progress = self._shards_progress([IPTargetSet(cidrs).num_addresses() for cidrs, _ in runs], on_progress)
+        for (cidrs, technique), run_progress in zip(runs, runs_progress):
+            async with aclosing(self._stream_run(args, cidrs, technique, stats, max_rate, run_progress)) as hosts:
+                found.extend([host async for host in hosts])
+        for host in sorted(found, key=self._host_order):
+            yield host
+
+    async def _stream_run(
+        self,
+        args: Arguments,
+        targets: list[str],
+        technique: str | None,
+        stats: NmapRunStats,
+        max_rate: int | None = None,
+        on_progress: Callable[[float], None] | None = None,
+    ) -> AsyncIterator[NmapHost]:
+        """
+        Scan networks with a single run of the configured backend and yield host records as they are found.
+        The run uses the timing learned from the previous scans of the networks, and its result updates it.
+        When cluster workers are registered the networks are scanned by a worker with nmap, and the host records
+        are yielded once its report is received.
+        :param args: Arguments containing the CIDR IP address and timeout.
+        :param targets: The CIDRs to scan.
+        :param technique: The host discovery technique, None for the backend default.
+        :param stats: Run statistics updated when the scan completes.
+        :param max_rate: Maximum number of packets sent per second, None for no limit.
+        :param on_progress: Called with the completed fraction of the scan, None if progress is not tracked.
+        :return: An asynchronous iterator over the host records.
+        """
+        timing = self._timing(targets)
+        found = []
+        cluster = self._cluster()
+        if cluster is not None:
+            report = await self._remote_report(cluster, targets, args.timeout_s, max_rate, timing, technique)
+            parser = NmapXmlStream(max_buffer_bytes=len(report) + 1)
+            found = parser.feed(report.encode()) + parser.close()
+            stats.add(parser.stats)
+            if on_progress is not None:
+                on_progress(1.0)
+            for host in found:
+                yield host
+        else:
+            sweep = self._scanner().sweep(targets, args.timeout_s, stats, max_rate, on_progress, timing, technique)
+            async with aclosing(sweep) as hosts:
+                async for host in hosts:
+                    found.append(host)
+                    yield host
+        if self.get_timing() is not None:
+            await asyncio.to_thread(self._learn, targets, found, timing)
+
+    @staticmethod
+    def _host_order(host: NmapHost) -> tuple[int, int]:
+        """
+        Sort key of the host records: IPv4 first, then by address.
+        """
+        address = ip_address(host.ip)
+        return address.version, int(address)
+
+    @staticmethod
+    def _shards_progress(
+        sizes: list[int], on_progress: Callable[[float], None] | None
+    ) -> list[Callable[[float], None] | None]:
+        """
+        Create the progress callbacks of the shards of a sweep, reporting the overall progress of the sweep,
+        each shard weighted by its number of addresses.
+        :param sizes: The number of addresses of each shard.
+        :param on_progress: Called with the completed fraction of the sweep, None if progress is not tracked.
+        :return: The progress callbacks of the shards, in shard order.
+        """
+        if on_progress is None:
+            return [None] * len(sizes)
+
+        total = sum(sizes)
+        done = [0.0] * len(sizes)
+        completed = 0.0
+
+        def shard_progress(index: int, fraction: float) -> None:
+            nonlocal completed
+            completed += (fraction - done[index]) * sizes[index] / total
+            done[index] = fraction
+            on_progress(min(completed, 1.0))
+
+        return [partial(shard_progress, index) for index in range(len(sizes))]
+
+    async def ping_sweep_stream(self, args: Arguments, stats: NmapRunStats) -> AsyncIterator[NmapHost]:
+        """
+        Perform a ping sweep with the configured backend and yield host records incrementally.
+        Shards are scanned concurrently and their hosts are yielded in address order.
+        :param args: Arguments containing the CIDR IP address and timeout.
+        :param stats: Run statistics updated when the sweep completes.
+        :return: An asynchronous iterator over the host records.
+        """
+        shards = self._shards(args)
+        on_progress = tool_context.get().on_progress
+        if len(shards) == 1:
+            async with aclosing(self._stream_shard(args, shards, stats, self._max_rate(), on_progress)) as hosts:
+                async for host in hosts:
+                    yield host
+            return
+
+        workers = self._workers()
+        semaphore = asyncio.Semaphore(workers)
+        max_rate = self._max_rate(min(workers, len(shards)))
+        shards_progress = self._shards_progress([ip_network(shard).num_addresses for shard in shards], on_progress)
+
+        async def sweep_shard(shard: str, shard_progress: Callable[[float], None] | None) -> list[NmapHost]:
+            async with semaphore:
+                async with aclosing(self._stream_shard(args, [shard], stats, max_rate, shard_progress)) as hosts:
+                    return [host async for host in hosts]
+
+        async with asyncio.TaskGroup() as group:
+            tasks = [
+                group.create_task(sweep_shard(shard, shard_progress))
+                for shard, shard_progress in zip(shards, shards_progress)
+            ]
+            for task in tasks:
+                for host in await task:
+                    yield host
+
+
+class ToolPingSweepBatch(ToolPingSweep):
+    """
+    Batch network host discovery class.
+    This class discovers the hosts of several networks at once: the networks are merged, the duplicate and
+    excluded addresses removed, and the remaining networks scanned concurrently in a single scheduled sweep.
+    """
+
+    # Dataclass for function arguments
+    class Arguments(SweepArguments):
+        """
+        Arguments for the batch ping sweep function.
+        """
+        ip_cidrs: list[str]
+        exclude: list[str] = []
+
+        @model_validator(mode="after")
+        def validate_targets(self) -> "ToolPingSweepBatch.Arguments":
+            """ Validate the CIDR IP addresses and exclusions """
+            _ = CIDRIPListContainer(self.ip_cidrs, self.exclude)
+            return self
+
+    def get_tool(self) -> MCPTool:
+        """
+        Returns the tool's metadata.
+        """
+        return MCPTool(
+            name=self.get_name(),
+            description="Perform a ping sweep of several networks at once using nmap. Overlapping and adjacent "
+                        "networks are merged, duplicate and excluded addresses are removed, the remaining "
+                        "networks are scanned concurrently and reported together.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "ip_cidrs": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "minItems": 1,
+                        "maxItems": CIDRIPListContainer.MAX_ITEMS,
+                        "description": "CIDR notations of the IP ranges to scan "
+                                       "(e.g., [\"192.168.0.0/24\", \"10.0.0.0/16\"])."
+                    },
+                    "exclude": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "CIDR notations or addresses to leave out of the scan (e.g., [\"10.0.0.1\"])."
+                    },
+                    "timeout_s": {
+                        "type": "integer",
+                        "description": "Timeout for each ping in seconds (e.g., 10). Default is 60 if not specified."
+                    },
+                    "format": {
+                        "type": "string",
+                        "enum": list(NmapSweepResult.FORMATS),
+                        "description": "Output format: 'compact' host table with a summary (default) "
+                                       "or 'xml' for the raw nmap XML report, without host names."
+                    },
+                    "resolve": {
+                        "type": "boolean",
+                        "description": "Resolve the names of the hosts up with reverse DNS after the sweep, "
+                                       "compact format only. Set to false for faster sweeps. "
+                                       "Defaults to the server configuration."
+                    },
+                    "priority": {
+                        "type": "integer",
+                        "minimum": ToolScheduler.MIN_PRIORITY,
+                        "maximum": ToolScheduler.MAX_PRIORITY,
+                        "description": "Scheduling priority when scans are queued, lower values start first. "
+                                       f"Default is {ToolScheduler.DEFAULT_PRIORITY}."
+                    },
+                },
+                "required": ["ip_cidrs", "timeout_s"],
+            }
+        )
+
+    def _get_arguments(self, arguments: dict) -> Arguments:
+        """
+        Validate the raw tool arguments.
+        """
+        return self.Arguments(
+            ip_cidrs=arguments.get("ip_cidrs"),
+            exclude=arguments.get("exclude") or [],
+            timeout_s=arguments.get("timeout_s"),
+            format=arguments.get("format") or NmapSweepResult.FORMAT_COMPACT,
+            resolve=arguments.get("resolve"),
+            priority=arguments.get("priority", ToolScheduler.DEFAULT_PRIORITY)
+        )
+
+    @staticmethod
+    def _targets(args: Arguments) -> CIDRIPListContainer:
+        """
+        Get the merged networks to scan.
+        """
+        return CIDRIPListContainer(args.ip_cidrs, args.exclude)
+
+    @staticmethod
+    def _describe(targets: CIDRIPListContainer) -> str:
+        """
+        Describe the scanned networks in the result, with the number of addresses removed from the request.
+        """
+        removed = []
+        if targets.num_duplicates():
+            removed.append(f"{targets.num_duplicates()} duplicate")
+        if targets.num_excluded():
+            removed.append(f"{targets.num_excluded()} excluded")
+        return f"{targets} ({', '.join(removed)} addresses removed)" if removed else str(targets)
+
+    def exec(self, arguments: dict) -> Any:
+        """
+        Invokes the tool with the provided arguments, with an nmap run per address family.
+        """
+        args = self._get_arguments(arguments)
+        targets = self._targets(args)
+
+        ts = time.time()
+        reports = [
+            self._report([str(network) for network in family.to_networks()], args.timeout_s)
+            for family in self._families(targets.get_target_set())
+        ]
+        result = self._parse_batch_xml(args, targets, reports)
+        self._record_batch(targets, ts, result)
+        return result
+
+    async def exec_async(self, arguments: dict) -> Any:
+        """
+        Invokes the tool with the provided arguments without blocking the event loop.
+        """
+        args = self._get_arguments(arguments)
+        targets = self._targets(args)
+
+        ts = time.time()
+        if args.format == NmapSweepResult.FORMAT_XML:
+            result = self._parse_batch_xml(args, targets, await self.ping_sweep_batch_xml(args, targets))
+        else:
+            result = await self.ping_sweep_batch(args, targets)
+            await self._resolve_names(args, result.hosts)
+        await asyncio.to_thread(self._record_batch, targets, ts, result)
+        return result
+
+    def _parse_batch_xml(self, args: Arguments, targets: CIDRIPListContainer, reports: list[str]) -> NmapSweepResult:
+        """
+        Build the sweep result from the nmap XML reports of the runs of a batch.
+        """
+        xml = NmapXml.merge(reports, args=" ".join(self._nmap.command(targets.get_value(), args.timeout_s)))
+        parser = NmapXmlStream(max_buffer_bytes=len(xml) + 1)
+        hosts = parser.feed(xml.encode()) + parser.close()
+        return NmapSweepResult(
+            self._describe(targets), hosts, parser.stats, xml if args.format == NmapSweepResult.FORMAT_XML else None,
+            discovery=self._discovery_record(targets.get_value()),
+        )
+
+    def _record_batch(self, targets: CIDRIPListContainer, ts: float, result: NmapSweepResult) -> None:
+        """
+        Record the sweep result in the host inventory, if enabled.
+        """
+        inventory = self.get_inventory()
+        if inventory is not None:
+            inventory.record_many(targets.get_networks(), ts, result.hosts)
+
+    def cache_key(self, arguments: dict) -> Hashable | None:
+        """
+        Get the normalized arguments used as results cache key: merged networks, timeout, format and name
+        resolution.
+        """
+        args = self._get_arguments(arguments)
+        return (tuple(self._targets(args).get_value()), args.timeout_s, args.format, self._resolves(args))
+
+    def cache_subsume(self, key: Hashable, cached_key: Hashable, cached_value: Any) -> Any | None:
+        """
+        Batch results are only reused for the same networks.
+        """
+        return None
+
+    def partial_result(self, arguments: dict, hosts: list[NmapHost], elapsed_s: float) -> Any:
+        """
+        Build the result of a batch sweep still running, or cancelled, from the hosts found so far.
+        """
+        targets = self._targets(self._get_arguments(arguments))
+        return NmapSweepResult(self._describe(targets), list(hosts), NmapRunStats(elapsed_s=elapsed_s), partial=True)
+
+    @staticmethod
+    def _families(targets: IPTargetSet) -> list[IPTargetSet]:
+        """
+        Split the addresses by address family, a scanner run only handles one family.
+        """
+        families = [targets.family(version) for version in IPTargetSet.VERSIONS]
+        return [family for family in families if family]
+
+    @classmethod
+    def _groups(cls, targets: IPTargetSet, workers: int) -> list[list[IPv4Network | IPv6Network]]:
+        """
+        Split the addresses of a batch between scanner runs of the same number of addresses, at most a run per
+        worker and address family. The address intervals are cut, so that a large network is shared between
+        runs rather than scanned by a single one.
+        :return: The networks of each run, in address order.
+        """
+        return [
+            chunk.to_networks()
+            for family in cls._families(targets)
+            for chunk in family.split(workers)
+        ]
+
+    async def ping_sweep_batch_xml(self, args: Arguments, targets: CIDRIPListContainer) -> list[str]:
+        """
+        Perform a ping sweep of the networks of a batch using a bounded pool of nmap workers.
+        :return: The nmap XML reports of the runs.
+        """
+        workers = self._workers()
+        groups = self._groups(targets.get_target_set(), workers)
+        semaphore = asyncio.Semaphore(workers)
+        max_rate = self._max_rate(min(workers, len(groups)))
+
+        async def sweep_group(group: list[IPv4Network | IPv6Network]) -> str:
+            async with semaphore:
+                return await self._report_async([str(network) for network in group], args.timeout_s, max_rate)
+
+        async with asyncio.TaskGroup() as group_tasks:
+            tasks = [group_tasks.create_task(sweep_group(group)) for group in groups]
+        return [task.result() for task in tasks]
+
+    async def ping_sweep_batch(self, args: Arguments, targets: CIDRIPListContainer) -> NmapSweepResult:
+        """
+        Perform a ping sweep of the networks of a batch with the configured backend, using a bounded pool of
+        scanner runs, and collect the host records.
+        :return: The combined sweep result, hosts in address order.
+        """
+        workers = self._workers()
+        groups = self._groups(targets.get_target_set(), workers)
+        semaphore = asyncio.Semaphore(workers)
+        max_rate = self._max_rate(min(workers, len(groups)))
+        groups_progress = self._shards_progress(
+            [sum(network.num_addresses for network in group) for group in groups], tool_context.get().on_progress
+        )
+        stats = NmapRunStats()
+
+        async def sweep_group(
+            group: list[IPv4Network | IPv6Network], group_progress: Callable[[float], None] | None
+        ) -> list[NmapHost]:
+            async with semaphore:
+                cidrs = [str(network) for network in group]
+                async with aclosing(self._stream_shard(args, cidrs, stats, max_rate, group_progress)) as stream:
+                    return await self._collect(stream)
+
+        async with asyncio.TaskGroup() as group_tasks:
+            tasks = [
+                group_tasks.create_task(sweep_group(group, group_progress))
+                for group, group_progress in zip(groups, groups_progress)
+            ]
+        hosts = sorted((host for task in tasks for host in task.result()), key=self._host_order)
+        discovery = self._discovery_record(targets.get_value(), self._uses_nmap())
+        return NmapSweepResult(self._describe(targets), hosts, stats, discovery=discovery)
@@ -0,0 +1,173 @@
+import time
+from datetime import datetime, timezone
+from typing import Any
+from pydantic import BaseModel, field_validator
+
+from utils import CIDRIPContainer
+from utils import HostObservation
+from tools.tool import Tool, ToolError
+
+from mcp.types import Tool as MCPTool
+
+
+class ToolHostInventory(Tool):
+    """
+    Host inventory query class.
+    This class answers questions about past scans from the host inventory, without scanning the network.
+    """
+
+    # Supported queries
+    QUERY_ALIVE_AT = "alive_at"
+    QUERY_LAST_SEEN = "last_seen"
+    QUERIES = (QUERY_ALIVE_AT, QUERY_LAST_SEEN)
+
+    # Columns of the result table
+    COLUMNS = ("ip", "state", "seen_at", "latency_ms", "mac", "vendor", "hostname")
+
+    # Dataclass for function arguments
+    class Arguments(BaseModel):
+        """
+        Arguments for the host inventory query function.
+        """
+        query: str
+        ip_cidr: str
+        at: str | None = None
+
+        @field_validator("query")
+        def validate_query(cls, value: str) -> str:
+            """ Validate the query name """
+            if value not in ToolHostInventory.QUERIES:
+                raise ValueError(f"Invalid query: {value}, expected one of {', '.join(ToolHostInventory.QUERIES)}")
+            return value
+
+        @field_validator("ip_cidr")
+        def validate_ip_cidr(cls, value: str) -> str:
+            """ Validate the CIDR IP address """
+            _ = CIDRIPContainer(value)
+            return value
+
+        @field_validator("at")
+        def validate_at(cls, value: str | None) -> str | None:
+            """ Validate the query time """
+            if value is not None:
+                _ = ToolHostInventory.parse_time(value)
+            return value
+
+    def __init__(self):
+        """
+        Initialize the ToolHostInventory class.
+        """
+        super().__init__()
+
+    @staticmethod
+    def parse_time(value: str) -> float:
+        """
+        Parse a time given as an ISO 8601 date or as a POSIX timestamp, naive dates are UTC.
+        :param value: The time.
+        :return: The POSIX timestamp.
+        """
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        try:
+            at = datetime.fromisoformat(value)
+        except ValueError as e:
+            raise ValueError(f"Invalid time: {value}, expected an ISO 8601 date or a POSIX timestamp") from e
+        if at.tzinfo is None:
+            at = at.replace(tzinfo=timezone.utc)
+        return at.timestamp()
+
+    @staticmethod
+    def format_time(ts: float) -> str:
+        """
+        Format a POSIX timestamp as an ISO 8601 UTC date.
+        """
+        return datetime.fromtimestamp(ts, timezone.utc).isoformat(timespec="seconds")
+
+    def get_tool(self) -> MCPTool:
+        """
+        Returns the tool's metadata.
+        """
+        return MCPTool(
+            name=self.get_name(),
+            description="Query the inventory of hosts recorded by previous ping sweeps, without scanning. "
+                        "'alive_at' lists the hosts up in a network at a given time, "
+                        "'last_seen' lists when each host of a network was last seen up.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "query": {
+                        "type": "string",
+                        "enum": list(self.QUERIES),
+                        "description": "The query to run: 'alive_at' or 'last_seen'."
+                    },
+                    "ip_cidr": {
+                        "type": "string",
+                        "description": "CIDR notation of the IP range to query (e.g., 192.168.0.0/24)."
+                    },
+                    "at": {
+                        "type": "string",
+                        "description": "Query time as an ISO 8601 date (UTC if no offset) or a POSIX timestamp. "
+                                       "Default is now."
+                    },
+                },
+                "required": ["query", "ip_cidr"],
+            }
+        )
+
+    def get_name(self) -> str:
+        """
+        Get the tool's name.
+        """
+        return self.__class__.__name__
+
+    def exec(self, arguments: dict) -> Any:
+        """
+        Invokes the tool with the provided arguments.
+        """
+        # Create an instance of the Arguments dataclass
+        args = self.Arguments(
+            query=arguments.get("query"),
+            ip_cidr=arguments.get("ip_cidr"),
+            at=arguments.get("at")
+        )
+
+        # Call the query method with the arguments
+        return self.query(args)
+
+    def query(self, args: Arguments) -> str:
+        """
+        Query the host inventory.
+        :param args: Arguments containing the query, CIDR IP address and time.
+        :return: A tab separated table of the matching hosts followed by a summary line.
+        """
+        inventory = self.get_inventory()
+        if inventory is None:
+            raise ToolError("The host inventory is not enabled in the configuration.")
+
+        network = CIDRIPContainer(args.ip_cidr).get_network()
+        ts = self.parse_time(args.at) if args.at is not None else time.time()
+
+        start = time.perf_counter()
+        if args.query == self.QUERY_ALIVE_AT:
+            observations = inventory.alive_at(network, ts)
+        else:
+            observations = inventory.last_seen(network, ts)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        lines = [f"# {args.query} {network} at {self.format_time(ts)}", "\t".join(self.COLUMNS)]
+        lines.extend(self._row(observation) for observation in observations)
+        lines.append(f"# summary: {len(observations)} hosts, query {elapsed_ms:.2f}ms")
+        return "\n".join(lines)
+
+    def _row(self, observation: HostObservation) -> str:
+        """
+        Render an observation as a row of the result table.
+        """
+        latency = f"{observation.latency_ms:g}" if observation.latency_ms is not None else None
+        values = (
+            observation.ip, observation.state, self.format_time(observation.ts), latency,
+            observation.mac, observation.vendor, observation.hostname,
+        )
+        return "\t".join(value if value else "-" for value in values)
@@ -0,0 +1,254 @@
+import asyncio
+from typing import Any
+from pydantic import BaseModel
+
+from tools.tool import Tool, ToolError
+from tools.tool_context import tool_context
+from tools.tool_jobs import ToolJob
+
+from mcp.types import Tool as MCPTool
+
+
+def _job_id_schema() -> dict:
+    """
+    Input schema of the tools taking a job identifier.
+    """
+    return {
+        "type": "object",
+        "properties": {
+            "job_id": {
+                "type": "string",
+                "description": "Identifier of the job returned by ToolJobSubmit."
+            },
+        },
+        "required": ["job_id"],
+    }
+
+
+def _render_status(job: ToolJob) -> str:
+    """
+    Render the status of a job as 'name: value' lines.
+    """
+    return "\n".join(f"{name}: {value}" for name, value in job.get_status().items())
+
+
+class ToolJobSubmit(Tool):
+    """
+    Background job submission class.
+    This class starts a scan in the background and returns its job identifier immediately.
+    """
+
+    # Dataclass for function arguments
+    class Arguments(BaseModel):
+        """
+        Arguments for the job submission function.
+        """
+        tool: str = "ToolPingSweep"
+        arguments: dict
+
+    def __init__(self):
+        """
+        Initialize the ToolJobSubmit class.
+        """
+        super().__init__()
+
+    def get_tool(self) -> MCPTool:
+        """
+        Returns the tool's metadata.
+        """
+        return MCPTool(
+            name=self.get_name(),
+            description="Start a scan in the background and return its job identifier. "
+                        "Use ToolJobStatus to poll the job, ToolJobResult to fetch the results found so far "
+                        "or the final result, and ToolJobCancel to stop it.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "tool": {
+                        "type": "string",
+                        "description": "Name of the scan tool to run (e.g., ToolPingSweep). Default is ToolPingSweep."
+                    },
+                    "arguments": {
+                        "type": "object",
+                        "description": "Arguments of the scan tool "
+                                       "(e.g., {\"ip_cidr\": \"10.0.0.0/16\", \"timeout_s\": 10})."
+                    },
+                },
+                "required": ["arguments"],
+            }
+        )
+
+    def get_name(self) -> str:
+        """
+        Get the tool's name.
+        """
+        return self.__class__.__name__
+
+    def exec(self, arguments: dict) -> Any:
+        """
+        Invokes the tool with the provided arguments.
+        """
+        raise ToolError("Background jobs are only supported by the asynchronous execution path.")
+
+    async def exec_async(self, arguments: dict) -> Any:
+        """
+        Invokes the tool with the provided arguments on the server event loop.
+        """
+        # Create an instance of the Arguments dataclass
+        args = self.Arguments(
+            tool=arguments.get("tool") or "ToolPingSweep",
+            arguments=arguments.get("arguments")
+        )
+
+        # Check the call before starting the job, so that errors are reported to the submitter
+        tool = Tool._get_tool(args.tool)
+        if not tool.SCHEDULED:
+            raise ToolError(f"Tool '{args.tool}' does not run scans and cannot be submitted as a job.")
+        tool.validate_arguments(args.arguments)
+
+        caller = tool_context.get().caller
+        job = self.get_jobs().submit(
+            args.tool, args.arguments, caller,
+            lambda: Tool.exec_tool_async(args.tool, args.arguments, caller=caller),
+        )
+        return _render_status(job)
+
+
+class ToolJobStatus(Tool):
+    """
+    Background job polling class.
+    This class reports the state and progress of a background job.
+    """
+
+    def __init__(self):
+        """
+        Initialize the ToolJobStatus class.
+        """
+        super().__init__()
+
+    def get_tool(self) -> MCPTool:
+        """
+        Returns the tool's metadata.
+        """
+        return MCPTool(
+            name=self.get_name(),
+            description="Get the state (running, done, failed or cancelled) of a background job, its elapsed time "
+                        "and the number of hosts found so far.",
+            inputSchema=_job_id_schema(),
+        )
+
+    def get_name(self) -> str:
+        """
+        Get the tool's name.
+        """
+        return self.__class__.__name__
+
+    def exec(self, arguments: dict) -> Any:
+        """
+        Invokes the tool with the provided arguments.
+        """
+        return _render_status(self.get_jobs().get(arguments.get("job_id")))
+
+    async def exec_async(self, arguments: dict) -> Any:
+        """
+        Invokes the tool on the server event loop, which owns the jobs.
+        """
+        return self.exec(arguments)
+
+
+class ToolJobResult(Tool):
+    """
+    Background job results class.
+    This class returns the final result of a background job, or the hosts found so far while it runs.
+    """
+
+    def __init__(self):
+        """
+        Initialize the ToolJobResult class.
+        """
+        super().__init__()
+
+    def get_tool(self) -> MCPTool:
+        """
+        Returns the tool's metadata.
+        """
+        return MCPTool(
+            name=self.get_name(),
+            description="Fetch the result of a background job. While the job runs, or if it was cancelled, "
+                        "return the hosts found so far.",
+            inputSchema=_job_id_schema(),
+        )
+
+    def get_name(self) -> str:
+        """
+        Get the tool's name.
+        """
+        return self.__class__.__name__
+
+    def exec(self, arguments: dict) -> Any:
+        """
+        Invokes the tool with the provided arguments.
+        """
+        job = self.get_jobs().get(arguments.get("job_id"))
+        match job.state:
+            case ToolJob.STATE_DONE:
+                return job.result
+            case ToolJob.STATE_FAILED:
+                raise ToolError(f"Job {job.job_id} failed: {job.error}")
+            case _:
+                # Rendered by the tool that ran, e.g. a ping sweep table or the open ports of a port scan
+                partial = Tool._get_tool(job.tool_name).partial_result(job.arguments, job.hosts, job.elapsed_s)
+                header = f"# job {job.job_id} {job.state}"
+                return header if partial is None else f"{header}\n{partial}"
+
+    async def exec_async(self, arguments: dict) -> Any:
+        """
+        Invokes the tool on the server event loop, which owns the jobs.
+        """
+        return self.exec(arguments)
+
+
+class ToolJobCancel(Tool):
+    """
+    Background job cancellation class.
+    This class stops a running background job, the hosts found so far remain available.
+    """
+
+    def __init__(self):
+        """
+        Initialize the ToolJobCancel class.
+        """
+        super().__init__()
+
+    def get_tool(self) -> MCPTool:
+        """
+        Returns the tool's metadata.
+        """
+        return MCPTool(
+            name=self.get_name(),
+            description="Cancel a running background job. The hosts found so far can still be fetched "
+                        "with ToolJobResult.",
+            inputSchema=_job_id_schema(),
+        )
+
+    def get_name(self) -> str:
+        """
+        Get the tool's name.
+        """
+        return self.__class__.__name__
+
+    def exec(self, arguments: dict) -> Any:
+        """
+        Invokes the tool with the provided arguments.
+        """
+        raise ToolError("Background jobs are only supported by the asynchronous execution path.")
+
+    async def exec_async(self, arguments: dict) -> Any:
+        """
+        Invokes the tool on the server event loop, which owns the jobs.
+        """
+        job = self.get_jobs().cancel(arguments.get("job_id"))
+        # Let the job task handle the cancellation before reporting its state
+        if job.task is not None:
+            await asyncio.wait([job.task])
+        return _render_status(job)
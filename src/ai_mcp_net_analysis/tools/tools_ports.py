@@ -0,0 +1,383 @@
+import asyncio
+import math
+import time
+from contextlib import aclosing
+from dataclasses import replace
+from itertools import product
+from typing import Any, Callable, Hashable
+from pydantic import field_validator, model_validator
+
+from utils import ConfigData
+from utils import NmapHost, NmapRunStats, NmapServices, NmapXmlError
+from utils import NmapPortScanResult, NmapPortScanStats
+from utils import NmapPortScanner, ScannerError
+from utils import CIDRIPListContainer, IPTargetSet, PortListContainer
+from utils import MetricsRegistry
+from tools.tool import ToolError
+from tools.tool_context import tool_context
+from tools.tool_scheduler import ToolScheduler
+from tools.tools_discovery import ToolPingSweepBatch
+
+from mcp.types import Tool as MCPTool
+
+
+class ToolPortScan(ToolPingSweepBatch):
+    """
+    TCP port scan class.
+    This class finds the open ports of the hosts of several networks. The hosts up are found first, by a ping sweep
+    or from the host inventory, so that dead addresses are never probed. The hosts and the ports are then split
+    into tasks, each scanned by an nmap run of a bounded pool, and the open ports merged into a table per host.
+    """
+
+    # Port scan defaults, overridden by the scan.port_scan configuration section
+    PORT_SCAN_WORKERS = 8
+    PORT_SCAN_HOSTS_PER_TASK = 32
+    PORT_SCAN_PORTS_PER_TASK = 1024
+
+    # Default number of most frequently open ports scanned when no port is given
+    DEFAULT_TOP_PORTS = 100
+
+    # How the hosts to scan are found: ping sweep of the networks, hosts up in the host inventory, or all the
+    # addresses of the networks
+    DISCOVERY_SWEEP = "sweep"
+    DISCOVERY_INVENTORY = "inventory"
+    DISCOVERY_NONE = "none"
+    DISCOVERY_MODES = (DISCOVERY_SWEEP, DISCOVERY_INVENTORY, DISCOVERY_NONE)
+
+    # Fraction of the progress of a scan reported by its ping sweep
+    SWEEP_PROGRESS_SHARE = 0.2
+
+    # Dataclass for function arguments
+    class Arguments(ToolPingSweepBatch.Arguments):
+        """
+        Arguments for the port scan function.
+        """
+        ports: str | None = None
+        top_ports: int | None = None
+        discovery: str = "sweep"
+
+        @field_validator("ports")
+        def validate_ports(cls, value: str | None) -> str | None:
+            """ Validate the port specification """
+            if value is not None:
+                _ = PortListContainer(value)
+            return value
+
+        @field_validator("top_ports")
+        def validate_top_ports(cls, value: int | None) -> int | None:
+            """ Validate the number of top ports """
+            if value is not None and not 1 <= value <= PortListContainer.MAX_PORT:
+                raise ValueError(f"Invalid number of top ports: {value}, expected 1 to {PortListContainer.MAX_PORT}")
+            return value
+
+        @field_validator("discovery")
+        def validate_discovery(cls, value: str) -> str:
+            """ Validate the host discovery mode """
+            if value not in ToolPortScan.DISCOVERY_MODES:
+                raise ValueError(
+                    f"Invalid discovery: {value}, expected one of {', '.join(ToolPortScan.DISCOVERY_MODES)}")
+            return value
+
+        @model_validator(mode="after")
+        def validate_port_selection(self) -> "ToolPortScan.Arguments":
+            """ Validate that the ports are given once """
+            if self.ports is not None and self.top_ports is not None:
+                raise ValueError("Only one of ports and top_ports may be given")
+            return self
+
+    def get_tool(self) -> MCPTool:
+        """
+        Returns the tool's metadata.
+        """
+        return MCPTool(
+            name=self.get_name(),
+            description="Find the open TCP ports of the hosts of several networks using nmap. The hosts up are "
+                        "found first so that dead addresses are not probed, then hosts and ports are split into "
+                        "tasks scanned concurrently, and the open ports are reported in a table per host.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "ip_cidrs": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "minItems": 1,
+                        "maxItems": CIDRIPListContainer.MAX_ITEMS,
+                        "description": "CIDR notations of the IP ranges to scan "
+                                       "(e.g., [\"192.168.0.0/24\", \"10.0.0.5\"])."
+                    },
+                    "exclude": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "CIDR notations or addresses to leave out of the scan (e.g., [\"10.0.0.1\"])."
+                    },
+                    "ports": {
+                        "type": "string",
+                        "description": "Ports to scan in nmap notation (e.g., \"22,80,443,8000-8100\"). "
+                                       "Mutually exclusive with top_ports."
+                    },
+                    "top_ports": {
+                        "type": "integer",
+                        "minimum": 1,
+                        "maximum": PortListContainer.MAX_PORT,
+                        "description": "Scan the N most frequently open ports. "
+                                       f"Default is {self.DEFAULT_TOP_PORTS} if no ports are given."
+                    },
+                    "discovery": {
+                        "type": "string",
+                        "enum": list(self.DISCOVERY_MODES),
+                        "description": "How the hosts to scan are found: 'sweep' runs a ping sweep first "
+                                       "(default), 'inventory' uses the hosts up in the host inventory, 'none' "
+                                       "scans every address."
+                    },
+                    "timeout_s": {
+                        "type": "integer",
+                        "description": "Timeout for each host in seconds (e.g., 60)."
+                    },
+                    "priority": {
+                        "type": "integer",
+                        "minimum": ToolScheduler.MIN_PRIORITY,
+                        "maximum": ToolScheduler.MAX_PRIORITY,
+                        "description": "Scheduling priority when scans are queued, lower values start first. "
+                                       f"Default is {ToolScheduler.DEFAULT_PRIORITY}."
+                    },
+                },
+                "required": ["ip_cidrs", "timeout_s"],
+            }
+        )
+
+    def _get_arguments(self, arguments: dict) -> Arguments:
+        """
+        Validate the raw tool arguments.
+        """
+        return self.Arguments(
+            ip_cidrs=arguments.get("ip_cidrs"),
+            exclude=arguments.get("exclude") or [],
+            ports=arguments.get("ports"),
+            top_ports=arguments.get("top_ports"),
+            discovery=arguments.get("discovery") or self.DISCOVERY_SWEEP,
+            timeout_s=arguments.get("timeout_s"),
+            priority=arguments.get("priority", ToolScheduler.DEFAULT_PRIORITY)
+        )
+
+    def exec(self, arguments: dict) -> Any:
+        """
+        Port scans run their tasks concurrently and are only executed asynchronously.
+        """
+        raise ToolError("Port scans are only supported by the asynchronous execution path.")
+
+    async def exec_async(self, arguments: dict) -> Any:
+        """
+        Invokes the tool with the provided arguments without blocking the event loop.
+        """
+        args = self._get_arguments(arguments)
+        return await self.port_scan(args, self._targets(args), self._ports(args))
+
+    def _ports(self, args: Arguments) -> PortListContainer:
+        """
+        Get the ports to scan, the given ones or the most frequently open ones.
+        """
+        if args.ports is not None:
+            return PortListContainer(args.ports)
+        try:
+            return PortListContainer(NmapServices.top_ports(args.top_ports or self.DEFAULT_TOP_PORTS))
+        except NmapXmlError as e:
+            raise ToolError(str(e)) from e
+
+    def _describe_ports(self, args: Arguments) -> str:
+        """
+        Describe the scanned ports in the result.
+        """
+        if args.ports is not None:
+            return PortListContainer(args.ports).get_value()
+        return f"top {args.top_ports or self.DEFAULT_TOP_PORTS}"
+
+    def cache_key(self, arguments: dict) -> Hashable | None:
+        """
+        Get the normalized arguments used as results cache key: merged networks, ports, discovery and timeout.
+        """
+        args = self._get_arguments(arguments)
+        ports = args.ports if args.ports is None else PortListContainer(args.ports).get_value()
+        return (tuple(self._targets(args).get_value()), ports, args.top_ports, args.discovery, args.timeout_s)
+
+    def partial_result(self, arguments: dict, hosts: list[NmapHost], elapsed_s: float) -> Any:
+        """
+        Build the result of a port scan still running, or cancelled, from the open ports found so far, the records
+        of a host scanned by several tasks merged.
+        """
+        args = self._get_arguments(arguments)
+        return NmapPortScanResult(
+            self._describe(self._targets(args)), self._describe_ports(args), self._merge(hosts),
+            NmapPortScanStats(elapsed_s=elapsed_s), partial=True,
+        )
+
+    def _port_scan_config(self) -> ConfigData:
+        """
+        Get the port scan configuration section.
+        """
+        scan = self.get_config().get_value("scan", ConfigData({}))
+        return scan.get_value("port_scan", ConfigData({}))
+
+    def _port_scanner(self) -> NmapPortScanner:
+        """
+        Get the port scanner with the configured technique.
+        """
+        technique = self._port_scan_config().get_value("technique", NmapPortScanner.TECHNIQUE_AUTO)
+        try:
+            return NmapPortScanner(technique)
+        except ScannerError as e:
+            raise ToolError(str(e)) from e
+
+    async def _live_hosts(
+        self, args: Arguments, targets: CIDRIPListContainer, on_progress: Callable[[float], None] | None
+    ) -> IPTargetSet:
+        """
+        Get the addresses to scan for open ports, according to the discovery mode.
+        :param args: Arguments containing the discovery mode and timeout.
+        :param targets: The merged networks to scan.
+        :param on_progress: Called with the completed fraction of the ping sweep, None if progress is not tracked.
+        :return: The addresses of the hosts up, or all the addresses if discovery is disabled.
+        """
+        target_set = targets.get_target_set()
+        if args.discovery == self.DISCOVERY_NONE:
+            return target_set
+
+        ts = time.time()
+        if args.discovery == self.DISCOVERY_INVENTORY:
+            inventory = self.get_inventory()
+            if inventory is None:
+                raise ToolError("Inventory discovery requires the host inventory to be enabled in the configuration.")
+            observations = await asyncio.to_thread(
+                lambda: [host.ip for network in targets.get_networks() for host in inventory.alive_at(network, ts)]
+            )
+            return IPTargetSet(observations) & target_set
+
+        # The sweep hosts are not partial results of the port scan, and the sweep reports its share of the progress
+        context = tool_context.get()
+        token = tool_context.set(replace(context, on_host=None, on_progress=on_progress))
+        try:
+            result = await self.ping_sweep_batch(args, targets)
+        finally:
+            tool_context.reset(token)
+        await asyncio.to_thread(self._record_batch, targets, ts, result)
+        return IPTargetSet(host.ip for host in result.hosts if host.state == "up") & target_set
+
+    def _tasks(self, hosts: IPTargetSet, ports: PortListContainer) -> list[tuple[IPTargetSet, PortListContainer]]:
+        """
+        Split a port scan into tasks: the hosts are split into groups of at most hosts_per_task addresses, of the
+        same address family, the ports into ranges of at most ports_per_task ports, and each task scans a host
+        group on a port range.
+        :return: The host group and port range of each task, in address then port order.
+        """
+        config = self._port_scan_config()
+        hosts_per_task = config.get_value("hosts_per_task", self.PORT_SCAN_HOSTS_PER_TASK)
+        ports_per_task = config.get_value("ports_per_task", self.PORT_SCAN_PORTS_PER_TASK)
+        host_groups = [
+            group
+            for family in self._families(hosts)
+            for group in family.split(math.ceil(family.num_addresses() / hosts_per_task))
+        ]
+        port_ranges = ports.split(math.ceil(ports.num_ports() / ports_per_task))
+        return list(product(host_groups, port_ranges))
+
+    @staticmethod
+    def _part_progress(
+        on_progress: Callable[[float], None], start: float, share: float
+    ) -> Callable[[float], None]:
+        """
+        Create the progress callback of a part of a scan, reporting the overall progress of the scan.
+        :param on_progress: Called with the completed fraction of the scan.
+        :param start: The completed fraction of the scan when the part starts.
+        :param share: The fraction of the scan taken by the part.
+        :return: The progress callback of the part.
+        """
+        def part_progress(fraction: float) -> None:
+            on_progress(start + fraction * share)
+
+        return part_progress
+
+    @staticmethod
+    def _merge(found: list[NmapHost]) -> list[NmapHost]:
+        """
+        Merge the host records of the tasks of a scan, a host scanned by several tasks gets the open ports of all.
+        :return: A record per host with its open ports in port order, hosts in address order.
+        """
+        merged: dict[str, NmapHost] = {}
+        for host in found:
+            previous = merged.get(host.ip)
+            merged[host.ip] = host if previous is None else replace(previous, ports=previous.ports + host.ports)
+        hosts = [
+            replace(host, ports=tuple(sorted(host.ports, key=lambda port: (port.protocol, port.port))))
+            for host in merged.values()
+        ]
+        return sorted(hosts, key=ToolPortScan._host_order)
+
+    async def port_scan(
+        self, args: Arguments, targets: CIDRIPListContainer, ports: PortListContainer
+    ) -> NmapPortScanResult:
+        """
+        Scan the open ports of the hosts up of the networks, using a bounded pool of nmap runs.
+        :param args: Arguments containing the discovery mode and timeout.
+        :param targets: The merged networks to scan.
+        :param ports: The ports to scan.
+        :return: The open ports of each host.
+        """
+        start = time.perf_counter()
+        on_progress = tool_context.get().on_progress
+        if on_progress is not None and args.discovery == self.DISCOVERY_SWEEP:
+            share = self.SWEEP_PROGRESS_SHARE
+            sweep_progress = self._part_progress(on_progress, 0.0, share)
+            scan_progress = self._part_progress(on_progress, share, 1 - share)
+        else:
+            sweep_progress = scan_progress = on_progress
+
+        live = await self._live_hosts(args, targets, sweep_progress)
+        tasks = self._tasks(live, ports)
+
+        workers = self._port_scan_config().get_value("workers", self.PORT_SCAN_WORKERS)
+        semaphore = asyncio.Semaphore(workers)
+        max_rate = self._max_rate(min(workers, len(tasks)))
+        tasks_progress = self._shards_progress(
+            [hosts.num_addresses() * task_ports.num_ports() for hosts, task_ports in tasks], scan_progress
+        )
+        scanner = self._port_scanner()
+        stats = NmapRunStats()
+
+        async def scan_task(
+            hosts: IPTargetSet, task_ports: PortListContainer, task_progress: Callable[[float], None] | None
+        ) -> list[NmapHost]:
+            async with semaphore:
+                cidrs = [str(network) for network in hosts.to_networks()]
+                scan = scanner.scan(
+                    cidrs, task_ports.get_value(), args.timeout_s, stats, max_rate, task_progress, self._timing(cidrs)
+                )
+                async with aclosing(scan) as stream:
+                    return await self._collect(stream)
+
+        async with asyncio.TaskGroup() as group:
+            running = [
+                group.create_task(scan_task(hosts, task_ports, task_progress))
+                for (hosts, task_ports), task_progress in zip(tasks, tasks_progress)
+            ]
+        hosts = self._merge([host for task in running for host in task.result()])
+
+        scanned = live.num_addresses()
+        probes = scanned * ports.num_ports()
+        metrics = MetricsRegistry.get_registry()
+        metrics.inc("port_scan_tasks_total", len(tasks))
+        metrics.inc("port_scan_probes_total", probes)
+        if on_progress is not None and not tasks:
+            on_progress(1.0)
+
+        return NmapPortScanResult(
+            self._describe(targets),
+            self._describe_ports(args),
+            hosts,
+            NmapPortScanStats(
+                scanned=scanned,
+                skipped=targets.num_addresses() - scanned,
+                ports=ports.num_ports(),
+                tasks=len(tasks),
+                probes=probes,
+                elapsed_s=time.perf_counter() - start,
+            ),
+        )
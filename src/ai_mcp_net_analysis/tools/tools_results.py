@@ -0,0 +1,163 @@
+from typing import Any
+from pydantic import BaseModel, field_validator, model_validator
+
+from utils import CIDRIPContainer
+from tools.tool import Tool, ToolError
+from tools.tool_results import ToolResultError, ToolResultFilter, ToolResultStore
+
+from mcp.types import Tool as MCPTool
+
+
+class ToolResultPage(Tool):
+    """
+    Paginated results class.
+    This class reads the pages of the large results kept by the results store: the next page of a cursor, or a
+    page of a view filtered by host state, network or open port.
+    """
+
+    # Host states accepted by the state filter
+    STATES = ("up", "down")
+
+    # Dataclass for function arguments
+    class Arguments(BaseModel):
+        """
+        Arguments for the result page function.
+        """
+        cursor: str | None = None
+        handle: str | None = None
+        offset: int = 0
+        limit: int | None = None
+        state: str | None = None
+        ip_cidr: str | None = None
+        port: int | None = None
+
+        @field_validator("offset")
+        def validate_offset(cls, value: int) -> int:
+            """ Validate the row offset """
+            if value < 0:
+                raise ValueError(f"Invalid offset: {value}, expected 0 or more")
+            return value
+
+        @field_validator("limit")
+        def validate_limit(cls, value: int | None) -> int | None:
+            """ Validate the number of rows """
+            if value is not None and not 1 <= value <= ToolResultStore.MAX_PAGE_SIZE:
+                raise ValueError(f"Invalid limit: {value}, expected 1 to {ToolResultStore.MAX_PAGE_SIZE}")
+            return value
+
+        @field_validator("state")
+        def validate_state(cls, value: str | None) -> str | None:
+            """ Validate the host state """
+            if value is not None and value not in ToolResultPage.STATES:
+                raise ValueError(f"Invalid state: {value}, expected one of {', '.join(ToolResultPage.STATES)}")
+            return value
+
+        @field_validator("ip_cidr")
+        def validate_ip_cidr(cls, value: str | None) -> str | None:
+            """ Validate the CIDR IP address """
+            if value is not None:
+                _ = CIDRIPContainer(value)
+            return value
+
+        @field_validator("port")
+        def validate_port(cls, value: int | None) -> int | None:
+            """ Validate the port number """
+            if value is not None and not 1 <= value <= 65535:
+                raise ValueError(f"Invalid port: {value}, expected 1 to 65535")
+            return value
+
+        @model_validator(mode="after")
+        def validate_position(self) -> "ToolResultPage.Arguments":
+            """ Validate that the page is given by a cursor or a result handle """
+            if (self.cursor is None) == (self.handle is None):
+                raise ValueError("Exactly one of cursor and handle must be given")
+            return self
+
+    def __init__(self):
+        """
+        Initialize the ToolResultPage class.
+        """
+        super().__init__()
+
+    def get_tool(self) -> MCPTool:
+        """
+        Returns the tool's metadata.
+        """
+        return MCPTool(
+            name=self.get_name(),
+            description="Read a page of a large scan result. Results with more hosts than a page are returned as "
+                        "their first page with a result handle and a cursor: pass the cursor to get the next page, "
+                        "or the handle with filters (host state, network, open port) and an offset to read a "
+                        "filtered view. The full result is available gzip compressed as the MCP resource given in "
+                        "each page.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "cursor": {
+                        "type": "string",
+                        "description": "Cursor of the page to read, as returned by the previous page."
+                    },
+                    "handle": {
+                        "type": "string",
+                        "description": "Result handle, to read a page of a filtered view instead of a cursor."
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "minimum": 0,
+                        "description": "Index of the first row of the page, with a handle. Default is 0."
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "minimum": 1,
+                        "maximum": ToolResultStore.MAX_PAGE_SIZE,
+                        "description": "Number of rows of the page, with a handle. "
+                                       "Defaults to the server page size."
+                    },
+                    "state": {
+                        "type": "string",
+                        "enum": list(self.STATES),
+                        "description": "Only the hosts in this state."
+                    },
+                    "ip_cidr": {
+                        "type": "string",
+                        "description": "Only the hosts in this network (e.g., 10.0.3.0/24)."
+                    },
+                    "port": {
+                        "type": "integer",
+                        "description": "Only the hosts with this port open, for port scan results."
+                    },
+                },
+            }
+        )
+
+    def get_name(self) -> str:
+        """
+        Get the tool's name.
+        """
+        return self.__class__.__name__
+
+    def exec(self, arguments: dict) -> Any:
+        """
+        Invokes the tool with the provided arguments.
+        """
+        args = self.Arguments(
+            cursor=arguments.get("cursor"),
+            handle=arguments.get("handle"),
+            offset=arguments.get("offset") or 0,
+            limit=arguments.get("limit"),
+            state=arguments.get("state"),
+            ip_cidr=arguments.get("ip_cidr"),
+            port=arguments.get("port"),
+        )
+
+        store = self.get_results()
+        try:
+            if args.cursor is not None:
+                handle_id, offset, limit, result_filter = store.decode_cursor(args.cursor)
+            else:
+                handle_id, offset, limit = args.handle, args.offset, args.limit
+                ip_cidr = CIDRIPContainer(args.ip_cidr).get_value() if args.ip_cidr is not None else None
+                result_filter = ToolResultFilter(args.state, ip_cidr, args.port)
+            return store.page(store.get(handle_id), offset, limit, result_filter)
+        except ToolResultError as e:
+            raise ToolError(str(e)) from e
@@ -0,0 +1,123 @@
+from typing import Any
+
+from utils import MetricsRegistry
+from tools.tool import Tool, ToolError
+
+from mcp.types import Tool as MCPTool
+
+
+class ToolScanQueue(Tool):
+    """
+    Scans scheduler status class.
+    This class reports the state of the scans queue: running and waiting scans, limits and wait times.
+    """
+
+    def __init__(self):
+        """
+        Initialize the ToolScanQueue class.
+        """
+        super().__init__()
+
+    def get_tool(self) -> MCPTool:
+        """
+        Returns the tool's metadata.
+        """
+        return MCPTool(
+            name=self.get_name(),
+            description="Report the state of the scans scheduler: queue depth, running scans, concurrency and "
+                        "packet rate limits, recent wait times and scan time used by each client.",
+            inputSchema={
+                "type": "object",
+                "properties": {},
+            }
+        )
+
+    def get_name(self) -> str:
+        """
+        Get the tool's name.
+        """
+        return self.__class__.__name__
+
+    def exec(self, arguments: dict) -> Any:
+        """
+        Invokes the tool with the provided arguments.
+        """
+        stats = self.get_scheduler_stats()
+        if stats is None:
+            raise ToolError("The scans scheduler is not enabled in the configuration.")
+
+        usage = stats.pop("usage_s")
+        lines = [f"{name}: {value}" for name, value in stats.items()]
+        lines.extend(f"usage_s[{caller}]: {value}" for caller, value in usage.items())
+        return "\n".join(lines)
+
+    async def exec_async(self, arguments: dict) -> Any:
+        """
+        Invokes the tool on the server event loop, the scheduler queue and accounting are only safe to read there.
+        """
+        return self.exec(arguments)
+
+
+class ToolMetrics(Tool):
+    """
+    Server metrics class.
+    This class reports the metrics of the tool calls and of the commands they run.
+    """
+
+    # Supported output formats
+    FORMAT_SUMMARY = "summary"
+    FORMAT_PROMETHEUS = "prometheus"
+    FORMATS = (FORMAT_SUMMARY, FORMAT_PROMETHEUS)
+
+    def __init__(self):
+        """
+        Initialize the ToolMetrics class.
+        """
+        super().__init__()
+
+    def get_tool(self) -> MCPTool:
+        """
+        Returns the tool's metadata.
+        """
+        return MCPTool(
+            name=self.get_name(),
+            description="Report the server metrics: tool call latency, validation, execution and serialization "
+                        "times, output sizes, errors by type, calls in flight, subprocess wall and CPU time, "
+                        "cache, scheduler and background jobs statistics.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "format": {
+                        "type": "string",
+                        "enum": list(self.FORMATS),
+                        "description": "Output format: 'summary' with one line per metric (default) "
+                                       "or 'prometheus' for the Prometheus text exposition format."
+                    },
+                },
+            }
+        )
+
+    def get_name(self) -> str:
+        """
+        Get the tool's name.
+        """
+        return self.__class__.__name__
+
+    def exec(self, arguments: dict) -> Any:
+        """
+        Invokes the tool with the provided arguments.
+        """
+        output_format = arguments.get("format") or self.FORMAT_SUMMARY
+        if output_format not in self.FORMATS:
+            raise ToolError(f"Invalid format: {output_format}, expected one of {', '.join(self.FORMATS)}")
+
+        metrics = MetricsRegistry.get_registry()
+        if output_format == self.FORMAT_PROMETHEUS:
+            return metrics.to_prometheus()
+        return metrics.to_summary()
+
+    async def exec_async(self, arguments: dict) -> Any:
+        """
+        Invokes the tool on the server event loop, reading the metrics is cheap.
+        """
+        return self.exec(arguments)
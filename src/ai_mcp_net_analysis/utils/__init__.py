@@ -1,6 +1,65 @@
-from .config import ConfigParser, ConfigData, ConfigError  # noqa: F401
-from .logger import LoggerFactory, Logger, LoggerError  # noqa: F401
-from .type import DataContainer, DataContainerError  # noqa: F401
-from .type import CIDRIPContainer  # noqa: F401
-from .type import TimeoutSecContainer  # noqa: F401
-from .cmd import CmdExec, CmdExecError  # noqa: F401
+import importlib
+from typing import TYPE_CHECKING
+
+# Exported names and the submodules providing them, a submodule is imported on the first access to one of
+# its names so that importing the package stays cheap
+_EXPORTS = {
+    ".config": ("ConfigParser", "ConfigData", "ConfigError", "ConfigWatcher"),
+    ".logger": ("LoggerFactory", "Logger", "LoggerError"),
+    ".type": ("DataContainer", "DataContainerError", "CIDRIPContainer", "CIDRIPListContainer", "IPTargetSet",
+              "PortListContainer", "TimeoutSecContainer"),
+    ".metrics": ("MetricsRegistry", "MetricsFileWriter"),
+    ".cmd": ("CmdExec", "CmdExecError"),
+    ".nmap": (
+        "NmapXml", "NmapXmlError", "NmapXmlStream", "NmapHost", "NmapPort", "NmapRunStats", "NmapSweepResult",
+        "NmapPortScanResult", "NmapPortScanStats", "HostChange", "NmapServices",
+    ),
+    ".inventory": ("InventoryStore", "InventoryError", "HostObservation", "InventoryDelta", "DeltaPlan"),
+    ".scanner": (
+        "Scanner", "ScannerError", "ScannerFactory", "NmapScanner", "AsyncioScanner", "ScanTiming", "TimingModel",
+        "NmapPortScanner", "RouteTable",
+    ),
+    ".cluster": ("ClusterError", "ClusterCoordinator", "ClusterWorker"),
+    ".dns": ("DnsError", "ReverseResolver"),
+}
+_MODULES = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = list(_MODULES)
+
+
+def __getattr__(name: str):
+    """
+    Import an exported name from its submodule on first access.
+    """
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
+
+
+if TYPE_CHECKING:
+    from .config import ConfigParser, ConfigData, ConfigError, ConfigWatcher  # noqa: F401
+    from .logger import LoggerFactory, Logger, LoggerError  # noqa: F401
+    from .type import DataContainer, DataContainerError  # noqa: F401
+    from .type import CIDRIPContainer, CIDRIPListContainer, IPTargetSet  # noqa: F401
+    from .type import PortListContainer, TimeoutSecContainer  # noqa: F401
+    from .metrics import MetricsRegistry, MetricsFileWriter  # noqa: F401
+    from .cmd import CmdExec, CmdExecError  # noqa: F401
+    from .nmap import NmapXml, NmapXmlError  # noqa: F401
+    from .nmap import NmapXmlStream, NmapHost, NmapPort, NmapRunStats  # noqa: F401
+    from .nmap import NmapSweepResult, NmapPortScanResult, NmapPortScanStats, HostChange  # noqa: F401
+    from .nmap import NmapServices  # noqa: F401
+    from .inventory import InventoryStore, InventoryError, HostObservation  # noqa: F401
+    from .inventory import InventoryDelta, DeltaPlan  # noqa: F401
+    from .scanner import Scanner, ScannerError, ScannerFactory  # noqa: F401
+    from .scanner import NmapScanner, AsyncioScanner  # noqa: F401
+    from .scanner import ScanTiming, TimingModel  # noqa: F401
+    from .scanner import NmapPortScanner, RouteTable  # noqa: F401
+    from .cluster import ClusterError, ClusterCoordinator, ClusterWorker  # noqa: F401
+    from .dns import DnsError, ReverseResolver  # noqa: F401
@@ -0,0 +1,3 @@
+from .cluster_protocol import ClusterError, ClusterWorkerLost, ClusterProtocol  # noqa: F401
+from .cluster_coordinator import ClusterCoordinator, ClusterNode  # noqa: F401
+from .cluster_worker import ClusterWorker  # noqa: F401
@@ -0,0 +1,288 @@
+import asyncio
+import hmac
+import itertools
+import time
+from dataclasses import asdict, dataclass, field
+
+from ..logger import LoggerFactory
+from ..metrics import MetricsRegistry
+from ..scanner import ScanTiming
+from .cluster_protocol import ClusterError, ClusterProtocol, ClusterWorkerLost
+
+
+@dataclass(eq=False)
+class ClusterNode:
+    """
+    Worker registered with the coordinator.
+    """
+    name: str
+    # Number of shards the worker runs at once
+    capacity: int
+    writer: asyncio.StreamWriter
+    # Shards sent and not answered yet, by identifier
+    pending: dict[int, asyncio.Future] = field(default_factory=dict)
+    last_seen: float = field(default_factory=time.monotonic)
+
+    def load(self) -> float:
+        """
+        Fraction of the capacity of the worker in use.
+        """
+        return len(self.pending) / self.capacity
+
+
+class ClusterCoordinator:
+    """
+    Coordinator of remote scan workers.
+    Workers connect to the coordinator and register. Each shard of a sweep is sent to the least loaded worker with
+    a free slot, which runs nmap on it and returns the XML report. The shards of a worker whose connection is lost,
+    or which stops sending heartbeats, are sent again to another worker, up to a number of attempts.
+    """
+
+    # Defaults, overridden by the cluster configuration section
+    DEFAULT_HOST = "127.0.0.1"
+    DEFAULT_PORT = 7810
+    DEFAULT_HEARTBEAT_TIMEOUT_S = 10.0
+    DEFAULT_MAX_ATTEMPTS = 3
+    DEFAULT_WAIT_S = 30.0
+
+    # Time in s a new connection has to register
+    REGISTER_TIMEOUT_S = 10.0
+
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        token: str = "",
+        heartbeat_timeout_s: float = DEFAULT_HEARTBEAT_TIMEOUT_S,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        wait_s: float = DEFAULT_WAIT_S,
+    ):
+        """
+        Initialize the coordinator, it accepts workers once run.
+        :param host: Address the coordinator listens on.
+        :param port: TCP port the coordinator listens on, 0 for a free port chosen when run.
+        :param token: Token the workers must present to register, empty for none.
+        :param heartbeat_timeout_s: Time in seconds without a message after which a worker is considered lost.
+        :param max_attempts: Number of workers a shard is sent to before the sweep fails.
+        :param wait_s: Time in seconds a shard waits for a free worker slot.
+        """
+        self._host = host
+        self._port = port
+        self.set_limits(token, heartbeat_timeout_s, max_attempts, wait_s)
+        self._nodes: list[ClusterNode] = []
+        self._changed = asyncio.Condition()
+        self._ids = itertools.count(1)
+        self._stats = dict(registered=0, lost=0, shards=0, retries=0, failures=0)
+
+    def set_limits(self, token: str, heartbeat_timeout_s: float, max_attempts: int, wait_s: float) -> None:
+        """
+        Change the token, heartbeat timeout and retry limits, the listening address is kept.
+        """
+        self._token = token
+        self._heartbeat_timeout_s = heartbeat_timeout_s
+        self._max_attempts = max_attempts
+        self._wait_s = wait_s
+
+    def get_port(self) -> int:
+        """
+        Get the TCP port the coordinator listens on, the chosen one once run if configured as 0.
+        """
+        return self._port
+
+    def has_workers(self) -> bool:
+        """
+        Whether a worker is registered.
+        """
+        return bool(self._nodes)
+
+    def get_capacity(self) -> int:
+        """
+        Get the number of shards the registered workers run at once.
+        """
+        return sum(node.capacity for node in self._nodes)
+
+    async def _notify(self) -> None:
+        """
+        Wake up the shards waiting for a worker slot.
+        """
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def _register(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> ClusterNode | None:
+        """
+        Read the registration of a new connection.
+        :return: The registered worker, None if the registration is invalid.
+        """
+        message = await asyncio.wait_for(ClusterProtocol.receive(reader), self.REGISTER_TIMEOUT_S)
+        if message is None or message["type"] != ClusterProtocol.REGISTER:
+            return None
+        if not hmac.compare_digest(str(message.get("token", "")).encode(), self._token.encode()):
+            LoggerFactory.get_logger().log_warning("Cluster worker %s rejected: invalid token", message.get("name"))
+            return None
+        capacity = message.get("capacity")
+        if not isinstance(capacity, int) or capacity < 1:
+            return None
+        peer = writer.get_extra_info("peername")
+        name = str(message.get("name") or (f"{peer[0]}:{peer[1]}" if peer else "worker"))
+        await ClusterProtocol.send(writer, {"type": ClusterProtocol.REGISTERED})
+        return ClusterNode(name, capacity, writer)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Handle a worker connection: registration, then heartbeats and shard results until it is closed.
+        """
+        logger = LoggerFactory.get_logger()
+        node = None
+        try:
+            node = await self._register(reader, writer)
+            if node is None:
+                return
+            self._nodes.append(node)
+            self._stats["registered"] += 1
+            logger.log_info("Cluster worker %s registered, %d slots", node.name, node.capacity)
+            await self._notify()
+
+            while (message := await ClusterProtocol.receive(reader)) is not None:
+                node.last_seen = time.monotonic()
+                if message["type"] == ClusterProtocol.RESULT:
+                    future = node.pending.get(message.get("id"))
+                    if future is None or future.done():
+                        continue
+                    if message.get("error") is not None:
+                        future.set_exception(ClusterError(f"Worker {node.name} failed: {message['error']}"))
+                    else:
+                        future.set_result(str(message.get("report", "")))
+        except (ClusterError, OSError, asyncio.TimeoutError) as e:
+            logger.log_warning("Cluster worker %s connection error: %s", node.name if node else "unregistered", e)
+        finally:
+            if node is not None:
+                await self._lose(node)
+            writer.close()
+
+    async def _lose(self, node: ClusterNode) -> None:
+        """
+        Drop a worker, its pending shards fail and are sent again to another worker.
+        """
+        if node not in self._nodes:
+            return
+        self._nodes.remove(node)
+        self._stats["lost"] += 1
+        LoggerFactory.get_logger().log_warning(
+            "Cluster worker %s lost with %d pending shards", node.name, len(node.pending)
+        )
+        for future in node.pending.values():
+            if not future.done():
+                future.set_exception(ClusterWorkerLost(f"Worker {node.name} lost"))
+        node.writer.close()
+        await self._notify()
+
+    async def _watch(self) -> None:
+        """
+        Drop the workers silent for longer than the heartbeat timeout.
+        """
+        while True:
+            await asyncio.sleep(self._heartbeat_timeout_s / 4)
+            now = time.monotonic()
+            for node in [node for node in self._nodes if now - node.last_seen > self._heartbeat_timeout_s]:
+                await self._lose(node)
+
+    async def run(self) -> None:
+        """
+        Accept and watch the workers until cancelled.
+        """
+        server = await asyncio.start_server(self._serve, self._host, self._port)
+        self._port = server.sockets[0].getsockname()[1]
+        LoggerFactory.get_logger().log_info("Cluster coordinator listening on %s:%d", self._host, self._port)
+        async with server:
+            async with asyncio.TaskGroup() as group:
+                group.create_task(self._watch())
+                group.create_task(server.serve_forever())
+
+    def _free_node(self) -> ClusterNode | None:
+        """
+        Get the least loaded worker with a free slot, None if all are busy.
+        """
+        free = [node for node in self._nodes if len(node.pending) < node.capacity]
+        return min(free, key=ClusterNode.load) if free else None
+
+    async def _acquire(self) -> ClusterNode:
+        """
+        Wait for a free worker slot.
+        :raises ClusterError: If no slot is free within the wait time.
+        """
+        async with self._changed:
+            try:
+                await asyncio.wait_for(self._changed.wait_for(self._free_node), self._wait_s)
+            except asyncio.TimeoutError as e:
+                raise ClusterError(f"No cluster worker available within {self._wait_s}s") from e
+            return self._free_node()
+
+    async def report(
+        self,
+        targets: list[str],
+        timeout_s: int,
+        max_rate: int | None = None,
+        timing: ScanTiming | None = None,
+        technique: str | None = None,
+    ) -> str:
+        """
+        Run a ping sweep of a shard on a worker and return the raw nmap XML report.
+        :param targets: The CIDRs of the shard.
+        :param timeout_s: Timeout for each host in seconds.
+        :param max_rate: Maximum number of packets sent per second, None for no limit.
+        :param timing: RTT timeouts, retries and parallelism, None for the nmap defaults.
+        :param technique: The host discovery technique, None for the worker default.
+        :return: The nmap XML report.
+        :raises ClusterError: If the worker fails, or the shard is lost on every attempt.
+        """
+        metrics = MetricsRegistry.get_registry()
+        shard = {
+            "type": ClusterProtocol.SHARD,
+            "targets": targets,
+            "timeout_s": timeout_s,
+            "max_rate": max_rate,
+            "timing": asdict(timing) if timing is not None else None,
+            "technique": technique,
+        }
+        self._stats["shards"] += 1
+        for attempt in range(self._max_attempts):
+            node = await self._acquire()
+            shard_id = next(self._ids)
+            future = asyncio.get_running_loop().create_future()
+            node.pending[shard_id] = future
+            try:
+                await ClusterProtocol.send(node.writer, {**shard, "id": shard_id})
+                with metrics.track("cluster_shard_seconds", worker=node.name):
+                    return await future
+            except (ClusterWorkerLost, OSError) as e:
+                self._stats["retries"] += 1
+                metrics.inc("cluster_shard_retries_total")
+                LoggerFactory.get_logger().log_warning(
+                    "Shard %s lost on attempt %d of %d: %s", ",".join(targets), attempt + 1, self._max_attempts, e
+                )
+                await self._lose(node)
+            except asyncio.CancelledError:
+                if node in self._nodes and not node.writer.is_closing():
+                    node.writer.write(ClusterProtocol.encode({"type": ClusterProtocol.CANCEL, "id": shard_id}))
+                raise
+            except ClusterError:
+                self._stats["failures"] += 1
+                raise
+            finally:
+                node.pending.pop(shard_id, None)
+                await self._notify()
+        self._stats["failures"] += 1
+        raise ClusterError(f"Shard {','.join(targets)} lost on {self._max_attempts} attempts")
+
+    def get_stats(self) -> dict:
+        """
+        Get the coordinator counters.
+        :return: The registered, lost, shards, retries and failures counters, the number of workers, their
+            capacity and the shards in flight.
+        """
+        return dict(
+            self._stats,
+            workers=len(self._nodes),
+            capacity=self.get_capacity(),
+            in_flight=sum(len(node.pending) for node in self._nodes),
+        )
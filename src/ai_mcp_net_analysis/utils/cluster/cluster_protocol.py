@@ -0,0 +1,88 @@
+import asyncio
+import json
+import struct
+
+
+class ClusterError(Exception):
+    """
+    Custom exception for cluster errors.
+    """
+    pass
+
+
+class ClusterWorkerLost(ClusterError):
+    """
+    Raised for the shards of a worker whose connection was lost, they can be sent again to another worker.
+    """
+    pass
+
+
+class ClusterProtocol:
+    """
+    Messages exchanged between the coordinator and its workers over TCP: a JSON object per frame, prefixed with its
+    length as a 4 bytes big-endian integer.
+
+    A worker connects to the coordinator and sends 'register' with its name, number of shards it runs at once and
+    the shared token, and the coordinator answers 'registered'. The coordinator then sends 'shard' messages, with an
+    identifier, the targets and the nmap options, and 'cancel' for a shard no longer needed. The worker answers each
+    shard with a 'result' holding the nmap XML report or an error, and sends 'heartbeat' at a regular interval.
+    """
+
+    # Message types
+    REGISTER = "register"
+    REGISTERED = "registered"
+    SHARD = "shard"
+    CANCEL = "cancel"
+    RESULT = "result"
+    HEARTBEAT = "heartbeat"
+
+    # Frame header, the length of the JSON payload
+    HEADER = struct.Struct(">I")
+
+    # Maximum payload size in bytes, a shard report is an nmap XML report
+    MAX_FRAME_BYTES = 256 * 1024 * 1024
+
+    @classmethod
+    def encode(cls, message: dict) -> bytes:
+        """
+        Encode a message as a frame.
+        :raises ClusterError: If the message is larger than MAX_FRAME_BYTES.
+        """
+        payload = json.dumps(message, separators=(",", ":")).encode()
+        if len(payload) > cls.MAX_FRAME_BYTES:
+            raise ClusterError(f"Message of {len(payload)} bytes exceeds {cls.MAX_FRAME_BYTES} bytes")
+        return cls.HEADER.pack(len(payload)) + payload
+
+    @classmethod
+    async def send(cls, writer: asyncio.StreamWriter, message: dict) -> None:
+        """
+        Send a message and wait for the stream to drain.
+        """
+        writer.write(cls.encode(message))
+        await writer.drain()
+
+    @classmethod
+    async def receive(cls, reader: asyncio.StreamReader) -> dict | None:
+        """
+        Receive a message.
+        :return: The message, None if the connection was closed between two messages.
+        :raises ClusterError: If the frame is invalid or the connection closed within a frame.
+        """
+        try:
+            header = await reader.readexactly(cls.HEADER.size)
+        except asyncio.IncompleteReadError as e:
+            if not e.partial:
+                return None
+            raise ClusterError("Connection closed within a frame header") from e
+        (length,) = cls.HEADER.unpack(header)
+        if length > cls.MAX_FRAME_BYTES:
+            raise ClusterError(f"Frame of {length} bytes exceeds {cls.MAX_FRAME_BYTES} bytes")
+        try:
+            message = json.loads(await reader.readexactly(length))
+        except asyncio.IncompleteReadError as e:
+            raise ClusterError("Connection closed within a frame") from e
+        except ValueError as e:
+            raise ClusterError(f"Invalid frame: {e}") from e
+        if not isinstance(message, dict) or not isinstance(message.get("type"), str):
+            raise ClusterError("Invalid message, expected an object with a type")
+        return message
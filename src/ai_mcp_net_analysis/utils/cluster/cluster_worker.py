@@ -0,0 +1,139 @@
+import asyncio
+import os
+import socket
+
+from ..logger import LoggerFactory
+from ..scanner import NmapScanner, ScanTiming
+from .cluster_protocol import ClusterError, ClusterProtocol
+
+
+class ClusterWorker:
+    """
+    Scan worker of a cluster.
+    The worker connects to the coordinator, registers, and runs the ping sweep shards it receives with nmap, at
+    most its capacity at once, answering each with the nmap XML report. The connection is opened again after a
+    delay when it is lost, the shards running at that time are cancelled.
+    """
+
+    # Defaults, overridden by the cluster configuration section
+    DEFAULT_CAPACITY = 2
+    DEFAULT_HEARTBEAT_INTERVAL_S = 2.0
+
+    # Delays in s before connecting again, doubled after each failed attempt up to the maximum
+    RECONNECT_DELAY_S = 0.5
+    MAX_RECONNECT_DELAY_S = 10.0
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        name: str | None = None,
+        capacity: int = DEFAULT_CAPACITY,
+        token: str = "",
+        heartbeat_interval_s: float = DEFAULT_HEARTBEAT_INTERVAL_S,
+        scanner: NmapScanner | None = None,
+    ):
+        """
+        Initialize the worker.
+        :param host: Address of the coordinator.
+        :param port: TCP port of the coordinator.
+        :param name: Name of the worker in the coordinator logs and metrics, the host name and process id if None.
+        :param capacity: Number of shards run at once.
+        :param token: Token presented to the coordinator.
+        :param heartbeat_interval_s: Interval in seconds between two heartbeats.
+        :param scanner: The nmap scanner running the shards.
+        """
+        self._host = host
+        self._port = port
+        self._name = name or f"{socket.gethostname()}-{os.getpid()}"
+        self._capacity = capacity
+        self._token = token
+        self._heartbeat_interval_s = heartbeat_interval_s
+        self._scanner = scanner or NmapScanner()
+
+    async def _run_shard(self, message: dict, send) -> None:
+        """
+        Run a shard and send its result.
+        """
+        try:
+            timing = ScanTiming(**message["timing"]) if message.get("timing") else None
+            report = await self._scanner.report_async(
+                list(message["targets"]), int(message["timeout_s"]), message.get("max_rate"), timing,
+                message.get("technique") or NmapScanner.TECHNIQUE_ICMP,
+            )
+            result = {"type": ClusterProtocol.RESULT, "id": message["id"], "report": report}
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            LoggerFactory.get_logger().log_warning("Shard %s failed: %s", message.get("targets"), e)
+            result = {"type": ClusterProtocol.RESULT, "id": message["id"], "error": str(e) or type(e).__name__}
+        await send(result)
+
+    async def _session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Register with the coordinator and run its shards until the connection is closed.
+        :raises ClusterError: If the registration is refused or a message is invalid.
+        """
+        lock = asyncio.Lock()
+
+        async def send(message: dict) -> None:
+            async with lock:
+                await ClusterProtocol.send(writer, message)
+
+        await send({
+            "type": ClusterProtocol.REGISTER, "name": self._name, "capacity": self._capacity, "token": self._token
+        })
+        answer = await ClusterProtocol.receive(reader)
+        if answer is None or answer["type"] != ClusterProtocol.REGISTERED:
+            raise ClusterError("Registration refused by the coordinator")
+        LoggerFactory.get_logger().log_info(
+            "Cluster worker %s registered with %s:%d", self._name, self._host, self._port
+        )
+
+        async def heartbeat() -> None:
+            while True:
+                await asyncio.sleep(self._heartbeat_interval_s)
+                await send({"type": ClusterProtocol.HEARTBEAT})
+
+        shards: dict[int, asyncio.Task] = {}
+        async with asyncio.TaskGroup() as group:
+            heartbeat_task = group.create_task(heartbeat())
+            try:
+                while (message := await ClusterProtocol.receive(reader)) is not None:
+                    match message["type"]:
+                        case ClusterProtocol.SHARD:
+                            task = group.create_task(self._run_shard(message, send))
+                            shards[message["id"]] = task
+                            task.add_done_callback(lambda _, shard_id=message["id"]: shards.pop(shard_id, None))
+                        case ClusterProtocol.CANCEL:
+                            task = shards.get(message.get("id"))
+                            if task is not None:
+                                task.cancel()
+            finally:
+                heartbeat_task.cancel()
+                for task in list(shards.values()):
+                    task.cancel()
+
+    async def run(self) -> None:
+        """
+        Serve the coordinator until cancelled, connecting again when the connection is lost.
+        """
+        logger = LoggerFactory.get_logger()
+        delay_s = self.RECONNECT_DELAY_S
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(self._host, self._port)
+            except OSError as e:
+                logger.log_warning("Cannot connect to the coordinator %s:%d: %s", self._host, self._port, e)
+            else:
+                delay_s = self.RECONNECT_DELAY_S
+                try:
+                    await self._session(reader, writer)
+                    logger.log_warning("Connection to the coordinator closed")
+                except* (ClusterError, OSError) as e:
+                    # The errors of the shards and heartbeat tasks are grouped
+                    logger.log_warning("Connection to the coordinator lost: %s", e.exceptions[0])
+                finally:
+                    writer.close()
+            await asyncio.sleep(delay_s)
+            delay_s = min(delay_s * 2, self.MAX_RECONNECT_DELAY_S)
@@ -1,6 +1,12 @@
+import asyncio
+import os
+import resource
 import subprocess
+import threading
+from typing import AsyncIterator
 
 from utils import LoggerFactory, Logger
+from utils import MetricsRegistry
 
 
 class CmdExecError(Exception):
@@ -23,12 +29,47 @@ class CmdExec:
     # Default timeout in s for command execution
     DEFAULT_TIMEOUT = 60
 
+    # Default size in bytes of the chunks read from streamed commands
+    DEFAULT_CHUNK_SIZE = 64 * 1024
+
+    # Maximum number of bytes of stderr kept for error reporting
+    MAX_STDERR_BYTES = 64 * 1024
+
+    # CPU time in s of the reaped child processes already accounted for
+    _children_cpu_s = 0.0
+    _children_cpu_lock = threading.Lock()
+
+    @staticmethod
+    def _command_name(command: list[str]) -> str:
+        """
+        Get the name of the program run by a command, used as metrics label.
+        """
+        return os.path.basename(command[0]) if command else ""
+
+    @staticmethod
+    def _record(command: list[str], output_bytes: int) -> None:
+        """
+        Record the output size and CPU time of a completed command.
+        The CPU time is the growth of the CPU time of all the reaped children since the previous command
+        completed: the total is exact, the split between commands running concurrently is approximate.
+        """
+        metrics = MetricsRegistry.get_registry()
+        if not metrics.enabled:
+            return
+        usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        with CmdExec._children_cpu_lock:
+            cpu_s = usage.ru_utime + usage.ru_stime
+            delta = cpu_s - CmdExec._children_cpu_s
+            CmdExec._children_cpu_s = cpu_s
+        name = CmdExec._command_name(command)
+        metrics.inc("subprocess_cpu_seconds_total", delta, command=name)
+        metrics.inc("subprocess_output_bytes_total", output_bytes, command=name)
+
     @staticmethod
     def execute(command: list[str], timeout: int = DEFAULT_TIMEOUT) -> str:
         """
         Execute a shell command and return the result.
         :param command: The command to execute as a list of strings.
-        :param response_model: The expected response model.
         :param timeout: Timeout for command execution in seconds.
         :return: The result of the command execution.
         """
@@ -40,21 +81,163 @@ class CmdExec:
 
         try:
             # Execute the command with a timeout
-            logger.log_debug(f"Executing command: {cmd_text}")
-            result = subprocess.run(command, capture_output=True, text=True, check=True)
-            logger.log_debug(f"Command executed successfully: {result.stdout}")
+            logger.log_debug("Executing command: %s", cmd_text)
+            with MetricsRegistry.get_registry().track("subprocess", command=CmdExec._command_name(command)):
+                result = subprocess.run(command, capture_output=True, text=True, check=True, timeout=timeout)
+            CmdExec._record(command, len(result.stdout))
+            logger.log_debug("Command executed successfully: %d characters of output", len(result.stdout))
             return result.stdout
         except subprocess.TimeoutExpired:
             # If the command times out, we raise a custom exception
             raise CmdExecError("Command execution time out")
         except subprocess.CalledProcessError as e:
             # If the command fails, we raise a custom exception
-            if e.returncode != 0:
-                raise CmdExecError(f"Command execution failed with return code: {result.returncode}")
-            elif result.stderr:
-                raise CmdExecError(f"Command error: {result.stderr}")
+            if e.stderr:
+                raise CmdExecError(f"Command error: {e.stderr}")
             else:
-                raise CmdExecError(f"Command execution failed: {e}")
+                raise CmdExecError(f"Command execution failed with return code: {e.returncode}")
         except Exception as e:
             # Catch any other exceptions and raise a custom exception
             raise CmdExecError(f"Command execution error: {e}")
+
+    @staticmethod
+    async def _kill(process: asyncio.subprocess.Process) -> None:
+        """
+        Kill a child process and reap it.
+        :param process: The process to kill.
+        """
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+            await process.wait()
+
+    @staticmethod
+    async def execute_async(command: list[str], timeout: int = DEFAULT_TIMEOUT) -> str:
+        """
+        Execute a shell command without blocking the event loop and return the result.
+        The child process is killed if the timeout expires or if the calling task is cancelled.
+        :param command: The command to execute as a list of strings.
+        :param timeout: Timeout for command execution in seconds, None to wait indefinitely.
+        :return: The result of the command execution.
+        """
+
+        # Initialize logger
+        logger = LoggerFactory.get_logger()
+
+        cmd_text = ' '.join(command)
+
+        logger.log_debug("Executing command: %s", cmd_text)
+        with MetricsRegistry.get_registry().track("subprocess", command=CmdExec._command_name(command)):
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *command,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+            except Exception as e:
+                raise CmdExecError(f"Command execution error: {e}")
+
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+            except asyncio.TimeoutError:
+                # If the command times out, kill it and raise a custom exception
+                await CmdExec._kill(process)
+                raise CmdExecError("Command execution time out")
+            except BaseException:
+                # Cancelled by the caller (e.g. MCP request cancellation): do not leave the child running
+                await asyncio.shield(CmdExec._kill(process))
+                raise
+
+            if process.returncode != 0:
+                # If the command fails, we raise a custom exception
+                if stderr:
+                    raise CmdExecError(f"Command error: {stderr.decode(errors='replace')}")
+                else:
+                    raise CmdExecError(f"Command execution failed with return code: {process.returncode}")
+
+        CmdExec._record(command, len(stdout))
+        logger.log_debug("Command executed successfully: %d bytes of output", len(stdout))
+        return stdout.decode(errors="replace")
+
+    @staticmethod
+    async def _drain(stream: asyncio.StreamReader, limit: int) -> bytes:
+        """
+        Read a stream until EOF, keeping at most limit bytes.
+        :param stream: The stream to read.
+        :param limit: Maximum number of bytes to keep.
+        :return: The first bytes read from the stream.
+        """
+        data = bytearray()
+        while chunk := await stream.read(CmdExec.DEFAULT_CHUNK_SIZE):
+            if len(data) < limit:
+                data += chunk[:limit - len(data)]
+        return bytes(data)
+
+    @staticmethod
+    async def stream_async(
+        command: list[str],
+        timeout: int = DEFAULT_TIMEOUT,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> AsyncIterator[bytes]:
+        """
+        Execute a shell command and yield its output chunk by chunk as it is produced.
+        The child process is killed if the timeout expires, if the calling task is cancelled or if the
+        consumer stops iterating.
+        :param command: The command to execute as a list of strings.
+        :param timeout: Timeout for command execution in seconds, None to wait indefinitely.
+        :param chunk_size: Maximum size in bytes of the yielded chunks.
+        :return: An asynchronous iterator over the output chunks.
+        """
+
+        # Initialize logger
+        logger = LoggerFactory.get_logger()
+
+        cmd_text = ' '.join(command)
+
+        logger.log_debug("Streaming command: %s", cmd_text)
+        with MetricsRegistry.get_registry().track("subprocess", command=CmdExec._command_name(command)):
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *command,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+            except Exception as e:
+                raise CmdExecError(f"Command execution error: {e}")
+
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout if timeout is not None else None
+            stderr_task = asyncio.create_task(CmdExec._drain(process.stderr, CmdExec.MAX_STDERR_BYTES))
+            size = 0
+            try:
+                while True:
+                    remaining = deadline - loop.time() if deadline is not None else None
+                    try:
+                        chunk = await asyncio.wait_for(process.stdout.read(chunk_size), timeout=remaining)
+                    except asyncio.TimeoutError:
+                        raise CmdExecError("Command execution time out")
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    yield chunk
+
+                stderr = await stderr_task
+                await process.wait()
+            finally:
+                # Consumer stopped, cancelled or timed out: do not leave the child running
+                await asyncio.shield(CmdExec._kill(process))
+                stderr_task.cancel()
+
+            if process.returncode != 0:
+                # If the command fails, we raise a custom exception
+                if stderr:
+                    raise CmdExecError(f"Command error: {stderr.decode(errors='replace')}")
+                else:
+                    raise CmdExecError(f"Command execution failed with return code: {process.returncode}")
+
+        CmdExec._record(command, size)
+        logger.log_debug("Command executed successfully: %d bytes of output", size)
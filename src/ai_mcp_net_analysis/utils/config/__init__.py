@@ -1 +1,2 @@
 from .config import ConfigParser, ConfigData, ConfigError  # noqa: F401
+from .config_watcher import ConfigWatcher  # noqa: F401
@@ -14,19 +14,64 @@ class ConfigError(Exception):
 class ConfigData:
     """
     Class to represent configuration data.
+    The tree is immutable, built once from the validated configuration and shared by all its readers: a new
+    configuration is a new tree swapped in place of the previous one. Each node is an instance of a class with a
+    slot per key, created once per set of keys, so that attribute lookups are plain slot reads.
     """
 
+    __slots__ = ("_values",)
+
+    # Node classes by set of keys
+    _node_classes: dict[tuple[str, ...], type] = {}
+
+    def __new__(cls, data: dict):
+        """
+        Create a node of the class holding a slot for each of the keys of the data.
+        """
+        keys = tuple(
+            key for key in data
+            if isinstance(key, str) and key.isidentifier() and not hasattr(ConfigData, key)
+        )
+        node_class = ConfigData._node_classes.get(keys)
+        if node_class is None:
+            node_class = type(ConfigData.__name__, (ConfigData,), {"__slots__": keys})
+            ConfigData._node_classes[keys] = node_class
+        return object.__new__(node_class)
+
     def __init__(self, data: dict):
         """
         Initialize the ConfigData object with a dictionary.
         :param data: Dictionary containing configuration data.
         """
+        values = {}
         for key, value in data.items():
             if isinstance(value, dict):
                 value = ConfigData(value)
-            elif isinstance(value, list):
-                value = [ConfigData(item) if isinstance(item, dict) else item for item in value]
-            setattr(self, key, value)
+            elif isinstance(value, (list, tuple)):
+                value = tuple(ConfigData(item) if isinstance(item, dict) else item for item in value)
+            values[key] = value
+        object.__setattr__(self, "_values", values)
+        for key in type(self).__slots__:
+            object.__setattr__(self, key, values[key])
+
+    def __getattr__(self, key: str):
+        """
+        Get an item from the configuration data using attribute access, for the keys without a slot.
+        :param key: Key to access the configuration data.
+        :return: The value associated with the key.
+        """
+        if key == "_values":
+            raise AttributeError(key)
+        try:
+            return self._values[key]
+        except KeyError:
+            raise AttributeError(f"Value '{key}' not set in configuration.") from None
+
+    def __setattr__(self, key: str, value: any) -> None:
+        """
+        Configuration data is immutable.
+        """
+        raise AttributeError(f"Configuration data is immutable, cannot set '{key}'.")
 
     def __getitem__(self, key: str):
         """
@@ -36,16 +81,24 @@ class ConfigData:
         """
         return getattr(self, key)
 
+    def __eq__(self, other: object) -> bool:
+        """
+        Configuration data trees are equal if they hold the same values.
+        """
+        if not isinstance(other, ConfigData):
+            return NotImplemented
+        return self._values == other._values
+
     def to_dict(self) -> dict:
         """
         Convert the configuration data to a dictionary.
         :return: Dictionary representation of the configuration data.
         """
         result = {}
-        for key, value in self.__dict__.items():
+        for key, value in self._values.items():
             if isinstance(value, ConfigData):
                 value = value.to_dict()
-            elif isinstance(value, list):
+            elif isinstance(value, tuple):
                 value = [v.to_dict() if isinstance(v, ConfigData) else v for v in value]
             result[key] = value
         return result
@@ -55,7 +108,7 @@ class ConfigData:
         String representation of the ConfigData object.
         :return: String representation of the configuration data.
         """
-        return f"{self.__class__.__name__}({self.__dict__})"
+        return f"{self.__class__.__name__}({self._values})"
 
     def get_value(self, key: str, default: any = None) -> any:
         """
@@ -65,8 +118,8 @@ class ConfigData:
         :raises ValueError: If the value is not set and default is None.
         :return: The value of the configuration data.
         """
-        if hasattr(self, key):
-            return getattr(self, key)
+        if key in self._values:
+            return self._values[key]
         elif default is None:
             raise ValueError(f"Value '{key}' not set in configuration.")
         # If the value is not set, return the default value
@@ -97,7 +150,7 @@ class ConfigParser:
             raise ValueError("Configuration not loaded.")
 
         try:
-            config_schema.validate(self._config)
+            self._config = config_schema.validate(self._config)
         except SchemaError as e:
             raise ConfigError(f"Configuration validation error: {e}")
 
@@ -109,6 +162,7 @@ class ConfigParser:
         """
         self._cfg_path = None
         self._config = None
+        self._config_data = None
 
         # Load and validate the configuration
         self._config_load(cfg_path)
@@ -136,8 +190,10 @@ class ConfigParser:
     @property
     def config(self) -> ConfigData:
         """
-        Get the loaded configuration as a ConfigData object.
+        Get the loaded configuration as a ConfigData object, built on first access.
 
         :return: The loaded configuration as a ConfigData object.
         """
-        return ConfigData(self._config)
+        if self._config_data is None:
+            self._config_data = ConfigData(self._config)
+        return self._config_data
@@ -0,0 +1,82 @@
+import asyncio
+import os
+from typing import Callable
+
+from .config import ConfigParser, ConfigData, ConfigError
+
+
+class ConfigWatcher:
+    """
+    Watcher of the configuration file.
+    The file modification time, size and inode are checked at an interval. A changed file is loaded and validated
+    again, the new configuration is then passed to a reload function. A file that fails to load or validate is
+    reported and ignored, the previous configuration stays in use until the next change.
+    """
+
+    # Default interval in s between two checks of the file
+    DEFAULT_INTERVAL_S = 2.0
+
+    def __init__(
+            self,
+            cfg_path: str,
+            on_reload: Callable[[ConfigData], None],
+            interval_s: float = DEFAULT_INTERVAL_S,
+    ):
+        """
+        Initialize the watcher, changes are detected from the current state of the file.
+        :param cfg_path: Path to the YAML configuration file.
+        :param on_reload: Function applying a new configuration.
+        :param interval_s: Interval in seconds between two checks of the file.
+        """
+        self._cfg_path = cfg_path
+        self._on_reload = on_reload
+        self._interval_s = interval_s
+        self._stamp = self._file_stamp()
+
+    def _file_stamp(self) -> tuple | None:
+        """
+        Get the modification time, size and inode of the file, None if it cannot be read.
+        """
+        try:
+            stat = os.stat(self._cfg_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def check(self) -> ConfigData | None:
+        """
+        Load the configuration file if it changed since the last check.
+        :return: The new configuration, None if the file did not change or is not valid.
+        """
+        stamp = self._file_stamp()
+        if stamp is None or stamp == self._stamp:
+            return None
+        self._stamp = stamp
+
+        try:
+            return ConfigParser.get_config(self._cfg_path).config
+        except (ConfigError, OSError, ValueError) as e:
+            # The logger package depends on this one, imported on use
+            from ..logger import LoggerFactory
+            LoggerFactory.get_logger().log_warning(
+                "Configuration %s not reloaded, keeping the previous one: %s", self._cfg_path, e
+            )
+            return None
+
+    async def run(self) -> None:
+        """
+        Check the file at each interval and apply the new configurations until cancelled.
+        """
+        from ..logger import LoggerFactory
+        logger = LoggerFactory.get_logger()
+        while True:
+            await asyncio.sleep(self._interval_s)
+            config_data = await asyncio.to_thread(self.check)
+            if config_data is None:
+                continue
+            try:
+                self._on_reload(config_data)
+            except Exception as e:
+                logger.log_error("Failed to apply the configuration %s: %s", self._cfg_path, e)
+            else:
+                logger.log_info("Configuration %s reloaded", self._cfg_path)
@@ -10,6 +10,9 @@ config_schema = Schema({
         'name': str,
         'level': And(str, lambda s: s in ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']),
         "type": And(str, lambda s: s in ['file']),
+        Optional('async'): bool,
+        Optional('queue_size'): And(Use(int), lambda n: n >= 0),
+        Optional('max_message_chars'): And(Use(int), lambda n: n >= 0),
         Optional('console'): {
             'enabled': bool,
             Optional('format'): And(str, len),
@@ -20,6 +23,117 @@ config_schema = Schema({
             Optional('max_size_mb'): And(Use(int), lambda n: n > 0),
             Optional('backup_count'): And(Use(int), lambda n: n >= 0),
             Optional('format'):  And(str, len),
+            Optional('json_lines'): bool,
         }
-    }
+    },
+    Optional('transport'): {
+        'type': And(str, lambda s: s in ['stdio', 'sse']),
+        Optional('host'): And(str, len),
+        Optional('port'): And(Use(int), lambda n: 0 < n < 65536),
+        Optional('sse_path'): And(str, lambda s: s.startswith('/')),
+        Optional('message_path'): And(str, lambda s: s.startswith('/')),
+    },
+    Optional('scan'): {
+        Optional('backend'): And(str, lambda s: s in ['nmap', 'asyncio']),
+        Optional('asyncio'): {
+            Optional('ports'): [And(Use(int), lambda n: 0 < n < 65536)],
+            Optional('concurrency'): And(Use(int), lambda n: n > 0),
+            Optional('probe_timeout_s'): And(Use(float), lambda n: n > 0),
+            Optional('icmp'): bool,
+            Optional('max_addresses'): And(Use(int), lambda n: n > 0),
+        },
+        Optional('sharding'): {
+            'enabled': bool,
+            Optional('workers'): And(Use(int), lambda n: n > 0),
+            Optional('prefix_length_v4'): And(Use(int), lambda n: 0 <= n <= 32),
+            Optional('prefix_length_v6'): And(Use(int), lambda n: 0 <= n <= 128),
+        },
+        Optional('incremental'): {
+            Optional('freshness_s'): And(Use(float), lambda n: n >= 0),
+            Optional('empty_freshness_s'): And(Use(float), lambda n: n >= 0),
+            Optional('block_prefix_length_v4'): And(Use(int), lambda n: 0 <= n <= 32),
+            Optional('block_prefix_length_v6'): And(Use(int), lambda n: 0 <= n <= 128),
+        },
+        Optional('timing'): {
+            'enabled': bool,
+            Optional('prefix_length_v4'): And(Use(int), lambda n: 0 <= n <= 32),
+            Optional('prefix_length_v6'): And(Use(int), lambda n: 0 <= n <= 128),
+            Optional('max_subnets'): And(Use(int), lambda n: n > 0),
+            Optional('target_miss'): And(Use(float), lambda n: 0 < n < 1),
+            Optional('max_retries'): And(Use(int), lambda n: 0 <= n <= 10),
+        },
+        Optional('discovery'): {
+            Optional('technique'): And(str, lambda s: s in ['auto', 'arp', 'icmp-tcp', 'icmp']),
+        },
+        Optional('port_scan'): {
+            Optional('workers'): And(Use(int), lambda n: n > 0),
+            Optional('hosts_per_task'): And(Use(int), lambda n: n > 0),
+            Optional('ports_per_task'): And(Use(int), lambda n: n > 0),
+            Optional('technique'): And(str, lambda s: s in ['auto', 'syn', 'connect']),
+        },
+    },
+    Optional('cache'): {
+        'enabled': bool,
+        Optional('ttl_s'): And(Use(float), lambda n: n > 0),
+        Optional('max_entries'): And(Use(int), lambda n: n > 0),
+    },
+    Optional('inventory'): {
+        'enabled': bool,
+        Optional('path'): And(str, len),
+        Optional('retention_s'): And(Use(int), lambda n: n >= 0),
+    },
+    Optional('scheduler'): {
+        'enabled': bool,
+        Optional('max_concurrent'): And(Use(int), lambda n: n > 0),
+        Optional('max_rate_pps'): And(Use(int), lambda n: n >= 0),
+    },
+    Optional('cluster'): {
+        'enabled': bool,
+        Optional('host'): And(str, len),
+        Optional('port'): And(Use(int), lambda n: 0 < n < 65536),
+        Optional('token'): str,
+        Optional('capacity'): And(Use(int), lambda n: n > 0),
+        Optional('heartbeat_interval_s'): And(Use(float), lambda n: n > 0),
+        Optional('heartbeat_timeout_s'): And(Use(float), lambda n: n > 0),
+        Optional('max_attempts'): And(Use(int), lambda n: n > 0),
+        Optional('wait_s'): And(Use(float), lambda n: n > 0),
+    },
+    Optional('dns'): {
+        'enabled': bool,
+        Optional('servers'): [And(str, len)],
+        Optional('concurrency'): And(Use(int), lambda n: n > 0),
+        Optional('timeout_s'): And(Use(float), lambda n: n > 0),
+        Optional('retries'): And(Use(int), lambda n: n >= 0),
+        Optional('max_ttl_s'): And(Use(int), lambda n: n >= 0),
+        Optional('negative_ttl_s'): And(Use(int), lambda n: n >= 0),
+        Optional('max_entries'): And(Use(int), lambda n: n > 0),
+    },
+    Optional('results'): {
+        'enabled': bool,
+        Optional('page_size'): And(Use(int), lambda n: 0 < n <= 4096),
+        Optional('max_results'): And(Use(int), lambda n: n > 0),
+        Optional('max_bytes'): And(Use(int), lambda n: n > 0),
+        Optional('ttl_s'): And(Use(float), lambda n: n > 0),
+    },
+    Optional('progress'): {
+        'enabled': bool,
+        Optional('interval_s'): And(Use(float), lambda n: n > 0),
+    },
+    Optional('metrics'): {
+        'enabled': bool,
+        Optional('prometheus'): {
+            'enabled': bool,
+            Optional('path'): And(str, len),
+            Optional('interval_s'): And(Use(float), lambda n: n > 0),
+        },
+    },
+    Optional('reload'): {
+        'enabled': bool,
+        Optional('interval_s'): And(Use(float), lambda n: n > 0),
+    },
+    Optional('jobs'): {
+        'enabled': bool,
+        Optional('max_jobs'): And(Use(int), lambda n: n > 0),
+        Optional('retention_s'): And(Use(float), lambda n: n >= 0),
+    },
 })
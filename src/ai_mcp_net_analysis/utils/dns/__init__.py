@@ -0,0 +1,2 @@
+from .dns_message import DnsError, DnsAnswer, DnsMessage  # noqa: F401
+from .dns_resolver import ReverseResolver  # noqa: F401
@@ -0,0 +1,134 @@
+import struct
+from dataclasses import dataclass
+
+
+class DnsError(Exception):
+    """
+    Custom exception for DNS errors.
+    """
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class DnsAnswer:
+    """
+    Answer to a PTR query.
+    """
+    query_id: int
+    # Queried name, e.g. '1.0.0.10.in-addr.arpa'
+    qname: str
+    rcode: int
+    # Host name of the PTR record, None if the address has none
+    name: str | None
+    # Time to live of the answer in seconds, for a negative answer the one of the zone SOA record, None if unknown
+    ttl: int | None
+
+
+class DnsMessage:
+    """
+    Encoding of the PTR queries and decoding of their answers, in the DNS wire format (RFC 1035).
+    """
+
+    # Header: id, flags, questions, answers, authority and additional records
+    HEADER = struct.Struct(">HHHHHH")
+    # Resource record after its name: type, class, time to live, data length
+    RECORD = struct.Struct(">HHIH")
+
+    FLAG_RD = 0x0100
+    FLAG_TC = 0x0200
+    TYPE_PTR = 12
+    TYPE_SOA = 6
+    CLASS_IN = 1
+
+    RCODE_NOERROR = 0
+    RCODE_NXDOMAIN = 3
+
+    # Maximum number of compression pointers followed in a name
+    MAX_POINTERS = 32
+
+    @classmethod
+    def ptr_query(cls, query_id: int, qname: str) -> bytes:
+        """
+        Encode a recursive PTR query.
+        :param query_id: The query identifier.
+        :param qname: The reverse name, e.g. '1.0.0.10.in-addr.arpa'.
+        :return: The query message.
+        """
+        labels = b"".join(
+            len(label).to_bytes(1, "big") + label for label in qname.rstrip(".").encode("ascii").split(b".")
+        )
+        return (
+            cls.HEADER.pack(query_id, cls.FLAG_RD, 1, 0, 0, 0)
+            + labels + b"\x00"
+            + struct.pack(">HH", cls.TYPE_PTR, cls.CLASS_IN)
+        )
+
+    @classmethod
+    def _name(cls, data: bytes, offset: int) -> tuple[str, int]:
+        """
+        Decode a possibly compressed name.
+        :return: The name and the offset following it in the message.
+        """
+        labels = []
+        end = None
+        for _ in range(cls.MAX_POINTERS):
+            while True:
+                length = data[offset]
+                if length & 0xC0 == 0xC0:
+                    if end is None:
+                        end = offset + 2
+                    offset = ((length & 0x3F) << 8) | data[offset + 1]
+                    break
+                offset += 1
+                if not length:
+                    return ".".join(labels), end if end is not None else offset
+                labels.append(data[offset:offset + length].decode("ascii", "replace"))
+                offset += length
+        raise DnsError("Too many compression pointers in a name")
+
+    @classmethod
+    def id_of(cls, data: bytes) -> int:
+        """
+        Get the identifier of a message.
+        :raises DnsError: If the message is shorter than its header.
+        """
+        if len(data) < cls.HEADER.size:
+            raise DnsError("Truncated DNS message")
+        return int.from_bytes(data[:2], "big")
+
+    @classmethod
+    def parse_ptr_answer(cls, data: bytes) -> DnsAnswer:
+        """
+        Decode the answer to a PTR query: the first PTR record of the answer section, or for a negative answer the
+        time to live of the SOA record of the authority section (RFC 2308).
+        :param data: The answer message.
+        :return: The decoded answer.
+        :raises DnsError: If the message is malformed or truncated.
+        """
+        try:
+            query_id, flags, questions, answers, authorities, _ = cls.HEADER.unpack_from(data)
+            if flags & cls.FLAG_TC:
+                raise DnsError("Truncated DNS answer")
+            offset = cls.HEADER.size
+            qname = ""
+            for _ in range(questions):
+                qname, offset = cls._name(data, offset)
+                offset += 4
+
+            name = None
+            ttl = None
+            for index in range(answers + authorities):
+                _, offset = cls._name(data, offset)
+                rtype, _, record_ttl, length = cls.RECORD.unpack_from(data, offset)
+                offset += cls.RECORD.size
+                if index < answers and rtype == cls.TYPE_PTR and name is None:
+                    name, _ = cls._name(data, offset)
+                    ttl = record_ttl
+                elif index >= answers and rtype == cls.TYPE_SOA and name is None:
+                    # The negative answer lives for the smallest of the SOA record TTL and its minimum field
+                    minimum = int.from_bytes(data[offset + length - 4:offset + length], "big")
+                    ttl = min(record_ttl, minimum)
+                offset += length
+        except (IndexError, struct.error) as e:
+            raise DnsError(f"Malformed DNS answer: {e}") from e
+        return DnsAnswer(query_id, qname, flags & 0x000F, name, ttl)
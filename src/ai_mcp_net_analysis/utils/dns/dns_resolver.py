@@ -0,0 +1,273 @@
+import asyncio
+import ipaddress
+import random
+import socket
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from ..logger import LoggerFactory
+from ..metrics import MetricsRegistry
+from .dns_message import DnsError, DnsMessage
+
+
+class _DnsProtocol(asyncio.DatagramProtocol):
+    """
+    UDP endpoint of the resolver, matching the answers to the pending queries by identifier.
+    """
+
+    def __init__(self):
+        self.pending: dict[int, asyncio.Future] = {}
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        try:
+            future = self.pending.get(DnsMessage.id_of(data))
+        except DnsError:
+            return
+        if future is not None and not future.done():
+            future.set_result(data)
+
+    def error_received(self, exc: Exception) -> None:
+        # An ICMP port unreachable answering a query, the queries in flight time out or are sent again
+        LoggerFactory.get_logger().log_debug("DNS socket error: %s", exc)
+
+
+class ReverseResolver:
+    """
+    Asynchronous reverse DNS resolver.
+    The addresses are resolved with PTR queries sent over UDP to the name servers, all at once in batches, with at
+    most a number of queries in flight. The answers are cached for their time to live, the negative ones (no PTR
+    record) too, for the TTL of the zone SOA record (RFC 2308), both capped. Failures (timeout, server failure) are
+    cached as negative answers for a short time, so that an unreachable name server does not delay every sweep.
+    """
+
+    # Defaults, overridden by the dns configuration section
+    DEFAULT_CONCURRENCY = 64
+    DEFAULT_TIMEOUT_S = 1.0
+    DEFAULT_RETRIES = 1
+    DEFAULT_MAX_TTL_S = 3600
+    DEFAULT_NEGATIVE_TTL_S = 300
+    DEFAULT_MAX_ENTRIES = 65536
+
+    # Time in s a failed resolution is cached as a negative answer
+    FAILURE_TTL_S = 30
+
+    # Name server when resolv.conf lists none
+    FALLBACK_SERVER = "127.0.0.1"
+    RESOLV_CONF = "/etc/resolv.conf"
+    DNS_PORT = 53
+
+    def __init__(
+        self,
+        servers: list[str] | None = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        timeout_s: float = DEFAULT_TIMEOUT_S,
+        retries: int = DEFAULT_RETRIES,
+        max_ttl_s: int = DEFAULT_MAX_TTL_S,
+        negative_ttl_s: int = DEFAULT_NEGATIVE_TTL_S,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        """
+        Initialize the resolver, its socket is opened on first use.
+        :param servers: Name servers as 'host' or 'host:port' ('[host]:port' for IPv6), None or empty for the ones
+            of resolv.conf.
+        :param concurrency: Maximum number of queries in flight.
+        :param timeout_s: Time in seconds to wait for an answer before sending the query again.
+        :param retries: Number of times a query is sent again, to the next name server.
+        :param max_ttl_s: Maximum time in seconds an answer is cached.
+        :param negative_ttl_s: Maximum time in seconds a negative answer is cached, and its time when the name
+            server sends no SOA record.
+        :param max_entries: Maximum number of cached answers, the least recently used are dropped first.
+        """
+        self._servers = [self._parse_server(server) for server in (servers or self._system_servers())]
+        self._timeout_s = timeout_s
+        self._retries = retries
+        self._max_ttl_s = max_ttl_s
+        self._negative_ttl_s = negative_ttl_s
+        self._max_entries = max_entries
+        self._concurrency = concurrency
+        # Cached host names by address, None for a negative answer, with their expiration time
+        self._cache: OrderedDict[str, tuple[str | None, float]] = OrderedDict()
+        # Resolutions in flight by address, shared by the batches asking for the same address
+        self._inflight: dict[str, asyncio.Task] = {}
+        # Socket and queries in flight cap of the event loop the resolver runs in
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._transport: asyncio.DatagramTransport | None = None
+        self._protocol: _DnsProtocol | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._stats = dict(hits=0, negative_hits=0, queries=0, answers=0, negative=0, failures=0)
+
+    @classmethod
+    def _system_servers(cls) -> list[str]:
+        """
+        Get the name servers of resolv.conf.
+        """
+        try:
+            lines = Path(cls.RESOLV_CONF).read_text().splitlines()
+        except OSError:
+            lines = []
+        servers = [line.split()[1] for line in lines if line.startswith("nameserver") and len(line.split()) > 1]
+        return servers or [cls.FALLBACK_SERVER]
+
+    @classmethod
+    def _parse_server(cls, server: str) -> tuple[str, int]:
+        """
+        Parse a name server as 'host', 'host:port' or '[host]:port'.
+        :raises ValueError: If the address is invalid.
+        """
+        host, port = server, cls.DNS_PORT
+        if server.startswith("["):
+            host, _, port = server[1:].partition("]")
+            port = int(port[1:]) if port else cls.DNS_PORT
+        elif server.count(":") == 1:
+            host, port = server.split(":")
+            port = int(port)
+        # A zone index is not an address, e.g. 'fe80::1%eth0'
+        ipaddress.ip_address(host.split("%")[0])
+        return host, port
+
+    async def _open(self) -> None:
+        """
+        Open the socket for the running loop, again if the loop changed.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and not self._transport.is_closing():
+            return
+        if self._transport is not None:
+            self._transport.close()
+        # The socket family is the one of the first name server
+        family = socket.AF_INET6 if ":" in self._servers[0][0] else socket.AF_INET
+        self._transport, self._protocol = await loop.create_datagram_endpoint(_DnsProtocol, family=family)
+        self._loop = loop
+        self._inflight = {}
+        self._semaphore = asyncio.Semaphore(self._concurrency)
+
+    def _cached(self, ip: str) -> tuple[bool, str | None]:
+        """
+        Look up an address in the cache.
+        :return: Whether the answer is cached, and the cached host name.
+        """
+        entry = self._cache.get(ip)
+        if entry is None:
+            return False, None
+        if entry[1] <= time.monotonic():
+            del self._cache[ip]
+            return False, None
+        self._cache.move_to_end(ip)
+        self._stats["hits" if entry[0] is not None else "negative_hits"] += 1
+        return True, entry[0]
+
+    def _store(self, ip: str, name: str | None, ttl: float) -> None:
+        """
+        Cache a host name, None for a negative answer, for a time to live in seconds.
+        """
+        if ttl <= 0:
+            return
+        self._cache[ip] = (name, time.monotonic() + ttl)
+        self._cache.move_to_end(ip)
+        while len(self._cache) > self._max_entries:
+            self._cache.popitem(last=False)
+
+    async def _query(self, ip: str) -> str | None:
+        """
+        Resolve an address with a PTR query, sent again to the next name server on timeout.
+        :return: The host name, None if the address has none.
+        :raises DnsError: If no name server answers, or all fail.
+        """
+        qname = ipaddress.ip_address(ip).reverse_pointer
+        error = None
+        async with self._semaphore:
+            for attempt in range(self._retries + 1):
+                server = self._servers[attempt % len(self._servers)]
+                query_id = random.getrandbits(16)
+                while query_id in self._protocol.pending:
+                    query_id = random.getrandbits(16)
+                future = self._loop.create_future()
+                self._protocol.pending[query_id] = future
+                self._stats["queries"] += 1
+                try:
+                    self._transport.sendto(DnsMessage.ptr_query(query_id, qname), server)
+                    answer = DnsMessage.parse_ptr_answer(await asyncio.wait_for(future, self._timeout_s))
+                except asyncio.TimeoutError:
+                    error = DnsError(f"No answer from {server[0]}:{server[1]} within {self._timeout_s}s")
+                    continue
+                except (DnsError, OSError) as e:
+                    error = e
+                    continue
+                finally:
+                    self._protocol.pending.pop(query_id, None)
+                if answer.qname.lower() != qname.lower():
+                    error = DnsError(f"Answer for {answer.qname} to the query for {qname}")
+                    continue
+                if answer.rcode not in (DnsMessage.RCODE_NOERROR, DnsMessage.RCODE_NXDOMAIN):
+                    error = DnsError(f"Name server {server[0]}:{server[1]} failed with rcode {answer.rcode}")
+                    continue
+                if answer.name is not None:
+                    self._stats["answers"] += 1
+                    self._store(ip, answer.name, min(answer.ttl, self._max_ttl_s))
+                else:
+                    self._stats["negative"] += 1
+                    ttl = answer.ttl if answer.ttl is not None else self._negative_ttl_s
+                    self._store(ip, None, min(ttl, self._negative_ttl_s))
+                return answer.name
+        raise error
+
+    async def _resolve(self, ip: str) -> str | None:
+        """
+        Resolve an address, failures logged.
+        :return: The host name, None if the address has none or the resolution failed.
+        """
+        try:
+            return await self._query(ip)
+        except DnsError as e:
+            self._stats["failures"] += 1
+            LoggerFactory.get_logger().log_debug("Reverse DNS of %s failed: %s", ip, e)
+            self._store(ip, None, min(self.FAILURE_TTL_S, self._negative_ttl_s))
+            return None
+
+    def _task(self, ip: str) -> asyncio.Task:
+        """
+        Get the resolution in flight for an address, shared by the batches asking for it, started if none is.
+        """
+        task = self._inflight.get(ip)
+        if task is None:
+            task = self._loop.create_task(self._resolve(ip))
+            self._inflight[ip] = task
+            task.add_done_callback(lambda _: self._inflight.pop(ip, None))
+        return task
+
+    async def resolve(self, addresses: list[str]) -> dict[str, str | None]:
+        """
+        Resolve a batch of addresses, the cached answers first, then the others with queries sent concurrently.
+        :param addresses: The IPv4 or IPv6 addresses.
+        :return: The host names by address, None for an address without one or whose resolution failed.
+        """
+        names = {}
+        missing = []
+        for ip in dict.fromkeys(addresses):
+            cached, name = self._cached(ip)
+            if cached:
+                names[ip] = name
+            else:
+                missing.append(ip)
+        if missing:
+            await self._open()
+            with MetricsRegistry.get_registry().track("dns_batch_seconds"):
+                # A cancelled batch leaves the resolutions running for the other batches sharing them
+                resolved = await asyncio.shield(asyncio.gather(*(self._task(ip) for ip in missing)))
+            names.update(zip(missing, resolved))
+        return names
+
+    def clear(self) -> None:
+        """
+        Drop the cached answers.
+        """
+        self._cache.clear()
+
+    def get_stats(self) -> dict:
+        """
+        Get the resolver counters.
+        :return: The hits, negative hits, queries, answers, negative answers and failures counters, and the number of
+            cached answers.
+        """
+        return dict(self._stats, entries=len(self._cache))
@@ -0,0 +1,2 @@
+from .inventory import InventoryStore, InventoryError, HostObservation  # noqa: F401
+from .inventory_delta import InventoryDelta, DeltaPlan  # noqa: F401
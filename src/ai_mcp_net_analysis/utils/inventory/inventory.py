@@ -0,0 +1,262 @@
+import sqlite3
+import threading
+from dataclasses import dataclass
+from ipaddress import ip_address, IPv4Address, IPv6Address, IPv4Network, IPv6Network
+from pathlib import Path
+
+from ..nmap import NmapHost
+
+
+class InventoryError(Exception):
+    """
+    Custom exception for host inventory errors.
+    """
+    pass
+
+
+@dataclass(slots=True)
+class HostObservation:
+    """
+    Host state observed by a scan at a given time.
+    """
+    ip: str
+    ts: float
+    state: str
+    latency_ms: float | None = None
+    mac: str | None = None
+    vendor: str | None = None
+    hostname: str | None = None
+
+
+class InventoryStore:
+    """
+    Persistent host inventory backed by an embedded SQLite database.
+    Each scan records the covered address range and the observed hosts. Addresses are stored as their IP version
+    byte followed by a 16 bytes big-endian integer, so that IPv4 and IPv6 ranges are answered by the same ordered
+    index and IPv4-mapped IPv6 addresses (::ffff:a.b.c.d) are kept apart from the IPv4 ones.
+    The scans and observations older than the retention period are pruned when a scan is recorded, so that the
+    tables, and the time of the queries, stay bounded.
+    """
+
+    # Default path of the database file
+    DEFAULT_PATH = "data/inventory.sqlite"
+
+    # Default retention period in s of the scans and observations, 0 to keep them forever
+    DEFAULT_RETENTION_S = 30 * 24 * 3600
+
+    # Version of the database schema, stored as the database user_version. Version 0 stored the addresses without
+    # their IP version, IPv4 addresses mapped into ::ffff:0:0/96
+    SCHEMA_VERSION = 1
+
+    # Database schema
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS scans (
+            id INTEGER PRIMARY KEY,
+            target TEXT NOT NULL,
+            ip_first BLOB NOT NULL,
+            ip_last BLOB NOT NULL,
+            ts REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS scans_ts ON scans (ts);
+        CREATE TABLE IF NOT EXISTS observations (
+            ip BLOB NOT NULL,
+            ts REAL NOT NULL,
+            state TEXT NOT NULL,
+            latency_ms REAL,
+            mac TEXT,
+            vendor TEXT,
+            hostname TEXT
+        );
+        CREATE INDEX IF NOT EXISTS observations_ip_ts ON observations (ip, ts);
+        CREATE INDEX IF NOT EXISTS observations_ts ON observations (ts);
+    """
+
+    # Latest observation of each address of a range up to a time. The bare columns of the SELECT are intentionally
+    # not aggregated: with a single MAX() aggregate SQLite takes them from the row holding the maximum
+    _LATEST_QUERY = """
+        SELECT ip, MAX(ts) AS ts, state, latency_ms, mac, vendor, hostname
+        FROM observations
+        WHERE ip BETWEEN :ip_first AND :ip_last AND ts <= :ts {state}
+        GROUP BY ip
+        ORDER BY ip
+    """
+
+    # Addresses up in their latest observation and not omitted by a later scan covering them
+    _ALIVE_QUERY = """
+        SELECT * FROM ({latest}) AS latest
+        WHERE latest.state = 'up' AND NOT EXISTS (
+            SELECT 1 FROM scans
+            WHERE scans.ts > latest.ts AND scans.ts <= :ts
+            AND scans.ip_first <= latest.ip AND scans.ip_last >= latest.ip
+        )
+    """.format(latest=_LATEST_QUERY.format(state=""))
+
+    def __init__(self, path: str, retention_s: int = DEFAULT_RETENTION_S):
+        """
+        Open or create the inventory database.
+        :param path: Path of the SQLite database file.
+        :param retention_s: Retention period in seconds of the scans and observations, 0 to keep them forever.
+        """
+        self._retention_s = retention_s
+        db_file = Path(path)
+        try:
+            db_file.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(db_file, check_same_thread=False)
+            self._db.executescript(self.SCHEMA)
+            self._migrate()
+            self._db.execute("PRAGMA journal_mode=WAL")
+        except (OSError, sqlite3.Error) as e:
+            raise InventoryError(f"Cannot open host inventory {path}: {e}") from e
+        # The connection is shared by the worker threads
+        self._lock = threading.Lock()
+
+    def _migrate(self) -> None:
+        """
+        Upgrade a database written with a previous schema version.
+        """
+        if self._db.execute("PRAGMA user_version").fetchone()[0] >= self.SCHEMA_VERSION:
+            return
+        with self._db:
+            # Version 0 keys are 16 bytes long, without the IP version byte
+            observations = self._db.execute("SELECT rowid, ip FROM observations WHERE length(ip) = 16").fetchall()
+            self._db.executemany(
+                "UPDATE observations SET ip = ? WHERE rowid = ?",
+                [(self._legacy_key(ip), rowid) for rowid, ip in observations],
+            )
+            scans = self._db.execute("SELECT id, ip_first, ip_last FROM scans WHERE length(ip_first) = 16").fetchall()
+            self._db.executemany(
+                "UPDATE scans SET ip_first = ?, ip_last = ? WHERE id = ?",
+                [(self._legacy_key(first), self._legacy_key(last), scan_id) for scan_id, first, last in scans],
+            )
+            self._db.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+    @staticmethod
+    def _legacy_key(key: bytes) -> bytes:
+        """
+        Convert an address key of schema version 0, where IPv4 addresses were mapped into ::ffff:0:0/96.
+        """
+        value = int.from_bytes(key, "big")
+        if value >> 32 == 0xffff:
+            return bytes((4,)) + (value & 0xffffffff).to_bytes(16, "big")
+        return bytes((6,)) + key
+
+    @staticmethod
+    def _ip_key(ip: str) -> bytes:
+        """
+        Encode an address as its IP version byte followed by a 16 bytes big-endian integer.
+        """
+        address = ip_address(ip)
+        return bytes((address.version,)) + int(address).to_bytes(16, "big")
+
+    @staticmethod
+    def _ip_str(key: bytes) -> str:
+        """
+        Decode an address encoded by _ip_key.
+        """
+        value = int.from_bytes(key[1:], "big")
+        return str(IPv4Address(value) if key[0] == 4 else IPv6Address(value))
+
+    @staticmethod
+    def _range(network: IPv4Network | IPv6Network) -> tuple[bytes, bytes]:
+        """
+        Encode the first and last addresses of a network.
+        """
+        return (
+            InventoryStore._ip_key(str(network.network_address)),
+            InventoryStore._ip_key(str(network.broadcast_address)),
+        )
+
+    def record(self, network: IPv4Network | IPv6Network, ts: float, hosts: list[NmapHost]) -> None:
+        """
+        Record the hosts observed by a scan of a network.
+        :param network: The scanned network.
+        :param ts: The scan time as a POSIX timestamp.
+        :param hosts: The host records reported by the scan.
+        """
+        self.record_many([network], ts, hosts)
+
+    def record_many(self, networks: list[IPv4Network | IPv6Network], ts: float, hosts: list[NmapHost]) -> None:
+        """
+        Record the hosts observed by a scan of several networks, and prune the scans and observations older than
+        the retention period before the scan time.
+        :param networks: The scanned networks.
+        :param ts: The scan time as a POSIX timestamp.
+        :param hosts: The host records reported by the scan.
+        """
+        scans = [(str(network), *self._range(network), ts) for network in networks]
+        rows = [
+            (self._ip_key(host.ip), ts, host.state, host.latency_ms, host.mac, host.vendor, host.hostname)
+            for host in hosts if host.ip
+        ]
+        try:
+            with self._lock, self._db:
+                self._db.executemany("INSERT INTO scans (target, ip_first, ip_last, ts) VALUES (?, ?, ?, ?)", scans)
+                self._db.executemany("INSERT INTO observations VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                if self._retention_s:
+                    self._db.execute("DELETE FROM scans WHERE ts < ?", (ts - self._retention_s,))
+                    self._db.execute("DELETE FROM observations WHERE ts < ?", (ts - self._retention_s,))
+        except sqlite3.Error as e:
+            raise InventoryError(f"Cannot record scan of {', '.join(map(str, networks))}: {e}") from e
+
+    def scans_since(self, network: IPv4Network | IPv6Network, ts: float) -> list[tuple[int, int, float]]:
+        """
+        Get the address ranges of the scans overlapping a network since a time.
+        :param network: The network.
+        :param ts: The time as a POSIX timestamp.
+        :return: The (first address, last address, scan time) of the scans, addresses as integers.
+        """
+        ip_first, ip_last = self._range(network)
+        try:
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT ip_first, ip_last, ts FROM scans WHERE ts >= ? AND ip_first <= ? AND ip_last >= ?",
+                    (ts, ip_last, ip_first),
+                ).fetchall()
+        except sqlite3.Error as e:
+            raise InventoryError(f"Cannot query host inventory: {e}") from e
+        return [(int.from_bytes(first[1:], "big"), int.from_bytes(last[1:], "big"), ts) for first, last, ts in rows]
+
+    def _query(self, query: str, network: IPv4Network | IPv6Network, ts: float) -> list[HostObservation]:
+        """
+        Run an observations query over a network up to a time.
+        """
+        ip_first, ip_last = self._range(network)
+        try:
+            with self._lock:
+                rows = self._db.execute(query, dict(ip_first=ip_first, ip_last=ip_last, ts=ts)).fetchall()
+        except sqlite3.Error as e:
+            raise InventoryError(f"Cannot query host inventory: {e}") from e
+        return [self._observation(row) for row in rows]
+
+    def _observation(self, row: tuple) -> HostObservation:
+        """
+        Build an observation from a database row.
+        """
+        ip, ts, state, latency_ms, mac, vendor, hostname = row
+        return HostObservation(self._ip_str(ip), ts, state, latency_ms, mac, vendor, hostname)
+
+    def alive_at(self, network: IPv4Network | IPv6Network, ts: float) -> list[HostObservation]:
+        """
+        Get the hosts of a network that were up at a given time.
+        A host is up at a time if its latest observation is up and no later scan covering it omitted it.
+        :param network: The network.
+        :param ts: The time as a POSIX timestamp.
+        :return: The latest observation of the hosts up, in address order.
+        """
+        return self._query(self._ALIVE_QUERY, network, ts)
+
+    def last_seen(self, network: IPv4Network | IPv6Network, ts: float) -> list[HostObservation]:
+        """
+        Get the last time each host of a network was seen up.
+        :param network: The network.
+        :param ts: Ignore observations after this time, as a POSIX timestamp.
+        :return: The latest up observation of each host, in address order.
+        """
+        return self._query(self._LATEST_QUERY.format(state="AND state = 'up'"), network, ts)
+
+    def close(self) -> None:
+        """
+        Close the database.
+        """
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,163 @@
+from ipaddress import ip_address, summarize_address_range, IPv4Network, IPv6Network
+
+from ..nmap import NmapHost, HostChange
+from .inventory import InventoryStore, InventoryError, HostObservation
+
+
+class DeltaPlan:
+    """
+    Address blocks of a network to probe again, because their last scan is older than their freshness window.
+    """
+
+    def __init__(self, network: IPv4Network | IPv6Network, block_prefix_length: int, stale: list[int]):
+        """
+        Initialize the plan.
+        :param network: The network.
+        :param block_prefix_length: Prefix length of the blocks.
+        :param stale: Indexes of the stale blocks, in address order.
+        """
+        self.network = network
+        self._base = int(network.network_address)
+        self._block_size = 1 << (network.max_prefixlen - block_prefix_length)
+        self._stale = set(stale)
+        self.targets = self._summarize(stale)
+
+    def _summarize(self, stale: list[int]) -> list[IPv4Network | IPv6Network]:
+        """
+        Merge runs of consecutive stale blocks into the smallest list of networks.
+        """
+        targets = []
+        run_start = None
+        for position, index in enumerate(stale):
+            if run_start is None:
+                run_start = index
+            if position + 1 < len(stale) and stale[position + 1] == index + 1:
+                continue
+            first = ip_address(self._base + run_start * self._block_size)
+            last = ip_address(self._base + (index + 1) * self._block_size - 1)
+            targets.extend(summarize_address_range(first, last))
+            run_start = None
+        return targets
+
+    def is_stale(self, ip: str) -> bool:
+        """
+        Check if an address belongs to a block probed again.
+        """
+        return (int(ip_address(ip)) - self._base) // self._block_size in self._stale
+
+    @property
+    def probed(self) -> int:
+        """
+        Number of addresses probed again.
+        """
+        return len(self._stale) * self._block_size
+
+
+class InventoryDelta:
+    """
+    Incremental scanning support: plans the blocks to probe again from the scans recorded in the inventory
+    and computes the changes between the recorded state and a new scan.
+    Blocks where no host was ever seen up are probed less often.
+    """
+
+    # Maximum number of blocks of a network
+    MAX_BLOCKS = 1 << 16
+
+    def __init__(
+        self,
+        inventory: InventoryStore,
+        freshness_s: float,
+        empty_freshness_s: float,
+        block_prefix_length: int,
+    ):
+        """
+        Initialize the delta planner.
+        :param inventory: The host inventory.
+        :param freshness_s: Age in seconds after which a block is probed again.
+        :param empty_freshness_s: Age in seconds after which a block without known hosts is probed again.
+        :param block_prefix_length: Prefix length of the blocks.
+        """
+        self._inventory = inventory
+        self._freshness_s = freshness_s
+        self._empty_freshness_s = max(empty_freshness_s, freshness_s)
+        self._block_prefix_length = block_prefix_length
+
+    def plan(self, network: IPv4Network | IPv6Network, now: float) -> DeltaPlan:
+        """
+        Find the blocks of a network to probe again.
+        :param network: The network.
+        :param now: The current time as a POSIX timestamp.
+        :return: The plan.
+        """
+        block_prefix_length = max(self._block_prefix_length, network.prefixlen)
+        blocks = 1 << (block_prefix_length - network.prefixlen)
+        if blocks > self.MAX_BLOCKS:
+            raise InventoryError(
+                f"Network {network} has too many /{block_prefix_length} blocks for an incremental scan."
+            )
+        base = int(network.network_address)
+        block_size = 1 << (network.max_prefixlen - block_prefix_length)
+
+        # Time of the last scan covering each block entirely
+        last_scan = [0.0] * blocks
+        for first, last, ts in self._inventory.scans_since(network, now - self._empty_freshness_s):
+            first_block = max(-(-(first - base) // block_size), 0)
+            last_block = min((last + 1 - base) // block_size - 1, blocks - 1)
+            for index in range(first_block, last_block + 1):
+                last_scan[index] = max(last_scan[index], ts)
+
+        # Blocks where a host was seen up
+        occupied = {
+            (int(ip_address(observation.ip)) - base) // block_size
+            for observation in self._inventory.last_seen(network, now)
+        }
+
+        stale = [
+            index for index in range(blocks)
+            if now - last_scan[index] > (self._freshness_s if index in occupied else self._empty_freshness_s)
+        ]
+        return DeltaPlan(network, block_prefix_length, stale)
+
+    @staticmethod
+    def diff(
+        plan: DeltaPlan,
+        previous: list[HostObservation],
+        hosts: list[NmapHost],
+    ) -> tuple[list[HostChange], list[NmapHost]]:
+        """
+        Compute the changes between the recorded state and a scan of the stale blocks.
+        :param plan: The plan of the scan.
+        :param previous: The hosts up before the scan.
+        :param hosts: The hosts reported by the scan.
+        :return: The changes and the merged current view, in address order.
+        """
+        previous_by_ip = {observation.ip: observation for observation in previous}
+        current_by_ip = {host.ip: host for host in hosts if host.state == "up"}
+
+        changes = []
+        for ip, host in current_by_ip.items():
+            observation = previous_by_ip.get(ip)
+            if observation is None:
+                changes.append(HostChange("up", host))
+            elif host.mac and observation.mac and host.mac != observation.mac:
+                changes.append(HostChange("mac", host, observation.mac))
+
+        current = list(current_by_ip.values())
+        for ip, observation in previous_by_ip.items():
+            host = NmapHost(
+                ip, observation.state, observation.latency_ms, observation.mac, observation.vendor,
+                observation.hostname,
+            )
+            if not plan.is_stale(ip):
+                # Fresh block, not probed: keep the recorded state
+                current.append(host)
+            elif ip not in current_by_ip:
+                host.state = "down"
+                changes.append(HostChange("down", host))
+
+        def address_key(item: NmapHost) -> int:
+            return int(ip_address(item.ip))
+
+        changes.sort(key=lambda change: address_key(change.host))
+        current.sort(key=address_key)
+        return changes, current
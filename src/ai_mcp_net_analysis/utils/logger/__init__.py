@@ -1,3 +1,5 @@
 from .logger import Logger, LoggerError  # noqa: F401
 from .logger_factory import LoggerFactory  # noqa: F401
 from .logger_file import FileLogger  # noqa: F401
+from .logger_json import JsonLinesFormatter  # noqa: F401
+from .logger_queue import LogQueueHandler, LogTruncateFilter  # noqa: F401
@@ -15,41 +15,59 @@ class Logger(ABC):
     """
 
     @abstractmethod
-    def log_info(self, message: str) -> None:
+    def log_info(self, message: str, *args) -> None:
         """
         Log an informational message.
         :param message: The message to log.
+        :param args: Arguments merged into the message with the % operator, only if the message is logged.
         """
         pass
 
     @abstractmethod
-    def log_warning(self, message: str) -> None:
+    def log_warning(self, message: str, *args) -> None:
         """
         Log a warning message.
         :param message: The message to log.
+        :param args: Arguments merged into the message with the % operator, only if the message is logged.
         """
         pass
 
     @abstractmethod
-    def log_error(self, message: str) -> None:
+    def log_error(self, message: str, *args) -> None:
         """
         Log an error message.
         :param message: The message to log.
+        :param args: Arguments merged into the message with the % operator, only if the message is logged.
         """
         pass
 
     @abstractmethod
-    def log_critical(self, message: str) -> None:
+    def log_critical(self, message: str, *args) -> None:
         """
         Log a critical error message.
         :param message: The message to log.
+        :param args: Arguments merged into the message with the % operator, only if the message is logged.
         """
         pass
 
     @abstractmethod
-    def log_debug(self, message: str) -> None:
+    def log_debug(self, message: str, *args) -> None:
         """
         Log a debug message.
         :param message: The message to log.
+        :param args: Arguments merged into the message with the % operator, only if the message is logged.
+        """
+        pass
+
+    def close(self) -> None:
+        """
+        Flush the pending messages and release the logger resources.
+        """
+        pass
+
+    def set_level(self, level: str) -> None:
+        """
+        Change the logging level.
+        :param level: The level name: DEBUG, INFO, WARNING, ERROR or CRITICAL.
         """
         pass
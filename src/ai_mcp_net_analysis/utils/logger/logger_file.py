@@ -1,9 +1,13 @@
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueListener, RotatingFileHandler
 from pathlib import Path
 
 
 from .logger import Logger, LoggerError
+from .logger_json import JsonLinesFormatter
+from .logger_queue import LogQueueHandler, LogTruncateFilter
 from ..config import ConfigData
 
 # Constants
@@ -11,11 +15,16 @@ FILELOG_PATH = "logs/ai-mcp-net-analysis-server.log"
 FILELOG_MAX_SIDE_MB = 10
 FILELOG_BACKUP_COUNTS = 5
 FILELOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+LOG_ASYNC = True
+LOG_QUEUE_SIZE = 10000
+LOG_MAX_MESSAGE_CHARS = 8192
 
 
 class FileLogger(Logger):
     """
     A logger that writes log messages to a file.
+    By default the records are queued and written by a background thread, so that logging does not block the
+    event loop on file writes.
     """
 
     def __init__(self, config_data: ConfigData):
@@ -35,6 +44,10 @@ class FileLogger(Logger):
         self._backup_count = config_data.logging.file.get_value("backup_count", FILELOG_BACKUP_COUNTS)
         self._format = config_data.logging.file.get_value("format", FILELOG_FORMAT)
         self._path = config_data.logging.file.get_value("path", FILELOG_PATH)
+        self._json_lines = config_data.logging.file.get_value("json_lines", False)
+        self._async = config_data.logging.get_value("async", LOG_ASYNC)
+        self._queue_size = config_data.logging.get_value("queue_size", LOG_QUEUE_SIZE)
+        self._max_message_chars = config_data.logging.get_value("max_message_chars", LOG_MAX_MESSAGE_CHARS)
 
         # Create the log directory if it doesn't exist
         log_file = Path(self._path).resolve()
@@ -58,44 +71,92 @@ class FileLogger(Logger):
             backupCount=self._backup_count,
         )
         self._handler.setLevel(self._level)
-        self._handler.setFormatter(logging.Formatter(self._format))
-        logger.addHandler(self._handler)
+        self._handler.setFormatter(JsonLinesFormatter() if self._json_lines else logging.Formatter(self._format))
+
+        # Queue the records for a background writer, the file handler is then only called by the listener
+        self._listener = None
+        self._queue_handler = None
+        handler = self._handler
+        if self._async:
+            self._queue_handler = LogQueueHandler(queue.Queue(self._queue_size))
+            self._queue_handler.setLevel(self._level)
+            self._listener = QueueListener(self._queue_handler.queue, self._handler, respect_handler_level=True)
+            self._listener.start()
+            atexit.register(self.close)
+            handler = self._queue_handler
+
+        # Truncate the oversized messages before they are queued
+        handler.addFilter(LogTruncateFilter(self._max_message_chars))
+        logger.addHandler(handler)
 
         # Create the application logger
         self._logger = logging.getLogger(self._name)
         self._logger.propagate = True
 
-    def log_info(self, message: str) -> None:
+    def log_info(self, message: str, *args) -> None:
         """
         Log an informational message.
         :param message: The message to log.
+        :param args: Arguments merged into the message with the % operator, only if the message is logged.
         """
-        self._logger.info(message)
+        self._logger.info(message, *args)
 
-    def log_warning(self, message: str) -> None:
+    def log_warning(self, message: str, *args) -> None:
         """
         Log a warning message.
         :param message: The message to log.
+        :param args: Arguments merged into the message with the % operator, only if the message is logged.
         """
-        self._logger.warning(message)
+        self._logger.warning(message, *args)
 
-    def log_error(self, message: str) -> None:
+    def log_error(self, message: str, *args) -> None:
         """
         Log an error message.
         :param message: The message to log.
+        :param args: Arguments merged into the message with the % operator, only if the message is logged.
         """
-        self._logger.error(message)
+        self._logger.error(message, *args)
 
-    def log_critical(self, message: str) -> None:
+    def log_critical(self, message: str, *args) -> None:
         """
         Log a critical error message.
         :param message: The message to log.
+        :param args: Arguments merged into the message with the % operator, only if the message is logged.
         """
-        self._logger.critical(message)
+        self._logger.critical(message, *args)
 
-    def log_debug(self, message: str) -> None:
+    def log_debug(self, message: str, *args) -> None:
         """
         Log a debug message.
         :param message: The message to log.
+        :param args: Arguments merged into the message with the % operator, only if the message is logged.
         """
-        self._logger.debug(message)
+        self._logger.debug(message, *args)
+
+    def set_level(self, level: str) -> None:
+        """
+        Change the logging level.
+        :param level: The level name: DEBUG, INFO, WARNING, ERROR or CRITICAL.
+        """
+        self._level = level
+        logging.getLogger().setLevel(level)
+        self._handler.setLevel(level)
+        if self._queue_handler is not None:
+            self._queue_handler.setLevel(level)
+
+    def close(self) -> None:
+        """
+        Write the queued messages and stop the background writer.
+        """
+        if self._listener is None:
+            return
+        self._listener.stop()
+        self._listener = None
+        if self._queue_handler.dropped:
+            self._handler.handle(logging.makeLogRecord({
+                "name": self._name,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": f"{self._queue_handler.dropped} log messages dropped, the log queue was full",
+            }))
+        self._handler.flush()
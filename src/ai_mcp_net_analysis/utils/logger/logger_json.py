@@ -0,0 +1,25 @@
+import json
+import logging
+from datetime import datetime, timezone
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Formatter writing each record as a JSON object on a single line.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Format a record as a JSON line with its time, logger name, level and message.
+        """
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "name": record.name,
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
@@ -0,0 +1,65 @@
+import logging
+import queue
+from logging.handlers import QueueHandler
+
+
+class LogTruncateFilter(logging.Filter):
+    """
+    Filter truncating the oversized messages, such as command outputs, to a maximum number of characters.
+    The message arguments are merged only when the record passes the level checks, then dropped.
+    """
+
+    def __init__(self, max_chars: int):
+        """
+        Initialize the filter.
+        :param max_chars: Maximum number of characters of a message, 0 for no limit.
+        """
+        super().__init__()
+        self._max_chars = max_chars
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """
+        Truncate the message of the record if needed, the record is always kept.
+        """
+        if self._max_chars <= 0:
+            return True
+        # Truncate the long string arguments first, so that they are not copied whole into the message
+        if isinstance(record.args, tuple):
+            record.args = tuple(self._truncate(arg) if isinstance(arg, str) else arg for arg in record.args)
+        message = record.getMessage()
+        if len(message) > self._max_chars:
+            record.msg = self._truncate(message)
+            record.args = None
+        return True
+
+    def _truncate(self, text: str) -> str:
+        """
+        Truncate a text to the maximum number of characters, with a note of the number of characters removed.
+        """
+        if len(text) <= self._max_chars:
+            return text
+        return f"{text[:self._max_chars]}... [truncated {len(text) - self._max_chars} characters]"
+
+
+class LogQueueHandler(QueueHandler):
+    """
+    Handler passing the records to a bounded queue emptied by a background listener.
+    The records arriving while the queue is full are dropped and counted, logging never blocks the caller.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        """
+        Initialize the handler.
+        :param log_queue: The queue of the records.
+        """
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """
+        Add a record to the queue, or drop it if the queue is full.
+        """
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
@@ -0,0 +1,2 @@
+from .metrics import MetricsRegistry, Histogram  # noqa: F401
+from .metrics_writer import MetricsFileWriter  # noqa: F401
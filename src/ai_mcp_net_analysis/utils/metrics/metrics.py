@@ -0,0 +1,257 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+
+class Histogram:
+    """
+    Distribution of observed values over fixed buckets, with the sum and count of the values.
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        """
+        Initialize the histogram.
+        :param buckets: Upper bounds of the buckets, in increasing order, an overflow bucket is added.
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """
+        Record a value.
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def copy(self) -> "Histogram":
+        """
+        Copy the histogram.
+        """
+        histogram = Histogram(self.buckets)
+        histogram.counts = list(self.counts)
+        histogram.sum = self.sum
+        histogram.count = self.count
+        return histogram
+
+    def quantile(self, rank: float) -> float:
+        """
+        Estimate a quantile as the upper bound of the bucket holding it, the overflow bucket reports the
+        largest bound.
+        """
+        target = rank * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """
+    Process wide registry of counters, gauges and histograms, identified by a name and a set of labels.
+    Updates are a dictionary lookup and a few additions under a lock, cheap enough to stay enabled. Values
+    computed on demand are provided by collectors, called when the metrics are read.
+    """
+
+    # Prefix of the exported metric names
+    PREFIX = "mcp_net_"
+
+    # Default buckets of the latency histograms, in seconds
+    LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+    # Default buckets of the size histograms, in bytes
+    BYTES_BUCKETS = tuple(float(256 << (2 * n)) for n in range(10))
+
+    # Registry singleton instance
+    _instance = None
+
+    def __init__(self):
+        """
+        Initialize an empty registry.
+        """
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._counters: dict[tuple, float] = {}
+        self._gauges: dict[tuple, float] = {}
+        self._histograms: dict[tuple, Histogram] = {}
+        self._collectors: dict[str, Callable[[], dict | None]] = {}
+
+    @classmethod
+    def get_registry(cls) -> "MetricsRegistry":
+        """
+        Get the registry singleton instance.
+        """
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @staticmethod
+    def _key(name: str, labels: dict) -> tuple:
+        """
+        Identify a metric by its name and labels.
+        """
+        return (name, *sorted(labels.items())) if labels else (name,)
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        """
+        Increase a counter.
+        """
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def add(self, name: str, delta: float, **labels: str) -> None:
+        """
+        Change a gauge by a delta.
+        """
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            self._gauges[key] = self._gauges.get(key, 0) + delta
+
+    def observe(self, name: str, value: float, buckets: tuple[float, ...] = LATENCY_BUCKETS, **labels: str) -> None:
+        """
+        Record a value in a histogram.
+        """
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def track(self, name: str, **labels: str) -> Iterator[None]:
+        """
+        Measure an operation: in-flight count (<name>_in_flight), latency (<name>_seconds) and errors by type
+        (<name>_errors_total).
+        """
+        if not self.enabled:
+            yield
+            return
+        self.add(f"{name}_in_flight", 1, **labels)
+        start = time.perf_counter()
+        try:
+            yield
+        except GeneratorExit:
+            # Generator closed by its consumer, not an error
+            raise
+        except BaseException as e:
+            self.inc(f"{name}_errors_total", type=type(e).__name__, **labels)
+            raise
+        finally:
+            self.observe(f"{name}_seconds", time.perf_counter() - start, **labels)
+            self.add(f"{name}_in_flight", -1, **labels)
+
+    def register_collector(self, name: str, collector: Callable[[], dict | None]) -> None:
+        """
+        Register a function returning statistics, called when the metrics are read. The numeric statistics
+        are exported as <name>_<statistic> gauges, a collector registered again under the same name replaces
+        the previous one.
+        """
+        self._collectors[name] = collector
+
+    def clear(self) -> None:
+        """
+        Drop all the recorded values and collectors.
+        """
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+        self._collectors.clear()
+
+    def _collect(self) -> dict[tuple, float]:
+        """
+        Get the values of the collectors.
+        """
+        values = {}
+        for prefix, collector in self._collectors.items():
+            for name, value in (collector() or {}).items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    values[(f"{prefix}_{name}",)] = value
+        return values
+
+    @staticmethod
+    def _labels(key: tuple, extra: str = "") -> str:
+        """
+        Render the labels of a metric key in the Prometheus text format.
+        """
+        labels = [f'{name}="{value}"' for name, value in key[1:]]
+        if extra:
+            labels.append(extra)
+        return "{" + ",".join(labels) + "}" if labels else ""
+
+    def _snapshot(self) -> tuple[dict, dict, dict]:
+        """
+        Copy the recorded values, collector values included in the gauges.
+        :return: The (counters, gauges, histograms) tuple.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            histograms = {key: histogram.copy() for key, histogram in self._histograms.items()}
+        gauges.update(self._collect())
+        return counters, gauges, histograms
+
+    def to_summary(self) -> str:
+        """
+        Render the metrics as one line each, histograms summarized by their count, mean and estimated
+        50th and 95th percentiles.
+        """
+        counters, gauges, histograms = self._snapshot()
+        lines = [f"{key[0]}{self._labels(key)} {value:g}" for key, value in sorted({**counters, **gauges}.items())]
+        for key in sorted(histograms):
+            histogram = histograms[key]
+            mean = histogram.sum / histogram.count if histogram.count else 0.0
+            lines.append(
+                f"{key[0]}{self._labels(key)} count={histogram.count} mean={mean:.6g} "
+                f"p50<={histogram.quantile(0.5):g} p95<={histogram.quantile(0.95):g}"
+            )
+        return "\n".join(lines)
+
+    def to_prometheus(self) -> str:
+        """
+        Render the metrics in the Prometheus text exposition format.
+        """
+        counters, gauges, histograms = self._snapshot()
+
+        lines = []
+        for kind, values in (("counter", counters), ("gauge", gauges)):
+            declared = set()
+            for key in sorted(values):
+                name = self.PREFIX + key[0]
+                if name not in declared:
+                    declared.add(name)
+                    lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name}{self._labels(key)} {values[key]:g}")
+
+        declared = set()
+        for key in sorted(histograms):
+            histogram = histograms[key]
+            name = self.PREFIX + key[0]
+            if name not in declared:
+                declared.add(name)
+                lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, bucket_count in zip((*histogram.buckets, float("inf")), histogram.counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                bucket_labels = self._labels(key, f'le="{le}"')
+                lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{name}_sum{self._labels(key)} {histogram.sum:g}")
+            lines.append(f"{name}_count{self._labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,63 @@
+import asyncio
+import os
+from pathlib import Path
+
+from ..logger import LoggerFactory
+from .metrics import MetricsRegistry
+
+
+class MetricsFileWriter:
+    """
+    Periodic writer of the metrics to a file in the Prometheus text format, for the node exporter textfile
+    collector. The file is replaced atomically so that readers never see a partial file.
+    """
+
+    # Default file path
+    DEFAULT_PATH = "data/metrics.prom"
+
+    # Default interval in s between two writes
+    DEFAULT_INTERVAL_S = 15.0
+
+    def __init__(self, registry: MetricsRegistry, path: str, interval_s: float = DEFAULT_INTERVAL_S):
+        """
+        Initialize the writer.
+        :param registry: The metrics to write.
+        :param path: The file path.
+        :param interval_s: Interval in seconds between two writes.
+        """
+        self._registry = registry
+        self._path = Path(path)
+        self._interval_s = interval_s
+
+    def write(self, text: str | None = None) -> None:
+        """
+        Write the metrics file.
+        :param text: The metrics in the Prometheus text format, rendered from the registry if None.
+        """
+        if text is None:
+            text = self._registry.to_prometheus()
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self._path.with_name(f".{self._path.name}.tmp")
+        temp_path.write_text(text)
+        os.replace(temp_path, self._path)
+
+    async def run(self) -> None:
+        """
+        Write the metrics file at each interval until cancelled, then a last time.
+        The metrics are rendered on the event loop, where the collectors of the scheduler, cluster and resolver
+        statistics are safe to run, only the file is written in a thread. A failed write is logged and retried at
+        the next interval.
+        """
+        logger = LoggerFactory.get_logger()
+        try:
+            while True:
+                try:
+                    await asyncio.to_thread(self.write, self._registry.to_prometheus())
+                except Exception as e:
+                    logger.log_error("Failed to write the metrics file %s: %s", self._path, e)
+                await asyncio.sleep(self._interval_s)
+        finally:
+            try:
+                self.write()
+            except Exception as e:
+                logger.log_error("Failed to write the metrics file %s: %s", self._path, e)
@@ -0,0 +1,4 @@
+from .nmap_xml import NmapXml, NmapXmlError  # noqa: F401
+from .nmap_stream import NmapXmlStream, NmapHost, NmapPort, NmapRunStats  # noqa: F401
+from .nmap_result import NmapSweepResult, NmapPortScanResult, NmapPortScanStats, HostChange  # noqa: F401
+from .nmap_services import NmapServices  # noqa: F401
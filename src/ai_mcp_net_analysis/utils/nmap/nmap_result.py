@@ -0,0 +1,238 @@
+from dataclasses import dataclass
+from ipaddress import ip_address, ip_network, IPv4Network, IPv6Network
+
+from .nmap_stream import NmapHost, NmapPort, NmapRunStats
+from .nmap_xml import NmapXml
+
+
+@dataclass(slots=True)
+class HostChange:
+    """
+    Change of a host between two scans: 'up', 'down' or 'mac' (MAC address changed).
+    """
+    change: str
+    host: NmapHost
+    previous_mac: str | None = None
+
+
+class NmapSweepResult:
+    """
+    Result of a ping sweep, rendered either as a compact host table or as the raw nmap XML report.
+    """
+
+    # Supported output formats
+    FORMAT_COMPACT = "compact"
+    FORMAT_XML = "xml"
+    FORMATS = (FORMAT_COMPACT, FORMAT_XML)
+
+    # Columns of the compact host table
+    COLUMNS = ("ip", "state", "latency_ms", "mac", "vendor", "hostname")
+
+    # Placeholder for missing values in the compact host table
+    MISSING = "-"
+
+    def __init__(
+        self,
+        target: str,
+        hosts: list[NmapHost] | None = None,
+        stats: NmapRunStats | None = None,
+        xml: str | None = None,
+        changes: list[HostChange] | None = None,
+        probed: int | None = None,
+        partial: bool = False,
+        discovery: list[tuple[str, str]] | None = None,
+    ):
+        """
+        Initialize the result.
+        :param target: The scanned CIDR.
+        :param hosts: The host records, required for the compact format.
+        :param stats: The run statistics.
+        :param xml: The raw nmap XML report, required for the XML format.
+        :param changes: The host changes found by an incremental sweep.
+        :param probed: The number of addresses probed by an incremental sweep.
+        :param partial: Whether the result holds the hosts found so far by a sweep still running.
+        :param discovery: The host discovery technique used for each scanned CIDR, None if not chosen.
+        """
+        self.target = target
+        self.hosts = hosts if hosts is not None else []
+        self.stats = stats if stats is not None else NmapRunStats()
+        self.xml = xml
+        self.changes = changes
+        self.probed = probed
+        self.partial = partial
+        self.discovery = discovery
+
+    @property
+    def format(self) -> str:
+        """
+        The output format of the result.
+        """
+        return self.FORMAT_XML if self.xml is not None else self.FORMAT_COMPACT
+
+    def filter(self, network: IPv4Network | IPv6Network) -> "NmapSweepResult":
+        """
+        Get the result restricted to a sub-network of the scanned network.
+        :param network: The sub-network to keep.
+        :return: A new result holding only the hosts inside the sub-network.
+        """
+        xml = NmapXml.filter(self.xml, network) if self.xml is not None else None
+        hosts = [host for host in self.hosts if ip_address(host.ip) in network]
+        changes = [change for change in self.changes if ip_address(change.host.ip) in network] \
+            if self.changes is not None else None
+
+        up = sum(1 for host in hosts if host.state == "up")
+        total = network.num_addresses
+        stats = NmapRunStats(up=up, down=total - up, total=total, elapsed_s=self.stats.elapsed_s)
+        discovery = [
+            (cidr, technique) for cidr, technique in self.discovery if ip_network(cidr).overlaps(network)
+        ] if self.discovery is not None else None
+        return NmapSweepResult(str(network), hosts, stats, xml, changes, discovery=discovery)
+
+    def with_hosts(self, hosts: list[NmapHost]) -> "NmapSweepResult":
+        """
+        Get the result with other host records, used to render a page of the host table.
+        The statistics and changes are kept, the XML report is not.
+        :param hosts: The host records of the new result.
+        """
+        return NmapSweepResult(
+            self.target, hosts, self.stats, None, self.changes, self.probed, self.partial, self.discovery
+        )
+
+    def _row(self, host: NmapHost) -> str:
+        """
+        Render a host record as a row of the compact table.
+        """
+        latency = f"{host.latency_ms:g}" if host.latency_ms is not None else None
+        values = (host.ip, host.state, latency, host.mac, host.vendor, host.hostname)
+        return "\t".join(value if value else self.MISSING for value in values)
+
+    def to_compact(self) -> str:
+        """
+        Render the result as a tab separated host table followed by a summary line.
+        The changes found by an incremental sweep are rendered first, in a table of their own.
+        """
+        lines = []
+        if self.changes is not None:
+            counts = {
+                change: sum(1 for item in self.changes if item.change == change) for change in ("up", "down", "mac")
+            }
+            lines.append(f"# changes: {counts['up']} up, {counts['down']} down, {counts['mac']} mac changed")
+            lines.append("\t".join(("change", *self.COLUMNS, "previous_mac")))
+            lines.extend(
+                f"{item.change}\t{self._row(item.host)}\t{item.previous_mac or self.MISSING}" for item in self.changes
+            )
+
+        lines.append(f"# ping sweep {self.target}")
+        lines.append("\t".join(self.COLUMNS))
+        lines.extend(self._row(host) for host in self.hosts)
+        if self.partial:
+            lines.append(f"# partial: {len(self.hosts)} up so far, {self.stats.elapsed_s:.2f}s")
+            return "\n".join(lines)
+        summary = (
+            f"# summary: {self.stats.up} up, {self.stats.down} down, {self.stats.total} total, "
+            f"{self.stats.elapsed_s:.2f}s"
+        )
+        if self.probed is not None:
+            summary += f", {self.probed} probed"
+        if self.discovery:
+            techniques = {}
+            for cidr, technique in self.discovery:
+                techniques.setdefault(technique, []).append(cidr)
+            lines.append("# discovery: " + "; ".join(
+                f"{technique} {', '.join(cidrs)}" for technique, cidrs in techniques.items()
+            ))
+        lines.append(summary)
+        return "\n".join(lines)
+
+    def __str__(self) -> str:
+        """
+        Render the result in its output format.
+        """
+        return self.xml if self.xml is not None else self.to_compact()
+
+
+@dataclass(slots=True)
+class NmapPortScanStats:
+    """
+    Statistics of a port scan split into tasks.
+    """
+    # Addresses probed and addresses left out because they were not found up
+    scanned: int = 0
+    skipped: int = 0
+    # Number of ports probed on each address
+    ports: int = 0
+    # Number of scanner runs and of port probes sent, without retries
+    tasks: int = 0
+    probes: int = 0
+    elapsed_s: float = 0.0
+
+
+class NmapPortScanResult:
+    """
+    Result of a port scan, rendered as a compact table of the open ports of each host.
+    """
+
+    # Columns of the compact open ports table
+    COLUMNS = ("ip", "open_ports")
+
+    def __init__(
+        self, target: str, ports: str, hosts: list[NmapHost], stats: NmapPortScanStats, partial: bool = False
+    ):
+        """
+        Initialize the result.
+        :param target: The scanned networks.
+        :param ports: Description of the scanned ports.
+        :param hosts: The host records with their open ports, one per host, in address order.
+        :param stats: The scan statistics.
+        :param partial: Whether the result holds the open ports found so far by a scan still running.
+        """
+        self.target = target
+        self.ports = ports
+        self.hosts = hosts
+        self.stats = stats
+        self.partial = partial
+
+    @staticmethod
+    def _port(port: NmapPort) -> str:
+        """
+        Render a port of the compact table as its number and service name.
+        """
+        return f"{port.port}/{port.service}" if port.service else str(port.port)
+
+    def with_hosts(self, hosts: list[NmapHost]) -> "NmapPortScanResult":
+        """
+        Get the result with other host records, used to render a page of the open ports table.
+        :param hosts: The host records of the new result.
+        """
+        return NmapPortScanResult(self.target, self.ports, hosts, self.stats, self.partial)
+
+    def num_open_ports(self) -> int:
+        """
+        Count the open ports of all the hosts.
+        """
+        return sum(len(host.ports) for host in self.hosts)
+
+    def to_compact(self) -> str:
+        """
+        Render the result as a tab separated table of the hosts with open ports followed by a summary line.
+        """
+        lines = [f"# port scan {self.target} ports {self.ports}", "\t".join(self.COLUMNS)]
+        lines.extend(f"{host.ip}\t{','.join(self._port(port) for port in host.ports)}" for host in self.hosts)
+        if self.partial:
+            lines.append(
+                f"# partial: {len(self.hosts)} hosts with open ports so far, {self.num_open_ports()} open ports, "
+                f"{self.stats.elapsed_s:.2f}s"
+            )
+            return "\n".join(lines)
+        lines.append(
+            f"# summary: {len(self.hosts)} hosts with open ports, {self.num_open_ports()} open ports, "
+            f"{self.stats.scanned} hosts scanned, {self.stats.skipped} skipped, {self.stats.ports} ports, "
+            f"{self.stats.tasks} tasks, {self.stats.probes} probes, {self.stats.elapsed_s:.2f}s"
+        )
+        return "\n".join(lines)
+
+    def __str__(self) -> str:
+        """
+        Render the result as a compact table.
+        """
+        return self.to_compact()
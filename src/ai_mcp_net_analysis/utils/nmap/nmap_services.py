@@ -0,0 +1,87 @@
+import os
+import threading
+from pathlib import Path
+
+from .nmap_xml import NmapXmlError
+
+
+class NmapServices:
+    """
+    Ports ranked by how often they are found open, read from the nmap-services file shipped with nmap, as nmap
+    itself ranks them for --top-ports. The ranking is read once per protocol and kept for the life of the process,
+    so that top N port lists are precomputed rather than resolved by nmap at each scan.
+    """
+
+    # Directories searched for the nmap-services file, after the one set by the NMAPDIR environment variable
+    SEARCH_PATHS = ("/usr/share/nmap", "/usr/local/share/nmap", "/opt/homebrew/share/nmap")
+
+    # Name of the services file
+    FILE_NAME = "nmap-services"
+
+    # Most frequently open TCP ports, in frequency order, used when the services file is not found
+    TOP_TCP_PORTS = (
+        80, 23, 443, 21, 22, 25, 3389, 110, 445, 139, 143, 53, 135, 3306, 8080, 1723, 111, 995, 993, 5900,
+    )
+
+    # Ranked ports of each protocol, read on first use
+    _ranked: dict[str, list[int]] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def _path(cls) -> Path | None:
+        """
+        Find the nmap-services file.
+        """
+        directories = [os.environ["NMAPDIR"]] if os.environ.get("NMAPDIR") else []
+        for directory in (*directories, *cls.SEARCH_PATHS):
+            path = Path(directory) / cls.FILE_NAME
+            if path.is_file():
+                return path
+        return None
+
+    @classmethod
+    def _load(cls, protocol: str) -> None:
+        """
+        Read the ports of a protocol from the services file, by decreasing open frequency.
+        Called with the lock held.
+        """
+        path = cls._path()
+        entries = []
+        if path is not None:
+            try:
+                lines = path.read_text(errors="replace").splitlines()
+            except OSError as e:
+                raise NmapXmlError(f"Failed to read {path}: {e}") from e
+            for line in lines:
+                fields = line.split("#", 1)[0].split()
+                if len(fields) < 3:
+                    continue
+                port, _, port_protocol = fields[1].partition("/")
+                if port_protocol != protocol:
+                    continue
+                try:
+                    entries.append((-float(fields[2]), int(port)))
+                except ValueError:
+                    continue
+        if entries:
+            cls._ranked[protocol] = [port for _, port in sorted(entries)]
+        else:
+            cls._ranked[protocol] = list(cls.TOP_TCP_PORTS) if protocol == "tcp" else []
+
+    @classmethod
+    def top_ports(cls, count: int, protocol: str = "tcp") -> list[int]:
+        """
+        Get the most frequently open ports of a protocol.
+        :param count: The number of ports.
+        :param protocol: The protocol, 'tcp' or 'udp'.
+        :return: The ports, by decreasing open frequency.
+        :raises NmapXmlError: If fewer ports are known.
+        """
+        with cls._lock:
+            if protocol not in cls._ranked:
+                cls._load(protocol)
+            ranked = cls._ranked[protocol]
+        if count > len(ranked):
+            raise NmapXmlError(f"Only {len(ranked)} ranked {protocol} ports are known, {count} requested.")
+        return ranked[:count]
+
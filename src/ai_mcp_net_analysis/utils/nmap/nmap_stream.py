@@ -0,0 +1,201 @@
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+
+from .nmap_xml import NmapXmlError
+
+
+@dataclass(slots=True, frozen=True)
+class NmapPort:
+    """
+    Port record extracted from an nmap XML report.
+    """
+    port: int
+    protocol: str
+    state: str
+    service: str | None = None
+
+    @classmethod
+    def from_element(cls, port: ET.Element) -> "NmapPort":
+        """
+        Build a port record from an nmap port element.
+        :param port: The port element.
+        :return: The port record.
+        """
+        state = port.find("state")
+        service = port.find("service")
+        return cls(
+            port=int(port.get("portid", 0)),
+            protocol=port.get("protocol", "tcp"),
+            state=state.get("state", "unknown") if state is not None else "unknown",
+            service=service.get("name") if service is not None else None,
+        )
+
+
+@dataclass(slots=True)
+class NmapHost:
+    """
+    Host record extracted from an nmap XML report.
+    """
+    ip: str
+    state: str
+    latency_ms: float | None = None
+    mac: str | None = None
+    vendor: str | None = None
+    hostname: str | None = None
+    reason: str | None = None
+    ports: tuple[NmapPort, ...] = ()
+
+    @classmethod
+    def from_element(cls, host: ET.Element) -> "NmapHost":
+        """
+        Build a host record from an nmap host element.
+        :param host: The host element.
+        :return: The host record.
+        """
+        record = cls(ip="", state="unknown")
+        # Single pass over the children, this is the hot path of large sweeps
+        for child in host:
+            match child.tag:
+                case "status":
+                    record.state = child.get("state", "unknown")
+                    record.reason = child.get("reason")
+                case "address":
+                    if child.get("addrtype") == "mac":
+                        record.mac = child.get("addr")
+                        record.vendor = child.get("vendor")
+                    elif not record.ip:
+                        record.ip = child.get("addr", "")
+                case "times":
+                    srtt = child.get("srtt")
+                    if srtt:
+                        # nmap reports the smoothed round trip time in microseconds
+                        record.latency_ms = int(srtt) / 1000
+                case "hostnames":
+                    if len(child):
+                        record.hostname = child[0].get("name")
+                case "ports":
+                    # Only written by port scans, the ports summarized by an extraports element are left out
+                    record.ports = tuple(NmapPort.from_element(port) for port in child.iter("port"))
+        return record
+
+
+@dataclass(slots=True)
+class NmapRunStats:
+    """
+    Run statistics extracted from an nmap XML report.
+    """
+    up: int = 0
+    down: int = 0
+    total: int = 0
+    elapsed_s: float = 0.0
+
+    def add(self, other: "NmapRunStats") -> None:
+        """
+        Accumulate the statistics of a run executed concurrently with this one.
+        :param other: The statistics to add.
+        """
+        self.up += other.up
+        self.down += other.down
+        self.total += other.total
+        self.elapsed_s = max(self.elapsed_s, other.elapsed_s)
+
+
+class NmapXmlStream:
+    """
+    Incremental nmap XML parser.
+    Chunks of the report are fed as they are read from nmap and host records are returned as soon as
+    their host element is closed. Parsed elements are discarded so that memory usage does not depend
+    on the size of the scan. Progress elements, written by nmap run with --stats-every, update the
+    completion percentage of the scan.
+    """
+
+    # Default maximum number of bytes buffered without completing a host element
+    DEFAULT_MAX_BUFFER_BYTES = 1024 * 1024
+
+    def __init__(self, max_buffer_bytes: int = DEFAULT_MAX_BUFFER_BYTES):
+        """
+        Initialize the parser.
+        :param max_buffer_bytes: Maximum number of bytes buffered between two host elements.
+        """
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._max_buffer_bytes = max_buffer_bytes
+        self._buffered = 0
+        self._root: ET.Element | None = None
+        self._depth = 0
+        self.stats = NmapRunStats()
+        # Completion percentage reported by the last progress element, never decreasing
+        self.percent = 0.0
+
+    def feed(self, chunk: bytes) -> list[NmapHost]:
+        """
+        Feed a chunk of the XML report.
+        :param chunk: The next chunk of the report.
+        :return: The host records completed by this chunk.
+        """
+        self._buffered += len(chunk)
+        try:
+            self._parser.feed(chunk)
+            hosts = self._read_events()
+        except ET.ParseError as e:
+            raise NmapXmlError(f"Invalid nmap XML output: {e}") from e
+
+        if self._buffered > self._max_buffer_bytes:
+            raise NmapXmlError(f"nmap XML element exceeds the {self._max_buffer_bytes} bytes buffer limit.")
+        return hosts
+
+    def close(self) -> list[NmapHost]:
+        """
+        Signal the end of the report.
+        :return: The remaining host records.
+        """
+        try:
+            self._parser.close()
+            hosts = self._read_events()
+        except ET.ParseError as e:
+            raise NmapXmlError(f"Invalid nmap XML output: {e}") from e
+        if self._root is None:
+            raise NmapXmlError("Empty nmap XML output.")
+        return hosts
+
+    def _read_events(self) -> list[NmapHost]:
+        """
+        Process the pending parser events.
+        """
+        hosts = []
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                if self._root is None:
+                    if elem.tag != "nmaprun":
+                        raise NmapXmlError(f"Unexpected nmap XML root element: {elem.tag}")
+                    self._root = elem
+                self._depth += 1
+                continue
+
+            self._depth -= 1
+            if self._depth != 1:
+                # Nested elements are processed with their top level parent
+                continue
+            if elem.tag == "host":
+                hosts.append(NmapHost.from_element(elem))
+            elif elem.tag == "taskprogress":
+                self.percent = max(self.percent, float(elem.get("percent", 0)))
+            elif elem.tag == "runstats":
+                self._read_runstats(elem)
+
+            # Top level element done, release it
+            self._root.remove(elem)
+            self._buffered = 0
+        return hosts
+
+    def _read_runstats(self, runstats: ET.Element) -> None:
+        """
+        Read the run statistics element.
+        """
+        hosts = runstats.find("hosts")
+        if hosts is not None:
+            self.stats.up = int(hosts.get("up", 0))
+            self.stats.down = int(hosts.get("down", 0))
+            self.stats.total = int(hosts.get("total", 0))
+        finished = runstats.find("finished")
+        if finished is not None:
+            self.stats.elapsed_s = float(finished.get("elapsed", 0))
@@ -0,0 +1,149 @@
+import xml.etree.ElementTree as ET
+from ipaddress import ip_address, IPv4Network, IPv6Network
+
+
+class NmapXmlError(Exception):
+    """
+    Custom exception for nmap XML processing errors.
+    """
+    pass
+
+
+class NmapXml:
+    """
+    Helpers for manipulating nmap XML reports (-oX output).
+    """
+
+    # XML declaration emitted in front of generated reports
+    XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>\n'
+
+    @staticmethod
+    def parse(xml_text: str) -> ET.Element:
+        """
+        Parse an nmap XML report.
+        :param xml_text: The XML report as a string.
+        :return: The nmaprun root element.
+        """
+        try:
+            root = ET.fromstring(xml_text)
+        except ET.ParseError as e:
+            raise NmapXmlError(f"Invalid nmap XML output: {e}") from e
+        if root.tag != "nmaprun":
+            raise NmapXmlError(f"Unexpected nmap XML root element: {root.tag}")
+        return root
+
+    @staticmethod
+    def host_address(host: ET.Element) -> str | None:
+        """
+        Get the IP address of a host element.
+        :param host: The host element.
+        :return: The IPv4 or IPv6 address, None if the host has no IP address.
+        """
+        for address in host.iter("address"):
+            if address.get("addrtype") in ("ipv4", "ipv6"):
+                return address.get("addr")
+        return None
+
+    @staticmethod
+    def _host_sort_key(host: ET.Element) -> tuple[int, int]:
+        """
+        Sort key ordering hosts by IP version and numeric address.
+        """
+        addr = NmapXml.host_address(host)
+        if addr is None:
+            return (0, 0)
+        ip = ip_address(addr)
+        return (ip.version, int(ip))
+
+    @staticmethod
+    def merge(xml_texts: list[str], args: str | None = None) -> str:
+        """
+        Merge several nmap XML reports into a single report.
+        Hosts are sorted by address so that the merged report does not depend on the order in
+        which the partial reports completed, and the run statistics are summed.
+        :param xml_texts: The XML reports to merge.
+        :param args: Optional command line to record in the merged report.
+        :return: The merged XML report.
+        """
+        if not xml_texts:
+            raise NmapXmlError("No nmap XML report to merge.")
+
+        roots = [NmapXml.parse(xml_text) for xml_text in xml_texts]
+        merged = roots[0]
+        if args is not None:
+            merged.set("args", args)
+
+        # Collect hosts and statistics from all reports and drop per report elements from the first one
+        hosts = [host for root in roots for host in root.findall("host")]
+        runstats = NmapXml._merge_runstats(roots)
+        for child in list(merged):
+            if child.tag in ("host", "runstats", "taskbegin", "taskprogress", "taskend"):
+                merged.remove(child)
+
+        # Start time of the merged run is the earliest start time
+        starts = [int(root.get("start")) for root in roots if root.get("start")]
+        if starts:
+            merged.set("start", str(min(starts)))
+
+        hosts.sort(key=NmapXml._host_sort_key)
+        merged.extend(hosts)
+        merged.append(runstats)
+
+        return NmapXml.XML_DECLARATION + ET.tostring(merged, encoding="unicode")
+
+    @staticmethod
+    def filter(xml_text: str, network: IPv4Network | IPv6Network) -> str:
+        """
+        Keep only the hosts of a report inside the given network.
+        The run statistics are recomputed for the network.
+        :param xml_text: The XML report.
+        :param network: The network to keep.
+        :return: The filtered XML report.
+        """
+        root = NmapXml.parse(xml_text)
+        up = 0
+        for host in root.findall("host"):
+            addr = NmapXml.host_address(host)
+            if addr is None or ip_address(addr) not in network:
+                root.remove(host)
+            elif host.find("status") is not None and host.find("status").get("state") == "up":
+                up += 1
+
+        hosts = root.find("runstats/hosts")
+        if hosts is not None:
+            total = network.num_addresses
+            hosts.set("up", str(up))
+            hosts.set("down", str(total - up))
+            hosts.set("total", str(total))
+        return NmapXml.XML_DECLARATION + ET.tostring(root, encoding="unicode")
+
+    @staticmethod
+    def _merge_runstats(roots: list[ET.Element]) -> ET.Element:
+        """
+        Build the runstats element of a merged report.
+        """
+        up = down = total = 0
+        finished_time = 0
+        elapsed = 0.0
+        finished_attrs = {}
+        for root in roots:
+            hosts = root.find("runstats/hosts")
+            if hosts is not None:
+                up += int(hosts.get("up", 0))
+                down += int(hosts.get("down", 0))
+                total += int(hosts.get("total", 0))
+            finished = root.find("runstats/finished")
+            if finished is not None:
+                finished_attrs = dict(finished.attrib)
+                finished_time = max(finished_time, int(finished.get("time", 0)))
+                elapsed = max(elapsed, float(finished.get("elapsed", 0)))
+
+        runstats = ET.Element("runstats")
+        finished_attrs.update(
+            time=str(finished_time),
+            elapsed=f"{elapsed:.2f}",
+            summary=f"Nmap done; {total} IP addresses ({up} hosts up) scanned in {elapsed:.2f} seconds",
+        )
+        ET.SubElement(runstats, "finished", finished_attrs)
+        ET.SubElement(runstats, "hosts", up=str(up), down=str(down), total=str(total))
+        return runstats
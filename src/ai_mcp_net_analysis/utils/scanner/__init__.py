@@ -0,0 +1,7 @@
+from .scanner import Scanner, ScannerError  # noqa: F401
+from .scanner_timing import ScanTiming, SubnetTiming, TimingModel  # noqa: F401
+from .scanner_nmap import NmapScanner  # noqa: F401
+from .scanner_asyncio import AsyncioScanner, IcmpPinger  # noqa: F401
+from .scanner_ports import NmapPortScanner  # noqa: F401
+from .scanner_routes import RouteTable  # noqa: F401
+from .scanner_factory import ScannerFactory  # noqa: F401
@@ -0,0 +1,51 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Callable
+
+from ..nmap import NmapHost, NmapRunStats
+from .scanner_timing import ScanTiming
+
+
+class ScannerError(Exception):
+    """
+    Custom exception for scanner backend errors.
+    """
+    pass
+
+
+class Scanner(ABC):
+    """
+    Abstract host discovery backend.
+    Subclasses scan a list of networks and yield a record for each host found up.
+    """
+
+    @abstractmethod
+    def get_name(self) -> str:
+        """
+        Get the backend name, as used in the configuration.
+        """
+        pass
+
+    @abstractmethod
+    def sweep(
+        self,
+        targets: list[str],
+        timeout_s: int,
+        stats: NmapRunStats,
+        max_rate: int | None = None,
+        on_progress: Callable[[float], None] | None = None,
+        timing: ScanTiming | None = None,
+        technique: str | None = None,
+    ) -> AsyncIterator[NmapHost]:
+        """
+        Discover the hosts up in the given networks.
+        :param targets: The CIDRs to scan.
+        :param timeout_s: Timeout for each host in seconds.
+        :param stats: Run statistics updated when the sweep completes.
+        :param max_rate: Maximum number of probes sent per second, None for no limit.
+        :param on_progress: Called with the completed fraction of the sweep, from 0 to 1, as it progresses.
+        :param timing: Timing options learned from the previous scans, None for the backend defaults.
+        :param technique: Host discovery technique, one of NmapScanner.TECHNIQUES except 'auto', None for the
+            backend default. Backends without a choice of probes ignore it.
+        :return: An asynchronous iterator over the records of the hosts up, in address order.
+        """
+        pass
@@ -0,0 +1,374 @@
+import asyncio
+import itertools
+import os
+import socket
+import struct
+import weakref
+from ipaddress import ip_network
+from typing import AsyncIterator, Callable, Iterator
+
+from ..nmap import NmapHost, NmapRunStats
+from .scanner import Scanner, ScannerError
+from .scanner_timing import ScanTiming
+
+
+class IcmpPinger:
+    """
+    ICMP echo requests over a shared raw socket, IPv4 only.
+    Replies are dispatched to the pending requests by source address and sequence number. A raw socket receives
+    the replies to every ICMP socket of the host, each pinger has its own identifier and ignores the others, and
+    the sweeps running on an event loop share a single pinger, see IcmpPinger.acquire.
+    """
+
+    # ICMP message types
+    ECHO_REPLY = 0
+    ECHO_REQUEST = 8
+
+    # Payload of the echo requests
+    PAYLOAD = b"ai-mcp-net-analysis"
+
+    # Identifiers of the echo requests, one per pinger
+    _idents = itertools.count(os.getpid())
+
+    # Pinger shared by the sweeps of each event loop and its number of users
+    _shared: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, list]" = weakref.WeakKeyDictionary()
+
+    def __init__(self, sock: socket.socket):
+        """
+        Initialize the pinger, use IcmpPinger.open to create an instance.
+        :param sock: The raw ICMP socket.
+        """
+        self._sock = sock
+        self._loop = asyncio.get_running_loop()
+        self._ident = next(self._idents) & 0xffff
+        self._seq = 0
+        self._pending: dict[tuple[str, int], asyncio.Future] = {}
+        self._loop.add_reader(sock.fileno(), self._on_readable)
+
+    @classmethod
+    def open(cls) -> "IcmpPinger | None":
+        """
+        Open a raw ICMP socket.
+        :return: The pinger, None if the process is not allowed to open raw sockets.
+        """
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+        except OSError:
+            return None
+        sock.setblocking(False)
+        return cls(sock)
+
+    @classmethod
+    def acquire(cls) -> "IcmpPinger | None":
+        """
+        Get the pinger shared by the sweeps of the running event loop, opened on first use.
+        Each acquisition is paired with a call to release, the socket is closed when the last user releases it.
+        :return: The pinger, None if the process is not allowed to open raw sockets.
+        """
+        loop = asyncio.get_running_loop()
+        shared = cls._shared.get(loop)
+        if shared is None:
+            pinger = cls.open()
+            if pinger is None:
+                return None
+            shared = cls._shared[loop] = [pinger, 0]
+        shared[1] += 1
+        return shared[0]
+
+    def release(self) -> None:
+        """
+        Release a pinger obtained from acquire.
+        """
+        shared = self._shared.get(self._loop)
+        if shared is not None and shared[0] is self:
+            shared[1] -= 1
+            if shared[1] > 0:
+                return
+            del self._shared[self._loop]
+        self.close()
+
+    @staticmethod
+    def _checksum(data: bytes) -> int:
+        """
+        Internet checksum of an ICMP message.
+        """
+        if len(data) % 2:
+            data += b"\0"
+        total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+        total = (total >> 16) + (total & 0xffff)
+        total += total >> 16
+        return ~total & 0xffff
+
+    def _packet(self, seq: int) -> bytes:
+        """
+        Build an echo request.
+        """
+        header = struct.pack("!BBHHH", self.ECHO_REQUEST, 0, 0, self._ident, seq)
+        checksum = self._checksum(header + self.PAYLOAD)
+        return struct.pack("!BBHHH", self.ECHO_REQUEST, 0, checksum, self._ident, seq) + self.PAYLOAD
+
+    def _on_readable(self) -> None:
+        """
+        Read the pending replies and resolve the matching requests.
+        """
+        while True:
+            try:
+                data, (addr, _) = self._sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+            # Raw IPv4 sockets receive the IP header
+            offset = (data[0] & 0x0f) * 4
+            if len(data) < offset + 8:
+                continue
+            icmp_type, _, _, ident, seq = struct.unpack("!BBHHH", data[offset:offset + 8])
+            if icmp_type != self.ECHO_REPLY or ident != self._ident:
+                continue
+            future = self._pending.pop((addr, seq), None)
+            if future is not None and not future.done():
+                future.set_result(self._loop.time())
+
+    async def ping(self, ip: str, timeout_s: float) -> float | None:
+        """
+        Send an echo request and wait for the reply.
+        :param ip: The IPv4 address.
+        :param timeout_s: Timeout in seconds.
+        :return: The round trip time in milliseconds, None if no reply was received.
+        """
+        self._seq = (self._seq + 1) & 0xffff
+        key = (ip, self._seq)
+        future = self._loop.create_future()
+        self._pending[key] = future
+        start = self._loop.time()
+        try:
+            await self._loop.sock_sendto(self._sock, self._packet(self._seq), (ip, 0))
+            end = await asyncio.wait_for(future, timeout_s)
+            return (end - start) * 1000
+        except (asyncio.TimeoutError, OSError):
+            return None
+        finally:
+            self._pending.pop(key, None)
+
+    def close(self) -> None:
+        """
+        Close the raw socket.
+        """
+        self._loop.remove_reader(self._sock.fileno())
+        self._sock.close()
+
+
+class RateLimiter:
+    """
+    Pace probes to a maximum rate, each acquisition reserves the next send time.
+    """
+
+    def __init__(self, rate: int):
+        """
+        Initialize the limiter.
+        :param rate: Maximum number of acquisitions per second.
+        """
+        self._interval = 1.0 / rate
+        self._next = 0.0
+
+    async def acquire(self) -> None:
+        """
+        Wait until the next probe may be sent.
+        """
+        now = asyncio.get_running_loop().time()
+        send_at = max(self._next, now)
+        self._next = send_at + self._interval
+        if send_at > now:
+            await asyncio.sleep(send_at - now)
+
+
+class AsyncioScanner(Scanner):
+    """
+    In-process host discovery backend.
+    Hosts are probed with TCP connections to a list of ports, a connection accepted or refused means the host
+    is up, and with ICMP echo requests when the process may open raw sockets. Probes run concurrently under
+    a cap shared by all the sweeps of the scanner on an event loop, addresses are processed in batches so that
+    results are yielded in address order.
+    """
+
+    # Defaults, overridden by the scan.asyncio configuration section
+    DEFAULT_PORTS = (80, 443, 22, 445, 3389)
+    DEFAULT_CONCURRENCY = 1024
+    DEFAULT_PROBE_TIMEOUT_S = 1.0
+    DEFAULT_MAX_ADDRESSES = 1 << 20
+
+    def __init__(
+        self,
+        ports: list[int] | tuple[int, ...] = DEFAULT_PORTS,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        probe_timeout_s: float = DEFAULT_PROBE_TIMEOUT_S,
+        icmp: bool = True,
+        max_addresses: int = DEFAULT_MAX_ADDRESSES,
+    ):
+        """
+        Initialize the scanner.
+        :param ports: TCP ports probed on each host.
+        :param concurrency: Maximum number of probes in flight, over all the sweeps.
+        :param probe_timeout_s: Timeout of each probe in seconds, capped by the sweep timeout.
+        :param icmp: Send ICMP echo requests when raw sockets are available.
+        :param max_addresses: Maximum number of addresses of a sweep.
+        """
+        if not ports and not icmp:
+            raise ScannerError("The asyncio scanner requires TCP ports or ICMP probes.")
+        self._ports = list(ports)
+        self._concurrency = concurrency
+        self._probe_timeout_s = probe_timeout_s
+        self._icmp = icmp
+        self._max_addresses = max_addresses
+        # Probes in flight of the sweeps of each event loop
+        self._semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = \
+            weakref.WeakKeyDictionary()
+
+    def get_name(self) -> str:
+        """
+        Get the backend name.
+        """
+        return "asyncio"
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        """
+        Get the cap of the probes in flight of the running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self._concurrency)
+        return semaphore
+
+    def _addresses(self, targets: list[str]) -> Iterator[tuple[str, int]]:
+        """
+        Enumerate the addresses of the targets.
+        :return: An iterator over the (address, IP version) tuples.
+        """
+        networks = [ip_network(target, strict=False) for target in targets]
+        count = sum(network.num_addresses for network in networks)
+        if count > self._max_addresses:
+            raise ScannerError(f"Too many addresses for the asyncio scanner: {count} > {self._max_addresses}.")
+        for network in networks:
+            for ip in network:
+                yield str(ip), network.version
+
+    async def _probe_port(
+        self, ip: str, version: int, port: int, timeout_s: float, limiter: RateLimiter | None
+    ) -> tuple[str | None, float]:
+        """
+        Probe a host with a TCP connection. A socket that cannot be created, e.g. once the process runs out of
+        file descriptors, counts as a probe without answer.
+        :return: The (reason, latency in milliseconds) tuple, the reason is None if the host did not answer.
+        """
+        loop = asyncio.get_running_loop()
+        family = socket.AF_INET if version == 4 else socket.AF_INET6
+        async with self._semaphore():
+            if limiter is not None:
+                await limiter.acquire()
+            sock = None
+            try:
+                sock = socket.socket(family, socket.SOCK_STREAM)
+                sock.setblocking(False)
+                # Reset the connection on close instead of lingering in TIME_WAIT
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+                start = loop.time()
+                await asyncio.wait_for(loop.sock_connect(sock, (ip, port)), timeout_s)
+                return "syn-ack", (loop.time() - start) * 1000
+            except ConnectionRefusedError:
+                return "conn-refused", (loop.time() - start) * 1000
+            except (asyncio.TimeoutError, OSError):
+                return None, 0.0
+            finally:
+                if sock is not None:
+                    sock.close()
+
+    async def _probe_icmp(
+        self, pinger: IcmpPinger, ip: str, timeout_s: float, limiter: RateLimiter | None
+    ) -> tuple[str | None, float]:
+        """
+        Probe a host with an ICMP echo request.
+        :return: The (reason, latency in milliseconds) tuple, the reason is None if the host did not answer.
+        """
+        async with self._semaphore():
+            if limiter is not None:
+                await limiter.acquire()
+            latency = await pinger.ping(ip, timeout_s)
+        return ("echo-reply", latency) if latency is not None else (None, 0.0)
+
+    async def _probe(
+        self, ip: str, version: int, timeout_s: float, pinger: IcmpPinger | None, limiter: RateLimiter | None
+    ) -> NmapHost | None:
+        """
+        Probe a host with all the probes concurrently, the first answer wins.
+        :return: The host record, None if the host did not answer.
+        """
+        probes = [self._probe_port(ip, version, port, timeout_s, limiter) for port in self._ports]
+        if pinger is not None and version == 4:
+            probes.append(self._probe_icmp(pinger, ip, timeout_s, limiter))
+
+        tasks = [asyncio.ensure_future(probe) for probe in probes]
+        try:
+            for probe in asyncio.as_completed(tasks):
+                reason, latency = await probe
+                if reason is not None:
+                    return NmapHost(ip, "up", round(latency, 3), reason=reason)
+        finally:
+            for task in tasks:
+                task.cancel()
+        return None
+
+    async def sweep(
+        self,
+        targets: list[str],
+        timeout_s: int,
+        stats: NmapRunStats,
+        max_rate: int | None = None,
+        on_progress: Callable[[float], None] | None = None,
+        timing: ScanTiming | None = None,
+        technique: str | None = None,
+    ) -> AsyncIterator[NmapHost]:
+        """
+        Probe the addresses of the targets and yield the records of the hosts up, in address order.
+        Progress is reported after each batch of addresses. The probes have no retries, only the maximum RTT
+        timeout of the timing options applies, as a shorter probe timeout. The technique is ignored, the probes
+        are always the configured ICMP echo and TCP connections.
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        limiter = RateLimiter(max_rate) if max_rate else None
+        timeout_s = min(timeout_s, self._probe_timeout_s)
+        if timing is not None and timing.max_rtt_timeout_ms is not None:
+            timeout_s = min(timeout_s, timing.max_rtt_timeout_ms / 1000)
+        pinger = IcmpPinger.acquire() if self._icmp else None
+        probes_per_host = len(self._ports) + (1 if pinger is not None else 0)
+        batch_size = max(self._concurrency // max(probes_per_host, 1), 1) * 4
+
+        up = total = 0
+        try:
+            batch = []
+            addresses = self._addresses(targets)
+            count = sum(ip_network(target, strict=False).num_addresses for target in targets)
+            while True:
+                batch.clear()
+                for address in addresses:
+                    batch.append(address)
+                    if len(batch) == batch_size:
+                        break
+                if not batch:
+                    break
+                total += len(batch)
+                hosts = await asyncio.gather(
+                    *(self._probe(ip, version, timeout_s, pinger, limiter) for ip, version in batch)
+                )
+                for host in hosts:
+                    if host is not None:
+                        up += 1
+                        yield host
+                if on_progress is not None:
+                    on_progress(total / count)
+        finally:
+            if pinger is not None:
+                pinger.release()
+
+        stats.add(NmapRunStats(up=up, down=total - up, total=total, elapsed_s=loop.time() - start))
@@ -0,0 +1,67 @@
+import threading
+
+from ..config import ConfigData
+from .scanner import Scanner, ScannerError
+from .scanner_nmap import NmapScanner
+from .scanner_asyncio import AsyncioScanner
+
+
+class ScannerFactory:
+    """
+    A factory class for creating host discovery backends.
+    The backend is created once and shared by all the sweeps of the process, so that the probes in flight of the
+    asyncio backend are capped across shards and concurrent sweeps. It is created again when its configuration
+    changes.
+    """
+
+    # Default backend
+    DEFAULT_BACKEND = "nmap"
+
+    # Shared backend and the configuration it was created from
+    _scanner: Scanner = None
+    _scanner_config: tuple = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_scanner(cls, config_data: ConfigData) -> Scanner:
+        """
+        Get the host discovery backend selected by the scan.backend configuration.
+        :param config_data: Configuration data.
+        :return: The shared instance of the scanner.
+        """
+        scan = config_data.get_value("scan", ConfigData({}))
+        backend = scan.get_value("backend", cls.DEFAULT_BACKEND)
+        progress = config_data.get_value("progress", ConfigData({}))
+        settings = scan.get_value("asyncio", ConfigData({}))
+
+        with cls._lock:
+            if cls._scanner is None or cls._scanner_config != (backend, progress, settings):
+                cls._scanner = cls._create(backend, progress, settings)
+                cls._scanner_config = (backend, progress, settings)
+            return cls._scanner
+
+    @classmethod
+    def _create(cls, backend: str, progress: ConfigData, settings: ConfigData) -> Scanner:
+        """
+        Create a host discovery backend.
+        :param backend: The backend name.
+        :param progress: The progress configuration section.
+        :param settings: The scan.asyncio configuration section.
+        :return: An instance of a scanner.
+        """
+        # Create scanner instance based on backend
+        match backend:
+            case "nmap":
+                return NmapScanner(
+                    stats_every_s=progress.get_value("interval_s", NmapScanner.DEFAULT_STATS_EVERY_S),
+                )
+            case "asyncio":
+                return AsyncioScanner(
+                    ports=settings.get_value("ports", AsyncioScanner.DEFAULT_PORTS),
+                    concurrency=settings.get_value("concurrency", AsyncioScanner.DEFAULT_CONCURRENCY),
+                    probe_timeout_s=settings.get_value("probe_timeout_s", AsyncioScanner.DEFAULT_PROBE_TIMEOUT_S),
+                    icmp=settings.get_value("icmp", True),
+                    max_addresses=settings.get_value("max_addresses", AsyncioScanner.DEFAULT_MAX_ADDRESSES),
+                )
+            case _:
+                raise ScannerError(f"Unsupported scanner backend: {backend}")
@@ -0,0 +1,154 @@
+import os
+from contextlib import aclosing
+from typing import AsyncIterator, Callable
+
+from ..cmd import CmdExec
+from ..nmap import NmapXmlStream, NmapHost, NmapRunStats
+from .scanner import Scanner, ScannerError
+from .scanner_timing import ScanTiming
+
+
+class NmapScanner(Scanner):
+    """
+    Host discovery backend running an nmap ping sweep, with the probes of a host discovery technique.
+    """
+
+    # Upper bound in s for a whole sweep, the per host timeout is given by the caller
+    COMMAND_TIMEOUT_S = 3600
+
+    # Default interval in s between two progress reports of nmap
+    DEFAULT_STATS_EVERY_S = 1.0
+
+    # Host discovery techniques: ARP requests (Neighbor Discovery for IPv6) for on-link networks, a mix of ICMP and
+    # TCP probes for routed networks, where hosts often drop ICMP echo, ICMP echo only, or the first two chosen
+    # from the route table of the scanning host
+    TECHNIQUE_AUTO = "auto"
+    TECHNIQUE_ARP = "arp"
+    TECHNIQUE_ICMP_TCP = "icmp-tcp"
+    TECHNIQUE_ICMP = "icmp"
+    TECHNIQUES = (TECHNIQUE_AUTO, TECHNIQUE_ARP, TECHNIQUE_ICMP_TCP, TECHNIQUE_ICMP)
+
+    # nmap probe options of each technique
+    PROBES = {
+        TECHNIQUE_ARP: ("-PR",),
+        TECHNIQUE_ICMP_TCP: ("-PE", "-PP", "-PS22,80,443,3389", "-PA80"),
+        TECHNIQUE_ICMP: ("-PE",),
+    }
+
+    def __init__(self, stats_every_s: float = DEFAULT_STATS_EVERY_S):
+        """
+        Initialize the scanner.
+        :param stats_every_s: Interval in seconds between two progress reports of nmap, when progress is tracked.
+        """
+        self._stats_every_s = stats_every_s
+
+    @staticmethod
+    def is_privileged() -> bool:
+        """
+        Whether nmap runs with the raw sockets needed by ARP requests and TCP SYN scans, as root.
+        """
+        return hasattr(os, "geteuid") and os.geteuid() == 0
+
+    def get_name(self) -> str:
+        """
+        Get the backend name.
+        """
+        return "nmap"
+
+    def command(
+        self,
+        targets: list[str],
+        timeout_s: int,
+        max_rate: int | None = None,
+        stats_every_s: float | None = None,
+        timing: ScanTiming | None = None,
+        technique: str = TECHNIQUE_ICMP,
+    ) -> list[str]:
+        """
+        Build the nmap ping sweep command line.
+        The host names are not resolved by nmap (-n), the sweep tools resolve them in a separate stage.
+        :param targets: The CIDRs to scan.
+        :param timeout_s: Timeout for each host in seconds.
+        :param max_rate: Maximum number of packets sent per second, None for no limit.
+        :param stats_every_s: Interval in seconds between two progress elements in the report, None for none.
+        :param timing: RTT timeouts, retries and parallelism, None for no retries and the nmap defaults.
+        :param technique: The host discovery technique, one of TECHNIQUES except TECHNIQUE_AUTO.
+        :return: The command as a list of strings.
+        :raises ScannerError: If the technique is unknown.
+        """
+        probes = self.PROBES.get(technique)
+        if probes is None:
+            raise ScannerError(f"Unknown host discovery technique: {technique}")
+        rate = ["--max-rate", str(max_rate)] if max_rate else []
+        if stats_every_s:
+            rate += ["--stats-every", f"{max(int(stats_every_s * 1000), 1)}ms"]
+        return [
+            "nmap",
+            "-oX",
+            "-",
+            "-sn",
+            "-n",
+            *probes,
+            *(timing or ScanTiming()).nmap_options(),
+            "--host-timeout", f"{timeout_s}s",
+            *rate,
+            *targets]
+
+    def report(
+        self,
+        targets: list[str],
+        timeout_s: int,
+        max_rate: int | None = None,
+        timing: ScanTiming | None = None,
+        technique: str = TECHNIQUE_ICMP,
+    ) -> str:
+        """
+        Run a ping sweep and return the raw nmap XML report.
+        """
+        command = self.command(targets, timeout_s, max_rate, timing=timing, technique=technique)
+        return CmdExec.execute(command, timeout=self.COMMAND_TIMEOUT_S)
+
+    async def report_async(
+        self,
+        targets: list[str],
+        timeout_s: int,
+        max_rate: int | None = None,
+        timing: ScanTiming | None = None,
+        technique: str = TECHNIQUE_ICMP,
+    ) -> str:
+        """
+        Run a ping sweep without blocking the event loop and return the raw nmap XML report.
+        """
+        command = self.command(targets, timeout_s, max_rate, timing=timing, technique=technique)
+        return await CmdExec.execute_async(command, timeout=self.COMMAND_TIMEOUT_S)
+
+    async def sweep(
+        self,
+        targets: list[str],
+        timeout_s: int,
+        stats: NmapRunStats,
+        max_rate: int | None = None,
+        on_progress: Callable[[float], None] | None = None,
+        timing: ScanTiming | None = None,
+        technique: str | None = None,
+    ) -> AsyncIterator[NmapHost]:
+        """
+        Run a ping sweep with a single nmap process and yield host records as nmap reports them.
+        When progress is tracked, nmap writes progress elements in its report at a regular interval.
+        """
+        parser = NmapXmlStream()
+        stats_every_s = self._stats_every_s if on_progress is not None else None
+        command = self.command(targets, timeout_s, max_rate, stats_every_s, timing, technique or self.TECHNIQUE_ICMP)
+        percent = 0.0
+        async with aclosing(CmdExec.stream_async(command, timeout=self.COMMAND_TIMEOUT_S)) as chunks:
+            async for chunk in chunks:
+                for host in parser.feed(chunk):
+                    yield host
+                if on_progress is not None and parser.percent != percent:
+                    percent = parser.percent
+                    on_progress(percent / 100)
+        for host in parser.close():
+            yield host
+        stats.add(parser.stats)
+        if on_progress is not None:
+            on_progress(1.0)
@@ -0,0 +1,119 @@
+from contextlib import aclosing
+from typing import AsyncIterator, Callable
+
+from ..cmd import CmdExec
+from ..nmap import NmapXmlStream, NmapHost, NmapRunStats
+from .scanner import ScannerError
+from .scanner_nmap import NmapScanner
+from .scanner_timing import ScanTiming
+
+
+class NmapPortScanner:
+    """
+    TCP port scanner running nmap on hosts already known to be up: host discovery and reverse DNS resolution are
+    skipped, and only the open ports are reported.
+    """
+
+    # Scan techniques: TCP SYN scan, which needs raw sockets, TCP connect scan, or the first one allowed
+    TECHNIQUE_AUTO = "auto"
+    TECHNIQUE_SYN = "syn"
+    TECHNIQUE_CONNECT = "connect"
+    TECHNIQUES = (TECHNIQUE_AUTO, TECHNIQUE_SYN, TECHNIQUE_CONNECT)
+
+    # Upper bound in s for a whole scan, the per host timeout is given by the caller
+    COMMAND_TIMEOUT_S = 3600
+
+    # Default interval in s between two progress reports of nmap
+    DEFAULT_STATS_EVERY_S = 1.0
+
+    def __init__(self, technique: str = TECHNIQUE_AUTO, stats_every_s: float = DEFAULT_STATS_EVERY_S):
+        """
+        Initialize the scanner.
+        :param technique: The scan technique, one of TECHNIQUES.
+        :param stats_every_s: Interval in seconds between two progress reports of nmap, when progress is tracked.
+        :raises ScannerError: If the technique is unknown.
+        """
+        if technique not in self.TECHNIQUES:
+            raise ScannerError(
+                f"Unknown port scan technique: {technique}, expected one of {', '.join(self.TECHNIQUES)}")
+        if technique == self.TECHNIQUE_AUTO:
+            technique = self.TECHNIQUE_SYN if NmapScanner.is_privileged() else self.TECHNIQUE_CONNECT
+        self._technique = technique
+        self._stats_every_s = stats_every_s
+
+    def get_technique(self) -> str:
+        """
+        Get the scan technique used, 'syn' or 'connect'.
+        """
+        return self._technique
+
+    def command(
+        self,
+        targets: list[str],
+        ports: str,
+        timeout_s: int,
+        max_rate: int | None = None,
+        stats_every_s: float | None = None,
+        timing: ScanTiming | None = None,
+    ) -> list[str]:
+        """
+        Build the nmap port scan command line.
+        :param targets: The CIDRs or addresses to scan.
+        :param ports: The ports to scan, as an nmap port specification.
+        :param timeout_s: Timeout for each host in seconds.
+        :param max_rate: Maximum number of packets sent per second, None for no limit.
+        :param stats_every_s: Interval in seconds between two progress elements in the report, None for none.
+        :param timing: RTT timeouts, retries and parallelism, None for the nmap defaults.
+        :return: The command as a list of strings.
+        """
+        options = timing.nmap_options() if timing is not None else []
+        if max_rate:
+            options += ["--max-rate", str(max_rate)]
+        if stats_every_s:
+            options += ["--stats-every", f"{max(int(stats_every_s * 1000), 1)}ms"]
+        return [
+            "nmap",
+            "-oX",
+            "-",
+            "-sS" if self._technique == self.TECHNIQUE_SYN else "-sT",
+            "-Pn",
+            "-n",
+            "--open",
+            "-p", ports,
+            *options,
+            "--host-timeout", f"{timeout_s}s",
+            *targets]
+
+    async def scan(
+        self,
+        targets: list[str],
+        ports: str,
+        timeout_s: int,
+        stats: NmapRunStats,
+        max_rate: int | None = None,
+        on_progress: Callable[[float], None] | None = None,
+        timing: ScanTiming | None = None,
+    ) -> AsyncIterator[NmapHost]:
+        """
+        Run a port scan with a single nmap process and yield the records of the hosts with open ports as nmap
+        reports them.
+        When progress is tracked, nmap writes progress elements in its report at a regular interval.
+        """
+        parser = NmapXmlStream()
+        stats_every_s = self._stats_every_s if on_progress is not None else None
+        command = self.command(targets, ports, timeout_s, max_rate, stats_every_s, timing)
+        percent = 0.0
+        async with aclosing(CmdExec.stream_async(command, timeout=self.COMMAND_TIMEOUT_S)) as chunks:
+            async for chunk in chunks:
+                for host in parser.feed(chunk):
+                    if host.ports:
+                        yield host
+                if on_progress is not None and parser.percent != percent:
+                    percent = parser.percent
+                    on_progress(percent / 100)
+        for host in parser.close():
+            if host.ports:
+                yield host
+        stats.add(parser.stats)
+        if on_progress is not None:
+            on_progress(1.0)
@@ -0,0 +1,131 @@
+import threading
+import time
+from ipaddress import IPv4Address, IPv4Network, IPv6Network
+from pathlib import Path
+
+from ..type import IPTargetSet
+
+
+class RouteTable:
+    """
+    On-link networks of the local host, read from the Linux interface and route tables.
+    A network is on-link when a route without gateway reaches it through an interface that resolves its neighbors
+    with ARP or Neighbor Discovery: up, Ethernet-like, without the NOARP flag. Routes through a gateway, rejected,
+    local or multicast destinations are not on-link. On other systems no network is on-link.
+    """
+
+    ROUTE_V4 = "/proc/net/route"
+    ROUTE_V6 = "/proc/net/ipv6_route"
+    SYS_CLASS_NET = "/sys/class/net"
+
+    # Route flags (linux/route.h, linux/ipv6_route.h)
+    RTF_UP = 0x0001
+    RTF_GATEWAY = 0x0002
+    RTF_REJECT = 0x0200
+    RTF_LOCAL = 0x80000000
+
+    # Interface hardware type (ARPHRD_ETHER) and flags (IFF_UP, IFF_NOARP)
+    ARPHRD_ETHER = 1
+    IFF_UP = 0x1
+    IFF_NOARP = 0x80
+
+    # Time in s the tables are kept before being read again, routes change when links or VPNs go up and down
+    REFRESH_S = 30.0
+
+    _table: "RouteTable" = None
+    _loaded_at: float = 0.0
+    _lock = threading.Lock()
+
+    def __init__(self, on_link: IPTargetSet):
+        """
+        Initialize the table.
+        :param on_link: The on-link networks.
+        """
+        self._on_link = on_link
+
+    @classmethod
+    def get_table(cls) -> "RouteTable":
+        """
+        Get the table of the local host, read again once older than REFRESH_S.
+        """
+        with cls._lock:
+            if cls._table is None or time.monotonic() - cls._loaded_at > cls.REFRESH_S:
+                cls._table = cls.load()
+                cls._loaded_at = time.monotonic()
+            return cls._table
+
+    @classmethod
+    def _neighbor_discovery(cls, interface: str) -> bool:
+        """
+        Whether an interface is up and resolves its neighbors with ARP or Neighbor Discovery.
+        """
+        path = Path(cls.SYS_CLASS_NET) / interface
+        try:
+            hardware = int((path / "type").read_text())
+            flags = int((path / "flags").read_text(), 16)
+        except (OSError, ValueError):
+            return False
+        return hardware == cls.ARPHRD_ETHER and bool(flags & cls.IFF_UP) and not flags & cls.IFF_NOARP
+
+    @classmethod
+    def _routes_v4(cls) -> list[tuple[str, IPv4Network]]:
+        """
+        Read the IPv4 routes without gateway, their destination in little-endian hex.
+        :return: The interface and destination of each route.
+        """
+        routes = []
+        for line in Path(cls.ROUTE_V4).read_text().splitlines()[1:]:
+            fields = line.split()
+            if len(fields) < 8:
+                continue
+            interface, destination, _, flags, *_ = fields
+            mask = int.from_bytes(bytes.fromhex(fields[7]), "little")
+            flags = int(flags, 16)
+            if flags & cls.RTF_UP and not flags & (cls.RTF_GATEWAY | cls.RTF_REJECT) and mask:
+                address = IPv4Address(int.from_bytes(bytes.fromhex(destination), "little"))
+                routes.append((interface, IPv4Network(f"{address}/{bin(mask).count('1')}", strict=False)))
+        return routes
+
+    @classmethod
+    def _routes_v6(cls) -> list[tuple[str, IPv6Network]]:
+        """
+        Read the IPv6 routes without gateway: destination, prefix length, source, source prefix length, next hop,
+        metric, counters, flags and interface.
+        :return: The interface and destination of each route.
+        """
+        routes = []
+        for line in Path(cls.ROUTE_V6).read_text().splitlines():
+            fields = line.split()
+            if len(fields) < 10:
+                continue
+            destination, prefix_length, next_hop, interface = fields[0], int(fields[1], 16), fields[4], fields[9]
+            flags = int(fields[8], 16)
+            if not flags & cls.RTF_UP or flags & (cls.RTF_GATEWAY | cls.RTF_REJECT | cls.RTF_LOCAL):
+                continue
+            network = IPv6Network((int(destination, 16), prefix_length), strict=False)
+            if int(next_hop, 16) or not prefix_length or network.is_multicast:
+                continue
+            routes.append((interface, network))
+        return routes
+
+    @classmethod
+    def load(cls) -> "RouteTable":
+        """
+        Read the tables of the local host.
+        """
+        routes = []
+        for read in (cls._routes_v4, cls._routes_v6):
+            try:
+                routes.extend(read())
+            except (OSError, ValueError):
+                continue
+        interfaces = {interface: cls._neighbor_discovery(interface) for interface in {name for name, _ in routes}}
+        return cls(IPTargetSet(network for interface, network in routes if interfaces[interface]))
+
+    def split(self, targets: IPTargetSet) -> tuple[IPTargetSet, IPTargetSet]:
+        """
+        Split target addresses between the on-link and routed ones.
+        :return: The on-link and the routed addresses.
+        """
+        on_link = targets.intersection(self._on_link)
+        return on_link, targets.difference(on_link)
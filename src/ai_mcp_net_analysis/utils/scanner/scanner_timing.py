@@ -0,0 +1,280 @@
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from ipaddress import ip_address, ip_network, IPv4Address, IPv6Address, IPv4Network, IPv6Network
+
+from ..nmap import NmapHost
+from ..type import IPTargetSet
+
+
+@dataclass(frozen=True)
+class ScanTiming:
+    """
+    Timing options of a scan, None for the scanner default.
+    """
+    max_retries: int = 0
+    initial_rtt_timeout_ms: int | None = None
+    min_rtt_timeout_ms: int | None = None
+    max_rtt_timeout_ms: int | None = None
+    min_parallelism: int | None = None
+
+    def nmap_options(self) -> list[str]:
+        """
+        Get the nmap command line options of the timing.
+        """
+        options = ["--max-retries", str(self.max_retries)]
+        for name, value in (
+            ("--initial-rtt-timeout", self.initial_rtt_timeout_ms),
+            ("--min-rtt-timeout", self.min_rtt_timeout_ms),
+            ("--max-rtt-timeout", self.max_rtt_timeout_ms),
+        ):
+            if value is not None:
+                options += [name, f"{value}ms"]
+        if self.min_parallelism is not None:
+            options += ["--min-parallelism", str(self.min_parallelism)]
+        return options
+
+
+@dataclass(slots=True)
+class SubnetTiming:
+    """
+    Running round trip time and loss statistics of a subnet.
+    """
+    srtt_ms: float = 0.0
+    rttvar_ms: float = 0.0
+    max_rtt_ms: float = 0.0
+    loss: float = 0.0
+    samples: int = 0
+    scans: int = 0
+    up: frozenset[int] = field(default_factory=frozenset)
+
+    def add_rtt(self, rtt_ms: float) -> None:
+        """
+        Update the smoothed round trip time and its variation with a sample, as TCP does (RFC 6298).
+        """
+        if not self.samples:
+            self.srtt_ms = rtt_ms
+            self.rttvar_ms = rtt_ms / 2
+        else:
+            self.rttvar_ms += TimingModel.RTTVAR_GAIN * (abs(self.srtt_ms - rtt_ms) - self.rttvar_ms)
+            self.srtt_ms += TimingModel.SRTT_GAIN * (rtt_ms - self.srtt_ms)
+        self.samples += 1
+
+
+class TimingModel:
+    """
+    Per subnet round trip time and loss statistics learned from the results of the previous scans, used to set
+    the timing options of the next scan of a subnet.
+
+    The round trip times are those reported for the hosts up. The loss is estimated from the hosts up in the
+    previous scan of a subnet and missing from the next scan probing them, converted to a per probe loss rate with
+    the number of retries of the scan. Scans of subnets without statistics keep the scanner defaults.
+    """
+
+    # Default prefix length of the subnets statistics are kept for
+    DEFAULT_PREFIX_LENGTH_V4 = 24
+    DEFAULT_PREFIX_LENGTH_V6 = 64
+
+    # Default maximum number of subnets, the least recently updated ones are dropped
+    DEFAULT_MAX_SUBNETS = 4096
+
+    # Default fraction of the hosts up allowed to be missed because of lost probes, sets the retries
+    DEFAULT_TARGET_MISS = 0.01
+
+    # Default maximum number of probe retries
+    DEFAULT_MAX_RETRIES = 3
+
+    # Gains of the smoothed round trip time and of its variation, from RFC 6298
+    SRTT_GAIN = 1 / 8
+    RTTVAR_GAIN = 1 / 4
+
+    # Weight of the last scan in the loss rate, when it rises and when it falls: a scan with retries misses few
+    # hosts even on a lossy link, the rate only falls slowly so that the retries are not dropped too early
+    LOSS_GAIN_UP = 0.5
+    LOSS_GAIN_DOWN = 0.1
+
+    # Decay of the maximum round trip time at each scan, recent slow replies weigh more
+    MAX_RTT_DECAY = 0.5
+
+    # Bounds of the RTT timeouts in ms, and the nmap default minimum, only lowered for subnets whose replies
+    # were all faster
+    MIN_RTT_TIMEOUT_MS = 10
+    MAX_RTT_TIMEOUT_MS = 10000
+    NMAP_MIN_RTT_TIMEOUT_MS = 100
+
+    # Round trip time under which a subnet is fast enough for more parallel probes, and the parallelism used
+    FAST_RTT_MS = 5.0
+    FAST_MIN_PARALLELISM = 128
+
+    # Loss rate above which a subnet does not get more parallel probes, nmap slows down on drops by itself
+    LOSSY_LOSS = 0.05
+
+    def __init__(
+        self,
+        prefix_length_v4: int = DEFAULT_PREFIX_LENGTH_V4,
+        prefix_length_v6: int = DEFAULT_PREFIX_LENGTH_V6,
+        max_subnets: int = DEFAULT_MAX_SUBNETS,
+        target_miss: float = DEFAULT_TARGET_MISS,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ):
+        """
+        Initialize the model.
+        :param prefix_length_v4: Prefix length of the IPv4 subnets statistics are kept for.
+        :param prefix_length_v6: Prefix length of the IPv6 subnets statistics are kept for.
+        :param max_subnets: Maximum number of subnets, the least recently updated ones are dropped.
+        :param target_miss: Fraction of the hosts up allowed to be missed because of lost probes.
+        :param max_retries: Maximum number of probe retries.
+        """
+        self._prefix_lengths = {4: prefix_length_v4, 6: prefix_length_v6}
+        self._max_subnets = max_subnets
+        self._target_miss = target_miss
+        self._max_retries = max_retries
+        self._subnets: OrderedDict[tuple[int, int], SubnetTiming] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, version: int, address: int) -> tuple[int, int]:
+        """
+        Identify the subnet of an address by its version and network number.
+        """
+        bits = 32 if version == 4 else 128
+        return version, address >> (bits - self._prefix_lengths[version])
+
+    def _network(self, key: tuple[int, int]) -> IPv4Network | IPv6Network:
+        """
+        Get the network of a subnet key.
+        """
+        version, number = key
+        bits = 32 if version == 4 else 128
+        prefix_length = self._prefix_lengths[version]
+        return ip_network((number << (bits - prefix_length), prefix_length))
+
+    def _known_keys(self, targets: IPTargetSet) -> list[tuple[int, int]]:
+        """
+        Get the keys of the subnets with statistics overlapping the targets, from the key range of each interval
+        of the targets. Called with the lock held.
+        """
+        keys = {}
+        for first, last in targets.ranges():
+            version = first.version
+            low, high = self._key(version, int(first))[1], self._key(version, int(last))[1]
+            if high - low < len(self._subnets):
+                candidates = ((version, number) for number in range(low, high + 1))
+                keys.update((key, None) for key in candidates if key in self._subnets)
+            else:
+                keys.update((key, None) for key in self._subnets if key[0] == version and low <= key[1] <= high)
+        return list(keys)
+
+    def record(self, targets: IPTargetSet, hosts: list[NmapHost], timing: ScanTiming | None = None) -> None:
+        """
+        Update the statistics of the scanned subnets with the result of a scan.
+        :param targets: The scanned addresses.
+        :param hosts: The host records of the scan.
+        :param timing: The timing options of the scan, None for the defaults.
+        """
+        retries = timing.max_retries if timing is not None else 0
+        rtts: dict[tuple[int, int], list[float]] = {}
+        up: dict[tuple[int, int], set[int]] = {}
+        for host in hosts:
+            if host.state != "up":
+                continue
+            address = ip_address(host.ip)
+            key = self._key(address.version, int(address))
+            up.setdefault(key, set()).add(int(address))
+            if host.latency_ms is not None:
+                rtts.setdefault(key, []).append(host.latency_ms)
+
+        with self._lock:
+            keys = set(rtts).union(self._known_keys(targets))
+            for key in keys:
+                subnet = self._subnets.get(key)
+                if subnet is None:
+                    if key not in rtts:
+                        continue
+                    subnet = self._subnets[key] = SubnetTiming()
+
+                samples = rtts.get(key, ())
+                for rtt_ms in samples:
+                    subnet.add_rtt(rtt_ms)
+                if samples:
+                    subnet.max_rtt_ms = max(max(samples), subnet.max_rtt_ms * self.MAX_RTT_DECAY)
+
+                # Losses are measured on the hosts up in the previous scan which were probed again
+                current = up.get(key, set())
+                address_class = IPv4Address if key[0] == 4 else IPv6Address
+                probed = {address for address in subnet.up if address_class(address) in targets}
+                if probed:
+                    missed = len(probed - current) / len(probed)
+                    # A host is missed when all its probes are lost
+                    loss = missed ** (1 / (retries + 1))
+                    gain = self.LOSS_GAIN_UP if loss > subnet.loss else self.LOSS_GAIN_DOWN
+                    subnet.loss += gain * (loss - subnet.loss)
+                subnet.up = frozenset((subnet.up - probed) | current)
+                subnet.scans += 1
+                self._subnets.move_to_end(key)
+
+            while len(self._subnets) > self._max_subnets:
+                self._subnets.popitem(last=False)
+
+    def _retries(self, loss: float) -> int:
+        """
+        Get the number of retries missing at most the target fraction of the hosts up for a probe loss rate.
+        """
+        if loss <= 0:
+            return 0
+        if loss >= 1:
+            return self._max_retries
+        retries = math.ceil(math.log(self._target_miss) / math.log(loss)) - 1
+        return min(max(retries, 0), self._max_retries)
+
+    def timing(self, targets: IPTargetSet) -> ScanTiming | None:
+        """
+        Get the timing options of a scan from the statistics of the subnets it covers, the slowest and lossiest
+        subnet setting them. When some of the scanned addresses are in subnets without statistics, only the
+        retries are set: the RTT timeouts and parallelism are left to the scanner.
+        :param targets: The addresses to scan.
+        :return: The timing options, None if no scanned subnet has statistics.
+        """
+        with self._lock:
+            known = [(key, self._subnets[key]) for key in self._known_keys(targets)]
+        if not known:
+            return None
+
+        srtt_ms = max(subnet.srtt_ms for _, subnet in known)
+        rttvar_ms = max(subnet.rttvar_ms for _, subnet in known)
+        max_rtt_ms = max(subnet.max_rtt_ms for _, subnet in known)
+        loss = max(subnet.loss for _, subnet in known)
+        retries = self._retries(loss)
+
+        covered = targets & IPTargetSet(self._network(key) for key, _ in known)
+        if covered.num_addresses() < targets.num_addresses():
+            return ScanTiming(max_retries=retries)
+
+        def bounded(value: float, low: float) -> int:
+            return int(min(max(value, low), self.MAX_RTT_TIMEOUT_MS))
+
+        min_rtt_timeout_ms = bounded(min(2 * max_rtt_ms, self.NMAP_MIN_RTT_TIMEOUT_MS), self.MIN_RTT_TIMEOUT_MS)
+        initial_rtt_timeout_ms = bounded(srtt_ms + 4 * rttvar_ms, min_rtt_timeout_ms)
+        max_rtt_timeout_ms = bounded(max(2 * initial_rtt_timeout_ms, 2 * max_rtt_ms), initial_rtt_timeout_ms)
+        return ScanTiming(
+            max_retries=retries,
+            initial_rtt_timeout_ms=initial_rtt_timeout_ms,
+            min_rtt_timeout_ms=min_rtt_timeout_ms,
+            max_rtt_timeout_ms=max_rtt_timeout_ms,
+            min_parallelism=self.FAST_MIN_PARALLELISM if srtt_ms <= self.FAST_RTT_MS and loss < self.LOSSY_LOSS
+            else None,
+        )
+
+    def get_subnet(self, network: IPv4Network | IPv6Network) -> SubnetTiming | None:
+        """
+        Get the statistics of the subnet holding a network address, None if unknown.
+        """
+        with self._lock:
+            return self._subnets.get(self._key(network.version, int(network.network_address)))
+
+    def get_stats(self) -> dict:
+        """
+        Get the number of subnets with statistics.
+        """
+        with self._lock:
+            return {"subnets": len(self._subnets)}
@@ -1,3 +1,5 @@
 from .type import DataContainer, DataContainerError  # noqa: F401
-from .type_ip import CIDRIPContainer  # noqa: F401
+from .type_ip import CIDRIPContainer, CIDRIPListContainer  # noqa: F401
+from .type_ip_set import IPTargetSet  # noqa: F401
+from .type_ports import PortListContainer  # noqa: F401
 from .type_tmout_sec import TimeoutSecContainer  # noqa: F401
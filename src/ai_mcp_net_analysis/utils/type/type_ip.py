@@ -1,6 +1,7 @@
 from ipaddress import ip_network, IPv4Network, IPv6Network
 
 from .type import DataContainer, DataContainerError
+from .type_ip_set import IPTargetSet
 
 
 class CIDRIPContainer(DataContainer):
@@ -36,6 +37,90 @@ class CIDRIPContainer(DataContainer):
         """Check if the CIDR IP address is IPv6."""
         return isinstance(self._network, IPv6Network)
 
+    def get_network(self) -> IPv4Network | IPv6Network:
+        """Get the CIDR IP address as an ipaddress network."""
+        return self._network
+
+    def subnets(self, prefix_length: int) -> list[str]:
+        """
+        Split the network into sub-networks of the given prefix length, in address order.
+        The network itself is returned if it is already smaller than the requested prefix length.
+        """
+        if prefix_length <= self._network.prefixlen:
+            return [self.get_value()]
+        return [str(subnet) for subnet in self._network.subnets(new_prefix=prefix_length)]
+
     def __str__(self):
         """Return the string representation of the CIDR IP address."""
         return self._network.__str__()
+
+
+class CIDRIPListContainer(DataContainer):
+    """
+    Subclass for handling a list of IPv4 and IPv6 CIDR IP addresses with exclusions.
+    The networks are merged into the minimal set of networks covering each address once: overlapping and adjacent
+    networks are merged, duplicate addresses removed and the excluded networks cut out.
+    """
+
+    # Maximum number of CIDR IP addresses in a list, included and excluded
+    MAX_ITEMS = 256
+
+    def __init__(self, values: list[str], exclude: list[str] | None = None):
+        self._values = values
+        self._exclude = exclude if exclude is not None else []
+        self._targets = IPTargetSet()
+        self._requested = 0
+        self._unique = 0
+        self._validate()
+
+    def _validate(self) -> None:
+        """Validate the CIDR IP addresses and compute the addresses to scan."""
+        if not isinstance(self._values, list) or not self._values:
+            raise DataContainerError("At least one CIDR IP address is required.")
+        if not isinstance(self._exclude, list):
+            raise DataContainerError("The excluded CIDR IP addresses must be a list.")
+        if len(self._values) + len(self._exclude) > self.MAX_ITEMS:
+            raise DataContainerError(f"Too many CIDR IP addresses: at most {self.MAX_ITEMS} including exclusions.")
+
+        included = [CIDRIPContainer(value).get_network() for value in self._values]
+        excluded = [CIDRIPContainer(value).get_network() for value in self._exclude]
+        self._requested = sum(network.num_addresses for network in included)
+
+        # Merge the networks as address intervals, then cut the excluded intervals out
+        merged = IPTargetSet(included)
+        self._unique = merged.num_addresses()
+        self._targets = merged - IPTargetSet(excluded)
+        if not self._targets:
+            raise DataContainerError("No address left once the excluded CIDR IP addresses are removed.")
+
+    def get_type(self) -> any:
+        """Get the type of the CIDR IP address list."""
+        return self.__class__.__name__
+
+    def get_value(self) -> any:
+        """Get the merged networks to scan as CIDR IP addresses, IPv4 first, in address order."""
+        return [str(network) for network in self._targets.to_networks()]
+
+    def get_networks(self) -> list[IPv4Network | IPv6Network]:
+        """Get the merged networks to scan as ipaddress networks, IPv4 first, in address order."""
+        return self._targets.to_networks()
+
+    def get_target_set(self) -> IPTargetSet:
+        """Get the addresses to scan as an interval set."""
+        return self._targets
+
+    def num_addresses(self) -> int:
+        """Get the number of addresses to scan."""
+        return self._targets.num_addresses()
+
+    def num_duplicates(self) -> int:
+        """Get the number of requested addresses removed because they were listed more than once."""
+        return self._requested - self._unique
+
+    def num_excluded(self) -> int:
+        """Get the number of requested addresses removed because they were excluded."""
+        return self._unique - self.num_addresses()
+
+    def __str__(self):
+        """Return the merged networks to scan as a comma separated list."""
+        return ", ".join(self.get_value())
@@ -0,0 +1,265 @@
+from bisect import bisect_right
+from heapq import merge
+from ipaddress import ip_network, summarize_address_range
+from ipaddress import IPv4Address, IPv6Address, IPv4Network, IPv6Network
+from operator import itemgetter
+from typing import Iterable, Iterator
+
+from .type import DataContainerError
+
+# Addresses and networks accepted by the target sets
+IPTarget = IPv4Address | IPv6Address | IPv4Network | IPv6Network | str
+
+
+class IPTargetSet:
+    """
+    Immutable set of IPv4 and IPv6 addresses, stored as sorted, disjoint and non adjacent integer intervals for each
+    address family. Set operations, membership tests, counting and splitting work on the intervals and never
+    enumerate the addresses: their cost depends on the number of intervals, not on the number of addresses.
+    """
+
+    __slots__ = ("_intervals",)
+
+    # Address families
+    VERSIONS = (4, 6)
+
+    def __init__(self, targets: Iterable[IPTarget] = ()):
+        """
+        Initialize the set with addresses and networks.
+        :param targets: Addresses and networks, as ipaddress objects or strings in CIDR notation.
+        :raises DataContainerError: If a string is not a valid address or CIDR.
+        """
+        intervals = {version: [] for version in self.VERSIONS}
+        for target in targets:
+            version, start, end = self._interval(target)
+            intervals[version].append((start, end))
+        self._intervals = {version: self._normalize(items) for version, items in intervals.items()}
+
+    @classmethod
+    def _from_intervals(cls, intervals: dict[int, list[tuple[int, int]]]) -> "IPTargetSet":
+        """
+        Create a set from normalized intervals.
+        """
+        target_set = cls.__new__(cls)
+        target_set._intervals = intervals
+        return target_set
+
+    @staticmethod
+    def _interval(target: IPTarget) -> tuple[int, int, int]:
+        """
+        Get the address family and the [start, end) integer interval of an address or network.
+        """
+        if isinstance(target, str):
+            try:
+                target = ip_network(target, strict=False)
+            except ValueError as e:
+                raise DataContainerError(f"Invalid CIDR IP address: {target} - {e}") from e
+        if isinstance(target, (IPv4Address, IPv6Address)):
+            return target.version, int(target), int(target) + 1
+        if isinstance(target, (IPv4Network, IPv6Network)):
+            return target.version, int(target.network_address), int(target.broadcast_address) + 1
+        raise DataContainerError(f"Invalid IP target: {target!r}")
+
+    @staticmethod
+    def _normalize(intervals: Iterable[tuple[int, int]]) -> list[tuple[int, int]]:
+        """
+        Sort intervals and merge the overlapping and adjacent ones.
+        """
+        result = []
+        for start, end in sorted(intervals):
+            if result and start <= result[-1][1]:
+                if end > result[-1][1]:
+                    result[-1] = (result[-1][0], end)
+            else:
+                result.append((start, end))
+        return result
+
+    @staticmethod
+    def _union(a: list[tuple[int, int]], b: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        """
+        Union of two normalized interval lists.
+        """
+        result = []
+        for start, end in merge(a, b):
+            if result and start <= result[-1][1]:
+                if end > result[-1][1]:
+                    result[-1] = (result[-1][0], end)
+            else:
+                result.append((start, end))
+        return result
+
+    @staticmethod
+    def _intersection(a: list[tuple[int, int]], b: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        """
+        Intersection of two normalized interval lists.
+        """
+        result = []
+        i = j = 0
+        while i < len(a) and j < len(b):
+            start = max(a[i][0], b[j][0])
+            end = min(a[i][1], b[j][1])
+            if start < end:
+                result.append((start, end))
+            if a[i][1] < b[j][1]:
+                i += 1
+            else:
+                j += 1
+        return result
+
+    @staticmethod
+    def _difference(a: list[tuple[int, int]], b: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        """
+        Difference of two normalized interval lists.
+        """
+        result = []
+        j = 0
+        for start, end in a:
+            # Skip the removed intervals ending before this one
+            while j < len(b) and b[j][1] <= start:
+                j += 1
+            k = j
+            while k < len(b) and b[k][0] < end:
+                if b[k][0] > start:
+                    result.append((start, b[k][0]))
+                start = max(start, b[k][1])
+                if start >= end:
+                    break
+                k += 1
+            if start < end:
+                result.append((start, end))
+        return result
+
+    def union(self, other: "IPTargetSet") -> "IPTargetSet":
+        """
+        Get the addresses in either set.
+        """
+        return self._from_intervals(
+            {version: self._union(self._intervals[version], other._intervals[version]) for version in self.VERSIONS}
+        )
+
+    def intersection(self, other: "IPTargetSet") -> "IPTargetSet":
+        """
+        Get the addresses in both sets.
+        """
+        return self._from_intervals(
+            {version: self._intersection(self._intervals[version], other._intervals[version])
+             for version in self.VERSIONS}
+        )
+
+    def difference(self, other: "IPTargetSet") -> "IPTargetSet":
+        """
+        Get the addresses of this set which are not in the other set.
+        """
+        return self._from_intervals(
+            {version: self._difference(self._intervals[version], other._intervals[version])
+             for version in self.VERSIONS}
+        )
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+
+    def family(self, version: int) -> "IPTargetSet":
+        """
+        Get the addresses of an address family.
+        :param version: The IP version, 4 or 6.
+        """
+        return self._from_intervals(
+            {item: list(self._intervals[item]) if item == version else [] for item in self.VERSIONS}
+        )
+
+    def __contains__(self, target: IPTarget) -> bool:
+        """
+        Check whether an address, or all the addresses of a network, are in the set.
+        """
+        version, start, end = self._interval(target)
+        intervals = self._intervals[version]
+        index = bisect_right(intervals, start, key=itemgetter(0)) - 1
+        return index >= 0 and intervals[index][1] >= end
+
+    def num_addresses(self, version: int | None = None) -> int:
+        """
+        Count the addresses of the set.
+        :param version: The IP version to count, None for both.
+        """
+        versions = self.VERSIONS if version is None else (version,)
+        return sum(end - start for item in versions for start, end in self._intervals[item])
+
+    def num_intervals(self) -> int:
+        """
+        Count the intervals of consecutive addresses of the set.
+        """
+        return sum(len(intervals) for intervals in self._intervals.values())
+
+    def split(self, count: int) -> list["IPTargetSet"]:
+        """
+        Split the set into chunks of the same number of addresses, plus or minus one, in address order.
+        :param count: The number of chunks, fewer are returned if the set has fewer addresses.
+        :return: The non empty chunks, IPv4 addresses first.
+        """
+        if count < 1:
+            raise DataContainerError(f"Invalid number of chunks: {count}")
+        size, extra = divmod(self.num_addresses(), count)
+
+        chunks = []
+        chunk = {version: [] for version in self.VERSIONS}
+        remaining = size + (1 if extra > 0 else 0)
+        for version in self.VERSIONS:
+            for start, end in self._intervals[version]:
+                while start < end and remaining:
+                    stop = min(end, start + remaining)
+                    chunk[version].append((start, stop))
+                    remaining -= stop - start
+                    start = stop
+                    if not remaining:
+                        chunks.append(self._from_intervals(chunk))
+                        chunk = {item: [] for item in self.VERSIONS}
+                        remaining = size + (1 if len(chunks) < extra else 0)
+        return chunks
+
+    def ranges(self) -> Iterator[tuple[IPv4Address | IPv6Address, IPv4Address | IPv6Address]]:
+        """
+        Iterate over the first and last addresses of the intervals of consecutive addresses, IPv4 first.
+        """
+        for version in self.VERSIONS:
+            address_class = IPv4Address if version == 4 else IPv6Address
+            for start, end in self._intervals[version]:
+                yield address_class(start), address_class(end - 1)
+
+    def to_networks(self) -> list[IPv4Network | IPv6Network]:
+        """
+        Get the smallest list of networks covering the set, IPv4 first, in address order.
+        """
+        return [network for first, last in self.ranges() for network in summarize_address_range(first, last)]
+
+    def __bool__(self) -> bool:
+        """
+        Whether the set holds any address.
+        """
+        return any(self._intervals.values())
+
+    def __eq__(self, other: object) -> bool:
+        """
+        Sets are equal if they hold the same addresses.
+        """
+        if not isinstance(other, IPTargetSet):
+            return NotImplemented
+        return self._intervals == other._intervals
+
+    def __hash__(self) -> int:
+        """
+        Hash of the addresses of the set.
+        """
+        return hash(tuple(tuple(self._intervals[version]) for version in self.VERSIONS))
+
+    def __str__(self) -> str:
+        """
+        Return the networks of the set as a comma separated list.
+        """
+        return ", ".join(str(network) for network in self.to_networks())
+
+    def __repr__(self) -> str:
+        """
+        String representation of the set.
+        """
+        return f"{self.__class__.__name__}([{', '.join(repr(str(network)) for network in self.to_networks())}])"
@@ -0,0 +1,113 @@
+from typing import Iterable
+
+from .type import DataContainer, DataContainerError
+
+
+class PortListContainer(DataContainer):
+    """
+    Subclass for handling a list of TCP or UDP ports.
+    The ports are given as an nmap style specification ("22,80,8000-8100") or as a list of port numbers, and are
+    stored as sorted, disjoint and non adjacent [first, last] ranges.
+    """
+
+    # Valid port numbers
+    MIN_PORT = 1
+    MAX_PORT = 65535
+
+    def __init__(self, value: str | Iterable[int]):
+        self._value = value
+        self._ranges: list[tuple[int, int]] = []
+        self._validate()
+
+    @classmethod
+    def _from_ranges(cls, ranges: list[tuple[int, int]]) -> "PortListContainer":
+        """Create a port list from normalized ranges."""
+        ports = cls.__new__(cls)
+        ports._value = None
+        ports._ranges = ranges
+        return ports
+
+    def _parse(self) -> list[tuple[int, int]]:
+        """Parse the port specification into ranges."""
+        if not isinstance(self._value, str):
+            try:
+                return [(int(port), int(port)) for port in self._value]
+            except (TypeError, ValueError) as e:
+                raise DataContainerError(f"Invalid port list: {self._value!r}") from e
+
+        ranges = []
+        for item in self._value.split(","):
+            first, separator, last = item.strip().partition("-")
+            try:
+                first = int(first) if first else self.MIN_PORT
+                last = (int(last) if last else self.MAX_PORT) if separator else first
+            except ValueError as e:
+                raise DataContainerError(f"Invalid port range: {item.strip()!r}") from e
+            if first > last:
+                raise DataContainerError(f"Invalid port range: {item.strip()!r}, {first} is greater than {last}")
+            ranges.append((first, last))
+        return ranges
+
+    def _validate(self) -> None:
+        """Validate the ports and merge them into ranges."""
+        ranges = self._parse()
+        if not ranges:
+            raise DataContainerError("At least one port is required.")
+        for first, last in ranges:
+            if first < self.MIN_PORT or last > self.MAX_PORT:
+                raise DataContainerError(
+                    f"Port numbers must be between {self.MIN_PORT} and {self.MAX_PORT}, got {first}-{last}."
+                )
+
+        # Merge the overlapping and adjacent ranges
+        for first, last in sorted(ranges):
+            if self._ranges and first <= self._ranges[-1][1] + 1:
+                if last > self._ranges[-1][1]:
+                    self._ranges[-1] = (self._ranges[-1][0], last)
+            else:
+                self._ranges.append((first, last))
+
+    def get_type(self) -> any:
+        """Get the type of the port list."""
+        return self.__class__.__name__
+
+    def get_value(self) -> any:
+        """Get the ports as an nmap port specification, in port order."""
+        return ",".join(str(first) if first == last else f"{first}-{last}" for first, last in self._ranges)
+
+    def get_ranges(self) -> list[tuple[int, int]]:
+        """Get the ports as [first, last] ranges, in port order."""
+        return list(self._ranges)
+
+    def num_ports(self) -> int:
+        """Get the number of ports."""
+        return sum(last - first + 1 for first, last in self._ranges)
+
+    def split(self, count: int) -> list["PortListContainer"]:
+        """
+        Split the ports into chunks of the same number of ports, plus or minus one, in port order.
+        :param count: The number of chunks, fewer are returned if there are fewer ports.
+        :return: The non empty chunks.
+        """
+        if count < 1:
+            raise DataContainerError(f"Invalid number of chunks: {count}")
+        size, extra = divmod(self.num_ports(), count)
+
+        chunks = []
+        chunk = []
+        remaining = size + (1 if extra > 0 else 0)
+        for first, last in self._ranges:
+            while first <= last and remaining:
+                stop = min(last, first + remaining - 1)
+                chunk.append((first, stop))
+                remaining -= stop - first + 1
+                first = stop + 1
+                if not remaining:
+                    chunks.append(self._from_ranges(chunk))
+                    chunk = []
+                    remaining = size + (1 if len(chunks) < extra else 0)
+        return chunks
+
+    def __str__(self):
+        """Return the ports as an nmap port specification."""
+        return self.get_value()
@@ -0,0 +1,72 @@
+import argparse
+
+from utils import ConfigParser, ConfigData
+from utils import Logger, LoggerFactory
+from utils import ClusterCoordinator, ClusterWorker
+
+
+# Default configuration file path
+CONFIG_PATH = "config/config.yaml"
+
+
+def coordinator_address(value: str) -> tuple[str, int | None]:
+    """
+    Parse a coordinator address, used as the argparse type of the --coordinator option.
+    :param value: The address as 'host', 'host:port', '[v6]' or '[v6]:port', a bare IPv6 address has no port.
+    :return: The host and port, None for the configured port.
+    :raises argparse.ArgumentTypeError: If the address is not valid.
+    """
+    port = None
+    if value.startswith("["):
+        host, bracket, rest = value[1:].partition("]")
+        if not bracket or (rest and not rest.startswith(":")):
+            raise argparse.ArgumentTypeError(f"invalid address '{value}', expected [v6] or [v6]:port")
+        port = rest[1:] if rest else None
+    elif value.count(":") == 1:
+        host, _, port = value.partition(":")
+    else:
+        host = value
+    if not host:
+        raise argparse.ArgumentTypeError(f"invalid address '{value}', no host")
+    if port is not None:
+        if not port.isdigit() or not 0 < int(port) < 65536:
+            raise argparse.ArgumentTypeError(f"invalid address '{value}', expected a port between 1 and 65535")
+        port = int(port)
+    return host, port
+
+
+async def work(
+    cfg_path: str = CONFIG_PATH,
+    coordinator: tuple[str, int | None] | None = None,
+    name: str | None = None,
+    capacity: int | None = None,
+) -> None:
+    """
+    Run a scan worker serving the coordinator of the cluster configuration section.
+    :param cfg_path: The configuration file path.
+    :param coordinator: The coordinator host and port, None for the configured ones, a None port for the
+        configured one.
+    :param name: The worker name, None for the host name and process id.
+    :param capacity: Number of shards run at once, None for the configured one.
+    """
+
+    # Load the configuration
+    config_data = ConfigParser.get_config(cfg_path).config
+    logger: Logger = LoggerFactory.get_logger(config_data)
+
+    cluster = config_data.get_value("cluster", ConfigData({}))
+    host = cluster.get_value("host", ClusterCoordinator.DEFAULT_HOST)
+    port = cluster.get_value("port", ClusterCoordinator.DEFAULT_PORT)
+    if coordinator is not None:
+        host, port = coordinator[0], coordinator[1] or port
+
+    worker = ClusterWorker(
+        host.strip("[]"),
+        port,
+        name=name,
+        capacity=capacity or cluster.get_value("capacity", ClusterWorker.DEFAULT_CAPACITY),
+        token=cluster.get_value("token", ""),
+        heartbeat_interval_s=cluster.get_value("heartbeat_interval_s", ClusterWorker.DEFAULT_HEARTBEAT_INTERVAL_S),
+    )
+    logger.log_info("Starting scan worker for the coordinator %s:%d", host, port)
+    await worker.run()
@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+
+import pytest
+import yaml
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# The package modules import each other as top-level 'utils' and 'tools' packages
+sys.path.insert(0, str(ROOT / "src" / "ai_mcp_net_analysis"))
+
+from utils import ConfigParser, Logger, LoggerFactory  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def logger(tmp_path_factory) -> Logger:
+    """
+    Logger of the components under test, writing to a temporary directory.
+    """
+    workdir = tmp_path_factory.mktemp("logs")
+    config = yaml.safe_load((ROOT / "config" / "config.yaml").read_text())
+    config["logging"]["file"]["path"] = str(workdir / "tests.log")
+    cfg_path = workdir / "config.yaml"
+    cfg_path.write_text(yaml.safe_dump(config))
+    return LoggerFactory.get_logger(ConfigParser.get_config(str(cfg_path)).config)
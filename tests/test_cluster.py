@@ -0,0 +1,215 @@
+import argparse
+import asyncio
+import time
+
+import pytest
+
+from utils.cluster import ClusterCoordinator, ClusterError, ClusterProtocol, ClusterWorker
+from worker import coordinator_address
+
+TOKEN = "secret"
+
+# Time in s the tests wait for the workers and shards
+TIMEOUT_S = 5.0
+
+
+class FakeScanner:
+    """
+    Stand-in nmap scanner of a worker: the shards wait until released, or answer at once if not held.
+    """
+
+    def __init__(self, name: str, hold: bool = False):
+        self.name = name
+        self.hold = hold
+        self.started: list[list[str]] = []
+        self.cancelled: list[list[str]] = []
+        self.release = asyncio.Event()
+
+    async def report_async(self, targets, timeout_s, max_rate=None, timing=None, technique=None) -> str:
+        self.started.append(targets)
+        try:
+            if self.hold:
+                await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled.append(targets)
+            raise
+        return f"<nmaprun worker='{self.name}' targets='{','.join(targets)}'/>"
+
+
+async def wait_for(condition, timeout_s: float = TIMEOUT_S) -> None:
+    """
+    Wait until a condition holds.
+    """
+    deadline = time.monotonic() + timeout_s
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+class Cluster:
+    """
+    Coordinator and workers on localhost, run in the tasks of the test.
+    """
+
+    def __init__(self, **limits):
+        self.coordinator = ClusterCoordinator("127.0.0.1", 0, TOKEN, **limits)
+        self.tasks: dict[str, asyncio.Task] = {}
+        self.scanners: dict[str, FakeScanner] = {}
+
+    async def __aenter__(self) -> "Cluster":
+        self.tasks["coordinator"] = asyncio.create_task(self.coordinator.run())
+        await wait_for(lambda: self.coordinator.get_port() != 0)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        for task in self.tasks.values():
+            task.cancel()
+        await asyncio.gather(*self.tasks.values(), return_exceptions=True)
+
+    async def start_worker(self, name: str, capacity: int = 2, hold: bool = False) -> FakeScanner:
+        """
+        Start a worker and wait for its registration.
+        """
+        scanner = self.scanners[name] = FakeScanner(name, hold)
+        count = self.coordinator.get_stats()["workers"]
+        worker = ClusterWorker(
+            "127.0.0.1", self.coordinator.get_port(), name, capacity, TOKEN, heartbeat_interval_s=0.2, scanner=scanner
+        )
+        self.tasks[name] = asyncio.create_task(worker.run())
+        await wait_for(lambda: self.coordinator.get_stats()["workers"] == count + 1)
+        return scanner
+
+    async def kill_worker(self, name: str) -> None:
+        """
+        Stop a worker, its connection is closed.
+        """
+        task = self.tasks.pop(name)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+def test_registration_token(logger):
+    async def run():
+        async with Cluster() as cluster:
+            await cluster.start_worker("good")
+            assert cluster.coordinator.has_workers()
+
+            reader, writer = await asyncio.open_connection("127.0.0.1", cluster.coordinator.get_port())
+            await ClusterProtocol.send(
+                writer, {"type": ClusterProtocol.REGISTER, "name": "bad", "capacity": 2, "token": "wrong"}
+            )
+            # The connection is closed without answer
+            assert await asyncio.wait_for(ClusterProtocol.receive(reader), TIMEOUT_S) is None
+            writer.close()
+            stats = cluster.coordinator.get_stats()
+            assert stats["registered"] == 1 and stats["workers"] == 1
+
+    asyncio.run(run())
+
+
+def test_least_loaded_dispatch(logger):
+    async def run():
+        async with Cluster() as cluster:
+            first = await cluster.start_worker("first", capacity=2, hold=True)
+            second = await cluster.start_worker("second", capacity=4, hold=True)
+            coordinator = cluster.coordinator
+            reports = []
+            for index in range(4):
+                reports.append(asyncio.create_task(coordinator.report([f"10.0.{index}.0/24"], 5)))
+                await wait_for(lambda: coordinator.get_stats()["in_flight"] == len(reports))
+            # Each shard goes to the worker with the smallest fraction of its capacity in use, the first registered
+            # on a tie: first 0/2 and second 0/4, then first 1/2 and second 0/4, first 1/2 and second 1/4, then
+            # first 1/2 and second 2/4
+            await wait_for(lambda: len(first.started) + len(second.started) == 4)
+            assert first.started == [["10.0.0.0/24"], ["10.0.3.0/24"]]
+            assert second.started == [["10.0.1.0/24"], ["10.0.2.0/24"]]
+
+            # The next shards go to the worker with free slots, then wait for a slot
+            reports.extend(asyncio.create_task(coordinator.report([f"10.1.{i}.0/24"], 5)) for i in range(2))
+            await wait_for(lambda: coordinator.get_stats()["in_flight"] == 6)
+            await wait_for(lambda: len(second.started) == 4)
+            assert len(first.started) == 2
+            late = asyncio.create_task(coordinator.report(["10.2.0.0/24"], 5))
+            await asyncio.sleep(0.1)
+            assert not late.done() and coordinator.get_stats()["in_flight"] == 6
+
+            first.release.set()
+            second.release.set()
+            results = await asyncio.wait_for(asyncio.gather(*reports, late), TIMEOUT_S)
+            assert "targets='10.2.0.0/24'" in results[-1]
+            assert coordinator.get_stats()["in_flight"] == 0
+
+    asyncio.run(run())
+
+
+def test_shard_resent_when_worker_lost(logger):
+    async def run():
+        async with Cluster() as cluster:
+            lost = await cluster.start_worker("lost", hold=True)
+            report = asyncio.create_task(cluster.coordinator.report(["10.0.0.0/24"], 5))
+            await wait_for(lambda: lost.started)
+            await cluster.start_worker("spare")
+            await cluster.kill_worker("lost")
+
+            result = await asyncio.wait_for(report, TIMEOUT_S)
+            assert "worker='spare'" in result
+            stats = cluster.coordinator.get_stats()
+            assert stats["retries"] == 1 and stats["lost"] == 1 and stats["failures"] == 0
+
+    asyncio.run(run())
+
+
+def test_max_attempts_exhausted(logger):
+    async def run():
+        async with Cluster(max_attempts=2, wait_s=1.0) as cluster:
+            first = await cluster.start_worker("first", hold=True)
+            second = await cluster.start_worker("second", hold=True)
+            report = asyncio.create_task(cluster.coordinator.report(["10.0.0.0/24"], 5))
+            await wait_for(lambda: first.started or second.started)
+            await cluster.kill_worker("first" if first.started else "second")
+            await wait_for(lambda: first.started and second.started)
+            await cluster.kill_worker("second" if first.cancelled else "first")
+
+            with pytest.raises(ClusterError, match="lost on 2 attempts"):
+                await asyncio.wait_for(report, TIMEOUT_S)
+            stats = cluster.coordinator.get_stats()
+            assert stats["retries"] == 2 and stats["failures"] == 1
+
+    asyncio.run(run())
+
+
+def test_cancel_sent_to_worker(logger):
+    async def run():
+        async with Cluster() as cluster:
+            scanner = await cluster.start_worker("worker", hold=True)
+            report = asyncio.create_task(cluster.coordinator.report(["10.0.0.0/24"], 5))
+            await wait_for(lambda: scanner.started)
+            report.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await report
+
+            # The worker cancels the shard and keeps its connection
+            await wait_for(lambda: scanner.cancelled == [["10.0.0.0/24"]])
+            stats = cluster.coordinator.get_stats()
+            assert stats["in_flight"] == 0 and stats["workers"] == 1 and stats["lost"] == 0
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("value, address", [
+    ("scanner.lan", ("scanner.lan", None)),
+    ("10.0.0.1:9750", ("10.0.0.1", 9750)),
+    ("[fd00::1]:9750", ("fd00::1", 9750)),
+    ("[fd00::1]", ("fd00::1", None)),
+    ("fd00::1", ("fd00::1", None)),
+])
+def test_coordinator_address(value, address):
+    assert coordinator_address(value) == address
+
+
+@pytest.mark.parametrize("value", [
+    "", ":9750", "host:", "host:port", "host:70000", "[fd00::1", "[fd00::1]9750", "[]:1",
+])
+def test_coordinator_address_invalid(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        coordinator_address(value)
@@ -0,0 +1,146 @@
+import asyncio
+import os
+from pathlib import Path
+
+import pytest
+import yaml
+
+from utils import ConfigParser, ConfigData, ConfigWatcher
+from tools import Tool
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class ConfigFile:
+    """
+    Temporary copy of the configuration, edited by the tests.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.config = yaml.safe_load((ROOT / "config" / "config.yaml").read_text())
+        # No component of the tools touching the disk or the network
+        self.config["inventory"]["enabled"] = False
+        self.config["cluster"]["enabled"] = False
+        self.config["dns"]["enabled"] = False
+        self._mtime_ns = 0
+        self.write(yaml.safe_dump(self.config))
+
+    def write(self, text: str) -> None:
+        # Each edit gets a later modification time, whatever the file system time resolution
+        self.path.write_text(text)
+        self._mtime_ns = max(self._mtime_ns, os.stat(self.path).st_mtime_ns) + 1_000_000
+        os.utime(self.path, ns=(self._mtime_ns, self._mtime_ns))
+
+    def edit(self, section: str, **values) -> None:
+        self.config[section].update(values)
+        self.write(yaml.safe_dump(self.config))
+
+
+@pytest.fixture
+def config_file(tmp_path, logger) -> ConfigFile:
+    return ConfigFile(tmp_path / "config.yaml")
+
+
+def test_config_data_immutable():
+    config = ConfigData({"cache": {"enabled": True, "ttl_s": 30}, "hosts": [{"ip": "10.0.0.1"}], "not-a-slot": 1})
+
+    with pytest.raises(AttributeError):
+        config.cache = None
+    with pytest.raises(AttributeError):
+        config.cache.ttl_s = 60
+    with pytest.raises(AttributeError):
+        config.hosts[0].ip = "10.0.0.2"
+    # Lists are frozen into tuples
+    assert isinstance(config.hosts, tuple)
+    with pytest.raises(TypeError):
+        config.hosts[0] = None
+
+    assert config.cache.ttl_s == 30 and config["not-a-slot"] == 1
+    assert config.to_dict() == {"cache": {"enabled": True, "ttl_s": 30}, "hosts": [{"ip": "10.0.0.1"}],
+                                "not-a-slot": 1}
+    assert config == ConfigData(config.to_dict())
+
+
+def test_check_unchanged(config_file):
+    watcher = ConfigWatcher(str(config_file.path), lambda config_data: None)
+    assert watcher.check() is None
+
+
+def test_check_broken_edit_ignored(config_file):
+    watcher = ConfigWatcher(str(config_file.path), lambda config_data: None)
+
+    config_file.write("cache: [unclosed\n")
+    assert watcher.check() is None
+    config_file.edit("cache", max_entries="many")
+    assert watcher.check() is None
+    # Reported once, not again until the next change
+    assert watcher.check() is None
+
+    config_file.edit("cache", max_entries=64)
+    config_data = watcher.check()
+    assert config_data.cache.max_entries == 64
+    assert watcher.check() is None
+
+
+def test_check_removed_file(config_file):
+    watcher = ConfigWatcher(str(config_file.path), lambda config_data: None)
+    config_file.path.unlink()
+    assert watcher.check() is None
+
+
+def test_reload_tools(config_file):
+    async def run():
+        Tool.configure(ConfigParser.get_config(str(config_file.path)).config)
+        initial = Tool.get_config()
+        cache = Tool._cache
+
+        watcher = ConfigWatcher(str(config_file.path), Tool.configure, interval_s=0.01)
+        task = asyncio.create_task(watcher.run())
+        try:
+            # A broken edit keeps the previous configuration
+            config_file.write("cache: {enabled: true, ttl_s: -1}\n")
+            await asyncio.sleep(0.1)
+            assert Tool.get_config() is initial
+            assert Tool._cache is cache
+
+            # A valid edit swaps the new configuration in, the components of the unchanged sections are kept
+            config_file.edit("scheduler", max_concurrent=2)
+            await asyncio.sleep(0.1)
+            assert Tool.get_config() is not initial
+            assert Tool.get_config().scheduler.max_concurrent == 2
+            assert Tool.get_scheduler_stats()["max_concurrent"] == 2
+            assert Tool._cache is cache
+
+            config_file.edit("cache", ttl_s=5)
+            await asyncio.sleep(0.1)
+            assert Tool._cache is not cache
+            assert Tool.get_cache_stats()["ttl_s"] == 5
+        finally:
+            task.cancel()
+
+    asyncio.run(run())
+
+
+def test_reload_failure_keeps_watching(config_file):
+    async def run():
+        applied = []
+
+        def on_reload(config_data: ConfigData) -> None:
+            if not applied:
+                applied.append(None)
+                raise RuntimeError("cannot apply")
+            applied.append(config_data)
+
+        watcher = ConfigWatcher(str(config_file.path), on_reload, interval_s=0.01)
+        task = asyncio.create_task(watcher.run())
+        try:
+            config_file.edit("cache", ttl_s=5)
+            await asyncio.sleep(0.1)
+            config_file.edit("cache", ttl_s=6)
+            await asyncio.sleep(0.1)
+        finally:
+            task.cancel()
+        assert [config_data.cache.ttl_s for config_data in applied[1:]] == [6]
+
+    asyncio.run(run())
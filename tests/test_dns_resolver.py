@@ -0,0 +1,176 @@
+import asyncio
+import ipaddress
+import socket
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from utils.dns import ReverseResolver
+
+# The stub DNS server of the benchmarks
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+import stub_dns  # noqa: E402
+
+# Addresses with a PTR record on the stub server, the ones whose integer value is a multiple of 5 have none
+NAMED = ["10.0.0.1", "10.0.0.2", "10.0.0.3", "10.0.0.4"]
+UNNAMED = "10.0.0.5"
+
+
+def qname(ip: str) -> str:
+    """
+    Reverse name of an address, as counted by the stub server.
+    """
+    return ipaddress.ip_address(ip).reverse_pointer
+
+
+def expires_in(resolver: ReverseResolver, ip: str) -> float:
+    """
+    Time in s until the cached answer of an address expires.
+    """
+    return resolver._cache[ip][1] - time.monotonic()
+
+
+def unused_port() -> int:
+    """
+    UDP port of the loopback interface no server listens on.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_positive_ttl_capped(logger):
+    async def run():
+        transport, server, address = await stub_dns.start(ttl_s=86400)
+        try:
+            resolver = ReverseResolver([address], max_ttl_s=0.2)
+            assert await resolver.resolve([NAMED[0]]) == {NAMED[0]: "host-a000001.lan"}
+            # Cached for the maximum time, not the record time to live
+            assert 0 < expires_in(resolver, NAMED[0]) <= 0.2
+            await resolver.resolve([NAMED[0]])
+            assert server.queries[qname(NAMED[0])] == 1
+            assert resolver.get_stats()["hits"] == 1
+
+            await asyncio.sleep(0.25)
+            assert await resolver.resolve([NAMED[0]]) == {NAMED[0]: "host-a000001.lan"}
+            assert server.queries[qname(NAMED[0])] == 2
+        finally:
+            transport.close()
+
+    asyncio.run(run())
+
+
+def test_negative_ttl(logger):
+    async def run():
+        transport, server, address = await stub_dns.start(negative_ttl_s=1)
+        try:
+            resolver = ReverseResolver([address], negative_ttl_s=300)
+            assert await resolver.resolve([UNNAMED]) == {UNNAMED: None}
+            # Cached for the SOA minimum of the zone, below the configured maximum
+            assert 0.5 < expires_in(resolver, UNNAMED) <= 1
+            assert await resolver.resolve([UNNAMED]) == {UNNAMED: None}
+            stats = resolver.get_stats()
+            assert stats["negative"] == 1 and stats["negative_hits"] == 1 and stats["failures"] == 0
+            assert server.queries[qname(UNNAMED)] == 1
+
+            await asyncio.sleep(1.05)
+            await resolver.resolve([UNNAMED])
+            assert server.queries[qname(UNNAMED)] == 2
+
+            # The configured maximum caps the SOA minimum
+            capped = ReverseResolver([address], negative_ttl_s=0.2)
+            await capped.resolve([UNNAMED])
+            assert 0 < expires_in(capped, UNNAMED) <= 0.2
+        finally:
+            transport.close()
+
+    asyncio.run(run())
+
+
+def test_unreachable_server(logger):
+    async def run():
+        resolver = ReverseResolver([f"127.0.0.1:{unused_port()}"], timeout_s=0.1, retries=1)
+        start = time.monotonic()
+        assert await resolver.resolve([NAMED[0]]) == {NAMED[0]: None}
+        assert time.monotonic() - start < 1
+        stats = resolver.get_stats()
+        assert stats["failures"] == 1 and stats["queries"] == 2
+        # The failure is cached as a negative answer for a short time, no query is sent again meanwhile
+        assert ReverseResolver.FAILURE_TTL_S - 1 < expires_in(resolver, NAMED[0]) <= ReverseResolver.FAILURE_TTL_S
+        assert await resolver.resolve([NAMED[0]]) == {NAMED[0]: None}
+        stats = resolver.get_stats()
+        assert stats["queries"] == 2 and stats["negative_hits"] == 1
+
+        # Never longer than the negative answers
+        short = ReverseResolver([f"127.0.0.1:{unused_port()}"], timeout_s=0.1, retries=0, negative_ttl_s=0.2)
+        await short.resolve([NAMED[0]])
+        assert 0 < expires_in(short, NAMED[0]) <= 0.2
+
+    asyncio.run(run())
+
+
+def test_failure_ttl_expires(logger, monkeypatch):
+    monkeypatch.setattr(ReverseResolver, "FAILURE_TTL_S", 0.2)
+
+    async def run():
+        resolver = ReverseResolver([f"127.0.0.1:{unused_port()}"], timeout_s=0.1, retries=0)
+        await resolver.resolve([NAMED[0]])
+        await asyncio.sleep(0.25)
+        await resolver.resolve([NAMED[0]])
+        stats = resolver.get_stats()
+        assert stats["queries"] == 2 and stats["failures"] == 2 and stats["negative_hits"] == 0
+
+    asyncio.run(run())
+
+
+def test_lru_eviction(logger):
+    async def run():
+        transport, server, address = await stub_dns.start()
+        try:
+            resolver = ReverseResolver([address], max_entries=3)
+            await resolver.resolve(NAMED[:3])
+            # The first address is used again, the second becomes the least recently used
+            await resolver.resolve([NAMED[0]])
+            await resolver.resolve([NAMED[3]])
+            assert resolver.get_stats()["entries"] == 3
+            assert list(resolver._cache) == [NAMED[2], NAMED[0], NAMED[3]]
+
+            await resolver.resolve(NAMED)
+            assert [server.queries[qname(ip)] for ip in NAMED] == [1, 2, 1, 1]
+            assert resolver.get_stats()["entries"] == 3
+        finally:
+            transport.close()
+
+    asyncio.run(run())
+
+
+def test_inflight_deduplicated(logger):
+    async def run():
+        transport, server, address = await stub_dns.start(latency_s=0.1)
+        try:
+            resolver = ReverseResolver([address])
+            first = asyncio.create_task(resolver.resolve(NAMED[:3] + [NAMED[0]]))
+            await asyncio.sleep(0.01)
+            second = asyncio.create_task(resolver.resolve(NAMED[1:] + [UNNAMED]))
+            third = asyncio.create_task(resolver.resolve(NAMED[2:]))
+            await asyncio.sleep(0.01)
+            # A cancelled batch leaves the queries it shares running for the others
+            third.cancel()
+            names_first, names_second = await asyncio.gather(first, second)
+            with pytest.raises(asyncio.CancelledError):
+                await third
+
+            assert names_first == {ip: f"host-{int(ipaddress.ip_address(ip)):x}.lan" for ip in NAMED[:3]}
+            assert names_second == {
+                **{ip: f"host-{int(ipaddress.ip_address(ip)):x}.lan" for ip in NAMED[1:]}, UNNAMED: None
+            }
+            assert all(server.queries[qname(ip)] == 1 for ip in NAMED + [UNNAMED])
+            assert resolver.get_stats()["queries"] == 5
+            assert not resolver._inflight
+        finally:
+            transport.close()
+
+    asyncio.run(run())
@@ -0,0 +1,130 @@
+from ipaddress import ip_network
+
+import pytest
+
+from utils import InventoryStore, InventoryError, InventoryDelta, NmapHost, NmapRunStats, NmapSweepResult
+
+NETWORK = ip_network("10.0.0.0/24")
+
+# Scan time of the first recorded sweep
+T0 = 1_700_000_000.0
+
+FRESHNESS_S = 300
+EMPTY_FRESHNESS_S = 3600
+
+
+@pytest.fixture
+def inventory(tmp_path):
+    inventory = InventoryStore(str(tmp_path / "inventory.sqlite"), retention_s=0)
+    yield inventory
+    inventory.close()
+
+
+def delta(inventory: InventoryStore, empty_freshness_s: float = EMPTY_FRESHNESS_S) -> InventoryDelta:
+    # Blocks of 64 addresses, 4 in NETWORK
+    return InventoryDelta(inventory, FRESHNESS_S, empty_freshness_s, block_prefix_length=26)
+
+
+def up(ip: str, mac: str | None = None) -> NmapHost:
+    return NmapHost(ip, "up", latency_ms=0.5, mac=mac)
+
+
+def targets(plan) -> list[str]:
+    return [str(target) for target in plan.targets]
+
+
+def test_never_scanned_blocks_are_stale(inventory):
+    plan = delta(inventory).plan(NETWORK, T0)
+    assert targets(plan) == ["10.0.0.0/24"]
+    assert plan.probed == 256
+
+
+def test_fresh_and_stale_blocks(inventory):
+    inventory.record(ip_network("10.0.0.0/25"), T0, [up("10.0.0.5")])
+
+    # The first two blocks were scanned 100 s ago, the last two never: merged into a single /25
+    plan = delta(inventory).plan(NETWORK, T0 + 100)
+    assert targets(plan) == ["10.0.0.128/25"]
+    assert plan.probed == 128
+    assert not plan.is_stale("10.0.0.5") and plan.is_stale("10.0.0.200")
+
+
+def test_empty_blocks_use_longer_window(inventory):
+    inventory.record(NETWORK, T0, [up("10.0.0.5"), up("10.0.0.200")])
+
+    # Past the freshness window, only the blocks where a host was seen up are stale
+    plan = delta(inventory).plan(NETWORK, T0 + FRESHNESS_S + 1)
+    assert targets(plan) == ["10.0.0.0/26", "10.0.0.192/26"]
+
+    # Past the empty block window, all blocks are stale
+    plan = delta(inventory).plan(NETWORK, T0 + EMPTY_FRESHNESS_S + 1)
+    assert targets(plan) == ["10.0.0.0/24"]
+
+
+def test_empty_window_not_shorter_than_freshness(inventory):
+    inventory.record(NETWORK, T0, [up("10.0.0.5")])
+
+    plan = delta(inventory, empty_freshness_s=10).plan(NETWORK, T0 + 100)
+    assert plan.targets == []
+
+
+def test_consecutive_stale_blocks_merged(inventory):
+    inventory.record(ip_network("10.0.0.64/26"), T0, [])
+
+    # Blocks 0, 2 and 3 are stale: 2 and 3 are merged into a /25
+    plan = delta(inventory).plan(NETWORK, T0 + 100)
+    assert targets(plan) == ["10.0.0.0/26", "10.0.0.128/25"]
+    assert plan.probed == 192
+
+
+def test_partially_covered_block_is_stale(inventory):
+    inventory.record(ip_network("10.0.0.0/27"), T0, [])
+
+    plan = delta(inventory).plan(NETWORK, T0 + 100)
+    assert targets(plan) == ["10.0.0.0/24"]
+
+
+def test_too_many_blocks(inventory):
+    with pytest.raises(InventoryError):
+        InventoryDelta(inventory, FRESHNESS_S, EMPTY_FRESHNESS_S, block_prefix_length=32).plan(
+            ip_network("10.0.0.0/8"), T0)
+
+
+def test_diff_changes(inventory):
+    inventory.record(
+        NETWORK, T0,
+        [up("10.0.0.5", "00:00:00:00:00:05"), up("10.0.0.70"), up("10.0.0.130", "00:00:00:00:01:30"),
+         up("10.0.0.200")],
+    )
+    # The second block was scanned again later: it stays fresh and is not probed
+    inventory.record(ip_network("10.0.0.64/26"), T0 + 200, [up("10.0.0.70")])
+
+    now = T0 + FRESHNESS_S + 100
+    plan = delta(inventory).plan(NETWORK, now)
+    assert targets(plan) == ["10.0.0.0/26", "10.0.0.128/25"]
+    previous = inventory.alive_at(NETWORK, now)
+
+    hosts = [
+        up("10.0.0.5", "00:00:00:00:00:05"),
+        up("10.0.0.130", "00:00:00:00:99:99"),
+        up("10.0.0.140"),
+        NmapHost("10.0.0.150", "down"),
+    ]
+    changes, current = InventoryDelta.diff(plan, previous, hosts)
+
+    assert [(change.change, change.host.ip, change.previous_mac) for change in changes] == [
+        ("mac", "10.0.0.130", "00:00:00:00:01:30"),
+        ("up", "10.0.0.140", None),
+        ("down", "10.0.0.200", None),
+    ]
+    assert changes[2].host.state == "down"
+    assert [host.ip for host in current] == ["10.0.0.5", "10.0.0.70", "10.0.0.130", "10.0.0.140"]
+
+    result = NmapSweepResult(
+        str(NETWORK), current, NmapRunStats(up=4, down=252, total=256), changes=changes, probed=plan.probed)
+    lines = result.to_compact().splitlines()
+    assert lines[0] == "# changes: 1 up, 1 down, 1 mac changed"
+    assert lines[2].split("\t") == ["mac", "10.0.0.130", "up", "0.5", "00:00:00:00:99:99", "-", "-",
+                                    "00:00:00:00:01:30"]
+    assert lines[4].split("\t")[:3] == ["down", "10.0.0.200", "down"]
+    assert lines[-1].endswith(", 192 probed")
@@ -0,0 +1,94 @@
+import asyncio
+import os
+import re
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pytest
+import yaml
+
+from utils import ConfigParser
+from tools import Tool
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Networks swept, the IPv6 one with small addresses, whose synthetic up state (computed in floating point) varies
+NETWORKS = ["10.1.0.0/22", "::a01:0/118"]
+
+# Attributes of the nmap reports depending on the run time, not on the hosts found
+TIMING_ATTRIBUTES = {
+    "nmaprun": ("start", "startstr"),
+    "finished": ("time", "timestr", "elapsed", "summary"),
+}
+
+
+@pytest.fixture
+def fake_nmap(tmp_path, monkeypatch, logger) -> None:
+    """
+    Stand-in nmap of the benchmarks on PATH, and the tools configured without cache, inventory, name resolution
+    and timing model, so that every sweep runs nmap.
+    """
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    nmap = bin_dir / "nmap"
+    nmap.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{ROOT / "benchmarks" / "fake_nmap.py"}" "$@"\n')
+    nmap.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_NMAP_UP_RATIO", "0.3")
+
+    config = yaml.safe_load((ROOT / "config" / "config.yaml").read_text())
+    config["cache"]["enabled"] = False
+    config["inventory"]["enabled"] = False
+    config["dns"]["enabled"] = False
+    config["scan"]["timing"]["enabled"] = False
+    config["scan"]["discovery"] = {"technique": "icmp"}
+    config["scan"]["sharding"].update(prefix_length_v4=24, prefix_length_v6=120)
+    cfg_path = tmp_path / "config.yaml"
+    cfg_path.write_text(yaml.safe_dump(config))
+    Tool.configure(ConfigParser.get_config(str(cfg_path)).config)
+
+
+def sweep(cidr: str, output_format: str, sharded: bool) -> str:
+    """
+    Run a ping sweep and render its result.
+    """
+    arguments = {"ip_cidr": cidr, "timeout_s": 30, "format": output_format, "sharded": sharded}
+    return str(asyncio.run(Tool.exec_tool_async("ToolPingSweep", arguments)))
+
+
+def without_timing_compact(text: str) -> str:
+    """
+    Drop the elapsed time of the summary line of a compact result.
+    """
+    return re.sub(r", [0-9.]+s$", "", text, flags=re.MULTILINE)
+
+
+def without_timing_xml(text: str) -> str:
+    """
+    Canonical form of an XML report without its timing attributes, serialization details such as the doctype and
+    the spacing between elements ignored.
+    """
+    root = ET.fromstring(text.split("\n", 1)[1].replace("<!DOCTYPE nmaprun>", ""))
+    for element in root.iter():
+        for name in TIMING_ATTRIBUTES.get(element.tag, ()):
+            element.attrib.pop(name, None)
+    return ET.canonicalize(ET.tostring(root, encoding="unicode"), strip_text=True)
+
+
+@pytest.mark.parametrize("cidr", NETWORKS)
+def test_sharded_compact_matches_unsharded(fake_nmap, cidr):
+    unsharded = sweep(cidr, "compact", sharded=False)
+    sharded = sweep(cidr, "compact", sharded=True)
+
+    assert len(unsharded.splitlines()) > 100
+    assert without_timing_compact(sharded) == without_timing_compact(unsharded)
+
+
+@pytest.mark.parametrize("cidr", NETWORKS)
+def test_sharded_xml_matches_unsharded(fake_nmap, cidr):
+    unsharded = sweep(cidr, "xml", sharded=False)
+    sharded = sweep(cidr, "xml", sharded=True)
+
+    assert unsharded.count("<host>") > 100
+    assert without_timing_xml(sharded) == without_timing_xml(unsharded)
@@ -0,0 +1,150 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from tools import tool_cache, Tool, ToolPingSweep
+from tools.tool_cache import ToolCache
+from utils import NmapHost, NmapRunStats, NmapSweepResult
+
+# Hosts up of the cached sweep of 10.0.0.0/24
+HOSTS = ["10.0.0.1", "10.0.0.20", "10.0.0.130", "10.0.0.200"]
+
+
+class FakeClock:
+    """
+    Stand-in for the time module of the cache, advanced by the tests.
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(tool_cache, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def sweep(monkeypatch) -> ToolPingSweep:
+    # The cache keys tell whether the names are resolved, the resolver is disabled
+    monkeypatch.setattr(Tool, "_resolver", None)
+    return ToolPingSweep()
+
+
+def sweep_xml(cidr: str, hosts: list[str]) -> str:
+    """
+    nmap XML report of a ping sweep finding the given hosts up.
+    """
+    elements = "".join(
+        f'<host><status state="up" reason="echo-reply"/><address addr="{ip}" addrtype="ipv4"/></host>\n'
+        for ip in hosts
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<nmaprun scanner="nmap" args="nmap -sn {cidr}" start="1700000000">\n{elements}'
+        '<runstats><finished time="1700000001" elapsed="1.00" exit="success"/>'
+        f'<hosts up="{len(hosts)}" down="{256 - len(hosts)}" total="256"/></runstats>\n</nmaprun>\n'
+    )
+
+
+def sweep_result(cidr: str = "10.0.0.0/24", output_format: str = "compact") -> NmapSweepResult:
+    """
+    Result of a sweep of a /24 network finding the HOSTS up.
+    """
+    hosts = [NmapHost(ip, "up", latency_ms=0.5) for ip in HOSTS]
+    stats = NmapRunStats(up=len(hosts), down=256 - len(hosts), total=256, elapsed_s=1.0)
+    xml = sweep_xml(cidr, HOSTS) if output_format == "xml" else None
+    return NmapSweepResult(cidr, hosts, stats, xml)
+
+
+def key(sweep: ToolPingSweep, cidr: str, output_format: str = "compact", timeout_s: int = 5):
+    return sweep.cache_key({"ip_cidr": cidr, "timeout_s": timeout_s, "format": output_format})
+
+
+def test_ttl_expiry(clock):
+    cache = ToolCache(ttl_s=30, max_entries=8)
+    cache.put("ToolPingSweep", "a", "result")
+    clock.now += 29.9
+    assert cache.get("ToolPingSweep", "a") == (True, "result")
+    clock.now += 0.1
+    assert cache.get("ToolPingSweep", "a") == (False, None)
+    stats = cache.get_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["expirations"] == 1 and stats["size"] == 0
+
+
+def test_hit_does_not_extend_ttl(clock):
+    cache = ToolCache(ttl_s=30, max_entries=8)
+    cache.put("ToolPingSweep", "a", "result")
+    clock.now += 20
+    assert cache.get("ToolPingSweep", "a")[0]
+    clock.now += 10
+    assert not cache.get("ToolPingSweep", "a")[0]
+
+
+def test_lru_eviction(clock):
+    cache = ToolCache(ttl_s=30, max_entries=2)
+    cache.put("ToolPingSweep", "a", 1)
+    cache.put("ToolPingSweep", "b", 2)
+    # Used again, a is the most recently used and b is evicted first
+    assert cache.get("ToolPingSweep", "a") == (True, 1)
+    cache.put("ToolPingSweep", "c", 3)
+    assert cache.get("ToolPingSweep", "b") == (False, None)
+    assert cache.get("ToolPingSweep", "a") == (True, 1)
+    assert cache.get("ToolPingSweep", "c") == (True, 3)
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_keys_by_tool(clock):
+    cache = ToolCache()
+    cache.put("ToolPingSweep", "a", 1)
+    assert cache.get("ToolPingSweepBatch", "a") == (False, None)
+    assert cache.get("ToolPingSweepBatch", "a", lambda *_: "derived") == (False, None)
+
+
+def test_subsumed_sub_network(clock, sweep):
+    cache = ToolCache()
+    cache.put(sweep.get_name(), key(sweep, "10.0.0.0/24"), sweep_result())
+
+    found, result = cache.get(sweep.get_name(), key(sweep, "10.0.0.128/25"), sweep.cache_subsume)
+    assert found
+    assert result.target == "10.0.0.128/25"
+    assert [host.ip for host in result.hosts] == ["10.0.0.130", "10.0.0.200"]
+    assert (result.stats.up, result.stats.down, result.stats.total) == (2, 126, 128)
+    assert cache.get_stats()["subsumed_hits"] == 1
+
+    # A sub-network of an expired sweep is not answered
+    clock.now += ToolCache.DEFAULT_TTL_S
+    assert cache.get(sweep.get_name(), key(sweep, "10.0.0.128/25"), sweep.cache_subsume) == (False, None)
+
+
+def test_not_subsumed(clock, sweep):
+    cache = ToolCache()
+    cache.put(sweep.get_name(), key(sweep, "10.0.0.0/24"), sweep_result())
+
+    # A larger or a disjoint network, another family, other options
+    for other in (
+        key(sweep, "10.0.0.0/23"),
+        key(sweep, "10.0.1.0/25"),
+        key(sweep, "::ffff:10.0.0.0/120"),
+        key(sweep, "10.0.0.0/25", timeout_s=10),
+        key(sweep, "10.0.0.0/25", output_format="xml"),
+    ):
+        assert cache.get(sweep.get_name(), other, sweep.cache_subsume) == (False, None)
+    assert cache.get_stats()["misses"] == 5
+
+
+def test_subsumed_xml_runstats(clock, sweep):
+    cache = ToolCache()
+    cache.put(sweep.get_name(), key(sweep, "10.0.0.0/24", "xml"), sweep_result(output_format="xml"))
+
+    found, result = cache.get(sweep.get_name(), key(sweep, "10.0.0.0/26", "xml"), sweep.cache_subsume)
+    assert found
+    root = ET.fromstring(str(result).split("\n", 1)[1])
+    assert [host.find("address").get("addr") for host in root.findall("host")] == ["10.0.0.1", "10.0.0.20"]
+    # The run statistics are recomputed for the sub-network
+    assert root.find("runstats/hosts").attrib == {"up": "2", "down": "62", "total": "64"}
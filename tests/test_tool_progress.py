@@ -0,0 +1,59 @@
+import asyncio
+
+from tools.tool_progress import ToolProgress
+
+
+class Reports:
+    """
+    Progress reports received by the client, sent after a short delay like notifications on a transport.
+    """
+
+    def __init__(self):
+        self.values: list[float] = []
+
+    async def send(self, fraction: float) -> None:
+        await asyncio.sleep(0.01)
+        self.values.append(fraction)
+
+
+def test_updates_throttled():
+    async def run():
+        reports = Reports()
+        progress = ToolProgress(reports.send, interval_s=0.1)
+        for fraction in (0.1, 0.2, 0.3):
+            progress.update(fraction)
+        await asyncio.sleep(0.15)
+        # The first update is sent at once, the latest of the others at the end of the interval
+        assert reports.values == [0.1, 0.3]
+        progress.update(0.3)
+        await asyncio.sleep(0.15)
+        assert reports.values == [0.1, 0.3]
+        await progress.close()
+
+    asyncio.run(run())
+
+
+def test_close_sends_held_back_report():
+    async def run():
+        reports = Reports()
+        progress = ToolProgress(reports.send, interval_s=10.0)
+        progress.update(0.5)
+        progress.update(1.0)
+        # The last report is held back by the interval, close sends it and waits until it is sent
+        await progress.close()
+        assert reports.values == [0.5, 1.0]
+
+    asyncio.run(run())
+
+
+def test_close_without_pending_report():
+    async def run():
+        reports = Reports()
+        progress = ToolProgress(reports.send, interval_s=10.0)
+        await progress.close()
+        progress_sent = ToolProgress(reports.send, interval_s=10.0)
+        progress_sent.update(1.0)
+        await progress_sent.close()
+        assert reports.values == [1.0]
+
+    asyncio.run(run())
@@ -0,0 +1,200 @@
+import gzip
+import time
+
+import pytest
+
+from tools import tool_results, ToolResultStore, ToolResultError
+from tools.tool_results import ToolResultFilter
+from utils import NmapHost, NmapPort, NmapRunStats, NmapSweepResult, HostChange
+
+# Estimated size of a result of 10 hosts
+RESULT_BYTES = 10 * ToolResultStore.HOST_BYTES_ESTIMATE
+
+
+class FakeClock:
+    """
+    Stand-in for the time module of the store, advanced by the tests. It starts at the current monotonic time,
+    the time at which the handles are created.
+    """
+
+    def __init__(self):
+        self.now = time.monotonic()
+
+    def monotonic(self) -> float:
+        return self.now
+
+    @staticmethod
+    def time() -> float:
+        return time.time()
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(tool_results, "time", clock)
+    return clock
+
+
+def host(index: int) -> NmapHost:
+    """
+    Host 10.0.0.<index>, up with an open port 22 if the index is even, down otherwise.
+    """
+    if index % 2:
+        return NmapHost(f"10.0.0.{index}", "down")
+    return NmapHost(f"10.0.0.{index}", "up", 0.5, ports=(NmapPort(22, "tcp", "open", "ssh"),))
+
+
+def sweep_result(count: int = 10, changes: list[HostChange] | None = None) -> NmapSweepResult:
+    """
+    Result of a sweep of 10.0.0.0/24 with the hosts 10.0.0.1 to 10.0.0.<count>.
+    """
+    hosts = [host(index) for index in range(1, count + 1)]
+    up = sum(1 for item in hosts if item.state == "up")
+    return NmapSweepResult("10.0.0.0/24", hosts, NmapRunStats(up=up, down=256 - up, total=256), changes=changes)
+
+
+def test_cursor_round_trip():
+    for result_filter in (ToolResultFilter(), ToolResultFilter("up", "10.0.0.0/28", 22)):
+        cursor = ToolResultStore.encode_cursor("0123456789abcdef", 512, 256, result_filter)
+        assert "=" not in cursor
+        assert ToolResultStore.decode_cursor(cursor) == ("0123456789abcdef", 512, 256, result_filter)
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", "e30", "eyJoIjoiYSIsIm8iOiJ4IiwibCI6MX0", "bm90IGpzb24"])
+def test_invalid_cursor(cursor):
+    # Not base64, no position, offset not a number, not JSON
+    with pytest.raises(ToolResultError):
+        ToolResultStore.decode_cursor(cursor)
+
+
+def test_pages(clock):
+    store = ToolResultStore(page_size=4)
+    result = sweep_result()
+    assert store.needs_paging(result) and not store.needs_paging(sweep_result(4))
+    handle = store.put("ToolPingSweep", result)
+
+    page = store.page(handle).splitlines()
+    assert page[0] == f"# result {handle.handle_id}: rows 1-4 of 10"
+    cursor = page[1].removeprefix("# next cursor: ")
+    assert ToolResultStore.decode_cursor(cursor) == (handle.handle_id, 4, 4, ToolResultFilter())
+    assert page[2] == f"# full result: result://{handle.handle_id} (application/gzip)"
+    assert [line.split("\t")[0] for line in page[5:9]] == ["10.0.0.1", "10.0.0.2", "10.0.0.3", "10.0.0.4"]
+
+    # The last page has no next cursor
+    page = store.page(handle, 8, 4).splitlines()
+    assert page[0] == f"# result {handle.handle_id}: rows 9-10 of 10"
+    assert not page[1].startswith("# next cursor")
+    page = store.page(handle, 12, 4).splitlines()
+    assert page[0] == f"# result {handle.handle_id}: no rows from 13, 10 rows"
+    assert store.get_stats()["pages"] == 3
+
+
+def test_changes_on_first_unfiltered_page(clock):
+    store = ToolResultStore(page_size=4)
+    handle = store.put("ToolPingSweep", sweep_result(changes=[HostChange("up", host(2))]))
+
+    assert "# changes: 1 up" in store.page(handle)
+    assert "# changes" not in store.page(handle, 4)
+    assert "# changes" not in store.page(handle, result_filter=ToolResultFilter(state="up"))
+
+
+def test_filtered_views(clock):
+    store = ToolResultStore(page_size=4)
+    handle = store.put("ToolPingSweep", sweep_result())
+
+    up = ToolResultFilter(state="up")
+    page = store.page(handle, result_filter=up).splitlines()
+    assert page[0] == f"# result {handle.handle_id}: rows 1-4 of 5 (state=up)"
+    assert ToolResultStore.decode_cursor(page[1].removeprefix("# next cursor: "))[3] == up
+    assert [item.ip for item in handle.views[up]] == ["10.0.0.2", "10.0.0.4", "10.0.0.6", "10.0.0.8", "10.0.0.10"]
+
+    # The view is filtered once and kept with the result
+    view = handle.views[up]
+    store.page(handle, 4, result_filter=up)
+    assert handle.views[up] is view
+
+    assert [item.ip for item in ToolResultFilter(cidr="10.0.0.0/29").apply(handle.result.hosts)] == [
+        f"10.0.0.{index}" for index in range(1, 8)
+    ]
+    assert len(ToolResultFilter(port=22).apply(handle.result.hosts)) == 5
+    assert ToolResultFilter(state="down", port=22).apply(handle.result.hosts) == []
+
+
+def test_views_capped(clock):
+    store = ToolResultStore(page_size=4)
+    handle = store.put("ToolPingSweep", sweep_result())
+
+    filters = [ToolResultFilter(cidr=f"10.0.0.{index}/32") for index in range(1, ToolResultStore.MAX_VIEWS + 2)]
+    for result_filter in filters[:-1]:
+        store.page(handle, result_filter=result_filter)
+    # Used again, the first filtered view is the most recently used
+    store.page(handle, result_filter=filters[0])
+    store.page(handle, result_filter=filters[-1])
+
+    assert len(handle.views) == ToolResultStore.MAX_VIEWS
+    assert ToolResultFilter() in handle.views
+    assert filters[0] in handle.views and filters[-1] in handle.views
+    assert filters[1] not in handle.views
+
+
+def test_ttl_expiry(clock):
+    store = ToolResultStore(page_size=4, ttl_s=60)
+    handle = store.put("ToolPingSweep", sweep_result())
+
+    clock.now += 50
+    assert store.get(handle.handle_id) is handle
+    # Reading a result extends its time to live
+    clock.now += 50
+    assert store.get(handle.handle_id) is handle
+    clock.now += 61
+    with pytest.raises(ToolResultError):
+        store.get(handle.handle_id)
+    stats = store.get_stats()
+    assert stats["expirations"] == 1 and stats["results"] == 0 and stats["bytes"] == 0
+
+
+def test_byte_budget_eviction(clock):
+    store = ToolResultStore(page_size=4, max_bytes=2 * RESULT_BYTES + RESULT_BYTES // 2)
+    first = store.put("ToolPingSweep", sweep_result())
+    second = store.put("ToolPingSweep", sweep_result())
+    # Read again, the first result is the most recently read and the second is evicted
+    store.get(first.handle_id)
+    third = store.put("ToolPingSweep", sweep_result())
+
+    assert [handle.handle_id for handle in store.get_handles()] == [first.handle_id, third.handle_id]
+    with pytest.raises(ToolResultError):
+        store.get(second.handle_id)
+    stats = store.get_stats()
+    assert stats["evictions"] == 1 and stats["bytes"] == 2 * RESULT_BYTES
+
+    # A result larger than the whole store is not kept
+    assert store.put("ToolPingSweep", sweep_result(30)) is None
+    assert store.get_stats()["rejected"] == 1 and store.get_stats()["results"] == 2
+
+
+def test_max_results_eviction(clock):
+    store = ToolResultStore(page_size=4, max_results=2)
+    handles = [store.put("ToolPingSweep", sweep_result()) for _ in range(3)]
+
+    assert [handle.handle_id for handle in store.get_handles()] == [handles[1].handle_id, handles[2].handle_id]
+    assert store.get_stats()["evictions"] == 1
+
+
+def test_compressed_size_accounting(clock):
+    store = ToolResultStore(page_size=4, ttl_s=60)
+    handle = store.put("ToolPingSweep", sweep_result())
+
+    compressed = store.compressed(handle.handle_id)
+    assert gzip.decompress(compressed).decode() == str(handle.result)
+    assert handle.size_bytes == RESULT_BYTES + len(compressed)
+    assert store.get_stats()["bytes"] == RESULT_BYTES + len(compressed)
+
+    # Built once, not counted again
+    assert store.compressed(handle.handle_id) is compressed
+    assert store.get_stats()["bytes"] == RESULT_BYTES + len(compressed)
+
+    # Dropped with the result
+    clock.now += 61
+    with pytest.raises(ToolResultError):
+        store.compressed(handle.handle_id)
+    assert store.get_stats()["bytes"] == 0
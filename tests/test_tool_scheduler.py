@@ -0,0 +1,160 @@
+import asyncio
+
+from tools.tool_scheduler import ToolScheduler
+
+
+class FakeScans:
+    """
+    Fake scans holding a scheduler slot until released, recording the order in which they start.
+    """
+
+    def __init__(self, scheduler: ToolScheduler):
+        self.scheduler = scheduler
+        self.started: list[str] = []
+        self.running = 0
+        self.peak = 0
+        self._release: dict[str, asyncio.Event] = {}
+
+    async def scan(self, name: str, caller: str | None = None, priority: int = ToolScheduler.DEFAULT_PRIORITY,
+                   duration_s: float | None = None) -> None:
+        """
+        Run a fake scan, until released or for a fixed duration.
+        """
+        self._release[name] = asyncio.Event()
+        async with self.scheduler.slot(caller, priority):
+            self.started.append(name)
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            try:
+                if duration_s is not None:
+                    await asyncio.sleep(duration_s)
+                else:
+                    await self._release[name].wait()
+            finally:
+                self.running -= 1
+
+    def release(self, name: str) -> None:
+        self._release[name].set()
+
+
+async def settle() -> None:
+    """
+    Let the scheduled tasks run until they block.
+    """
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_slot_cap():
+    async def run():
+        scheduler = ToolScheduler(max_concurrent=2)
+        scans = FakeScans(scheduler)
+        tasks = [asyncio.create_task(scans.scan(f"scan{i}", duration_s=0.01)) for i in range(6)]
+        await settle()
+        assert scheduler.get_stats()["running"] == 2
+        assert scheduler.get_stats()["queue_depth"] == 4
+        await asyncio.gather(*tasks)
+        assert scans.peak == 2
+        assert scheduler.get_stats()["running"] == 0
+        assert scheduler.get_stats()["granted"] == 6
+
+    asyncio.run(run())
+
+
+def test_priority_order():
+    async def run():
+        scheduler = ToolScheduler(max_concurrent=1)
+        scans = FakeScans(scheduler)
+        first = asyncio.create_task(scans.scan("first"))
+        await settle()
+        tasks = [
+            asyncio.create_task(scans.scan(name, priority=priority))
+            for name, priority in (("low", 7), ("high", 1), ("normal", 5), ("high2", 1))
+        ]
+        await settle()
+        for name in ("first", "high", "high2", "normal", "low"):
+            await settle()
+            assert scans.started[-1] == name
+            scans.release(name)
+        await asyncio.gather(first, *tasks)
+        assert scans.started == ["first", "high", "high2", "normal", "low"]
+
+    asyncio.run(run())
+
+
+def test_caller_fairness():
+    async def run():
+        scheduler = ToolScheduler(max_concurrent=1)
+        scans = FakeScans(scheduler)
+        # The busy caller already used scan time
+        await scans.scan("busy0", caller="busy", duration_s=0.01)
+        first = asyncio.create_task(scans.scan("busy1", caller="busy"))
+        await settle()
+        tasks = [asyncio.create_task(scans.scan(f"busy{i}", caller="busy", duration_s=0.01)) for i in range(2, 5)]
+        await settle()
+        tasks.append(asyncio.create_task(scans.scan("quiet", caller="quiet", duration_s=0.01)))
+        await settle()
+        scans.release("busy1")
+        await asyncio.gather(first, *tasks)
+        # Queued last, the scan of the other caller starts first
+        assert scans.started[2] == "quiet"
+        assert set(scheduler.get_stats()["usage_s"]) == {"busy", "quiet"}
+
+    asyncio.run(run())
+
+
+def test_cancel_waiting():
+    async def run():
+        scheduler = ToolScheduler(max_concurrent=1)
+        scans = FakeScans(scheduler)
+        first = asyncio.create_task(scans.scan("first", caller="a"))
+        await settle()
+        cancelled = asyncio.create_task(scans.scan("cancelled", caller="b"))
+        waiting = asyncio.create_task(scans.scan("waiting", caller="c", duration_s=0.0))
+        await settle()
+        assert scheduler.get_stats()["queue_depth"] == 2
+        cancelled.cancel()
+        await settle()
+        assert cancelled.cancelled()
+        assert scheduler.get_stats()["queue_depth"] == 1
+        scans.release("first")
+        await asyncio.gather(first, waiting)
+        assert scans.started == ["first", "waiting"]
+        assert scheduler.get_stats()["running"] == 0
+        # The cancelled caller left no accounting behind once idle and forgotten
+        scheduler.forget("b")
+        assert "b" not in scheduler.get_stats()["usage_s"]
+
+    asyncio.run(run())
+
+
+def test_forget_caller():
+    async def run():
+        scheduler = ToolScheduler(max_concurrent=1)
+        scans = FakeScans(scheduler)
+        await scans.scan("idle", caller="idle", duration_s=0.0)
+        running = asyncio.create_task(scans.scan("running", caller="running"))
+        await settle()
+        assert set(scheduler.get_stats()["usage_s"]) == {"idle"}
+        scheduler.forget("idle")
+        scheduler.forget("running")
+        assert scheduler.get_stats()["usage_s"] == {}
+        # The accounting of a forgotten caller is dropped once its scans end, not recorded again
+        scans.release("running")
+        await running
+        assert scheduler.get_stats()["usage_s"] == {}
+
+    asyncio.run(run())
+
+
+def test_idle_callers_expire():
+    async def run():
+        scheduler = ToolScheduler(max_concurrent=1)
+        scheduler.IDLE_TTL_S = 0.0
+        scans = FakeScans(scheduler)
+        await scans.scan("old", caller="old", duration_s=0.0)
+        await asyncio.sleep(0.01)
+        await scans.scan("new", caller="new", duration_s=0.0)
+        assert "old" not in scheduler.get_stats()["usage_s"]
+
+    asyncio.run(run())
@@ -0,0 +1,181 @@
+import random
+from ipaddress import collapse_addresses, ip_address, ip_network, IPv4Address, IPv6Address, IPv4Network, IPv6Network
+
+import pytest
+
+from utils.type import DataContainerError, IPTargetSet
+
+# Small address spaces of the random networks, so that the reference sets can hold every address
+SPACES = {
+    4: (ip_network("10.0.0.0/22"), 22, 32),
+    6: (ip_network("2001:db8::/118"), 118, 128),
+}
+
+# Number of random cases of each property
+SEEDS = range(200)
+
+
+def random_network(rng: random.Random, version: int) -> IPv4Network | IPv6Network:
+    """
+    Random network of an address family within its address space.
+    """
+    space, shortest, longest = SPACES[version]
+    prefix = rng.randint(shortest, longest)
+    offset = rng.getrandbits(prefix - space.prefixlen) << (space.max_prefixlen - prefix)
+    return ip_network((int(space.network_address) + offset, prefix))
+
+
+def random_networks(rng: random.Random, count: int) -> list[IPv4Network | IPv6Network]:
+    """
+    Random IPv4 and IPv6 networks, about half of each family.
+    """
+    return [random_network(rng, rng.choice((4, 6))) for _ in range(count)]
+
+
+def reference(networks: list[IPv4Network | IPv6Network]) -> set[tuple[int, int]]:
+    """
+    Reference set of the (IP version, address) pairs of networks.
+    """
+    return {(network.version, int(address)) for network in networks for address in network}
+
+
+def addresses(target_set: IPTargetSet) -> set[tuple[int, int]]:
+    """
+    Enumerate the (IP version, address) pairs of a target set.
+    """
+    return {
+        (first.version, value)
+        for first, last in target_set.ranges() for value in range(int(first), int(last) + 1)
+    }
+
+
+def random_pair(seed: int) -> tuple[random.Random, list, list]:
+    """
+    Random generator of a case and two random lists of networks.
+    """
+    rng = random.Random(seed)
+    return rng, random_networks(rng, rng.randint(0, 10)), random_networks(rng, rng.randint(0, 10))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_set_operations(seed):
+    _, a, b = random_pair(seed)
+    set_a, set_b = IPTargetSet(a), IPTargetSet(b)
+    ref_a, ref_b = reference(a), reference(b)
+
+    assert addresses(set_a) == ref_a
+    assert addresses(set_a | set_b) == ref_a | ref_b
+    assert addresses(set_a & set_b) == ref_a & ref_b
+    assert addresses(set_a - set_b) == ref_a - ref_b
+    assert set_a | set_b == set_b | set_a
+    assert set_a & set_b == set_b & set_a
+    assert (set_a - set_b) | (set_a & set_b) == set_a
+    assert not (set_a - set_b) & set_b
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_counts(seed):
+    _, a, _ = random_pair(seed)
+    set_a, ref_a = IPTargetSet(a), reference(a)
+
+    assert set_a.num_addresses() == len(ref_a)
+    for version in IPTargetSet.VERSIONS:
+        assert set_a.num_addresses(version) == sum(1 for item, _ in ref_a if item == version)
+        assert addresses(set_a.family(version)) == {item for item in ref_a if item[0] == version}
+    assert bool(set_a) == bool(ref_a)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_membership(seed):
+    rng, a, _ = random_pair(seed)
+    set_a, ref_a = IPTargetSet(a), reference(a)
+
+    for version, (space, _, _) in SPACES.items():
+        for _ in range(32):
+            address = ip_address(int(space.network_address) + rng.randrange(space.num_addresses))
+            assert (address in set_a) == ((version, int(address)) in ref_a)
+            assert (str(address) in set_a) == ((version, int(address)) in ref_a)
+        network = random_network(rng, version)
+        assert (network in set_a) == reference([network]).issubset(ref_a)
+    for network in a:
+        assert network in set_a
+        assert network.network_address in set_a and network.broadcast_address in set_a
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_minimal_networks(seed):
+    _, a, _ = random_pair(seed)
+    set_a = IPTargetSet(a)
+    expected = [
+        network for version in IPTargetSet.VERSIONS
+        for network in collapse_addresses(network for network in a if network.version == version)
+    ]
+
+    assert set_a.to_networks() == expected
+    assert IPTargetSet(set_a.to_networks()) == set_a
+    # The intervals are disjoint and not adjacent
+    ranges = list(set_a.ranges())
+    for (_, last), (first, _) in zip(ranges, ranges[1:]):
+        assert first.version != last.version or int(first) > int(last) + 1
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_split(seed):
+    rng, a, _ = random_pair(seed)
+    set_a = IPTargetSet(a)
+    count = rng.randint(1, 8)
+    chunks = set_a.split(count)
+    sizes = [chunk.num_addresses() for chunk in chunks]
+
+    assert len(chunks) == min(count, set_a.num_addresses())
+    assert sum(sizes) == set_a.num_addresses()
+    assert not sizes or max(sizes) - min(sizes) <= 1
+    union = IPTargetSet()
+    for chunk in chunks:
+        assert chunk and not union & chunk
+        union = union | chunk
+    assert union == set_a
+    # The chunks follow the address order, IPv4 first
+    flattened = [pair for chunk in chunks for first, last in chunk.ranges() for pair in (first, last)]
+    assert flattened == sorted(flattened, key=lambda address: (address.version, int(address)))
+
+
+def test_adjacent_networks_merge():
+    halves = IPTargetSet([ip_network("10.0.0.0/25"), ip_network("10.0.0.128/25")])
+    assert halves.num_intervals() == 1
+    assert halves.to_networks() == [ip_network("10.0.0.0/24")]
+
+    touching = IPTargetSet([IPv4Address("10.0.0.5"), ip_network("10.0.0.6/31"), IPv4Address("10.0.0.8")])
+    assert touching.num_intervals() == 1
+    assert [(str(first), str(last)) for first, last in touching.ranges()] == [("10.0.0.5", "10.0.0.8")]
+
+    gap = IPTargetSet([IPv4Address("10.0.0.5"), IPv4Address("10.0.0.7")])
+    assert gap.num_intervals() == 2
+
+
+def test_families_never_merge():
+    # ::ffff:0:0/96 maps IPv4 into IPv6, the families stay apart
+    mixed = IPTargetSet([ip_network("0.0.0.0/0"), ip_network("::ffff:0:0/96")])
+    assert mixed.num_intervals() == 2
+    assert mixed.num_addresses(4) == mixed.num_addresses(6) == 1 << 32
+    assert ip_address("::ffff:10.0.0.1") in mixed and ip_address("::1") not in mixed
+
+
+def test_address_space_bounds():
+    full = IPTargetSet(["0.0.0.0/0", "::/0"])
+    assert IPv4Address("0.0.0.0") in full and IPv4Address("255.255.255.255") in full
+    assert IPv6Address("::") in full and IPv6Address("ffff:ffff:ffff:ffff:ffff:ffff:ffff:ffff") in full
+    assert full.num_addresses() == (1 << 32) + (1 << 128)
+    edges = IPTargetSet(["0.0.0.0/32", "255.255.255.255/32"])
+    assert (full - edges).num_addresses(4) == (1 << 32) - 2
+    assert (full - edges).to_networks()[0] == ip_network("0.0.0.1/32")
+    assert full.split(3)[0].num_addresses() == ((1 << 32) + (1 << 128) + 2) // 3
+
+
+def test_invalid_targets():
+    with pytest.raises(DataContainerError):
+        IPTargetSet(["10.0.0.0/33"])
+    with pytest.raises(DataContainerError):
+        IPTargetSet([42])
+    with pytest.raises(DataContainerError):
+        IPTargetSet(["10.0.0.0/24"]).split(0)